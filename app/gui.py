@@ -1,30 +1,33 @@
 # app/gui.py
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import ctypes
 import sys
 import platform
 import psutil
-import subprocess
 import os
-from typing import Dict, Tuple
+import queue
+import threading
+from typing import Dict, Optional, Tuple
 
 from ui.scrollpanel import ScrollableFrame
 from ui.logpanel import LogPanel
 from ui.dnspopup import DNSConfigPopup
+from ui.monitorpanel import MonitorWindow
+from ui.diskscanpanel import DiskScanWindow
 
 from modules.task_runner import TaskRunner, TaskDef, TaskLevel
 import modules.sys_tasks as sys_tasks
 import modules.net_tasks as net_tasks
 import modules.game_tasks as game_tasks
-from modules import diagnostics
-
-# GPU 信息（可选）
-try:
-    import GPUtil
-    GPU_SUPPORT = True
-except Exception:
-    GPU_SUPPORT = False
+from modules import diagnostics, proc_profiler, profiling, retry_queue
+from modules.findings import render_text
+from modules.command_exec import run_command, spawn_detached
+from modules.net_probe import LatencyMonitor
+from modules.gpu_info import get_provider as get_gpu_provider
+from modules.game_session import GameSessionOptimizer, SessionConfig
+from modules.idle_maintenance import GameWatcher, IdleConfig, IdleMaintenance
+from modules.io_throttle import ThrottleConfig
 
 
 # ============================================================
@@ -82,9 +85,24 @@ class App:
         self.task_vars: Dict[str, Tuple[TaskDef, tk.BooleanVar]] = {}
 
         # DNS 设置
-        self.dns_target_ip = None
+        self.dns_target = None  # net_tasks.DnsServers
         self._dns_checkbox = None
 
+        # 网络延迟监控（后台线程，按需启动）
+        self.latency_monitor = LatencyMonitor()
+        self._latency_job = None
+
+        # 启动时在后台预读 GPU 信息，首次点击「显示系统信息」即可命中缓存
+        get_gpu_provider().refresh()
+
+        # 游戏会话优化（进程优先级 / 核心绑定）
+        self.game_session = None
+        self._session_job = None
+
+        # 空闲时自动维护（任务全部创建后再构造调度器）
+        self.idle_config = IdleConfig.load()
+        self.idle_maintenance = None
+
         # 每个 Tab 的说明区 Text
         self.desc_widgets = {}
 
@@ -102,9 +120,29 @@ class App:
             text="执行所有勾选任务",
             command=self._on_run_clicked
         ).pack()
+        # 默认快速模式；检测到游戏运行时会自动改用限速模式
+        self._throttle_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="限速清理（低优先级，避免游戏卡顿）",
+                        variable=self._throttle_var).pack()
 
         # 任务执行器
-        self.runner = TaskRunner(logger=self.logger, tk_root=self.root)
+        self.runner = TaskRunner(logger=self.logger, tk_root=self.root,
+                                 latency_monitor=self.latency_monitor)
+
+        self.idle_maintenance = IdleMaintenance(
+            self.idle_config, {key: task for key, (task, _) in self.task_vars.items()}, self.logger)
+        if self.idle_config.enabled:
+            self.idle_maintenance.start()
+            if self.idle_config.pending:
+                self.logger(f"[空闲维护] 上次有 {len(self.idle_config.pending)} 个任务未完成，"
+                            "将在下次空闲时继续。")
+        self._refresh_idle_status()
+
+        # 上次被占用而未删除的文件：启动时在后台按记录的路径重试一次
+        threading.Thread(target=retry_queue.retry_due, args=(self.logger,), daemon=True).start()
+
+        # 关闭窗口时恢复进程优先级、停止后台线程
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     # ============================================================
     #        左右分栏布局：左任务列表 + 右说明区
@@ -188,8 +226,17 @@ class App:
              lambda: sys_tasks.clean_windows_update_cache(self.logger),
              "清理 Windows Update 缓存，解决更新失败或磁盘占用。"),
         ]
+        sys_probes = {
+            "clean_temp": sys_tasks.probe_clean_temp,
+            "clean_prefetch": sys_tasks.probe_clean_prefetch,
+            "clean_dx_shader": sys_tasks.probe_clean_dx_shader_cache,
+            "clean_nv_shader": sys_tasks.probe_clean_nvidia_shader_cache,
+            "clean_recent": sys_tasks.probe_clean_recent,
+            "clean_win_update_cache": sys_tasks.probe_clean_windows_update_cache,
+        }
         for key, label, level, func, desc_text in sys_items:
-            self._add_task_row(left, key, label, level, func, desc_text, tab_key="系统优化")
+            self._add_task_row(left, key, label, level, func, desc_text, tab_key="系统优化",
+                               probe=sys_probes.get(key))
 
         ttk.Label(left, text="系统谨慎任务（LEVEL 2）：").pack(anchor="w", pady=(15, 5))
 
@@ -217,8 +264,7 @@ class App:
         ttk.Label(left, text="系统重启相关（LEVEL 3）：").pack(anchor="w", pady=(15, 5))
 
         def reboot_func():
-            self.logger("执行：shutdown /g /f /t 0")
-            subprocess.run(["shutdown", "/g", "/f", "/t", "0"], check=True)
+            run_command(["shutdown", "/g", "/f", "/t", "0"], self.logger)
 
         self._add_task_row(
             left,
@@ -260,7 +306,8 @@ class App:
              "轻量级修复 TCP/IP 协议栈，不修改你的 IP 配置。"),
         ]
         for key, label, level, func, desc_text in net_items:
-            self._add_task_row(left, key, label, level, func, desc_text, tab_key="网络工具")
+            self._add_task_row(left, key, label, level, func, desc_text, tab_key="网络工具",
+                               is_network_task=True)
 
         ttk.Label(left, text="网络谨慎任务（LEVEL 2）：").pack(anchor="w", pady=(15, 5))
 
@@ -273,18 +320,19 @@ class App:
         self._dns_checkbox = cb
 
         def dns_func():
-            if not self.dns_target_ip:
+            if not self.dns_target:
                 self.logger("DNS 未配置，跳过执行。")
                 return
-            net_tasks.set_dns(self.logger, self.dns_target_ip)
+            net_tasks.set_dns(self.logger, self.dns_target)
 
         dns_task = TaskDef(
             key="set_dns",
             label="应用 DNS 设置",
             level=TaskLevel.LEVEL2,
             func=dns_func,
-            warn="执行后会通过 netsh 修改网卡 DNS，网络会短暂掉线。",
-            is_dns_task=True
+            warn="执行后会通过 netsh 修改所有活动网卡的 DNS，网络会短暂掉线。",
+            is_dns_task=True,
+            is_network_task=True,
         )
         self.task_vars["set_dns"] = (dns_task, var)
 
@@ -296,6 +344,8 @@ class App:
                 "通过 netsh 命令修改网卡 DNS 服务器地址。\n\n"
                 "可用来切换阿里 / 腾讯 / Google / Cloudflare 等公共 DNS，"
                 "提升解析速度或稳定性。\n\n"
+                "会同时应用到所有已连接的网卡（有线 / 无线），并设置主、备 DNS"
+                "（可选 IPv6）。执行前会备份原设置，执行后自动核对并做一次测试解析。\n\n"
                 "注意：执行时会短暂掉线。"
             )
         )
@@ -303,6 +353,32 @@ class App:
 
         ttk.Button(frame, text="配置…", command=self._open_dns_popup).pack(side="right")
 
+        self._add_task_row(
+            left,
+            "restore_dns",
+            "恢复原 DNS 设置",
+            TaskLevel.LEVEL2,
+            lambda: net_tasks.restore_dns(self.logger),
+            "按「应用 DNS 设置」执行前保存的备份，恢复各网卡原来的 DNS"
+            "（自动获取 / 原静态地址）。\n\n"
+            "注意：执行时会短暂掉线。",
+            tab_key="网络工具",
+            is_dns_task=True,
+            is_network_task=True,
+        )
+
+        # 网络延迟监控
+        ttk.Label(left, text="网络延迟监控：").pack(anchor="w", pady=(15, 5))
+
+        self._latency_btn = ttk.Button(left, text="开始监控", command=self._toggle_latency_monitor)
+        self._latency_btn.pack(anchor="w", pady=2)
+
+        self._latency_var = tk.StringVar(
+            value="对常用游戏服务器持续测量 TCP 建连延迟。\n"
+                  "勾选网络任务执行时，会自动对比执行前后的延迟。"
+        )
+        ttk.Label(left, textvariable=self._latency_var, justify="left").pack(anchor="w", pady=2)
+
     # ============================================================
     #                       游戏增强 TAB
     # ============================================================
@@ -338,9 +414,49 @@ class App:
             ("clean_game_cache", "清理游戏 Shader Cache", TaskLevel.LEVEL1,
              lambda: game_tasks.clean_game_shader_cache(self.logger),
              "清理 Steam / WeGame Shader 缓存，修复卡顿、异常着色等问题。"),
+
+            ("restore_registry", "撤销上次注册表修改", TaskLevel.LEVEL1,
+             lambda: game_tasks.restore_registry_changes(self.logger),
+             "按修改前保存的快照，恢复最近一次「禁用 UWP 后台」或「启用 GameMode」"
+             "改动过的注册表值。"),
         ]
+        game_probes = {
+            "disable_uwp_bg": game_tasks.probe_uwp_background,
+            "high_perf_power": game_tasks.probe_high_performance_plan,
+            "set_balanced_plan": game_tasks.probe_balanced_plan,
+            "set_power_saver_plan": game_tasks.probe_power_saver_plan,
+            "enable_gamemode": game_tasks.probe_game_mode,
+            "clean_game_cache": game_tasks.probe_game_shader_cache,
+        }
+        # 与被撤销的任务同时勾选时，TaskRunner 会先执行撤销
+        game_undoes = {
+            "restore_registry": ("disable_uwp_bg", "enable_gamemode"),
+        }
         for key, label, level, func, desc_text in game_items:
-            self._add_task_row(left, key, label, level, func, desc_text, tab_key="游戏增强")
+            self._add_task_row(left, key, label, level, func, desc_text, tab_key="游戏增强",
+                               probe=game_probes.get(key), undoes=game_undoes.get(key, ()))
+
+        # 游戏会话优化：不是一次性任务，单独放按钮
+        ttk.Label(left, text="游戏会话优化：").pack(anchor="w", pady=(15, 5))
+
+        target_row = ttk.Frame(left)
+        target_row.pack(anchor="w", fill="x")
+        ttk.Label(target_row, text="游戏进程名或路径：").pack(side="left")
+        self._session_target = tk.StringVar(value="")
+        ttk.Entry(target_row, textvariable=self._session_target, width=24).pack(side="left")
+
+        self._session_pin = tk.BooleanVar(value=False)
+        self._session_demote = tk.BooleanVar(value=True)
+        ttk.Checkbutton(left, text="绑定游戏到最快的核心", variable=self._session_pin)\
+            .pack(anchor="w")
+        ttk.Checkbutton(left, text="降低启动器 / 更新程序 / 覆盖层优先级",
+                        variable=self._session_demote).pack(anchor="w")
+
+        self._session_btn = ttk.Button(left, text="开始会话优化", command=self._toggle_game_session)
+        self._session_btn.pack(anchor="w", pady=5)
+        self._session_status = tk.StringVar(value="未启动")
+        ttk.Label(left, textvariable=self._session_status, foreground="#555555")\
+            .pack(anchor="w")
 
     # ============================================================
     #                     工具与设置 TAB
@@ -376,40 +492,117 @@ class App:
             info.append(f"内存总量：{mem.total / (1024 ** 3):.2f} GB")
             info.append(f"内存占用：{mem.percent}%")
 
-            if GPU_SUPPORT:
-                try:
-                    gpus = GPUtil.getGPUs()
-                    if gpus:
-                        gpu = gpus[0]
-                        info.append(f"GPU：{gpu.name}")
-                        info.append(f"显存占用：{gpu.memoryUsed} MB / {gpu.memoryTotal} MB")
-                        info.append(f"GPU 温度：{gpu.temperature}°C")
-                    else:
-                        info.append("GPU：未检测到 GPU")
-                except Exception:
-                    info.append("GPU 信息读取失败（GPUtil 异常）")
-            else:
-                info.append("GPU 信息：未安装 GPUtil（可选依赖）")
+            # GPU 信息在后台读取，先显示缓存，读取完成后再刷新一次
+            gpu = get_gpu_provider()
+            self.show_description("\n".join(info + gpu.snapshot().describe()))
+
+            def wait_gpu(tries=0):
+                if gpu.busy and tries < 50:
+                    self.root.after(100, wait_gpu, tries + 1)
+                    return
+                self.show_description("\n".join(info + gpu.snapshot().describe()))
 
-            self.show_description("\n".join(info))
+            if gpu.busy:
+                self.root.after(100, wait_gpu)
 
         ttk.Button(left, text="显示系统信息", command=show_sysinfo)\
             .pack(anchor="w", pady=5)
 
+        ttk.Button(left, text="实时监控（CPU / 内存 / 磁盘 / 网络）",
+                   command=lambda: MonitorWindow(self.root))\
+            .pack(anchor="w", pady=5)
+
+        ttk.Button(left, text="磁盘空间分析（查找大文件 / 大目录）",
+                   command=lambda: DiskScanWindow(self.root))\
+            .pack(anchor="w", pady=5)
+
         # 打开任务管理器
-        ttk.Button(left, text="打开任务管理器", command=lambda: subprocess.Popen("taskmgr"))\
+        ttk.Button(left, text="打开任务管理器", command=lambda: spawn_detached(["taskmgr"]))\
             .pack(anchor="w", pady=10)
 
         # 设备驱动诊断（HID / USB / 键鼠）
         ttk.Label(left, text="诊断工具：").pack(anchor="w", pady=(15, 5))
 
-        ttk.Button(left, text="分析设备驱动错误（HID/USB）", command=self._diagnose_hid)\
+        self._diagnose_btn = ttk.Button(left, text="分析设备驱动错误（HID/USB）",
+                                        command=self._diagnose_hid)
+        self._diagnose_btn.pack(anchor="w", pady=5)
+
+        ttk.Button(left, text="与上次诊断对比", command=self._compare_diagnostics)\
             .pack(anchor="w", pady=5)
 
+        ttk.Button(left, text="导出诊断报告（JSON）", command=self._export_report)\
+            .pack(anchor="w", pady=5)
+
+        self._profile_btn = ttk.Button(left, text="分析后台进程与启动项",
+                                       command=self._start_process_profile)
+        self._profile_btn.pack(anchor="w", pady=5)
+
+        self._evtx_btn = ttk.Button(left, text="分析导出的事件日志文件（.evtx）",
+                                    command=self._open_evtx_file)
+        self._evtx_btn.pack(anchor="w", pady=5)
+
+        # 被占用文件重试队列
+        ttk.Label(left, text="被占用的文件：").pack(anchor="w", pady=(15, 5))
+        ttk.Button(left, text="查看无法删除的文件", command=self._show_retry_queue)\
+            .pack(anchor="w", pady=5)
+        self._retry_btn = ttk.Button(left, text="立即重试删除", command=self._retry_locked_files)
+        self._retry_btn.pack(anchor="w", pady=5)
+        self._reboot_btn = ttk.Button(left, text="重启后删除（需要管理员权限）",
+                                      command=self._delete_locked_on_reboot)
+        self._reboot_btn.pack(anchor="w", pady=5)
+
+        # 空闲时自动维护
+        ttk.Label(left, text="空闲时自动维护：").pack(anchor="w", pady=(15, 5))
+
+        self._idle_enabled = tk.BooleanVar(value=self.idle_config.enabled)
+        ttk.Checkbutton(left, text="电脑空闲且没有运行游戏时自动执行维护任务",
+                        variable=self._idle_enabled, command=self._on_idle_toggled)\
+            .pack(anchor="w")
+
+        ttk.Button(left, text="把当前勾选的 LEVEL1 任务设为维护任务",
+                   command=self._set_idle_tasks).pack(anchor="w", pady=5)
+        self._idle_tasks_var = tk.StringVar(value="")
+        ttk.Label(left, textvariable=self._idle_tasks_var, wraplength=320, justify="left")\
+            .pack(anchor="w")
+
+        idle_row = ttk.Frame(left)
+        idle_row.pack(anchor="w", fill="x", pady=2)
+        ttk.Label(idle_row, text="持续空闲（分钟）：").pack(side="left")
+        self._idle_minutes = tk.StringVar(value=f"{self.idle_config.idle_minutes:g}")
+        spin = ttk.Spinbox(idle_row, from_=1, to=240, increment=1, width=5,
+                           textvariable=self._idle_minutes, command=self._save_idle_settings)
+        spin.pack(side="left")
+        spin.bind("<FocusOut>", lambda e: self._save_idle_settings())
+
+        games_row = ttk.Frame(left)
+        games_row.pack(anchor="w", fill="x", pady=2)
+        ttk.Label(games_row, text="游戏进程（; 分隔）：").pack(side="left")
+        self._idle_games = tk.StringVar(value="; ".join(self.idle_config.games))
+        entry = ttk.Entry(games_row, textvariable=self._idle_games, width=24)
+        entry.pack(side="left")
+        entry.bind("<FocusOut>", lambda e: self._save_idle_settings())
+        entry.bind("<Return>", lambda e: self._save_idle_settings())
+
+        self._idle_status = tk.StringVar(value="未启动")
+        ttk.Label(left, textvariable=self._idle_status, foreground="#555555")\
+            .pack(anchor="w")
+        self._describe_idle_tasks()
+
+        # 隐藏开关：Ctrl+Alt+P 显示「性能分析模式」复选框
+        self._profiling_var = tk.BooleanVar(value=profiling.is_enabled())
+        self._profiling_cb = ttk.Checkbutton(
+            left, text="性能分析模式（记录 cProfile / 内存分配）",
+            variable=self._profiling_var, command=self._on_profiling_toggled)
+        if profiling.is_enabled():
+            self._profiling_cb.pack(anchor="w", pady=(15, 5))
+        self.root.bind_all("<Control-Alt-p>", self._reveal_profiling_switch)
+
     # ============================================================
     #                    公共：添加任务行
     # ============================================================
-    def _add_task_row(self, parent, key, label, level, func, description, tab_key: str):
+    def _add_task_row(self, parent, key, label, level, func, description, tab_key: str,
+                      probe=None, is_dns_task: bool = False, is_network_task: bool = False,
+                      undoes: Tuple[str, ...] = ()):
         row = ttk.Frame(parent)
         row.pack(fill="x", pady=2)
 
@@ -422,24 +615,183 @@ class App:
         lbl.bind("<Button-1>", lambda e, text=description: self.show_description(text))
         lbl.configure(cursor="hand2")
 
-        task = TaskDef(key=key, label=label, level=level, func=func, description=description)
+        task = TaskDef(key=key, label=label, level=level, func=func, description=description,
+                       probe=probe, is_dns_task=is_dns_task,
+                       is_network_task=is_network_task, undoes=undoes)
         self.task_vars[key] = (task, var)
 
+    # ============================================================
+    #                       网络延迟监控
+    # ============================================================
+    def _toggle_latency_monitor(self):
+        if self.latency_monitor.running:
+            self.latency_monitor.stop()
+            if self._latency_job:
+                self.root.after_cancel(self._latency_job)
+                self._latency_job = None
+            self._latency_btn.config(text="开始监控")
+            self.logger("网络延迟监控已停止。")
+            return
+
+        self.latency_monitor.start()
+        self._latency_btn.config(text="停止监控")
+        self.logger("网络延迟监控已启动。")
+        self._refresh_latency()
+
+    def _refresh_latency(self):
+        stats = self.latency_monitor.snapshot()
+        self._latency_var.set("\n".join(s.describe() for s in stats if s.sent) or "测量中……")
+        self._latency_job = self.root.after(1000, self._refresh_latency)
+
+    # ============================================================
+    #                       游戏会话优化
+    # ============================================================
+    def _toggle_game_session(self):
+        if self.game_session is not None:
+            if self._session_job:
+                self.root.after_cancel(self._session_job)
+                self._session_job = None
+            self.game_session.stop()
+            self.game_session = None
+            self._session_btn.config(text="开始会话优化")
+            self._session_status.set("未启动")
+            self.logger("游戏会话优化已停止，所有改动已恢复。")
+            return
+
+        targets = [t for t in self._session_target.get().split(";") if t.strip()]
+        if not targets:
+            messagebox.showwarning("提示", "请先填写游戏进程名（如 cs2.exe）或完整路径，多个用 ; 分隔。")
+            return
+
+        config = SessionConfig(
+            targets=targets,
+            pin_fast_cores=self._session_pin.get(),
+            demote_background=self._session_demote.get(),
+        )
+        self.game_session = GameSessionOptimizer(config, self.logger)
+        self._session_btn.config(text="停止会话优化")
+        self.logger(f"游戏会话优化已启动，等待游戏进程：{'; '.join(targets)}")
+        self._tick_game_session()
+
+    def _tick_game_session(self):
+        session = self.game_session
+        if session is None:
+            return
+        session.tick()
+        self._session_status.set("游戏运行中，已应用优化" if session.game_running
+                                 else "等待游戏启动……")
+        self._session_job = self.root.after(2000, self._tick_game_session)
+
+    # ============================================================
+    #                      被占用文件重试队列
+    # ============================================================
+    def _show_retry_queue(self, report: Optional[str] = None):
+        if report is None:
+            report = retry_queue.get_queue().report()
+        self.show_description("=== 被占用而无法删除的文件 ===\n\n" + report)
+
+    def _retry_locked_files(self):
+        # 队列最多上万条，逐个 stat / 删除放在后台线程
+        def work(log):
+            if retry_queue.retry_due(log, force=True) is None:
+                log("[重试队列] 队列为空。")
+            return retry_queue.get_queue().report()
+
+        self._run_in_background(self._retry_btn, work, self._show_retry_queue,
+                                error="重试删除失败")
+
+    def _delete_locked_on_reboot(self):
+        retry = retry_queue.get_queue()
+        if not len(retry):
+            self.logger("[重试队列] 队列为空。")
+            return
+        if not is_admin():
+            messagebox.showwarning("提示", "登记重启后删除需要管理员权限，请先以管理员身份重新启动本工具。")
+            return
+        if not messagebox.askyesno(
+                "重启后删除",
+                f"将为 {len(retry)} 个被占用的文件登记「重启后删除」，"
+                "下次重启 Windows 时由系统删除。\n\n是否继续？"):
+            return
+
+        def work(log):
+            done = retry.schedule_on_reboot()
+            log(f"[重试队列] 已为 {done} 个文件登记重启后删除。")
+            return retry.report()
+
+        self._run_in_background(self._reboot_btn, work, self._show_retry_queue,
+                                error="登记重启后删除失败")
+
+    # ============================================================
+    #                       空闲时自动维护
+    # ============================================================
+    def _describe_idle_tasks(self):
+        labels = [self.task_vars[k][0].label for k in self.idle_config.task_keys
+                  if k in self.task_vars]
+        self._idle_tasks_var.set("维护任务：" + ("、".join(labels) if labels else "（未选择）"))
+
+    def _save_idle_config(self):
+        try:
+            self.idle_config.save()
+        except OSError as e:
+            self.logger(f"保存空闲维护设置失败：{e}")
+
+    def _on_idle_toggled(self):
+        self.idle_config.enabled = self._idle_enabled.get()
+        self._save_idle_config()
+        if self.idle_config.enabled:
+            if not self.idle_config.task_keys:
+                self.logger("[空闲维护] 尚未选择维护任务：请先勾选 LEVEL1 任务并点击「设为维护任务」。")
+            self.idle_maintenance.start()
+            self.logger("[空闲维护] 已启用。")
+        else:
+            self.idle_maintenance.stop()
+            self.logger("[空闲维护] 已关闭。")
+
+    def _set_idle_tasks(self):
+        keys = [key for key, (task, var) in self.task_vars.items()
+                if var.get() and task.level == TaskLevel.LEVEL1]
+        skipped = [task.label for key, (task, var) in self.task_vars.items()
+                   if var.get() and task.level != TaskLevel.LEVEL1]
+        if skipped:
+            self.logger(f"[空闲维护] 只能自动执行 LEVEL1 任务，已忽略：{'、'.join(skipped)}")
+        self.idle_config.task_keys = keys
+        # 任务选择变化后本轮重新开始
+        self.idle_config.pending = []
+        self._save_idle_config()
+        self._describe_idle_tasks()
+
+    def _save_idle_settings(self):
+        try:
+            self.idle_config.idle_minutes = max(1.0, float(self._idle_minutes.get()))
+        except ValueError:
+            self._idle_minutes.set(f"{self.idle_config.idle_minutes:g}")
+        self.idle_config.games = [g.strip() for g in self._idle_games.get().split(";")
+                                  if g.strip()]
+        self._save_idle_config()
+        if self.idle_maintenance is not None:
+            self.idle_maintenance.reload_games()
+
+    def _refresh_idle_status(self):
+        self._idle_status.set(f"状态：{self.idle_maintenance.status}")
+        self.root.after(2000, self._refresh_idle_status)
+
     # ============================================================
     #                       DNS 配置弹窗
     # ============================================================
     def _open_dns_popup(self):
-        def on_selected(ip: str):
-            self.dns_target_ip = ip
+        def on_selected(servers: net_tasks.DnsServers):
+            self.dns_target = servers
+            ip = servers.describe()
             if self._dns_checkbox:
-                self._dns_checkbox.config(text=f"应用 DNS 设置（当前：{ip}）")
+                self._dns_checkbox.config(text=f"应用 DNS 设置（当前：{servers.primary}）")
 
             self.show_description(
                 f"已选择 DNS：{ip}\n\n"
                 "此处仅配置目标 DNS，真正应用需要：\n"
                 "1. 勾选左侧「应用 DNS 设置」任务；\n"
                 "2. 点击底部「执行所有勾选任务」按钮。\n\n"
-                "执行时会通过 netsh 修改网卡 DNS，网络会短暂掉线。"
+                "执行时会通过 netsh 修改所有活动网卡的 DNS，网络会短暂掉线。"
             )
             self.logger(f"DNS 已配置为：{ip}")
 
@@ -449,19 +801,122 @@ class App:
     #                   HID/USB 驱动诊断入口
     # ============================================================
     def _diagnose_hid(self):
-        text = diagnostics.analyze_hid_usb_issues(self.logger)
-        self.show_description(text)
+        # 事件日志查询等外部命令需要数秒，放到后台线程
+        self._run_in_background(self._diagnose_btn, diagnostics.analyze_hid_usb_issues,
+                                self.show_description)
+
+    def _compare_diagnostics(self):
+        self.show_description(diagnostics.compare_with_previous_run(self.logger))
+
+    def _export_report(self):
+        path = filedialog.asksaveasfilename(
+            title="导出诊断报告", defaultextension=".json",
+            initialfile=f"{platform.node() or 'report'}.json",
+            filetypes=[("JSON", "*.json"), ("所有文件", "*.*")])
+        if path:
+            self.show_description(diagnostics.export_latest_report(path, self.logger))
+
+    def _open_evtx_file(self):
+        path = filedialog.askopenfilename(
+            title="选择 .evtx 事件日志文件",
+            filetypes=[("事件日志", "*.evtx"), ("所有文件", "*.*")])
+        if not path:
+            return
+        # 大文件解析需要数秒，放到后台线程
+        self._run_in_background(
+            self._evtx_btn, lambda log: diagnostics.analyze_evtx_file(path, log),
+            self.show_description, error="解析事件日志失败")
+
+    def _reveal_profiling_switch(self, event=None):
+        if not self._profiling_cb.winfo_ismapped():
+            self._profiling_cb.pack(anchor="w", pady=(15, 5))
+
+    def _on_profiling_toggled(self):
+        profiling.set_enabled(self._profiling_var.get())
+        if profiling.is_enabled():
+            self.logger(f"性能分析模式已开启，结果保存在：{profiling.output_dir()}")
+        else:
+            self.logger("性能分析模式已关闭。")
+
+    def _start_process_profile(self):
+        # 采样窗口约 10 秒，在后台线程执行
+        self._run_in_background(
+            self._profile_btn, lambda log: render_text(proc_profiler.run_profile(log)),
+            lambda text: self.show_description("=== 后台进程与启动项分析 ===\n\n" + text),
+            error="进程分析失败")
+
+    # ============================================================
+    #                     后台执行（诊断 / 分析）
+    # ============================================================
+    def _run_in_background(self, button, work, on_done, error: str = "执行失败"):
+        """
+        work(logger) 在后台线程执行，期间按钮禁用；
+        日志与结果经队列交回 Tk 线程，完成后调用 on_done(结果文本)。
+        """
+        button.config(state="disabled")
+        q: "queue.Queue" = queue.Queue()
+
+        def worker():
+            try:
+                q.put(("done", work(lambda msg: q.put(("log", msg)))))
+            except Exception as e:
+                q.put(("done", f"{error}：{e}"))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self._poll_background(q, button, on_done)
+
+    def _poll_background(self, q: "queue.Queue", button, on_done):
+        while True:
+            try:
+                kind, payload = q.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "log":
+                self.logger(payload)
+            else:
+                button.config(state="normal")
+                on_done(payload)
+                return
+        self.root.after(200, self._poll_background, q, button, on_done)
 
     # ============================================================
     #                        执行任务入口
     # ============================================================
+    def _running_game(self):
+        if self.game_session is not None and self.game_session.game_running:
+            return "会话优化中的游戏"
+        try:
+            return GameWatcher(psutil, self.idle_config.games).running_game()
+        except psutil.Error:
+            return None
+
     def _on_run_clicked(self):
         selected = {
             key: (task_def, var.get())
             for key, (task_def, var) in self.task_vars.items()
         }
+        throttle = self._throttle_var.get()
+        if not throttle and any(sel for _, sel in selected.values()):
+            game = self._running_game()
+            if game:
+                self.logger(f"检测到游戏运行（{game}），本次清理自动使用限速模式。")
+                throttle = True
+        self.runner.throttle = ThrottleConfig() if throttle else None
         self.runner.run_selected_tasks(selected)
 
+    # ============================================================
+    #                          关闭窗口
+    # ============================================================
+    def _on_close(self):
+        # 会话优化改过的优先级 / 核心绑定必须在退出前恢复，否则会一直保留到进程结束
+        if self.game_session is not None:
+            self.game_session.stop()
+            self.game_session = None
+        self.latency_monitor.stop(timeout=1.0)
+        if self.idle_maintenance is not None:
+            self.idle_maintenance.stop()
+        self.root.destroy()
+
 
 # ============================================================
 #                          启动函数
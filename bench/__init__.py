@@ -0,0 +1,2 @@
+# bench/__init__.py
+"""清理引擎、诊断扫描器与日志缓冲的基准测试（python -m bench）"""
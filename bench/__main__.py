@@ -0,0 +1,85 @@
+# bench/__main__.py
+"""
+用法（在项目根目录执行，无需图形界面，Linux 下同样可用）：
+
+    python -m bench                       # small 规模，对比 bench/baseline.json
+    python -m bench --scale full          # 大规模数据（setupapi 约 300MB）
+    python -m bench --save-baseline       # 把本次结果保存为基线
+    python -m bench --only scan_setupapi  # 只跑指定用例
+"""
+
+import argparse
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from .cases import SCALES, build_cases
+from .harness import DEFAULT_REGRESSION, compare, load_baseline, run_case, save_baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="清理 / 诊断引擎基准测试")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--only", action="append", help="只运行指定用例（可多次指定）")
+    parser.add_argument("--repeat", type=int, default=3, help="计时运行次数，取最小值")
+    parser.add_argument("--no-memory", action="store_true", help="跳过 tracemalloc 峰值内存测量")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION,
+                        help="吞吐量下降超过该比例视为回退（默认 0.10）")
+    parser.add_argument("--workdir", help="合成数据目录（默认临时目录，结束后删除）")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="gamertool-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        print(f"生成合成数据（{args.scale}）：{workdir}")
+        t0 = time.perf_counter()
+        cases = build_cases(workdir, args.scale)
+        print(f"数据生成耗时 {time.perf_counter() - t0:.1f}s\n")
+
+        if args.only:
+            cases = [c for c in cases if c.name in args.only]
+        results = []
+        for case in cases:
+            case.repeat = args.repeat
+            result = run_case(case, measure_memory=not args.no_memory)
+            print(result.describe())
+            results.append(result)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    meta = {
+        "scale": args.scale,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    regressed = False
+    baseline = load_baseline(args.baseline)
+    if baseline and baseline.get("meta", {}).get("scale") == args.scale:
+        print(f"\n与基线对比（{baseline['meta'].get('time', '?')}）：")
+        for line in compare(results, baseline, args.threshold):
+            print(line)
+            regressed = regressed or line.startswith("回退")
+    elif baseline:
+        print(f"\n基线规模为 {baseline.get('meta', {}).get('scale')}，与本次不同，跳过对比。")
+    else:
+        print(f"\n未找到基线：{args.baseline}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, meta)
+        print(f"已保存基线：{args.baseline}")
+
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
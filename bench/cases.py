@@ -0,0 +1,132 @@
+# bench/cases.py
+"""
+具体的基准用例：删除引擎、setupapi / WER / 事件日志扫描器、日志缓冲。
+扫描器通过替换模块级路径常量与注入 FakeRunner 指向合成数据，不接触真实系统。
+"""
+
+import os
+import shutil
+from typing import Dict, List
+
+from modules import cleaner, diagnostics_core
+from modules.command_exec import CommandExecutor, FakeRunner, get_executor, set_executor
+from modules.event_store import EventStore
+from modules.logbuffer import LogBuffer
+
+from . import fixtures
+from .harness import Case
+
+SCALES = {
+    #            TEMP 文件数, 深度, setupapi MB, WER 数量, 每个 EventID 的事件数, 日志条数
+    "small": dict(files=2000, depth=4, setupapi_mb=20, wer=500, events=200, messages=20000),
+    "full": dict(files=20000, depth=6, setupapi_mb=300, wer=5000, events=2000, messages=200000),
+}
+
+
+def _noop(msg: str):
+    pass
+
+
+def build_cases(workdir: str, scale: str) -> List[Case]:
+    cfg = SCALES[scale]
+    cases: List[Case] = []
+
+    # ---------------- 删除引擎（TEMP 树） ----------------
+    temp_root = os.path.join(workdir, "temp")
+
+    def setup_clean():
+        shutil.rmtree(temp_root, ignore_errors=True)
+        os.makedirs(temp_root)
+        info = fixtures.make_temp_tree(temp_root, cfg["files"], cfg["depth"])
+
+        def run() -> Dict[str, int]:
+            stats = cleaner.delete_path_contents(temp_root, _noop, remove_dirs=True)
+            assert stats.files_deleted == info.files, stats
+            return {"files": stats.files_deleted, "bytes": stats.bytes_deleted}
+        return run
+
+    cases.append(Case("clean_temp", setup_clean))
+
+    # ---------------- setupapi.dev.log ----------------
+    setupapi = os.path.join(workdir, "setupapi.dev.log")
+    setupapi_lines = fixtures.make_setupapi_log(setupapi, cfg["setupapi_mb"])
+    setupapi_bytes = os.path.getsize(setupapi)
+
+    def setup_setupapi():
+        def run() -> Dict[str, int]:
+            old = diagnostics_core.SETUPAPI_PATH
+            diagnostics_core.SETUPAPI_PATH = setupapi
+            try:
+                findings = diagnostics_core.scan_setupapi()
+            finally:
+                diagnostics_core.SETUPAPI_PATH = old
+            return {"lines": setupapi_lines, "bytes": setupapi_bytes,
+                    "findings": len(findings)}
+        return run
+
+    cases.append(Case("scan_setupapi", setup_setupapi))
+
+    # ---------------- WER 报告（UTF-16） ----------------
+    wer_root = os.path.join(workdir, "ReportArchive")
+    wer_bytes = fixtures.make_wer_reports(wer_root, cfg["wer"])
+
+    def setup_wer():
+        def run() -> Dict[str, int]:
+            old = diagnostics_core.WER_PATH
+            diagnostics_core.WER_PATH = wer_root
+            try:
+                findings = diagnostics_core.scan_wer_reports()
+            finally:
+                diagnostics_core.WER_PATH = old
+            return {"files": cfg["wer"], "bytes": wer_bytes, "findings": len(findings)}
+        return run
+
+    cases.append(Case("scan_wer_reports", setup_wer))
+
+    # ---------------- System.evtx（录制的 wevtutil 输出） ----------------
+    event_output = fixtures.make_wevtutil_output(diagnostics_core.EVENT_IDS, cfg["events"])
+    responses = {
+        ("wevtutil", "gli", "System"): (0, b"oldestRecordNumber: 1\r\nnumberOfLogRecords: 1000000\r\n", b""),
+        ("wevtutil", "qe", "System"): (0, event_output, b""),
+    }
+    event_bytes = len(event_output)
+    store_dir = os.path.join(workdir, "events")
+
+    def setup_evtx():
+        # 每次都从空书签开始，测量的是完整解析 + 合并的开销
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+        def run() -> Dict[str, int]:
+            old = get_executor()
+            set_executor(CommandExecutor(spawn=FakeRunner(responses), encoding="utf-8"))
+            try:
+                store = EventStore(store_dir, max_entries=len(diagnostics_core.EVENT_IDS) * cfg["events"])
+                diagnostics_core.scan_system_event_log(store)
+            finally:
+                set_executor(old)
+            return {"events": len(store.recent(diagnostics_core.EVTX_CHANNEL)), "bytes": event_bytes}
+        return run
+
+    cases.append(Case("scan_system_event_log", setup_evtx))
+
+    # ---------------- 日志缓冲（LogPanel 的非 Tk 部分） ----------------
+    def setup_logbuffer():
+        buf = LogBuffer()
+        n = cfg["messages"]
+
+        def run() -> Dict[str, int]:
+            # 模拟任务执行期间的日志：每 50 条触发一次界面刷新
+            chars = 0
+            for i in range(n):
+                buf.append(f"  已删除：C:\\Users\\bench\\AppData\\Local\\Temp\\tmp{i:06d}.tmp")
+                if i % 50 == 49:
+                    text, _ = buf.drain()
+                    chars += len(text)
+            text, _ = buf.drain()
+            chars += len(text)
+            return {"messages": n, "bytes": chars}
+        return run
+
+    cases.append(Case("logbuffer", setup_logbuffer))
+
+    return cases
@@ -0,0 +1,200 @@
+# bench/fixtures.py
+"""
+基准测试用的合成数据：
+- TEMP 风格的目录树（N 个文件分布在 D 层目录中）
+- 大体积 setupapi.dev.log（按目标大小生成，混入 HID/USB 异常行）
+- WER 报告目录（Report.wer 为 UTF-16 LE + BOM，与真实系统一致）
+- wevtutil /f:RenderedXml 的录制输出
+
+所有生成函数都是确定性的（固定随机种子），便于不同版本之间对比。
+"""
+
+import os
+import random
+from dataclasses import dataclass
+from xml.sax.saxutils import escape
+
+from modules.device_id import VID_DATABASE
+
+
+@dataclass
+class TreeInfo:
+    files: int
+    bytes: int
+    dirs: int
+
+
+def make_temp_tree(root: str, files: int, depth: int, fanout: int = 4,
+                   size_range=(0, 16 * 1024), seed: int = 1) -> TreeInfo:
+    """在 root 下生成 files 个文件，目录最深 depth 层，每层 fanout 个子目录"""
+    rng = random.Random(seed)
+    dirs = [root]
+    frontier = [root]
+    for _ in range(depth):
+        nxt = []
+        for d in frontier:
+            for i in range(fanout):
+                p = os.path.join(d, f"d{i}")
+                nxt.append(p)
+        dirs.extend(nxt)
+        frontier = nxt
+        # 目录数量以文件数为上限，避免 depth 较大时目录爆炸
+        if len(dirs) >= files:
+            break
+    for d in dirs:
+        os.makedirs(d, exist_ok=True)
+
+    total = 0
+    blob = os.urandom(size_range[1] or 1)
+    for i in range(files):
+        d = dirs[rng.randrange(len(dirs))]
+        size = rng.randint(*size_range)
+        with open(os.path.join(d, f"tmp{i:06d}.tmp"), "wb") as f:
+            f.write(blob[:size])
+        total += size
+    return TreeInfo(files=files, bytes=total, dirs=len(dirs) - 1)
+
+
+_SETUPAPI_NOISE = [
+    ">>>  [Device Install (Hardware initiated) - SWD\\PRINTENUM\\{{{guid}}}]",
+    ">>>  Section start {ts}",
+    "     ump: Creating Install Process: DrvInst.exe {ts}",
+    "     ndv: Retrieving device info...",
+    "     ndv: Setting device parameters...",
+    "     dvi: Searching for hardware ID(s):",
+    "     dvi:      swd\\printenum\\printqueues",
+    "     sto: {{Configure Driver Package: C:\\Windows\\System32\\DriverStore\\FileRepository\\x.inf}}",
+    "<<<  Section end {ts}",
+    "<<<  [Exit status: SUCCESS]",
+]
+
+_SETUPAPI_HITS = [
+    "!!!  dvi: Device not started: Device has problem: 0x0a (CM_PROB_FAILED_START), "
+    "problem status: 0xc0000001. USB\\VID_{vid}&PID_{pid}\\6&2a3b",
+    "     dvi: Install failed for HID\\VID_{vid}&PID_{pid}&MI_01\\7&1c",
+    "!!!  ndv: Device removed USB\\VID_{vid}&PID_{pid}\\5&3f",
+    "     dvi: Driver not migrated: Keyboard USB\\VID_{vid}&PID_{pid}",
+]
+
+
+def make_setupapi_log(path: str, megabytes: float, hit_ratio: float = 0.02,
+                      seed: int = 2) -> int:
+    """生成约 megabytes MB 的 setupapi.dev.log，返回行数"""
+    rng = random.Random(seed)
+    vids = list(VID_DATABASE)
+    target = int(megabytes * 1024 * 1024)
+    written = 0
+    lines = 0
+    chunk = []
+    with open(path, "w", encoding="utf-8", newline="\r\n") as f:
+        while written < target:
+            ts = f"2024/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d} " \
+                 f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}.123"
+            if rng.random() < hit_ratio:
+                line = rng.choice(_SETUPAPI_HITS).format(
+                    vid=rng.choice(vids), pid=f"{rng.randint(0, 0xFFFF):04X}")
+            else:
+                line = rng.choice(_SETUPAPI_NOISE).format(
+                    ts=ts, guid=f"{rng.getrandbits(64):016X}")
+            chunk.append(line)
+            written += len(line) + 2
+            lines += 1
+            if len(chunk) >= 4096:
+                f.write("\n".join(chunk) + "\n")
+                chunk.clear()
+        if chunk:
+            f.write("\n".join(chunk) + "\n")
+    return lines
+
+
+_WER_TEMPLATE = """Version=1
+EventType={event_type}
+EventTime=133{n:015d}
+ReportType=2
+Consent=1
+UploadTime=133{n:015d}
+ReportStatus=268435456
+AppName={app}
+AppPath=C:\\Windows\\System32\\{app}
+Sig[0].Name=应用程序名称
+Sig[0].Value={app}
+Sig[1].Name=故障模块名称
+Sig[1].Value={module}
+DynamicSig[1].Name=OS 版本
+DynamicSig[1].Value=10.0.19045.2.0.0.256.48
+UI[2]=C:\\Windows\\System32\\{app}
+LoadedModule[0]=C:\\Windows\\System32\\ntdll.dll
+LoadedModule[1]=C:\\Windows\\System32\\KERNEL32.DLL
+LoadedModule[2]=C:\\Windows\\System32\\{module}
+"""
+
+_WER_EVENTS = [
+    ("LiveKernelEvent", "WATCHDOG", "nvlddmkm.sys"),
+    ("APPCRASH", "explorer.exe", "hid.dll"),
+    ("BlueScreen", "System", "USBXHCI.SYS"),
+    ("APPCRASH", "game.exe", "d3d11.dll"),
+    ("AppHangB1", "steam.exe", "user32.dll"),
+]
+
+
+def make_wer_reports(root: str, count: int, seed: int = 3) -> int:
+    """生成 count 个 UTF-16 编码的 Report.wer，返回总字节数"""
+    rng = random.Random(seed)
+    total = 0
+    for n in range(count):
+        event_type, app, module = rng.choice(_WER_EVENTS)
+        d = os.path.join(root, f"Kernel_{event_type}_{n:06d}")
+        os.makedirs(d, exist_ok=True)
+        data = _WER_TEMPLATE.format(event_type=event_type, app=app, module=module, n=n)
+        raw = "\ufeff".encode("utf-16-le") + data.replace("\n", "\r\n").encode("utf-16-le")
+        with open(os.path.join(d, "Report.wer"), "wb") as f:
+            f.write(raw)
+        total += len(raw)
+    return total
+
+
+_EVENT_TEMPLATE = (
+    "<Event xmlns='http://schemas.microsoft.com/win/2004/08/events/event'><System>"
+    "<Provider Name='{provider}'/><EventID Qualifiers='49152'>{event_id}</EventID>"
+    "<Version>0</Version><Level>{level}</Level><Task>0</Task><Opcode>0</Opcode>"
+    "<Keywords>0x8080000000000000</Keywords>"
+    "<TimeCreated SystemTime='2024-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}:{second:02d}.5120000Z'/>"
+    "<EventRecordID>{record_id}</EventRecordID><Correlation/>"
+    "<Execution ProcessID='812' ThreadID='6012'/><Channel>System</Channel>"
+    "<Computer>DESKTOP-BENCH</Computer><Security/></System>"
+    "<EventData><Data Name='param1'>{svc}</Data></EventData>"
+    "<RenderingInfo Culture='en-US'><Message>{description}</Message>"
+    "<Level>{level_name}</Level><Provider>{provider}</Provider></RenderingInfo></Event>"
+)
+
+_EVENT_PROVIDERS = [
+    ("Service Control Manager", "The {svc} service terminated unexpectedly."),
+    ("Microsoft-Windows-Kernel-PnP",
+     "The driver \\Driver\\WudfRd failed to load for the device USB\\VID_046D&PID_C33F\\5&1."),
+    ("disk", "An error was detected on device \\Device\\Harddisk1\\DR1 during a paging operation."),
+    ("Microsoft-Windows-DriverFrameworks-UserMode",
+     "A problem has occurred with one or more user-mode drivers."),
+]
+
+
+def make_wevtutil_output(event_ids, count: int, seed: int = 4) -> bytes:
+    """模拟 wevtutil qe System /f:RenderedXml 的输出（UTF-8 编码），每个 EventID count 条"""
+    rng = random.Random(seed)
+    parts = []
+    record_id = 1000
+    for _ in range(count):
+        for event_id in event_ids:
+            provider, desc = rng.choice(_EVENT_PROVIDERS)
+            level = rng.choice([2, 3])
+            svc = f"Svc{rng.randint(1, 50)}"
+            record_id += rng.randint(1, 20)
+            parts.append(_EVENT_TEMPLATE.format(
+                provider=provider, event_id=event_id, record_id=record_id,
+                month=rng.randint(1, 12), day=rng.randint(1, 28), hour=rng.randint(0, 23),
+                minute=rng.randint(0, 59), second=rng.randint(0, 59),
+                level=level, level_name="Error" if level == 2 else "Warning",
+                svc=svc, description=escape(desc.format(svc=svc)),
+            ))
+    # 与 /rd:true 一致：新 → 旧
+    parts.reverse()
+    return "\r\n".join(parts).encode("utf-8")
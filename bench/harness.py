@@ -0,0 +1,129 @@
+# bench/harness.py
+"""
+基准测试框架：
+- 每个用例由 setup（生成 / 准备数据，不计时）与 run（被测代码）组成
+- 先做计时运行（取多次中的最小值），再单独做一次 tracemalloc 运行得到峰值内存，
+  避免 tracemalloc 的开销影响吞吐量数字
+- 结果与 baseline JSON 对比，吞吐量下降超过阈值时标记为回退
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# run() 返回 {"files": n, "bytes": n, "lines": n, ...}，用于计算吞吐量
+RunFunc = Callable[[], Dict[str, int]]
+SetupFunc = Callable[[], RunFunc]
+
+DEFAULT_REGRESSION = 0.10   # 吞吐量下降 10% 视为回退
+
+UNIT_LABELS = {
+    "files": "files/s",
+    "bytes": "MB/s",
+    "lines": "lines/s",
+    "events": "events/s",
+    "messages": "msg/s",
+}
+
+
+@dataclass
+class Case:
+    name: str
+    setup: SetupFunc
+    repeat: int = 3
+
+
+@dataclass
+class CaseResult:
+    name: str
+    seconds: float
+    counts: Dict[str, int]
+    peak_kb: Optional[float] = None
+    throughput: Dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.throughput:
+            secs = max(self.seconds, 1e-9)
+            for unit, n in self.counts.items():
+                if unit in UNIT_LABELS:
+                    value = n / secs
+                    if unit == "bytes":
+                        value /= 1024 * 1024
+                    self.throughput[unit] = value
+
+    def describe(self) -> str:
+        parts = [f"{self.seconds * 1000:9.1f} ms"]
+        for unit, value in self.throughput.items():
+            parts.append(f"{value:12,.1f} {UNIT_LABELS[unit]}")
+        if self.peak_kb is not None:
+            parts.append(f"峰值内存 {self.peak_kb / 1024:8.1f} MB")
+        return f"{self.name:<24}" + "  ".join(parts)
+
+
+def run_case(case: Case, measure_memory: bool = True) -> CaseResult:
+    best = None
+    counts: Dict[str, int] = {}
+    for _ in range(max(1, case.repeat)):
+        run = case.setup()
+        start = time.perf_counter()
+        counts = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if measure_memory:
+        run = case.setup()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak = peak_bytes / 1024
+
+    return CaseResult(name=case.name, seconds=best, counts=counts, peak_kb=peak)
+
+
+# ============================================================
+#                          基线
+# ============================================================
+def save_baseline(path: str, results: List[CaseResult], meta: dict):
+    data = {"meta": meta, "results": {r.name: asdict(r) for r in results}}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def load_baseline(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compare(results: List[CaseResult], baseline: dict,
+            threshold: float = DEFAULT_REGRESSION) -> List[str]:
+    """返回对比说明行；吞吐量下降超过阈值的行以「回退」开头"""
+    lines = []
+    base_results = baseline.get("results", {})
+    for r in results:
+        base = base_results.get(r.name)
+        if not base:
+            lines.append(f"  {r.name}：基线中没有该用例")
+            continue
+        for unit, value in r.throughput.items():
+            old = base.get("throughput", {}).get(unit)
+            if not old:
+                continue
+            change = value / old - 1
+            tag = "回退" if change < -threshold else ("提升" if change > threshold else "持平")
+            lines.append(f"{tag} {r.name} {UNIT_LABELS[unit]}：{old:,.1f} → {value:,.1f}"
+                         f"（{change:+.1%}）")
+        old_peak = base.get("peak_kb")
+        if old_peak and r.peak_kb is not None:
+            lines.append(f"  {r.name} 峰值内存：{old_peak / 1024:.1f} MB → {r.peak_kb / 1024:.1f} MB")
+    return lines
@@ -1,7 +1,11 @@
 # main.py —— GamerTool 启动入口（精简版）
 
+import multiprocessing
+
 from app.gui import run_app
 
 
 if __name__ == "__main__":
+    # 打包成 exe 后，.evtx 解析的进程池子进程需要从这里分流
+    multiprocessing.freeze_support()
     run_app()
@@ -0,0 +1,23 @@
+# modules/app_paths.py
+"""
+本地数据目录：保存注册表快照等需要跨次运行保留的状态。
+
+默认位置：
+- Windows：%LOCALAPPDATA%\\GamerTool
+- 其它系统：~/.gamertool
+可通过环境变量 GAMERTOOL_DATA_DIR 覆盖（测试时指向临时目录）。
+"""
+
+import os
+
+
+def data_dir(*parts: str) -> str:
+    """返回数据目录（或其子目录）路径，不存在时自动创建"""
+    base = os.getenv("GAMERTOOL_DATA_DIR")
+    if not base:
+        local = os.getenv("LOCALAPPDATA")
+        base = os.path.join(local, "GamerTool") if local else os.path.join(
+            os.path.expanduser("~"), ".gamertool")
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,250 @@
+# modules/cleaner.py
+"""
+通用删除引擎：
+- 基于 os.scandir 的迭代遍历，删除前记录文件大小
+- 统计删除的文件数 / 字节数 / 失败数
+- 首次触及某个卷时记录该卷的剩余空间，供回收报告做前后对比
+- 每处理一个条目前经过一次暂停点：空闲维护可在此处挂起，恢复后从原位置继续
+- 当前线程启用限速时（io_throttle.throttled），每删除一项都向令牌桶申请配额
+
+所有清理任务（sys_tasks / game_tasks）都通过这里删除文件，
+并把 CleanStats 作为返回值交给 TaskRunner 汇总。
+"""
+
+import os
+import shutil
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+Logger = Callable[[str], None]
+
+# 每次调用最多在日志里列出多少条失败路径
+MAX_LOGGED_FAILURES = 5
+# CleanStats 最多保存多少条失败路径（供重试队列使用）；超出后只计数
+MAX_FAILED_PATHS = 20000
+
+
+# ============================================================
+#                         卷定位
+# ============================================================
+_VOLUME_CACHE: Dict[str, str] = {}
+
+
+def volume_of(path: str) -> str:
+    """返回路径所在的卷（Windows 为 "C:\\"，POSIX 为挂载点）"""
+    path = os.path.abspath(path)
+    drive, _ = os.path.splitdrive(path)
+    if drive:
+        return drive.upper() + os.sep
+
+    cached = _VOLUME_CACHE.get(path)
+    if cached:
+        return cached
+
+    current = path
+    while not os.path.ismount(current):
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+    _VOLUME_CACHE[path] = current
+    return current
+
+
+def free_space(volume: str) -> Optional[int]:
+    try:
+        return shutil.disk_usage(volume).free
+    except OSError:
+        return None
+
+
+# ============================================================
+#                         统计结果
+# ============================================================
+@dataclass
+class CleanStats:
+    files_deleted: int = 0
+    bytes_deleted: int = 0
+    dirs_removed: int = 0
+    failed: int = 0
+    failed_bytes: int = 0
+    # 卷 → 首次触及时的剩余空间（删除开始前）
+    free_before: Dict[str, int] = field(default_factory=dict)
+    # 最多 MAX_FAILED_PATHS 条；failed / failed_bytes 始终是完整计数
+    failed_paths: List[str] = field(default_factory=list)
+    failed_sizes: List[int] = field(default_factory=list)    # 与 failed_paths 一一对应
+    # 本应移除空目录的清理根目录（边界本身保留）：重试删除成功后据此清掉留下的空目录
+    prune_roots: List[str] = field(default_factory=list)
+
+    def touch_volume(self, path: str):
+        vol = volume_of(path)
+        if vol not in self.free_before:
+            free = free_space(vol)
+            if free is not None:
+                self.free_before[vol] = free
+
+    def merge(self, other: "CleanStats") -> "CleanStats":
+        self.files_deleted += other.files_deleted
+        self.bytes_deleted += other.bytes_deleted
+        self.dirs_removed += other.dirs_removed
+        self.failed += other.failed
+        self.failed_bytes += other.failed_bytes
+        for vol, free in other.free_before.items():
+            self.free_before.setdefault(vol, free)
+        room = max(0, MAX_FAILED_PATHS - len(self.failed_paths))
+        self.failed_paths.extend(other.failed_paths[:room])
+        self.failed_sizes.extend(other.failed_sizes[:room])
+        self.prune_roots.extend(r for r in other.prune_roots if r not in self.prune_roots)
+        return self
+
+
+def format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024:
+            return f"{n:.1f} {unit}" if unit != "B" else f"{int(n)} B"
+        n /= 1024
+    return f"{n:.2f} TB"
+
+
+# ============================================================
+#                          暂停点
+# ============================================================
+_local = threading.local()
+
+
+def set_pause_hook(hook: Optional[Callable[[], None]]):
+    """
+    为当前线程设置暂停点回调（None 取消）。
+    删除引擎每处理一个条目前调用一次；回调阻塞期间遍历状态原样保留。
+    只影响设置它的线程，GUI 线程中的手动清理不受影响。
+    """
+    _local.hook = hook
+
+
+def pause_point():
+    hook = getattr(_local, "hook", None)
+    if hook is not None:
+        hook()
+
+
+def set_throttle(throttle):
+    """为当前线程设置限速器（io_throttle.Throttle，None 为快速模式）"""
+    _local.throttle = throttle
+
+
+def _throttle(nbytes: int):
+    throttle = getattr(_local, "throttle", None)
+    if throttle is not None:
+        throttle.consume(1, nbytes)
+
+
+# ============================================================
+#                         删除引擎
+# ============================================================
+def _is_link(entry: os.DirEntry) -> bool:
+    if entry.is_symlink():
+        return True
+    is_junction = getattr(entry, "is_junction", None)  # Python 3.12+
+    return bool(is_junction and is_junction())
+
+
+def _fail(stats: CleanStats, path: str, size: int):
+    stats.failed += 1
+    stats.failed_bytes += size
+    if len(stats.failed_paths) < MAX_FAILED_PATHS:
+        stats.failed_paths.append(path)
+        stats.failed_sizes.append(size)
+
+
+def delete_path_contents(
+    path: str,
+    logger: Logger,
+    recursive: bool = True,
+    remove_dirs: bool = False,
+    remove_root: bool = False,
+    stats: Optional[CleanStats] = None,
+) -> CleanStats:
+    """
+    删除目录下的文件。
+
+    recursive   : 是否进入子目录
+    remove_dirs : 删除文件后是否移除变空的子目录
+    remove_root : 是否连同 path 本身一起移除（相当于 rmtree）
+    """
+    stats = stats if stats is not None else CleanStats()
+    if not os.path.isdir(path):
+        return stats
+
+    stats.touch_volume(path)
+    failed_before = stats.failed
+    failed_bytes_before = stats.failed_bytes
+    paths_before = len(stats.failed_paths)
+
+    # 先序遍历收集目录，便于之后按逆序（子目录优先）删除空目录
+    dirs: List[str] = []
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                pause_point()
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        # 不进入符号链接 / 目录联接，避免删到目标目录之外
+                        if recursive and not _is_link(entry):
+                            stack.append(entry.path)
+                        continue
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    size = 0
+                try:
+                    os.unlink(entry.path)
+                    stats.files_deleted += 1
+                    stats.bytes_deleted += size
+                except FileNotFoundError:
+                    # 遍历期间已被其它程序删除
+                    continue
+                except OSError:
+                    _fail(stats, entry.path, size)
+                    continue
+                _throttle(size)
+
+    if remove_dirs or remove_root:
+        for d in reversed(dirs):
+            if d == path and not remove_root:
+                continue
+            try:
+                os.rmdir(d)
+                stats.dirs_removed += 1
+                _throttle(0)
+            except OSError:
+                # 目录非空（有被占用的文件）时保留
+                pass
+
+    failed = stats.failed - failed_before
+    if failed and (remove_dirs or remove_root):
+        root = os.path.normpath(path)
+        boundary = os.path.dirname(root) if remove_root else root
+        if boundary not in stats.prune_roots:
+            stats.prune_roots.append(boundary)
+    if failed:
+        logger(f"    {failed} 个文件无法删除（可能正被占用），"
+               f"共 {format_bytes(stats.failed_bytes - failed_bytes_before)}：")
+        shown = stats.failed_paths[paths_before:paths_before + MAX_LOGGED_FAILURES]
+        for p in shown:
+            logger(f"      {p}")
+        if failed > len(shown):
+            logger(f"      ……其余 {failed - len(shown)} 个略")
+
+    return stats
+
+
+def delete_tree(path: str, logger: Logger, stats: Optional[CleanStats] = None) -> CleanStats:
+    """删除整个目录（rmtree 语义），被占用的文件及其父目录会保留"""
+    return delete_path_contents(path, logger, recursive=True, remove_root=True, stats=stats)
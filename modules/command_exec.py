@@ -0,0 +1,350 @@
+# modules/command_exec.py
+"""
+统一的外部命令执行层（基于 asyncio）：
+- 增量读取 stdout / stderr，按 OEM 代码页正确解码中文输出
+- 每读到一行就推送到 logger，长时间运行的命令也能看到进度
+- 支持超时（超时后结束进程）与并发上限（run_many）
+- 进程创建函数可注入，测试时用 FakeRunner 代替真实进程
+- 同步入口 run / run_many 每次在新的事件循环中执行；
+  在已有事件循环的线程中调用时改在独立线程执行，不会因 asyncio.run 嵌套而报错
+
+错误语义与 subprocess 保持一致：
+返回码不在 ok_codes 中时抛出 subprocess.CalledProcessError，
+超时抛出 subprocess.TimeoutExpired，调用方原有的 except 分支无需改动。
+"""
+
+import asyncio
+import codecs
+import locale
+import os
+import subprocess
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Logger = Callable[[str], None]
+
+# spawn(cmd) → 具有 stdout / stderr（StreamReader）、wait()、kill()、returncode 的进程对象
+Spawner = Callable[[Sequence[str]], Awaitable[object]]
+
+DEFAULT_TIMEOUT = 120
+DEFAULT_CONCURRENCY = 4
+
+
+# ============================================================
+#                       OEM 代码页
+# ============================================================
+_OEM_ENCODING: Optional[str] = None
+
+
+def oem_encoding() -> str:
+    """
+    控制台程序（ipconfig / netsh / powercfg / wevtutil）输出使用 OEM 代码页，
+    简体中文系统为 cp936，而不是 utf-8。
+    """
+    global _OEM_ENCODING
+    if _OEM_ENCODING is None:
+        enc = None
+        if os.name == "nt":
+            try:
+                import ctypes
+                enc = f"cp{ctypes.windll.kernel32.GetOEMCP()}"
+                codecs.lookup(enc)
+            except Exception:
+                enc = None
+        _OEM_ENCODING = enc or locale.getpreferredencoding(False) or "utf-8"
+    return _OEM_ENCODING
+
+
+# ============================================================
+#                          结果
+# ============================================================
+@dataclass
+class CommandResult:
+    cmd: List[str]
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    seconds: float
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+
+# ============================================================
+#                       真实 / 模拟进程
+# ============================================================
+async def _default_spawn(cmd: Sequence[str]):
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+    return await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **kwargs,
+    )
+
+
+class FakeProcess:
+    """模拟进程：按预设内容填充 stdout / stderr，可选延迟以测试超时"""
+
+    def __init__(self, returncode: int = 0, stdout: bytes = b"", stderr: bytes = b"",
+                 delay: float = 0.0):
+        self._rc = returncode
+        self._delay = delay
+        self.returncode: Optional[int] = None
+        self.killed = False
+        self.stdout = asyncio.StreamReader()
+        self.stderr = asyncio.StreamReader()
+        self._feed_task = asyncio.ensure_future(self._feed(stdout, stderr))
+
+    async def _feed(self, out: bytes, err: bytes):
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        for reader, data in ((self.stdout, out), (self.stderr, err)):
+            if data:
+                reader.feed_data(data)
+            reader.feed_eof()
+        self.returncode = self._rc
+
+    async def wait(self) -> int:
+        await self._feed_task
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self._feed_task.cancel()
+        for reader in (self.stdout, self.stderr):
+            if not reader.at_eof():
+                reader.feed_eof()
+        self.returncode = -9
+
+
+class FakeRunner:
+    """
+    可注入的假命令执行器。
+    responses：命令前缀（元组）→ (返回码, stdout, stderr[, 延迟秒])，按最长前缀匹配。
+    calls：记录所有被执行的命令。
+    """
+
+    def __init__(self, responses: Optional[Dict[Tuple[str, ...], tuple]] = None,
+                 default: tuple = (0, b"", b"")):
+        self.responses = dict(responses or {})
+        self.default = default
+        self.calls: List[List[str]] = []
+
+    async def __call__(self, cmd: Sequence[str]):
+        cmd = list(cmd)
+        self.calls.append(cmd)
+        best = None
+        for prefix, resp in self.responses.items():
+            if tuple(cmd[:len(prefix)]) == tuple(prefix):
+                if best is None or len(prefix) > len(best[0]):
+                    best = (prefix, resp)
+        resp = best[1] if best else self.default
+        if isinstance(resp, BaseException):
+            raise resp
+        return FakeProcess(*resp)
+
+
+# ============================================================
+#                          执行器
+# ============================================================
+def run_sync(make_coro: Callable[[], Awaitable[object]]):
+    """
+    在新的事件循环中执行协程并等待结果（同步入口共用）。
+    当前线程已有运行中的事件循环时 asyncio.run 会直接报错：
+    改为在独立线程的新循环中执行（调用方本来就是同步阻塞的）。
+    协程应在异步代码中直接 await run_async / run_many_async。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(make_coro())
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="CommandExecutor") as pool:
+        return pool.submit(lambda: asyncio.run(make_coro())).result()
+
+
+class CommandExecutor:
+    def __init__(self, spawn: Optional[Spawner] = None,
+                 max_concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 encoding: Optional[str] = None):
+        self.spawn = spawn or _default_spawn
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.encoding = encoding
+        # asyncio.Semaphore 绑定事件循环，每个循环各用一个
+        self._sems: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    def with_concurrency(self, max_concurrency: int) -> "CommandExecutor":
+        """
+        相同进程创建方式、独立并发上限的执行器：
+        一批必须同时开始的命令（如各事件日志通道的查询）不与其它命令争用共享的信号量。
+        """
+        return CommandExecutor(self.spawn, max(1, max_concurrency), self.timeout, self.encoding)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._sems.get(loop)
+        if sem is None:
+            sem = asyncio.Semaphore(self.max_concurrency)
+            self._sems[loop] = sem
+        return sem
+
+    async def _pump(self, reader, sink: List[str], logger: Optional[Logger], prefix: str):
+        decoder = codecs.getincrementaldecoder(self.encoding or oem_encoding())(errors="replace")
+        pending = ""
+        while True:
+            chunk = await reader.read(4096)
+            final = not chunk
+            text = pending + decoder.decode(chunk, final=final)
+            lines = text.splitlines(keepends=True)
+            # 最后一段没有换行符时留到下一次拼接
+            pending = lines.pop() if lines and not final and not lines[-1].endswith(("\n", "\r")) else ""
+            for line in lines:
+                sink.append(line)
+                stripped = line.rstrip()
+                if logger and stripped:
+                    logger(f"{prefix}{stripped}")
+            if final:
+                return
+
+    async def run_async(
+        self,
+        cmd: Sequence[str],
+        logger: Optional[Logger] = None,
+        timeout: Optional[float] = None,
+        check: bool = True,
+        ok_codes: Iterable[int] = (0,),
+        stream: bool = True,
+        echo: bool = True,
+    ) -> CommandResult:
+        """
+        执行一条命令。
+        stream=True 时逐行把输出写入 logger；echo=True 时先记录执行的命令行。
+        """
+        cmd = [str(c) for c in cmd]
+        timeout = self.timeout if timeout is None else timeout
+        if logger and echo:
+            logger(f"  执行命令：{' '.join(cmd)}")
+
+        out: List[str] = []
+        err: List[str] = []
+        log = logger if stream else None
+
+        async with self._semaphore():
+            start = time.perf_counter()
+            try:
+                proc = await self.spawn(cmd)
+            except OSError as e:
+                if logger:
+                    logger(f"  命令执行失败：{e}")
+                raise
+
+            timed_out = False
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        self._pump(proc.stdout, out, log, "    "),
+                        self._pump(proc.stderr, err, log, "    [stderr] "),
+                        proc.wait(),
+                    ),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                timed_out = True
+                try:
+                    proc.kill()
+                    await asyncio.wait_for(proc.wait(), timeout=5)
+                except (ProcessLookupError, asyncio.TimeoutError, asyncio.CancelledError):
+                    pass
+
+            result = CommandResult(
+                cmd=cmd,
+                returncode=None if timed_out else proc.returncode,
+                stdout="".join(out),
+                stderr="".join(err),
+                seconds=time.perf_counter() - start,
+                timed_out=timed_out,
+            )
+
+        if timed_out:
+            if logger:
+                logger(f"  命令超时（{timeout:g}s），已结束进程。")
+            if check:
+                raise subprocess.TimeoutExpired(cmd, timeout, result.stdout, result.stderr)
+        elif check and result.returncode not in tuple(ok_codes):
+            if logger:
+                logger(f"  命令执行错误码：{result.returncode}")
+            raise subprocess.CalledProcessError(
+                result.returncode, cmd, result.stdout, result.stderr)
+        return result
+
+    async def run_many_async(self, cmds: Sequence[Sequence[str]],
+                             timeouts: Optional[Sequence[Optional[float]]] = None,
+                             **kwargs) -> List[object]:
+        """
+        并发执行多条命令（受 max_concurrency 限制），按输入顺序返回。
+        失败的命令对应位置为异常对象，而不是让整批中断。
+        timeouts 可为每条命令单独指定超时（覆盖 timeout 参数）。
+        """
+        if timeouts is None:
+            coros = (self.run_async(c, **kwargs) for c in cmds)
+        else:
+            base = kwargs.pop("timeout", None)
+            coros = (self.run_async(c, timeout=base if t is None else t, **kwargs)
+                     for c, t in zip(cmds, timeouts))
+        return await asyncio.gather(*coros, return_exceptions=True)
+
+    # --------------------------
+    #  同步入口（GUI 后台线程 / 任务函数使用）
+    # --------------------------
+    @staticmethod
+    def _run_sync(make_coro: Callable[[], Awaitable[object]]):
+        return run_sync(make_coro)
+
+    def run(self, cmd: Sequence[str], logger: Optional[Logger] = None, **kwargs) -> CommandResult:
+        return self._run_sync(lambda: self.run_async(cmd, logger, **kwargs))
+
+    def run_many(self, cmds: Sequence[Sequence[str]], **kwargs) -> List[object]:
+        return self._run_sync(lambda: self.run_many_async(cmds, **kwargs))
+
+
+_executor: Optional[CommandExecutor] = None
+
+
+def get_executor() -> CommandExecutor:
+    global _executor
+    if _executor is None:
+        _executor = CommandExecutor()
+    return _executor
+
+
+def set_executor(executor: Optional[CommandExecutor]):
+    """替换默认执行器（测试时传入 CommandExecutor(spawn=FakeRunner(...))）"""
+    global _executor
+    _executor = executor
+
+
+def run_command(cmd: Sequence[str], logger: Optional[Logger] = None, **kwargs) -> CommandResult:
+    return get_executor().run(cmd, logger, **kwargs)
+
+
+def run_commands(cmds: Sequence[Sequence[str]], **kwargs) -> List[object]:
+    return get_executor().run_many(cmds, **kwargs)
+
+
+def spawn_detached(cmd: Sequence[str], logger: Optional[Logger] = None):
+    """启动后不等待的命令（DWM 重启、IdleTasks、任务管理器等）"""
+    if logger:
+        logger(f"  后台启动：{' '.join(cmd)}")
+    flags = subprocess.DETACHED_PROCESS if os.name == "nt" else 0
+    return subprocess.Popen(list(cmd), creationflags=flags)
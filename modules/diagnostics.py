@@ -5,7 +5,10 @@ GUI 使用的统一诊断入口
 """
 
 from typing import Callable
-from .diagnostics_core import run_full_diagnostics
+
+from . import fleet, run_history
+from .diagnostics_core import collect_findings, run_offline_evtx
+from .findings import render_text
 
 Logger = Callable[[str], None]
 
@@ -19,10 +22,17 @@ def analyze_hid_usb_issues(logger: Logger) -> str:
     logger("正在执行 HID/USB 设备诊断，请稍候……")
 
     # 调用完整诊断引擎（setupapi + evtx + WER + LiveKernel）
-    report = run_full_diagnostics()
+    sections = collect_findings()
+    report = render_text(sections)
 
     logger("诊断完成。")
 
+    # 保存到运行历史，供「与上次诊断对比」使用
+    try:
+        logger(run_history.save_run(sections).describe())
+    except OSError as e:
+        logger(f"保存诊断记录失败：{e}")
+
     # 新增声明区域
     header = (
         "=== HID / USB 驱动与系统事件诊断报告 ===\n\n"
@@ -38,3 +48,39 @@ def analyze_hid_usb_issues(logger: Logger) -> str:
 
     # 返回右侧说明区显示的完整文本
     return header + report + "\n（提示：如需更深入分析，可查看原始日志文件。）"
+
+
+def analyze_evtx_file(path: str, logger: Logger) -> str:
+    """离线解析用户导出的 .evtx 文件（不依赖 wevtutil，Linux 下同样可用）"""
+    logger(f"正在解析事件日志文件：{path}")
+    report = run_offline_evtx(path)
+    logger("解析完成。")
+    return "=== 事件日志文件分析（离线） ===\n\n" + report
+
+
+def compare_with_previous_run(logger: Logger) -> str:
+    """对比最近两次诊断，只列出新增、已消失与有变化的问题"""
+    logger("正在对比最近两次诊断记录……")
+    try:
+        text = run_history.compare_latest()
+    except (OSError, ValueError) as e:
+        return f"读取诊断记录失败：{e}"
+    if text is None:
+        return "诊断记录不足两次：请先运行「分析设备驱动错误（HID/USB）」至少两次。"
+    return "=== 与上次诊断对比 ===\n\n" + text
+
+
+def export_latest_report(path: str, logger: Logger) -> str:
+    """把最近一次诊断导出为 JSON 报告，供 python -m modules.fleet 汇总多台电脑"""
+    try:
+        runs = run_history.list_runs()
+        if not runs:
+            return "还没有诊断记录：请先运行「分析设备驱动错误（HID/USB）」。"
+        count = fleet.export_report(run_history.load_run(runs[-1]), path)
+    except (OSError, ValueError) as e:
+        return f"导出诊断报告失败：{e}"
+    logger(f"已导出诊断报告：{path}")
+    return (f"=== 导出诊断报告 ===\n\n已把诊断记录 {runs[-1]} 的 {count} 条结果导出到：\n{path}\n\n"
+            "收集多台电脑的报告后，可用以下命令汇总：\n"
+            "    python -m modules.fleet ingest fleet.db 报告目录\n"
+            "    python -m modules.fleet top-devices fleet.db --days 7")
@@ -2,16 +2,28 @@
 """
 核心诊断模块：
 - setupapi.dev.log 高级解析
-- System.evtx 扫描（USB/HID/驱动相关 EventID）
+- 事件日志扫描（System 与 Kernel-PnP / UMDF / USBHUB3 通道，增量、并发查询）
 - WER 错误报告扫描
 - LiveKernelReports 扫描
+
+每个扫描器返回 Finding 列表（见 findings.py），run_full_diagnostics 负责渲染成文本。
 """
 
+import datetime
+import json
 import os
+import re
 import subprocess
-from typing import List
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 
-from .device_id import resolve_vid_pid
+from .command_exec import get_executor
+from .device_id import USB_ID_REGEX, resolve_vid_pid
+from . import event_store, evtx, livekernel, profiling, timeline
+from .app_paths import data_dir
+from .findings import ERROR, INFO, WARNING, Finding, note, render_text
 
 
 # ============================================================
@@ -32,11 +44,32 @@ KEYWORDS = [
     "Mouse",
 ]
 
-def scan_setupapi() -> List[str]:
+ERROR_KEYWORDS = ("failed", "error", "not migrated")
+
+SETUPAPI_SOURCE = "setupapi"
+
+
+# 每个安装段以「>>>  Section start 2024/05/01 21:03:12.345」开头，段内各行沿用该时间
+_SECTION_START_RE = re.compile(r">>>\s+Section start (\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2})")
+
+
+def _parse_section_time(text: str) -> Optional[datetime.datetime]:
+    try:
+        return datetime.datetime.strptime(text, "%Y/%m/%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def _usb_ids(line: str):
+    m = USB_ID_REGEX.search(line)
+    return (m.group(1).upper(), m.group(2).upper()) if m else (None, None)
+
+
+def scan_setupapi() -> List[Finding]:
     """扫描 setupapi.dev.log 并返回匹配的异常行（带 VID/PID 解析）"""
 
     if not os.path.exists(SETUPAPI_PATH):
-        return ["未找到 setupapi.dev.log"]
+        return [note(SETUPAPI_SOURCE, "未找到 setupapi.dev.log")]
 
     # 尝试 utf-8 读取
     try:
@@ -50,72 +83,418 @@ def scan_setupapi() -> List[str]:
     lines = lines[-500:]  # 只取最近 500 行，避免太旧数据干扰
 
     result = []
+    section_time = None
     for line in lines:
+        m = _SECTION_START_RE.match(line)
+        if m:
+            section_time = _parse_section_time(m.group(1))
+            continue
         lower = line.lower()
         if any(k in lower for k in KEYWORDS):
             vendor, hint = resolve_vid_pid(line)
+            vid, pid = _usb_ids(line)
+            detail = ""
             if vendor != "Unknown Vendor" or hint:
-                result.append(
-                    f"{line.strip()}\n    → 设备识别：{vendor}"
-                    + (f"（{hint}）" if hint else "")
-                )
-            else:
-                result.append(line.strip())
+                detail = f"→ 设备识别：{vendor}" + (f"（{hint}）" if hint else "")
+            result.append(Finding(
+                source=SETUPAPI_SOURCE,
+                severity=ERROR if any(k in lower for k in ERROR_KEYWORDS) else INFO,
+                title=line.strip(),
+                detail=detail,
+                timestamp=section_time,
+                vid=vid,
+                pid=pid,
+            ))
 
     if not result:
-        return ["未检测到 setupapi.dev.log 中的 HID/USB 相关异常记录。"]
+        return [note(SETUPAPI_SOURCE, "未检测到 setupapi.dev.log 中的 HID/USB 相关异常记录。")]
 
-    return ["【setupapi.dev.log 检测到异常】"] + result
+    return result
 
 
 # ============================================================
-#       使用 wevtutil 扫描 System.evtx（系统事件日志）
+#     使用 wevtutil 扫描事件日志（System 与设备相关的操作日志通道）
 # ============================================================
 
 EVENT_IDS = [22, 51, 2100, 2101, 7000, 7001, 7005, 7034, 10110, 10111]
 
-def scan_system_event_log() -> List[str]:
+EVTX_CHANNEL = "System"
+EVTX_SOURCE = "System.evtx"
+
+# 单次查询最多取回的事件数（首次扫描没有书签时取最新的这些）
+MAX_EVENTS_PER_QUERY = 100
+# 有书签时按时间正序分页读取，每个通道每次扫描最多读取的页数；
+# 读不完的部分书签停在已读位置，下次扫描接着读
+MAX_PAGES_PER_SCAN = 20
+# 报告中每个通道列出的历史事件数
+MAX_EVENTS_LISTED = 50
+# 单个通道的默认超时（秒）
+CHANNEL_TIMEOUT = 15
+
+# 用户自定义通道表（数据目录下），格式见 ChannelSpec
+EVENT_CHANNELS_FILE = "event_channels.json"
+
+_EVENT_XML_RE = re.compile(r"<Event[\s>].*?</Event>", re.DOTALL)
+_RECORD_ID_RE = re.compile(r"<EventRecordID>(\d+)</EventRecordID>")
+_GLI_RE = re.compile(r"^\s*(oldestRecordNumber|numberOfLogRecords)\s*:\s*(\d+)", re.MULTILINE)
+_EVTX_LEVELS = {1: ERROR, 2: ERROR, 3: WARNING}
+
+
+@dataclass
+class ChannelSpec:
+    """一个事件日志通道及要查询的 EventID / Provider（都为空时查询全部事件）"""
+    channel: str
+    event_ids: List[int] = field(default_factory=list)
+    providers: List[str] = field(default_factory=list)
+    timeout: float = CHANNEL_TIMEOUT
+
+    @property
+    def source(self) -> str:
+        return EVTX_SOURCE if self.channel == EVTX_CHANNEL else self.channel
+
+    @property
+    def analytic(self) -> bool:
+        """分析 / 调试日志：不支持倒序查询（/rd:true）"""
+        return self.channel.lower().endswith(("analytic", "debug"))
+
+
+DEFAULT_CHANNELS = [
+    ChannelSpec(EVTX_CHANNEL, EVENT_IDS, timeout=30),
+    # 设备配置 / 启动失败 / 移除（400 已配置、410 已启动、411 启动出错、420 已删除、430 需进一步安装）
+    ChannelSpec("Microsoft-Windows-Kernel-PnP/Configuration", [400, 410, 411, 420, 430]),
+    # 用户模式驱动（UMDF）加载、崩溃与设备移除
+    ChannelSpec("Microsoft-Windows-DriverFrameworks-UserMode/Operational",
+                [2003, 2004, 2010, 2100, 2101, 2102, 2105, 2106, 10110, 10111]),
+]
+# USB 3.x 集线器分析日志（Microsoft-Windows-USB-USBHUB3-Analytic）默认未启用，
+# 启用期间又无法读取，不放在默认表中；需要时可写入 event_channels.json
+
+
+def load_channels() -> List[ChannelSpec]:
+    """读取数据目录中的通道表；不存在或格式错误时使用默认表"""
+    path = os.path.join(data_dir(), EVENT_CHANNELS_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [ChannelSpec(**c) for c in json.load(f)]
+    except (OSError, ValueError, TypeError):
+        return list(DEFAULT_CHANNELS)
+
+
+def event_query(event_ids: List[int], after: int = 0,
+                providers: Optional[List[str]] = None) -> str:
+    """XPath 查询：指定 EventID / Provider，且记录号大于书签"""
+    conds = []
+    if event_ids:
+        conds.append("(" + " or ".join(f"EventID={i}" for i in event_ids) + ")")
+    if providers:
+        conds.append("Provider[" + " or ".join(f"@Name='{p}'" for p in providers) + "]")
+    if after:
+        conds.append(f"EventRecordID>{after}")
+    if not conds:
+        return "*"
+    return f"*[System[{' and '.join(conds)}]]"
+
+
+def _record_range(gli_output: str) -> Optional[Tuple[int, int]]:
+    """wevtutil gli 输出 → (最旧记录号, 最新记录号)"""
+    values = dict(_GLI_RE.findall(gli_output))
+    try:
+        oldest = int(values["oldestRecordNumber"])
+        return oldest, oldest + int(values["numberOfLogRecords"]) - 1
+    except (KeyError, ValueError):
+        return None
+
+
+def _parse_system_time(text: Optional[str]) -> Optional[datetime.datetime]:
+    """SystemTime 为 UTC（小数位最多 7 位），转换为本地时间"""
+    if not text:
+        return None
+    m = re.match(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(\.\d+)?", text)
+    if not m:
+        return None
+    try:
+        ts = datetime.datetime.fromisoformat(m.group(1) + (m.group(2) or "")[:7])
+    except ValueError:
+        return None
+    return ts.replace(tzinfo=datetime.timezone.utc).astimezone().replace(tzinfo=None)
+
+
+def parse_wevtutil_xml(output: str, source: str = EVTX_SOURCE) -> List[Finding]:
+    """把 wevtutil qe /f:RenderedXml 的输出拆成逐条事件；无法解析的事件跳过"""
+    findings = []
+    # System 以外的通道在标题后注明来源
+    label = "" if source == EVTX_SOURCE else f" — {source.replace('Microsoft-Windows-', '')}"
+    for m in _EVENT_XML_RE.finditer(output):
+        try:
+            event = ET.fromstring(m.group(0))
+        except ET.ParseError:
+            continue
+        system = event.find("{*}System")
+        if system is None:
+            continue
+        provider_el = system.find("{*}Provider")
+        provider = provider_el.get("Name") if provider_el is not None else None
+        try:
+            event_id = int(system.findtext("{*}EventID", ""))
+            record_id = int(system.findtext("{*}EventRecordID", ""))
+        except ValueError:
+            continue
+        try:
+            level = int(system.findtext("{*}Level", ""))
+        except ValueError:
+            level = None
+        created = system.find("{*}TimeCreated")
+
+        message = (event.findtext("{*}RenderingInfo/{*}Message") or "").strip()
+        lines = message.splitlines() if message else [
+            f"{d.get('Name') or 'Data'}：{d.text}"
+            for d in event.iterfind("{*}EventData/{*}Data") if d.text
+        ]
+        detail = "\n".join(lines)
+        vid, pid = _usb_ids(detail)
+        findings.append(Finding(
+            source=source,
+            severity=_EVTX_LEVELS.get(level, WARNING),
+            title=f"EventID {event_id}" + (f"（{provider}）" if provider else "") + label,
+            detail=detail,
+            timestamp=_parse_system_time(created.get("SystemTime") if created is not None else None),
+            event_id=event_id,
+            module=provider,
+            vid=vid,
+            pid=pid,
+            extra={event_store.RECORD_ID: record_id},
+        ))
+    return findings
+
+
+@dataclass
+class ChannelResult:
+    spec: ChannelSpec
+    new: int = 0
+    seconds: float = 0.0
+    status: str = ""                              # 空表示正常；否则为跳过 / 失败原因
+    warnings: List[str] = field(default_factory=list)   # 有事件未能读取等
+
+
+def _query_cmd(spec: ChannelSpec, after: int) -> List[str]:
     """
-    扫描 System.evtx 里和 USB/HID/驱动有关的事件
-    使用系统内置 wevtutil，不依赖第三方库
+    没有书签（首次扫描或日志被清空）时倒序取最新的一页；
+    有书签时按时间正序取书签之后最早的一页，由调用方继续翻页，不会漏掉中间的事件。
     """
+    cmd = ["wevtutil", "qe", spec.channel,
+           f"/q:{event_query(spec.event_ids, after, spec.providers)}"]
+    if not after and not spec.analytic:
+        cmd.append("/rd:true")
+    return cmd + [f"/c:{MAX_EVENTS_PER_QUERY}", "/f:RenderedXml"]
 
-    result = ["【System.evtx 事件日志】"]
 
-    for event_id in EVENT_IDS:
-        cmd = (
-            f'wevtutil qe System /q:"*[System[(EventID={event_id})]]" /c:10 /f:text'
-        )
-        try:
-            output = subprocess.check_output(
-                cmd, shell=True, stderr=subprocess.STDOUT,
-                encoding="utf-8", errors="ignore"
-            )
-            if output.strip():
-                result.append(f"[EventID {event_id}]")
-                result.append(output.strip())
-        except subprocess.CalledProcessError:
-            pass
-        except Exception as e:
-            result.append(f"读取事件 {event_id} 时出错：{e}")
-
-    if len(result) == 1:
-        return ["System.evtx 中未找到相关事件。"]
+def _next_page(after: int, output) -> Optional[int]:
+    """正序查询的结果满一页时返回下一页的起点（本页最大记录号），否则返回 None"""
+    if not after or isinstance(output, Exception):
+        return None
+    ids = [int(m) for m in _RECORD_ID_RE.findall(output.stdout)]
+    if len(ids) < MAX_EVENTS_PER_QUERY:
+        return None
+    return max(ids)
+
+
+def _failure_status(error: Exception) -> str:
+    if isinstance(error, subprocess.TimeoutExpired):
+        return f"超时（{error.timeout:g}s），已跳过"
+    if isinstance(error, subprocess.CalledProcessError):
+        return "通道不存在、未启用或无法读取，已跳过"
+    return f"查询失败：{error}"
+
+
+def scan_event_logs(store: Optional[event_store.EventStore] = None,
+                    channels: Optional[List[ChannelSpec]] = None) -> List[Finding]:
+    """
+    扫描各事件日志通道里和 USB/HID/驱动有关的事件
+    使用系统内置 wevtutil，不依赖第三方库；所有通道同时查询（独立的并发上限，
+    不与其它命令共用信号量，一个通道卡住不会推迟其它通道），各自有超时，
+    不存在 / 未启用 / 超时的通道只记录状态，不影响其他通道。
+    增量扫描：只查询书签（上次见过的最大 EventRecordID）之后的记录，按正序分页读到最后一页，
+    结果并入本地滚动存储，报告列出存储中的最近事件，并标记本次新增的事件。
+    日志被清空（记录号回退）时重置书签；书签之后的记录已被循环覆盖时在报告中注明。
+    """
+    store = store or event_store.get_store()
+    specs = channels if channels is not None else load_channels()
+    started = time.perf_counter()
+
+    afters = [store.bookmark(spec.channel) for spec in specs]
+    cmds, timeouts = [], []
+    for spec, after in zip(specs, afters):
+        cmds += [["wevtutil", "gli", spec.channel], _query_cmd(spec, after)]
+        timeouts += [spec.timeout, spec.timeout]
+    executor = get_executor().with_concurrency(len(cmds))
+    outputs = executor.run_many(cmds, timeouts=timeouts)
+    infos, queries = outputs[0::2], outputs[1::2]
+    results = [ChannelResult(spec) for spec in specs]
+
+    # 日志被清空后记录号从头开始，旧书签会让查询永远为空：丢弃书签后重新查询。
+    # 清空后新记录可能已超过旧书签，所以同时比较最旧记录号（只会增长，除非日志被清空）
+    retry = []
+    for i, (spec, info) in enumerate(zip(specs, infos)):
+        span = None if isinstance(info, Exception) else _record_range(info.stdout)
+        if span is None:
+            continue
+        oldest, newest = span
+        prev_oldest = store.oldest(spec.channel)
+        store.set_oldest(spec.channel, oldest)
+        if afters[i] and (newest < afters[i] or oldest < prev_oldest):
+            store.reset_bookmark(spec.channel)
+            store.set_oldest(spec.channel, oldest)
+            afters[i] = 0
+            retry.append(i)
+            results[i].warnings.append("日志已被清空，书签已重置")
+        elif afters[i] and oldest > afters[i] + 1:
+            # 日志循环覆盖：书签之后、最旧记录之前的事件在读取前已被覆盖
+            results[i].warnings.append(
+                f"书签之后有 {oldest - afters[i] - 1} 条记录在读取前已被循环覆盖")
+    if retry:
+        again = executor.run_many([_query_cmd(specs[i], 0) for i in retry],
+                                  timeouts=[specs[i].timeout for i in retry])
+        for i, output in zip(retry, again):
+            queries[i] = output
+
+    # 有书签的通道按正序翻页，直到某页不满；各通道的同一页并发查询
+    pages = [[q] for q in queries]
+    cursors = {i: _next_page(after, q) for i, (after, q) in enumerate(zip(afters, queries))}
+    cursors = {i: c for i, c in cursors.items() if c is not None}
+    for _ in range(MAX_PAGES_PER_SCAN - 1):
+        if not cursors:
+            break
+        order = list(cursors)
+        more = executor.run_many([_query_cmd(specs[i], cursors[i]) for i in order],
+                                 timeouts=[specs[i].timeout for i in order])
+        cursors = {}
+        for i, output in zip(order, more):
+            if isinstance(output, Exception):
+                results[i].warnings.append(f"翻页查询失败（{_failure_status(output)}），下次扫描继续")
+                continue
+            pages[i].append(output)
+            nxt = _next_page(afters[i], output)
+            if nxt is not None:
+                cursors[i] = nxt
+    for i in cursors:
+        results[i].warnings.append(
+            f"新事件超过 {MAX_EVENTS_PER_QUERY * MAX_PAGES_PER_SCAN} 条，其余的下次扫描继续读取")
+
+    events: List[Finding] = []
+    for spec, res, outputs in zip(specs, results, pages):
+        first = outputs[0]
+        if isinstance(first, Exception):
+            res.status = _failure_status(first)
+            if isinstance(first, subprocess.TimeoutExpired):
+                res.seconds = first.timeout
+        else:
+            res.seconds = sum(o.seconds for o in outputs)
+            found = [f for o in outputs for f in parse_wevtutil_xml(o.stdout, spec.source)]
+            res.new = len(store.merge(spec.channel, found))
+        events.extend(store.recent(spec.channel, MAX_EVENTS_LISTED))
+
+    result: List[Finding] = list(events)
+    try:
+        store.save()
+    except OSError as e:
+        result.append(note(EVTX_SOURCE, f"保存事件书签失败：{e}"))
+
+    if not events and all(not r.status for r in results):
+        result.insert(0, note(EVTX_SOURCE, "事件日志中未找到相关事件。"))
+
+    lines = []
+    for r, after in zip(results, afters):
+        if r.status:
+            lines.append(f"{r.spec.channel}：{r.status}")
+        else:
+            since = f"（书签：记录号 {after} 之后）" if after else ""
+            lines.append(f"{r.spec.channel}：新增 {r.new} 条{since}，耗时 {r.seconds:.2f}s")
+        lines.extend(f"  {r.spec.channel}：{w}" for w in r.warnings)
+    result.append(note(EVTX_SOURCE,
+                       f"各通道查询情况（并发，总耗时 {time.perf_counter() - started:.2f}s）："))
+    result.extend(note(EVTX_SOURCE, f"  {line}") for line in lines)
+    return result
+
 
+def scan_system_event_log(store: Optional[event_store.EventStore] = None) -> List[Finding]:
+    """只扫描 System 通道"""
+    return scan_event_logs(store, [DEFAULT_CHANNELS[0]])
+
+
+# ============================================================
+#       离线解析 .evtx 文件（用户导出发来的日志，不依赖 wevtutil）
+# ============================================================
+
+MAX_OFFLINE_EVENTS = 200
+
+
+def scan_evtx_file(path: str, event_ids: Optional[List[int]] = None,
+                   since: Optional[datetime.datetime] = None) -> List[Finding]:
+    """
+    用纯 Python 解析器读取 .evtx 文件，把命中的事件转成 Finding。
+    event_ids 默认与 scan_system_event_log 相同；since 为 UTC 时间。
+    """
+    source = os.path.basename(path)
+    try:
+        scan = evtx.read_evtx(path, evtx.EventFilter.build(event_ids or EVENT_IDS, since=since))
+    except (OSError, evtx.EvtxError) as e:
+        return [Finding(source, ERROR, f"无法解析 {source}：{e}")]
+
+    result: List[Finding] = []
+    for rec in scan.records[-MAX_OFFLINE_EVENTS:]:
+        lines = [f"时间（UTC）：{rec.timestamp}", f"记录号：{rec.record_id}"]
+        if rec.computer:
+            lines.append(f"计算机：{rec.computer}")
+        lines.extend(f"{k}：{v}" for k, v in rec.data.items() if v)
+        detail = "\n".join(lines)
+        vid, pid = _usb_ids(detail)
+        result.append(Finding(
+            source=source,
+            severity=_EVTX_LEVELS.get(rec.level, WARNING),
+            title=f"EventID {rec.event_id}" + (f"（{rec.provider}）" if rec.provider else ""),
+            detail=detail,
+            timestamp=rec.timestamp,
+            event_id=rec.event_id,
+            module=rec.provider,
+            vid=vid,
+            pid=pid,
+        ))
+
+    summary = (f"共 {scan.chunks} 个块、{scan.records_total} 条记录，命中 {len(scan.records)} 条，"
+               f"耗时 {scan.seconds:.2f}s")
+    if len(scan.records) > MAX_OFFLINE_EVENTS:
+        summary += f"（只列出最近 {MAX_OFFLINE_EVENTS} 条）"
+    result.append(note(source, summary))
+    if scan.bad_chunks or scan.bad_records:
+        result.append(Finding(source, WARNING, "日志文件部分损坏",
+                              f"校验失败的块：{len(scan.bad_chunks)}，无法解析的记录：{scan.bad_records}"))
     return result
 
 
+def run_offline_evtx(path: str) -> str:
+    """解析单个 .evtx 文件并输出文本报告"""
+    return render_text([(f"【{os.path.basename(path)}】", scan_evtx_file(path))])
+
+
 # ============================================================
 #                   扫描 WER 崩溃报告
 # ============================================================
 
 WER_PATH = r"C:\ProgramData\Microsoft\Windows\WER\ReportArchive"
 
-def scan_wer_reports() -> List[str]:
-    result = ["【WER 错误报告】"]
+WER_SOURCE = "WER"
+
+
+def _wer_field(text: str, name: str) -> Optional[str]:
+    m = re.search(rf"^{name}=(.*)$", text, re.MULTILINE)
+    return m.group(1).strip() if m else None
+
+
+def scan_wer_reports() -> List[Finding]:
+    result: List[Finding] = []
 
     if not os.path.exists(WER_PATH):
-        return ["未找到 WER 报告目录"]
+        return [note(WER_SOURCE, "未找到 WER 报告目录")]
 
     found = False
     for root, _, files in os.walk(WER_PATH):
@@ -130,12 +509,27 @@ def scan_wer_reports() -> List[str]:
                             or "driver" in text.lower()
                             or "nvlddmkm" in text
                             or "Kernel" in text):
-                            result.append(f"\n报告：{full}\n{text}")
+                            event_type = _wer_field(text, "EventType") or "未知类型"
+                            app = _wer_field(text, "AppName") or os.path.basename(root)
+                            vid, pid = _usb_ids(text)
+                            result.append(Finding(
+                                source=WER_SOURCE,
+                                severity=WARNING,
+                                title=f"{event_type}：{app}",
+                                detail=f"报告：{full}\n{text}",
+                                timestamp=datetime.datetime.fromtimestamp(os.path.getmtime(full)),
+                                module=app,
+                                vid=vid,
+                                pid=pid,
+                            ))
                 except:
                     pass
 
     if not found:
-        return ["未检测到 WER 报告"]
+        return [note(WER_SOURCE, "未检测到 WER 报告")]
+
+    if not result:
+        return [note(WER_SOURCE, "WER 报告中未发现驱动 / 设备相关的错误")]
 
     return result
 
@@ -146,21 +540,51 @@ def scan_wer_reports() -> List[str]:
 
 LIVEKERNEL_PATH = r"C:\Windows\LiveKernelReports"
 
-def scan_livekernel() -> List[str]:
-    result = ["【LiveKernelReports】"]
+LIVEKERNEL_SOURCE = "LiveKernelReports"
 
-    if not os.path.exists(LIVEKERNEL_PATH):
-        return ["未找到 LiveKernelReports 目录"]
 
-    found = False
-    for root, _, files in os.walk(LIVEKERNEL_PATH):
-        for f in files:
-            if f.endswith(".dmp"):
-                found = True
-                result.append(f"检测到内核转储文件：{os.path.join(root, f)}")
+MAX_DUMPS_LISTED = 10
 
-    if not found:
-        return ["未检测到 LiveKernelReports 相关文件"]
+
+def scan_livekernel() -> List[Finding]:
+    """按组件与 BugCheck 分组汇总 LiveKernelReports 中的转储（只读取文件头）"""
+
+    if not os.path.exists(LIVEKERNEL_PATH):
+        return [note(LIVEKERNEL_SOURCE, "未找到 LiveKernelReports 目录")]
+
+    groups = livekernel.group_dumps(livekernel.scan_reports(LIVEKERNEL_PATH))
+    if not groups:
+        return [note(LIVEKERNEL_SOURCE, "未检测到 LiveKernelReports 相关文件")]
+
+    result: List[Finding] = []
+    for g in groups:
+        head = g.dumps[-1]
+        component = g.component or "（根目录）"
+        detail = [f"共 {g.count} 次"]
+        hint = livekernel.COMPONENT_HINTS.get(g.component or "")
+        if hint:
+            detail.append(f"说明：{hint}")
+        if g.first and g.last:
+            detail.append(f"时间范围：{g.first:%Y-%m-%d %H:%M} ~ {g.last:%Y-%m-%d %H:%M}")
+        detail.append("按日统计：" + "，".join(
+            f"{day:%m-%d} ×{n}" for day, n in g.per_day().items()))
+        for d in reversed(g.dumps[-MAX_DUMPS_LISTED:]):
+            params = " ".join(f"0x{p:X}" for p in d.params)
+            detail.append(f"{d.timestamp:%Y-%m-%d %H:%M:%S}  {os.path.basename(d.path)}"
+                          + (f"  参数：{params}" if params else ""))
+        if g.count > MAX_DUMPS_LISTED:
+            detail.append(f"……另有 {g.count - MAX_DUMPS_LISTED} 个更早的转储")
+
+        result.append(Finding(
+            source=LIVEKERNEL_SOURCE,
+            severity=WARNING,
+            # 次数放在详情里，标题（指纹）只描述是什么问题，便于前后两次运行对比
+            title=f"{component}：{head.bugcheck_name}",
+            detail="\n".join(detail),
+            timestamp=g.last,
+            module=g.component,
+            extra={"bugcheck": g.bugcheck, "count": g.count},
+        ))
 
     return result
 
@@ -169,19 +593,19 @@ def scan_livekernel() -> List[str]:
 #                  合并所有诊断结果（统一输出）
 # ============================================================
 
-def run_full_diagnostics() -> str:
-    """执行所有诊断并合并成文本"""
-
+@profiling.profiled("full_diagnostics")
+def collect_findings() -> List[tuple]:
+    """执行所有诊断，返回 [(标题, [Finding, ...]), ...]；最后一段为跨来源时间线"""
     sections = [
-        scan_setupapi(),
-        scan_system_event_log(),
-        scan_wer_reports(),
-        scan_livekernel(),
+        ("【setupapi.dev.log 检测到异常】", scan_setupapi()),
+        ("【事件日志（System / 设备相关通道）】", scan_event_logs()),
+        ("【WER 错误报告】", scan_wer_reports()),
+        ("【LiveKernelReports】", scan_livekernel()),
     ]
+    sections.append(("【事件时间线（跨来源关联 / 突发）】", timeline.build_timeline(sections)))
+    return sections
 
-    output = []
-    for sec in sections:
-        output.append("\n".join(sec))
-        output.append("\n" + "=" * 60 + "\n")
 
-    return "\n".join(output)
+def run_full_diagnostics() -> str:
+    """执行所有诊断并合并成文本"""
+    return render_text(collect_findings())
@@ -0,0 +1,345 @@
+# modules/disk_scan.py
+"""
+磁盘空间分析（查找大文件 / 大目录）：
+- 并行 scandir：多个线程各自列一个目录（系统调用期间释放 GIL），
+  协调线程负责派发子目录并合并结果
+- 只保留最大的 top_k 个文件与目录（定长小根堆），2 TB 的盘内存占用也保持平稳
+- 按扩展名、按根目录下的一级文件夹汇总大小
+- 目录大小是递归大小：子目录全部扫完后才把合计交给父目录，
+  只有「正在扫描的目录」常驻内存，已完成的目录随即释放
+- 待列举的目录按后进先出派发，同时在途的任务数有上限：
+  内存占用随目录深度增长，而不是随目录树的宽度增长
+- 扫描根会先去重，并去掉包含在其它扫描根之内的目录
+- snapshot() 随时可取当前的部分结果；seq 变化时 GUI 再刷新
+
+不进入符号链接 / 目录联接，无权限的目录直接跳过。
+"""
+
+import heapq
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_TOP_K = 100
+DEFAULT_WORKERS = 8
+INFLIGHT_PER_WORKER = 2          # 每个工作线程最多排队的列举任务
+MAX_GROUPS = 50                  # 快照中按扩展名 / 一级文件夹各列出多少项
+ROOT_FILES = "（根目录下的文件）"
+NO_EXT = "（无扩展名）"
+
+
+def normalize_roots(roots: Sequence[str]) -> List[str]:
+    """转为绝对路径，去掉重复项以及位于其它扫描根之内的目录（否则会重复计数）"""
+    result: List[str] = []
+    keys: List[str] = []
+    for root in sorted((os.path.abspath(r) for r in roots), key=len):
+        key = os.path.normcase(root)
+        prefixes = [k if k.endswith(os.sep) else k + os.sep for k in keys]
+        if key in keys or any(key.startswith(p) for p in prefixes):
+            continue
+        keys.append(key)
+        result.append(root)
+    return result
+
+
+def _is_link(entry: os.DirEntry) -> bool:
+    if entry.is_symlink():
+        return True
+    is_junction = getattr(entry, "is_junction", None)  # Python 3.12+
+    return bool(is_junction and is_junction())
+
+
+# ============================================================
+#                     单个目录的扫描结果
+# ============================================================
+@dataclass
+class _Listing:
+    """工作线程列出一个目录的结果（只含本目录的文件，不含子目录内容）"""
+    path: str
+    subdirs: List[str] = field(default_factory=list)
+    files: int = 0
+    bytes: int = 0
+    by_ext: Dict[str, int] = field(default_factory=dict)
+    largest: List[Tuple[int, str]] = field(default_factory=list)   # 本目录最大的 top_k 个文件
+    error: bool = False
+
+
+def _list_dir(path: str, top_k: int) -> _Listing:
+    result = _Listing(path)
+    candidates: List[Tuple[int, str]] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    # 链接本身不占数据空间；指向目录的链接也不能当作文件计入
+                    if _is_link(entry):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        result.subdirs.append(entry.path)
+                        continue
+                    # Windows 下 scandir 已带回文件大小，这里不会再产生系统调用
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+                result.files += 1
+                result.bytes += size
+                ext = os.path.splitext(entry.name)[1].lower() or NO_EXT
+                result.by_ext[ext] = result.by_ext.get(ext, 0) + size
+                if len(candidates) < top_k:
+                    heapq.heappush(candidates, (size, entry.path))
+                elif size > candidates[0][0]:
+                    heapq.heapreplace(candidates, (size, entry.path))
+    except OSError:
+        result.error = True
+    result.largest = candidates
+    return result
+
+
+class _TopK:
+    """定长小根堆：只保留最大的 k 项"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.heap: List[Tuple[int, str]] = []
+
+    def push(self, size: int, path: str):
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, (size, path))
+        elif size > self.heap[0][0]:
+            heapq.heapreplace(self.heap, (size, path))
+
+    def items(self) -> List[Tuple[int, str]]:
+        return sorted(self.heap, reverse=True)
+
+
+@dataclass
+class _Pending:
+    """尚未扫完子树的目录"""
+    parent: Optional[str]
+    group: str                   # 所属的一级文件夹
+    remaining: int = 1           # 本目录自身的列举 + 未完成的子目录数
+    total: int = 0
+
+
+# ============================================================
+#                           快照
+# ============================================================
+@dataclass
+class ScanSnapshot:
+    running: bool
+    stopped: bool                # 用户中途停止（结果不完整）
+    dirs_scanned: int
+    files: int
+    bytes: int
+    errors: int
+    seconds: float
+    current: str
+    top_files: List[Tuple[int, str]]
+    top_dirs: List[Tuple[int, str]]
+    by_ext: List[Tuple[str, int]]
+    by_group: List[Tuple[str, int]]
+    error: str = ""              # 扫描线程异常退出时的错误信息（结果不完整）
+
+
+# ============================================================
+#                           扫描器
+# ============================================================
+class DiskScanner:
+    def __init__(self, roots: Sequence[str], top_k: int = DEFAULT_TOP_K,
+                 workers: int = DEFAULT_WORKERS):
+        self.roots = normalize_roots(roots)
+        self.top_k = top_k
+        self.workers = max(1, workers)
+
+        self.seq = 0
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._files = _TopK(top_k)
+        self._dirs = _TopK(top_k)
+        self._by_ext: Dict[str, int] = {}
+        self._by_group: Dict[str, int] = {}
+        self._dirs_scanned = 0
+        self._file_count = 0
+        self._bytes = 0
+        self._errors = 0
+        self._current = ""
+        self._start = 0.0
+        self._elapsed = 0.0
+        self._error = ""
+
+    # --------------------------
+    #  生命周期
+    # --------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="DiskScanner", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # --------------------------
+    #  扫描
+    # --------------------------
+    def _run(self):
+        self._start = time.perf_counter()
+        try:
+            self._scan()
+        except Exception as e:
+            with self.lock:
+                self._error = f"{type(e).__name__}: {e}"
+        finally:
+            with self.lock:
+                self._elapsed = time.perf_counter() - self._start
+                self._current = ""
+                self.seq += 1
+
+    def _scan(self):
+        pending: Dict[str, _Pending] = {}
+        backlog: List[str] = []          # 已发现、尚未派发的目录（后进先出）
+        max_inflight = self.workers * INFLIGHT_PER_WORKER
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="DiskScan") as pool:
+            futures = {}
+
+            def submit():
+                while backlog and len(futures) < max_inflight:
+                    path = backlog.pop()
+                    futures[pool.submit(_list_dir, path, self.top_k)] = path
+
+            for root in reversed(self.roots):
+                if os.path.isdir(root):
+                    pending[root] = _Pending(parent=None, group=os.path.join(root, ROOT_FILES))
+                    backlog.append(root)
+            submit()
+
+            while futures and not self._stop.is_set():
+                done, _ = wait(futures, timeout=0.5, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    futures.pop(fut)
+                    listing = fut.result()
+                    node = pending[listing.path]
+                    for sub in listing.subdirs:
+                        if sub in pending:
+                            continue
+                        group = node.group if node.parent is not None else sub
+                        pending[sub] = _Pending(parent=listing.path, group=group)
+                        node.remaining += 1
+                        backlog.append(sub)
+                    self._merge(listing, node)
+                    self._finish(listing.path, pending)
+                submit()
+                with self.lock:
+                    self.seq += 1
+
+            for fut in futures:
+                fut.cancel()
+
+    def _merge(self, listing: _Listing, node: _Pending):
+        node.total += listing.bytes
+        with self.lock:
+            self._dirs_scanned += 1
+            self._file_count += listing.files
+            self._bytes += listing.bytes
+            self._errors += listing.error
+            self._current = listing.path
+            for size, path in listing.largest:
+                self._files.push(size, path)
+            for ext, size in listing.by_ext.items():
+                self._by_ext[ext] = self._by_ext.get(ext, 0) + size
+            if listing.bytes:
+                self._by_group[node.group] = self._by_group.get(node.group, 0) + listing.bytes
+
+    def _finish(self, path: str, pending: Dict[str, _Pending]):
+        """本目录列举完成：若子树也已全部完成，把递归大小逐级交给父目录"""
+        while path is not None:
+            node = pending[path]
+            node.remaining -= 1
+            if node.remaining:
+                return
+            del pending[path]
+            if node.parent is not None:
+                # 扫描根本身总是最大，不列入「最大目录」
+                with self.lock:
+                    self._dirs.push(node.total, path)
+                pending[node.parent].total += node.total
+            path = node.parent
+
+    # --------------------------
+    #  结果
+    # --------------------------
+    def snapshot(self, groups: int = MAX_GROUPS) -> ScanSnapshot:
+        with self.lock:
+            running = self.running
+            seconds = (time.perf_counter() - self._start) if running else self._elapsed
+            return ScanSnapshot(
+                running=running,
+                stopped=self._stop.is_set(),
+                dirs_scanned=self._dirs_scanned,
+                files=self._file_count,
+                bytes=self._bytes,
+                errors=self._errors,
+                seconds=seconds,
+                current=self._current,
+                top_files=self._files.items(),
+                top_dirs=self._dirs.items(),
+                by_ext=heapq.nlargest(groups, self._by_ext.items(), key=lambda kv: kv[1]),
+                by_group=heapq.nlargest(groups, self._by_group.items(), key=lambda kv: kv[1]),
+                error=self._error,
+            )
+
+
+def default_roots() -> List[str]:
+    """默认扫描系统盘（Windows 为 %SystemDrive%\\，其它系统为用户目录）"""
+    drive = os.getenv("SystemDrive")
+    return [drive + os.sep] if drive else [os.path.expanduser("~")]
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    from .cleaner import format_bytes
+
+    parser = argparse.ArgumentParser(prog="python -m modules.disk_scan",
+                                     description="查找占用空间最多的文件与目录")
+    parser.add_argument("roots", nargs="*")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args(argv)
+
+    scanner = DiskScanner(args.roots or default_roots(), top_k=args.top, workers=args.workers)
+    scanner.start()
+    scanner.join()
+    snap = scanner.snapshot(groups=args.top)
+    print(f"扫描 {snap.dirs_scanned} 个目录、{snap.files} 个文件，共 {format_bytes(snap.bytes)}，"
+          f"耗时 {snap.seconds:.2f}s（无法访问 {snap.errors} 个）")
+    if snap.error:
+        print(f"扫描中断：{snap.error}")
+    for title, rows in (("最大的文件", snap.top_files), ("最大的目录", snap.top_dirs)):
+        print(f"\n{title}：")
+        for size, path in rows:
+            print(f"  {format_bytes(size):>12}  {path}")
+    for title, rows in (("按扩展名", snap.by_ext), ("按一级文件夹", snap.by_group)):
+        print(f"\n{title}：")
+        for name, size in rows:
+            print(f"  {format_bytes(size):>12}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
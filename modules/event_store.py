@@ -0,0 +1,180 @@
+# modules/event_store.py
+"""
+事件日志的增量扫描状态：
+- 书签：每个通道（System、…）已见过的最大 EventRecordID，下次只查询之后的记录；
+  同时记下当时日志中最旧的记录号，用于判断日志是否被清空过
+- 本地滚动存储：历次扫描得到的事件 Finding，总数超过上限时丢弃最旧的
+
+两者都保存在数据目录 events\\ 下（bookmarks.json / findings.json）。
+重复诊断时只需查询上次之后的少量新事件，并可把它们标记为「新」。
+"""
+
+import datetime
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from .app_paths import data_dir
+from .findings import NEW_MARK, Finding
+
+STORE_DIR = "events"
+BOOKMARKS_FILE = "bookmarks.json"
+FINDINGS_FILE = "findings.json"
+MAX_STORED = 2000
+
+# Finding.extra 中使用的键
+RECORD_ID = "record_id"
+CHANNEL = "channel"
+
+
+def _write_json(path: str, data):
+    # 先写临时文件再替换，避免写到一半退出导致文件损坏
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+class EventStore:
+    def __init__(self, directory: Optional[str] = None, max_entries: int = MAX_STORED):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self._bookmarks: Optional[Dict[str, int]] = None
+        self._oldest: Dict[str, int] = {}
+        self._findings: Optional[List[Finding]] = None
+
+    def _dir(self) -> str:
+        if self.directory is None:
+            return data_dir(STORE_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+        return self.directory
+
+    def _load(self):
+        if self._bookmarks is not None:
+            return
+        d = self._dir()
+        raw = _read_json(os.path.join(d, BOOKMARKS_FILE), {})
+        self._bookmarks = {}
+        for k, v in (raw.items() if isinstance(raw, dict) else ()):
+            # 旧格式：{通道: 记录号}；新格式：{通道: {"record": 记录号, "oldest": 最旧记录号}}
+            try:
+                if isinstance(v, dict):
+                    self._bookmarks[str(k)] = int(v.get("record", 0))
+                    if v.get("oldest"):
+                        self._oldest[str(k)] = int(v["oldest"])
+                else:
+                    self._bookmarks[str(k)] = int(v)
+            except (TypeError, ValueError):
+                continue
+        findings = []
+        for item in _read_json(os.path.join(d, FINDINGS_FILE), []):
+            try:
+                findings.append(Finding.from_dict(item))
+            except (TypeError, ValueError):
+                continue
+        self._findings = findings
+
+    # --------------------------
+    #  书签
+    # --------------------------
+    def bookmark(self, channel: str) -> int:
+        with self.lock:
+            self._load()
+            return self._bookmarks.get(channel, 0)
+
+    def oldest(self, channel: str) -> int:
+        """上次扫描时日志中最旧的记录号（0 表示未知）"""
+        with self.lock:
+            self._load()
+            return self._oldest.get(channel, 0)
+
+    def set_oldest(self, channel: str, record: int):
+        with self.lock:
+            self._load()
+            self._oldest[channel] = record
+
+    def reset_bookmark(self, channel: str):
+        """日志被清空后记录号会从头开始：丢弃旧书签以及按旧记录号保存的事件"""
+        with self.lock:
+            self._load()
+            self._bookmarks.pop(channel, None)
+            self._oldest.pop(channel, None)
+            self._findings = [f for f in self._findings if f.extra.get(CHANNEL) != channel]
+
+    # --------------------------
+    #  合并
+    # --------------------------
+    def merge(self, channel: str, findings: List[Finding]) -> List[Finding]:
+        """
+        合并一次查询的结果，返回真正新增的事件（记录号大于书签且未存储过），
+        同时推进该通道的书签。新增事件带 NEW_MARK 标记，上一次的标记被清除。
+        """
+        with self.lock:
+            self._load()
+            mark = self._bookmarks.get(channel, 0)
+            for f in self._findings:
+                if f.extra.get(CHANNEL) == channel:
+                    f.extra.pop(NEW_MARK, None)
+            known = {f.extra.get(RECORD_ID) for f in self._findings
+                     if f.extra.get(CHANNEL) == channel}
+            new = []
+            for f in findings:
+                rid = f.extra.get(RECORD_ID)
+                if not isinstance(rid, int) or rid <= mark or rid in known:
+                    continue
+                f.extra[CHANNEL] = channel
+                f.extra[NEW_MARK] = True
+                known.add(rid)
+                new.append(f)
+            if new:
+                self._bookmarks[channel] = max(mark, max(f.extra[RECORD_ID] for f in new))
+                self._findings.extend(new)
+                if len(self._findings) > self.max_entries:
+                    self._findings.sort(key=lambda f: f.timestamp or datetime.datetime.min)
+                    del self._findings[:len(self._findings) - self.max_entries]
+            return new
+
+    def recent(self, channel: str, limit: Optional[int] = None) -> List[Finding]:
+        """某通道已存储的事件，新 → 旧"""
+        with self.lock:
+            self._load()
+            items = [f for f in self._findings if f.extra.get(CHANNEL) == channel]
+        items.sort(key=lambda f: f.extra.get(RECORD_ID, 0), reverse=True)
+        return items[:limit] if limit else items
+
+    def save(self):
+        with self.lock:
+            if self._bookmarks is None:
+                return
+            d = self._dir()
+            _write_json(os.path.join(d, BOOKMARKS_FILE), {
+                channel: {"record": self._bookmarks.get(channel, 0),
+                          "oldest": self._oldest.get(channel, 0)}
+                for channel in sorted(set(self._bookmarks) | set(self._oldest))})
+            # 「新」标记只对本次扫描有效，不写入文件
+            items = []
+            for f in self._findings:
+                data = f.to_dict()
+                data["extra"] = {k: v for k, v in data["extra"].items() if k != NEW_MARK}
+                items.append(data)
+            _write_json(os.path.join(d, FINDINGS_FILE), items)
+
+
+_store: Optional[EventStore] = None
+
+
+def get_store() -> EventStore:
+    global _store
+    if _store is None:
+        _store = EventStore()
+    return _store
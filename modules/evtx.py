@@ -0,0 +1,751 @@
+# modules/evtx.py
+"""
+纯 Python 的 .evtx 解析器（不依赖 wevtutil，可在 Linux 上离线分析用户发来的日志）：
+- mmap 映射文件，校验文件头（ElfFile）与每个 64KB 块头（ElfChnk）的 CRC32
+- 每个块独立解码（BinXML 模板、名称字符串都以块内偏移引用），用进程池并行处理
+- 先按记录头中的写入时间过滤，再只解码 EventID / Provider 两个替换值过滤，
+  命中的记录才完整渲染成 XML 并提取 EventData
+
+命令行用法：
+    python -m modules.evtx System.evtx --event-id 7000 --event-id 7034 --xml
+"""
+
+import datetime
+import mmap
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+FILE_SIGNATURE = b"ElfFile\x00"
+CHUNK_SIGNATURE = b"ElfChnk\x00"
+RECORD_SIGNATURE = b"**\x00\x00"
+
+FILE_HEADER_SIZE = 4096
+CHUNK_SIZE = 65536
+CHUNK_HEADER_SIZE = 512
+
+_FILETIME_EPOCH = datetime.datetime(1601, 1, 1)
+
+# 少于该块数时不启动进程池（进程启动开销大于解码本身）
+MIN_CHUNKS_FOR_POOL = 8
+
+
+class EvtxError(Exception):
+    pass
+
+
+# ============================================================
+#                         文件头 / 块头
+# ============================================================
+@dataclass
+class FileHeader:
+    first_chunk: int
+    last_chunk: int
+    next_record_id: int
+    major_version: int
+    minor_version: int
+    chunk_count: int
+    flags: int
+    checksum_ok: bool
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.flags & 0x1)
+
+
+def parse_file_header(data: bytes) -> FileHeader:
+    if len(data) < 128 or data[:8] != FILE_SIGNATURE:
+        raise EvtxError("不是有效的 .evtx 文件（文件头签名不匹配）")
+    first, last, next_id = struct.unpack_from("<QQQ", data, 8)
+    minor, major, _, chunk_count = struct.unpack_from("<HHHH", data, 36)
+    flags, checksum = struct.unpack_from("<II", data, 120)
+    return FileHeader(
+        first_chunk=first,
+        last_chunk=last,
+        next_record_id=next_id,
+        major_version=major,
+        minor_version=minor,
+        chunk_count=chunk_count,
+        flags=flags,
+        checksum_ok=zlib.crc32(data[:120]) == checksum,
+    )
+
+
+@dataclass
+class ChunkHeader:
+    first_record_id: int
+    last_record_id: int
+    free_space_offset: int
+    header_ok: bool
+    data_ok: bool
+
+
+def parse_chunk_header(chunk: bytes) -> Optional[ChunkHeader]:
+    """块签名不匹配（未使用的预分配块）时返回 None"""
+    if chunk[:8] != CHUNK_SIGNATURE:
+        return None
+    first_id, last_id = struct.unpack_from("<QQ", chunk, 24)
+    free_offset, data_crc = struct.unpack_from("<II", chunk, 48)
+    header_crc = struct.unpack_from("<I", chunk, 124)[0]
+    header_ok = zlib.crc32(chunk[128:CHUNK_HEADER_SIZE], zlib.crc32(chunk[:120])) == header_crc
+    free_offset = min(max(free_offset, CHUNK_HEADER_SIZE), CHUNK_SIZE)
+    data_ok = zlib.crc32(chunk[CHUNK_HEADER_SIZE:free_offset]) == data_crc
+    return ChunkHeader(first_id, last_id, free_offset, header_ok, data_ok)
+
+
+def _filetime(value: int) -> Optional[datetime.datetime]:
+    if value <= 0:
+        return None
+    try:
+        return _FILETIME_EPOCH + datetime.timedelta(microseconds=value // 10)
+    except OverflowError:
+        return None
+
+
+# ============================================================
+#                           过滤条件
+# ============================================================
+@dataclass(frozen=True)
+class EventFilter:
+    event_ids: Optional[FrozenSet[int]] = None
+    providers: Optional[FrozenSet[str]] = None       # 小写
+    since: Optional[datetime.datetime] = None        # UTC
+    until: Optional[datetime.datetime] = None
+
+    @classmethod
+    def build(cls, event_ids: Optional[Iterable[int]] = None,
+              providers: Optional[Iterable[str]] = None,
+              since: Optional[datetime.datetime] = None,
+              until: Optional[datetime.datetime] = None) -> "EventFilter":
+        return cls(
+            event_ids=frozenset(event_ids) if event_ids else None,
+            providers=frozenset(p.lower() for p in providers) if providers else None,
+            since=since,
+            until=until,
+        )
+
+    def time_ok(self, ts: Optional[datetime.datetime]) -> bool:
+        if ts is None:
+            return self.since is None and self.until is None
+        if self.since and ts < self.since:
+            return False
+        if self.until and ts > self.until:
+            return False
+        return True
+
+    def event_ok(self, event_id: Optional[int], provider: Optional[str]) -> bool:
+        if self.event_ids is not None and event_id not in self.event_ids:
+            return False
+        if self.providers is not None and (provider or "").lower() not in self.providers:
+            return False
+        return True
+
+
+# ============================================================
+#                           记录
+# ============================================================
+@dataclass
+class EvtxRecord:
+    record_id: int
+    written: Optional[datetime.datetime]             # 记录头中的写入时间（UTC）
+    event_id: Optional[int] = None
+    provider: Optional[str] = None
+    level: Optional[int] = None
+    channel: Optional[str] = None
+    computer: Optional[str] = None
+    time_created: Optional[datetime.datetime] = None
+    data: Dict[str, str] = field(default_factory=dict)
+    xml: str = ""
+
+    @property
+    def timestamp(self) -> Optional[datetime.datetime]:
+        return self.time_created or self.written
+
+
+# ============================================================
+#                         BinXML 结构
+# ============================================================
+class _BinXmlError(Exception):
+    pass
+
+
+@dataclass
+class _Subst:
+    index: int
+    vtype: int
+    optional: bool
+
+
+@dataclass
+class _Element:
+    name: str
+    attrs: List[Tuple[str, list]]
+    children: list
+
+
+@dataclass
+class _Instance:
+    """模板实例：模板树 + 本实例的替换值（值在需要时才解码）"""
+    tree: list
+    values: List[Tuple[int, int, int]]               # (类型, 块内偏移, 长度)
+
+
+# System 下需要的字段：(元素名, 属性名 / None 表示元素文本)
+_SYSTEM_FIELDS = {
+    "provider": ("Provider", "Name"),
+    "event_id": ("EventID", None),
+    "level": ("Level", None),
+    "time_created": ("TimeCreated", "SystemTime"),
+    "record_id": ("EventRecordID", None),
+    "channel": ("Channel", None),
+    "computer": ("Computer", None),
+}
+
+
+class _Chunk:
+    def __init__(self, buf: bytes):
+        self.buf = buf
+        self._names: Dict[int, str] = {}
+        self._templates: Dict[int, list] = {}
+        self._slots: Dict[int, Dict[str, list]] = {}
+
+    # --------------------------
+    #  基础读取
+    # --------------------------
+    def u16(self, p: int) -> int:
+        return struct.unpack_from("<H", self.buf, p)[0]
+
+    def u32(self, p: int) -> int:
+        return struct.unpack_from("<I", self.buf, p)[0]
+
+    def name(self, off: int) -> str:
+        s = self._names.get(off)
+        if s is None:
+            count = self.u16(off + 6)
+            s = self.buf[off + 8:off + 8 + count * 2].decode("utf-16-le", "replace")
+            self._names[off] = s
+        return s
+
+    def _skip_inline_name(self, p: int) -> int:
+        return p + 8 + self.u16(p + 6) * 2 + 2
+
+    # --------------------------
+    #  解析
+    # --------------------------
+    def parse_content(self, p: int) -> Tuple[list, int]:
+        """解析到 EndElement / EndOfStream 为止，返回 (子节点列表, 结束位置)"""
+        items: list = []
+        buf = self.buf
+        while True:
+            tok = buf[p]
+            base = tok & 0xBF
+            if base == 0x00 or base == 0x04:
+                return items, p + 1
+            if base == 0x01:
+                el, p = self.parse_element(p)
+                items.append(el)
+            elif base == 0x0F:
+                p += 4
+            elif base == 0x0C:
+                inst, p = self.parse_instance(p)
+                items.append(inst)
+            else:
+                value, p = self.parse_value(p)
+                if value is None:
+                    raise _BinXmlError(f"未知 BinXML 标记 0x{tok:02X}")
+                items.append(value)
+
+    def parse_value(self, p: int):
+        """解析文本类节点；不是文本类节点时返回 (None, p)"""
+        tok = self.buf[p]
+        base = tok & 0xBF
+        if base == 0x05:
+            vtype = self.buf[p + 1]
+            if vtype != 0x01:
+                raise _BinXmlError(f"不支持的文本值类型 0x{vtype:02X}")
+            count = self.u16(p + 2)
+            text = self.buf[p + 4:p + 4 + count * 2].decode("utf-16-le", "replace")
+            return text, p + 4 + count * 2
+        if base in (0x0D, 0x0E):
+            return _Subst(self.u16(p + 1), self.buf[p + 3], base == 0x0E), p + 4
+        if base == 0x07:
+            count = self.u16(p + 1)
+            return self.buf[p + 3:p + 3 + count * 2].decode("utf-16-le", "replace"), \
+                p + 3 + count * 2
+        if base == 0x08:
+            return chr(self.u16(p + 1)), p + 3
+        if base == 0x09:
+            off = self.u32(p + 1)
+            q = p + 5
+            if off == q:
+                q = self._skip_inline_name(q)
+            return f"&{self.name(off)};", q
+        if base in (0x0A, 0x0B):
+            # 处理指令，日志中基本不会出现；按结构跳过
+            if base == 0x0A:
+                off = self.u32(p + 1)
+                q = p + 5
+                return "", self._skip_inline_name(q) if off == q else q
+            count = self.u16(p + 1)
+            return "", p + 3 + count * 2
+        return None, p
+
+    def parse_element(self, p: int) -> Tuple[_Element, int]:
+        tok = self.buf[p]
+        has_attrs = bool(tok & 0x40)
+        name_off = self.u32(p + 7)
+        q = p + 11
+        if name_off == q:
+            q = self._skip_inline_name(q)
+        if has_attrs:
+            q += 4                                    # 属性列表长度
+            if name_off == q:
+                q = self._skip_inline_name(q)
+
+        attrs = []
+        while self.buf[q] & 0xBF == 0x06:
+            aoff = self.u32(q + 1)
+            q += 5
+            if aoff == q:
+                q = self._skip_inline_name(q)
+            values = []
+            while True:
+                value, q2 = self.parse_value(q)
+                if value is None:
+                    break
+                values.append(value)
+                q = q2
+            attrs.append((self.name(aoff), values))
+
+        end = self.buf[q] & 0xBF
+        if end == 0x03:
+            return _Element(self.name(name_off), attrs, []), q + 1
+        if end != 0x02:
+            raise _BinXmlError(f"元素 {self.name(name_off)} 缺少结束标记")
+        children, q = self.parse_content(q + 1)
+        return _Element(self.name(name_off), attrs, children), q
+
+    def parse_root(self, p: int) -> Optional[_Instance]:
+        """记录（或嵌套 BinXML 值）的根：可选的片段头 + 模板实例 + 替换值数组"""
+        if self.buf[p] == 0x0F:
+            p += 4
+        if self.buf[p] & 0xBF != 0x0C:
+            return None
+        inst, _ = self.parse_instance(p)
+        return inst
+
+    def template(self, def_off: int) -> list:
+        tree = self._templates.get(def_off)
+        if tree is None:
+            data_len = self.u32(def_off + 20)
+            start = def_off + 24
+            tree, _ = self.parse_content(start)
+            if not tree and data_len:
+                raise _BinXmlError("空模板")
+            self._templates[def_off] = tree
+        return tree
+
+    def parse_instance(self, p: int) -> Tuple[_Instance, int]:
+        def_off = self.u32(p + 6)
+        q = p + 10
+        if def_off == q:
+            # 模板定义紧跟在实例之后（块内第一次使用该模板）
+            tree = self.template(def_off)
+            q += 24 + self.u32(q + 20)
+        else:
+            tree = self.template(def_off)
+
+        count = self.u32(q)
+        q += 4
+        desc = []
+        for _ in range(count):
+            desc.append((self.u16(q), self.buf[q + 2]))
+            q += 4
+        values = []
+        for size, vtype in desc:
+            values.append((vtype, q, size))
+            q += size
+        return _Instance(tree, values), q
+
+    # --------------------------
+    #  字段定位（每个模板只做一次）
+    # --------------------------
+    def slots(self, inst: _Instance) -> Dict[str, list]:
+        key = id(inst.tree)
+        found = self._slots.get(key)
+        if found is None:
+            found = {}
+            system = _find_child(_find_child(inst.tree, "Event"), "System")
+            if system is not None:
+                for field_name, (el_name, attr) in _SYSTEM_FIELDS.items():
+                    el = _find_child(system.children, el_name)
+                    if el is None:
+                        continue
+                    if attr is None:
+                        found[field_name] = el.children
+                    else:
+                        for aname, avalues in el.attrs:
+                            if aname == attr:
+                                found[field_name] = avalues
+            self._slots[key] = found
+        return found
+
+    # --------------------------
+    #  值解码与渲染
+    # --------------------------
+    def decode(self, vtype: int, off: int, size: int):
+        return _decode_value(self, vtype, off, size)
+
+    def text_of(self, items: list, inst: Optional[_Instance]) -> str:
+        parts = []
+        for it in items:
+            if isinstance(it, str):
+                parts.append(it)
+            elif isinstance(it, _Subst) and inst is not None:
+                if it.index < len(inst.values):
+                    v = self.decode(*inst.values[it.index])
+                    if v is not None and not isinstance(v, (_Instance, list)):
+                        parts.append(str(v))
+        return "".join(parts)
+
+    def render(self, items: list, inst: Optional[_Instance], out: List[str]):
+        for it in items:
+            if isinstance(it, str):
+                out.append(escape(it))
+            elif isinstance(it, _Element):
+                out.append(f"<{it.name}")
+                for aname, avalues in it.attrs:
+                    if inst is not None and _all_null(avalues, inst, self):
+                        continue
+                    out.append(f" {aname}={quoteattr(self.text_of(avalues, inst))}")
+                if it.children:
+                    out.append(">")
+                    self.render(it.children, inst, out)
+                    out.append(f"</{it.name}>")
+                else:
+                    out.append("/>")
+            elif isinstance(it, _Subst):
+                if inst is None or it.index >= len(inst.values):
+                    continue
+                v = self.decode(*inst.values[it.index])
+                if isinstance(v, _Instance):
+                    self.render(v.tree, v, out)
+                elif isinstance(v, list):
+                    self.render(v, None, out)
+                elif v is not None:
+                    out.append(escape(str(v)))
+            elif isinstance(it, _Instance):
+                self.render(it.tree, it, out)
+
+    def event_data(self, inst: _Instance) -> Dict[str, str]:
+        """EventData/Data[@Name] → 文本；无名称的 Data 以序号命名"""
+        event = _find_child(inst.tree, "Event")
+        data_el = _find_child(event.children, "EventData") if event is not None else None
+        result: Dict[str, str] = {}
+        if data_el is None:
+            return result
+        for i, child in enumerate(c for c in data_el.children if isinstance(c, _Element)):
+            name = None
+            for aname, avalues in child.attrs:
+                if aname == "Name":
+                    name = self.text_of(avalues, inst)
+            result[name or f"Data{i}"] = self.text_of(child.children, inst)
+        return result
+
+
+def _find_child(items, name: str):
+    if items is None:
+        return None
+    if isinstance(items, _Element):
+        items = items.children
+    for it in items:
+        if isinstance(it, _Element) and it.name == name:
+            return it
+    return None
+
+
+def _all_null(values: list, inst: _Instance, chunk: _Chunk) -> bool:
+    """可选替换值为空时，对应属性不输出"""
+    subs = [v for v in values if isinstance(v, _Subst)]
+    if not subs or len(subs) != len(values):
+        return False
+    for s in subs:
+        if not s.optional:
+            return False
+        if s.index < len(inst.values):
+            vtype, _, size = inst.values[s.index]
+            if vtype != 0x00 and size:
+                return False
+    return True
+
+
+_INT_FORMATS = {
+    0x03: "<b", 0x04: "<B", 0x05: "<h", 0x06: "<H", 0x07: "<i", 0x08: "<I",
+    0x09: "<q", 0x0A: "<Q", 0x0B: "<f", 0x0C: "<d",
+}
+
+
+def _guid(b: bytes) -> str:
+    d1, d2, d3 = struct.unpack_from("<IHH", b, 0)
+    return "{%08X-%04X-%04X-%s-%s}" % (d1, d2, d3, b[8:10].hex().upper(), b[10:16].hex().upper())
+
+
+def _sid(b: bytes) -> str:
+    rev, count = b[0], b[1]
+    auth = int.from_bytes(b[2:8], "big")
+    subs = struct.unpack_from(f"<{count}I", b, 8)
+    return "S-%d-%d" % (rev, auth) + "".join(f"-{s}" for s in subs)
+
+
+def _systemtime(b: bytes) -> str:
+    y, mo, _, d, h, mi, s, ms = struct.unpack_from("<8H", b, 0)
+    return f"{y:04d}-{mo:02d}-{d:02d}T{h:02d}:{mi:02d}:{s:02d}.{ms:03d}Z"
+
+
+def _decode_value(chunk: _Chunk, vtype: int, off: int, size: int):
+    buf = chunk.buf
+    raw = buf[off:off + size]
+    if vtype == 0x00 or size == 0 and vtype != 0x01:
+        return None
+    if vtype == 0x01:
+        return raw.decode("utf-16-le", "replace").rstrip("\x00")
+    if vtype == 0x02:
+        return raw.decode("latin-1").rstrip("\x00")
+    fmt = _INT_FORMATS.get(vtype)
+    if fmt:
+        return struct.unpack_from(fmt, raw, 0)[0]
+    if vtype == 0x0D:
+        return "true" if struct.unpack_from("<I", raw, 0)[0] else "false"
+    if vtype == 0x0E:
+        return raw.hex().upper()
+    if vtype == 0x0F:
+        return _guid(raw)
+    if vtype == 0x10:
+        return "0x%x" % int.from_bytes(raw, "little")
+    if vtype == 0x11:
+        ts = _filetime(struct.unpack_from("<Q", raw, 0)[0])
+        return ts.isoformat() + "Z" if ts else None
+    if vtype == 0x12:
+        return _systemtime(raw)
+    if vtype == 0x13:
+        return _sid(raw)
+    if vtype == 0x14:
+        return "0x%08x" % struct.unpack_from("<I", raw, 0)[0]
+    if vtype == 0x15:
+        return "0x%016x" % struct.unpack_from("<Q", raw, 0)[0]
+    if vtype == 0x21:
+        inst = chunk.parse_root(off)
+        if inst is not None:
+            return inst
+        items, _ = chunk.parse_content(off)
+        return items
+    if vtype == 0x81:
+        return ", ".join(s for s in raw.decode("utf-16-le", "replace").split("\x00") if s)
+    if vtype & 0x80:
+        fmt = _INT_FORMATS.get(vtype & 0x7F)
+        if fmt:
+            width = struct.calcsize(fmt)
+            return ", ".join(str(v[0]) for v in struct.iter_unpack(fmt, raw[:size - size % width]))
+    return raw.hex().upper()
+
+
+def _parse_time(text: Optional[str]) -> Optional[datetime.datetime]:
+    if not text:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(text.rstrip("Z")[:26])
+    except ValueError:
+        return None
+
+
+# ============================================================
+#                           块解码
+# ============================================================
+@dataclass
+class ChunkResult:
+    index: int
+    records: List[EvtxRecord]
+    total: int = 0
+    bad: int = 0
+    header_ok: bool = True
+    data_ok: bool = True
+    empty: bool = False
+
+
+def decode_chunk(data: bytes, index: int, flt: EventFilter,
+                 render_xml: bool = False) -> ChunkResult:
+    header = parse_chunk_header(data)
+    if header is None:
+        return ChunkResult(index, [], empty=True)
+    result = ChunkResult(index, [], header_ok=header.header_ok, data_ok=header.data_ok)
+    chunk = _Chunk(data)
+
+    p = CHUNK_HEADER_SIZE
+    end = header.free_space_offset
+    while p + 28 <= end and data[p:p + 4] == RECORD_SIGNATURE:
+        size = chunk.u32(p + 4)
+        if size < 28 or p + size > CHUNK_SIZE:
+            result.bad += 1
+            break
+        result.total += 1
+        record_id, written_raw = struct.unpack_from("<QQ", data, p + 8)
+        written = _filetime(written_raw)
+        rec_start, p = p, p + size
+
+        # 第一层过滤：记录头中的写入时间，不解析 BinXML
+        if not flt.time_ok(written):
+            continue
+        try:
+            inst = chunk.parse_root(rec_start + 24)
+            if inst is None:
+                result.bad += 1
+                continue
+
+            # 第二层过滤：只解码 EventID / Provider 两个值
+            slots = chunk.slots(inst)
+            eid_text = chunk.text_of(slots.get("event_id", []), inst)
+            event_id = int(eid_text) if eid_text.strip().isdigit() else None
+            provider = chunk.text_of(slots.get("provider", []), inst) or None
+            if not flt.event_ok(event_id, provider):
+                continue
+
+            level_text = chunk.text_of(slots.get("level", []), inst)
+            rec = EvtxRecord(
+                record_id=record_id,
+                written=written,
+                event_id=event_id,
+                provider=provider,
+                level=int(level_text) if level_text.strip().isdigit() else None,
+                channel=chunk.text_of(slots.get("channel", []), inst) or None,
+                computer=chunk.text_of(slots.get("computer", []), inst) or None,
+                time_created=_parse_time(chunk.text_of(slots.get("time_created", []), inst)),
+                data=chunk.event_data(inst),
+            )
+            if render_xml:
+                out: List[str] = []
+                chunk.render(inst.tree, inst, out)
+                rec.xml = "".join(out)
+            result.records.append(rec)
+        except (_BinXmlError, struct.error, IndexError, ValueError, RecursionError):
+            result.bad += 1
+    return result
+
+
+# 进程池工作进程中的状态：(映射的文件, 过滤条件, 是否渲染 XML)，由 _init_worker 设置
+_worker_state: Optional[Tuple[mmap.mmap, EventFilter, bool]] = None
+
+
+def _init_worker(path: str, flt: EventFilter, render_xml: bool):
+    """进程池初始化：每个工作进程只打开并映射一次文件，之后按块号解码"""
+    global _worker_state
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)   # 映射持有自己的句柄
+    _worker_state = (mm, flt, render_xml)
+
+
+def _decode_chunk_in_worker(index: int) -> ChunkResult:
+    """进程池中的工作函数：只传回命中的记录"""
+    mm, flt, render_xml = _worker_state
+    start = FILE_HEADER_SIZE + index * CHUNK_SIZE
+    return decode_chunk(mm[start:start + CHUNK_SIZE], index, flt, render_xml)
+
+
+# ============================================================
+#                           文件读取
+# ============================================================
+@dataclass
+class EvtxScan:
+    path: str
+    header: FileHeader
+    records: List[EvtxRecord]
+    chunks: int = 0
+    records_total: int = 0
+    bad_records: int = 0
+    bad_chunks: List[int] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def read_evtx(path: str, flt: Optional[EventFilter] = None, render_xml: bool = False,
+              workers: Optional[int] = None) -> EvtxScan:
+    """
+    解析整个 .evtx 文件。
+    workers=None 时按 CPU 数使用进程池；workers<=1 或块数较少时在当前进程内解码。
+    """
+    flt = flt or EventFilter()
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < FILE_HEADER_SIZE:
+            raise EvtxError("文件过小，不是有效的 .evtx 文件")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header = parse_file_header(mm[:FILE_HEADER_SIZE])
+            # 文件头里的块数在日志未正常关闭时可能过期，以文件大小为准
+            count = (size - FILE_HEADER_SIZE) // CHUNK_SIZE
+
+            if workers is None:
+                workers = os.cpu_count() or 1
+            if workers <= 1 or count < MIN_CHUNKS_FOR_POOL:
+                results = [
+                    decode_chunk(mm[FILE_HEADER_SIZE + i * CHUNK_SIZE:
+                                    FILE_HEADER_SIZE + (i + 1) * CHUNK_SIZE], i, flt, render_xml)
+                    for i in range(count)
+                ]
+            else:
+                results = None
+
+    if results is None:
+        with ProcessPoolExecutor(max_workers=min(workers, count), initializer=_init_worker,
+                                 initargs=(path, flt, render_xml)) as pool:
+            results = list(pool.map(_decode_chunk_in_worker, range(count),
+                                    chunksize=max(1, count // (workers * 4))))
+
+    scan = EvtxScan(path=path, header=header, records=[])
+    for r in results:
+        if r.empty:
+            continue
+        scan.chunks += 1
+        scan.records_total += r.total
+        scan.bad_records += r.bad
+        if not (r.header_ok and r.data_ok):
+            scan.bad_chunks.append(r.index)
+        scan.records.extend(r.records)
+    scan.records.sort(key=lambda r: r.record_id)
+    scan.seconds = time.perf_counter() - start
+    return scan
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m modules.evtx",
+                                     description="离线解析 .evtx 事件日志")
+    parser.add_argument("path")
+    parser.add_argument("--event-id", type=int, action="append", dest="event_ids")
+    parser.add_argument("--provider", action="append", dest="providers")
+    parser.add_argument("--since", help="UTC 时间，如 2024-05-01T00:00:00")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--xml", action="store_true", help="输出完整 XML")
+    args = parser.parse_args(argv)
+
+    flt = EventFilter.build(args.event_ids, args.providers,
+                            datetime.datetime.fromisoformat(args.since) if args.since else None)
+    scan = read_evtx(args.path, flt, render_xml=args.xml, workers=args.workers)
+    for rec in scan.records:
+        if args.xml:
+            print(rec.xml)
+        else:
+            print(f"{rec.record_id:>8}  {rec.timestamp}  EventID {rec.event_id}  {rec.provider}  "
+                  + "; ".join(f"{k}={v}" for k, v in rec.data.items()))
+    print(f"\n{scan.chunks} 个块，{scan.records_total} 条记录，命中 {len(scan.records)} 条，"
+          f"损坏记录 {scan.bad_records}，校验失败的块 {len(scan.bad_chunks)}，"
+          f"耗时 {scan.seconds:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+# modules/findings.py
+"""
+结构化诊断结果（Finding）：
+所有扫描器（setupapi / 事件日志 / WER / LiveKernel / 进程分析……）统一输出 Finding 列表，
+再由 render_text 组合成右侧说明区显示的文本报告。
+
+fingerprint 只由「是什么问题」决定（来源、事件 ID、设备、模块、标题），
+不包含时间，同一问题多次出现时指纹相同，便于去重和前后对比：
+- 标题先规范化：去掉其中的日期、时间、数字与十六进制片段（setupapi 行内的时间戳、
+  进程排名与占用率等），统一小写并合并空白
+- 事件日志结果再加上消息模板（规范化后的详情），同一 EventID 的不同问题
+  （例如不同服务启动失败）指纹不同，同一问题的多次出现指纹相同
+"""
+
+import datetime
+import hashlib
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# 严重程度
+NOTE = "note"          # 扫描状态说明（未找到文件、未发现异常等）
+INFO = "info"
+WARNING = "warning"
+ERROR = "error"
+
+SEVERITY_ORDER = {ERROR: 0, WARNING: 1, INFO: 2, NOTE: 3}
+
+SEVERITY_LABELS = {ERROR: "错误", WARNING: "警告", INFO: "信息", NOTE: ""}
+
+# Finding.extra 中的键：本次扫描新出现的结果，渲染时加「新」标记
+NEW_MARK = "new"
+
+# 指纹中忽略的可变部分：含数字的十进制 / 十六进制片段（时间、记录号、实例 ID、百分比……）
+_VARIABLE_RE = re.compile(r"\b(?:0x)?[0-9a-f]*\d[0-9a-f]*\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """把文本变成「模板」：可变片段替换为 #，小写并合并空白"""
+    text = _VARIABLE_RE.sub("#", (text or "").lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+@dataclass
+class Finding:
+    source: str                                   # 扫描来源，如 "setupapi"、"System.evtx"
+    severity: str
+    title: str
+    detail: str = ""
+    timestamp: Optional[datetime.datetime] = None
+    vid: Optional[str] = None
+    pid: Optional[str] = None
+    event_id: Optional[int] = None
+    module: Optional[str] = None                  # 相关驱动 / 进程 / 模块名
+    extra: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def fingerprint(self) -> str:
+        parts = [self.source, self.event_id, (self.vid or "").upper(), (self.pid or "").upper(),
+                 (self.module or "").lower(), normalize_text(self.title)]
+        if self.event_id is not None:
+            parts.append(normalize_text(self.detail))
+        key = "|".join(str(x or "") for x in parts)
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def device(self) -> Optional[str]:
+        if self.vid and self.pid:
+            return f"VID_{self.vid}&PID_{self.pid}"
+        return None
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["timestamp"] = self.timestamp.isoformat() if self.timestamp else None
+        d["fingerprint"] = self.fingerprint
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Finding":
+        d = dict(d)
+        d.pop("fingerprint", None)
+        ts = d.get("timestamp")
+        d["timestamp"] = datetime.datetime.fromisoformat(ts) if ts else None
+        return cls(**d)
+
+
+def note(source: str, text: str) -> Finding:
+    return Finding(source=source, severity=NOTE, title=text)
+
+
+def sort_findings(findings: Iterable[Finding]) -> List[Finding]:
+    """按严重程度、时间（新 → 旧）排序"""
+    return sorted(
+        findings,
+        key=lambda f: (SEVERITY_ORDER.get(f.severity, 9),
+                       -(f.timestamp.timestamp() if f.timestamp else 0)),
+    )
+
+
+def render_finding(f: Finding) -> str:
+    label = SEVERITY_LABELS.get(f.severity, "")
+    head = f"[{label}] {f.title}" if label else f.title
+    if f.extra.get(NEW_MARK):
+        head = f"【新】{head}"
+    if f.timestamp:
+        head = f"{f.timestamp:%Y-%m-%d %H:%M:%S}  {head}"
+    if not f.detail:
+        return head
+    return head + "\n" + "\n".join(f"    {line}" for line in f.detail.splitlines())
+
+
+def render_section(header: str, findings: List[Finding]) -> str:
+    """一个扫描器的输出：只有状态说明时不加标题，与原文本报告保持一致"""
+    if findings and all(f.severity == NOTE for f in findings):
+        return "\n".join(f.title for f in findings)
+    return "\n".join([header] + [render_finding(f) for f in findings])
+
+
+def render_text(sections: List[tuple]) -> str:
+    """sections：[(标题, [Finding, ...]), ...]"""
+    output = []
+    for header, findings in sections:
+        output.append(render_section(header, findings))
+        output.append("\n" + "=" * 60 + "\n")
+    return "\n".join(output)
@@ -0,0 +1,428 @@
+# modules/fleet.py
+"""
+多台电脑的诊断报告汇总（离线工具，不需要图形界面）：
+- 每台电脑在「诊断工具」中导出最近一次诊断的报告（JSON，export_report）
+- 用命令行把收集到的报告批量导入 SQLite（分批事务，重复文件按内容哈希跳过）
+- findings 明细表按 机器、时间、VID/PID、EventID、模块 建索引；
+  导入时同时按天累加到 rollup 汇总表，百万级结果的跨机器统计查询也只需毫秒级
+- 同一台机器的多份报告常包含相同的事件（每次诊断都会读到最近的日志）：
+  明细表按 (机器, 指纹, 时间) 去重，只有真正新增的结果才计入汇总表
+
+用法：
+    python -m modules.fleet ingest fleet.db reports\\            # 导入目录下所有 .json
+    python -m modules.fleet top-devices fleet.db --days 7       # 近 7 天出错最多的设备
+    python -m modules.fleet module fleet.db nvlddmkm            # 出现 nvlddmkm 问题的机器
+    python -m modules.fleet top-events fleet.db --days 30 --json out.json
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import platform
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from .findings import NOTE
+from .run_history import EXCLUDED_SOURCES
+
+REPORT_FORMAT = "gamertool-report"
+REPORT_VERSION = 1
+
+BATCH_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS machines (
+    id      INTEGER PRIMARY KEY,
+    name    TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS reports (
+    id          INTEGER PRIMARY KEY,
+    machine_id  INTEGER NOT NULL REFERENCES machines(id),
+    created     TEXT,
+    sha256      TEXT NOT NULL UNIQUE,
+    path        TEXT
+);
+CREATE TABLE IF NOT EXISTS findings (
+    id          INTEGER PRIMARY KEY,
+    report_id   INTEGER NOT NULL REFERENCES reports(id),
+    machine_id  INTEGER NOT NULL REFERENCES machines(id),
+    ts          TEXT,
+    source      TEXT,
+    severity    TEXT,
+    title       TEXT,
+    vid         TEXT,
+    pid         TEXT,
+    event_id    INTEGER,
+    module      TEXT COLLATE NOCASE,
+    fingerprint TEXT,
+    detail      TEXT
+);
+-- 按天汇总的计数：跨机器的统计查询只扫描这张小表
+CREATE TABLE IF NOT EXISTS rollup (
+    day         TEXT NOT NULL,
+    machine_id  INTEGER NOT NULL,
+    vid         TEXT NOT NULL,
+    pid         TEXT NOT NULL,
+    event_id    INTEGER NOT NULL,
+    module      TEXT NOT NULL COLLATE NOCASE,
+    severity    TEXT NOT NULL,
+    n           INTEGER NOT NULL,
+    last_ts     TEXT,
+    PRIMARY KEY (day, machine_id, vid, pid, event_id, module, severity)
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_module ON rollup(module, day);
+-- 去重：同一机器、同一指纹、同一时间的结果只保留一条（批量导入时也保留）
+CREATE UNIQUE INDEX IF NOT EXISTS idx_findings_unique
+    ON findings(machine_id, fingerprint, ifnull(ts, ''));
+"""
+
+# 明细表索引：首次批量导入时先删除，导入完成后再建立
+_INDEX_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_findings_machine ON findings(machine_id, ts);
+CREATE INDEX IF NOT EXISTS idx_findings_ts ON findings(ts);
+CREATE INDEX IF NOT EXISTS idx_findings_device ON findings(vid, pid, ts);
+CREATE INDEX IF NOT EXISTS idx_findings_event ON findings(event_id, ts);
+CREATE INDEX IF NOT EXISTS idx_findings_module ON findings(module, ts);
+"""
+
+_INDEXES = ("idx_findings_machine", "idx_findings_ts", "idx_findings_device",
+            "idx_findings_event", "idx_findings_module")
+
+
+# ============================================================
+#                      导出（单台电脑）
+# ============================================================
+def export_report(sections: List[tuple], path: str, machine: Optional[str] = None,
+                  created: Optional[datetime.datetime] = None) -> int:
+    """把一次诊断结果导出为 JSON，返回导出的结果条数（不含状态说明与派生的时间线）"""
+    findings = []
+    for header, items in sections:
+        for f in items:
+            if f.severity == NOTE or f.source in EXCLUDED_SOURCES:
+                continue
+            d = f.to_dict()
+            d["section"] = header
+            findings.append(d)
+    data = {
+        "format": REPORT_FORMAT,
+        "version": REPORT_VERSION,
+        "machine": machine or platform.node() or "unknown",
+        "created": (created or datetime.datetime.now()).isoformat(timespec="seconds"),
+        "findings": findings,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    return len(findings)
+
+
+# ============================================================
+#                          存储
+# ============================================================
+@dataclass
+class IngestStats:
+    files: int = 0
+    skipped: int = 0                              # 已导入过（内容哈希相同）
+    invalid: int = 0
+    findings: int = 0
+    duplicates: int = 0                           # 其它报告中已导入过的结果
+    seconds: float = 0.0
+
+    def describe(self) -> str:
+        rate = self.findings / self.seconds if self.seconds else 0
+        return (f"导入 {self.files} 个报告、{self.findings} 条结果（{rate:,.0f} 条/s），"
+                f"重复结果 {self.duplicates} 条，跳过重复报告 {self.skipped} 个，"
+                f"无效 {self.invalid} 个，耗时 {self.seconds:.2f}s")
+
+
+def _iter_report_files(paths: Sequence[str]) -> Iterator[str]:
+    for p in paths:
+        if os.path.isdir(p):
+            for root, _, files in os.walk(p):
+                for name in sorted(files):
+                    if name.lower().endswith(".json"):
+                        yield os.path.join(root, name)
+        else:
+            yield p
+
+
+def _ts(value) -> Optional[str]:
+    # 统一成「YYYY-MM-DDTHH:MM:SS」，保证按字符串比较即按时间比较
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(str(value)).isoformat(timespec="seconds")
+    except ValueError:
+        return None
+
+
+def _fallback_fingerprint(d: dict) -> str:
+    # 旧版报告可能没有指纹：用来源、标题与详情代替，保证去重键不为 NULL
+    text = "\x1f".join(str(d.get(k) or "") for k in ("source", "title", "detail"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class FleetStore:
+    def __init__(self, path: str):
+        self.path = path
+        # 自动提交模式：事务由 ingest 显式控制
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.executescript(_INDEX_SCHEMA)
+        self._machines: Dict[str, int] = dict(
+            (name, mid) for mid, name in self.conn.execute("SELECT id, name FROM machines"))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _machine_id(self, name: str) -> int:
+        mid = self._machines.get(name)
+        if mid is None:
+            mid = self.conn.execute("INSERT INTO machines(name) VALUES (?)", (name,)).lastrowid
+            self._machines[name] = mid
+        return mid
+
+    def _drop_indexes(self):
+        for name in _INDEXES:
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def ingest(self, paths: Sequence[str], logger=None) -> IngestStats:
+        """
+        批量导入报告文件（或目录）。
+        - 内容哈希已存在的文件直接跳过（不解析 JSON）
+        - 按报告边界、每累计 BATCH_SIZE 条结果提交一次事务
+        - 已存在的结果（同一机器、指纹与时间）被忽略；每批插入后只把新插入的行
+          按 (日期, 机器, 设备, EventID, 模块, 严重程度) 累加到 rollup 汇总表
+        - 向空库首次导入时先删除明细索引、导入后再统一建立，比逐行维护索引快得多
+        """
+        stats = IngestStats()
+        start = time.perf_counter()
+        conn = self.conn
+        insert = ("INSERT OR IGNORE INTO findings(report_id, machine_id, ts, source, severity, title, "
+                  "vid, pid, event_id, module, fingerprint, detail) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+        # findings.id 单调递增：id 大于插入前最大值的行就是本批真正插入的行
+        # 汇总表的键不能为 NULL（NULL 在唯一约束中互不相等），统一用空值代替
+        upsert = ("INSERT INTO rollup(day, machine_id, vid, pid, event_id, module, severity, n, last_ts) "
+                  "SELECT ifnull(substr(ts, 1, 10), ''), machine_id, ifnull(vid, ''), ifnull(pid, ''), "
+                  "ifnull(event_id, 0), lower(ifnull(module, '')), ifnull(severity, ''), "
+                  "COUNT(*), ifnull(MAX(ts), '') FROM findings WHERE id > ? "
+                  "GROUP BY 1, 2, 3, 4, 5, 6, 7 "
+                  "ON CONFLICT(day, machine_id, vid, pid, event_id, module, severity) DO UPDATE SET "
+                  "n = n + excluded.n, last_ts = max(last_ts, excluded.last_ts)")
+
+        bulk = conn.execute("SELECT 1 FROM findings LIMIT 1").fetchone() is None
+        if bulk:
+            self._drop_indexes()
+
+        rows: List[tuple] = []
+
+        def flush():
+            last_id = conn.execute("SELECT ifnull(MAX(id), 0) FROM findings").fetchone()[0]
+            changes = conn.total_changes
+            conn.executemany(insert, rows)
+            added = conn.total_changes - changes
+            conn.execute(upsert, (last_id,))
+            stats.findings += added
+            stats.duplicates += len(rows) - added
+            rows.clear()
+
+        conn.execute("BEGIN")
+        try:
+            for path in _iter_report_files(paths):
+                try:
+                    with open(path, "rb") as f:
+                        raw = f.read()
+                except OSError:
+                    stats.invalid += 1
+                    continue
+                digest = hashlib.sha256(raw).hexdigest()
+                if conn.execute("SELECT 1 FROM reports WHERE sha256 = ?", (digest,)).fetchone():
+                    stats.skipped += 1
+                    continue
+                try:
+                    data = json.loads(raw.decode("utf-8"))
+                    if data.get("format") != REPORT_FORMAT:
+                        raise ValueError("format")
+                except ValueError:
+                    stats.invalid += 1
+                    continue
+
+                mid = self._machine_id(str(data.get("machine") or "unknown"))
+                rid = conn.execute(
+                    "INSERT INTO reports(machine_id, created, sha256, path) VALUES (?, ?, ?, ?)",
+                    (mid, _ts(data.get("created")), digest, path)).lastrowid
+                for d in data.get("findings", []):
+                    vid = (d.get("vid") or "").upper()
+                    pid = (d.get("pid") or "").upper()
+                    rows.append((rid, mid, _ts(d.get("timestamp")), d.get("source"),
+                                 d.get("severity"), d.get("title"), vid or None, pid or None,
+                                 d.get("event_id"), d.get("module"),
+                                 d.get("fingerprint") or _fallback_fingerprint(d),
+                                 d.get("detail")))
+                stats.files += 1
+                if len(rows) >= BATCH_SIZE:
+                    flush()
+                    conn.execute("COMMIT")
+                    conn.execute("BEGIN")
+                    if logger:
+                        logger(f"  已导入 {stats.files} 个报告、{stats.findings} 条结果……")
+            if rows:
+                flush()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            if bulk:
+                if logger:
+                    logger("  正在建立索引……")
+                conn.executescript(_INDEX_SCHEMA)
+        if bulk and stats.files:
+            conn.execute("ANALYZE")
+        elif stats.files:
+            # 增量导入只在统计信息明显过期时才重新分析
+            conn.execute("PRAGMA optimize")
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    # --------------------------
+    #  查询（统计走 rollup 汇总表，明细走 findings 表）
+    # --------------------------
+    def _query(self, sql: str, args: tuple = ()) -> List[dict]:
+        cur = self.conn.execute(sql, args)
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+    @staticmethod
+    def _since_day(days: Optional[float]) -> str:
+        if days is None:
+            return ""
+        return (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+
+    def top_devices(self, days: Optional[float] = 7, limit: int = 20) -> List[dict]:
+        """出错次数最多的设备（VID/PID），附受影响的机器数"""
+        return self._query(
+            "SELECT vid, pid, SUM(n) AS findings, COUNT(DISTINCT machine_id) AS machines, "
+            "MAX(last_ts) AS last_seen FROM rollup "
+            "WHERE vid != '' AND day >= ? AND severity != 'info' "
+            "GROUP BY vid, pid ORDER BY findings DESC LIMIT ?",
+            (self._since_day(days), limit))
+
+    def top_events(self, days: Optional[float] = 7, limit: int = 20) -> List[dict]:
+        return self._query(
+            "SELECT event_id, SUM(n) AS findings, COUNT(DISTINCT machine_id) AS machines, "
+            "MAX(last_ts) AS last_seen FROM rollup "
+            "WHERE event_id != 0 AND day >= ? "
+            "GROUP BY event_id ORDER BY findings DESC LIMIT ?",
+            (self._since_day(days), limit))
+
+    def machines_with_module(self, module: str, days: Optional[float] = None) -> List[dict]:
+        """模块名（前缀匹配，不区分大小写）相关问题出现过的机器，如 nvlddmkm"""
+        return self._query(
+            "SELECT m.name AS machine, SUM(r.n) AS findings, MIN(r.day) AS first_day, "
+            "MAX(r.last_ts) AS last_seen FROM rollup r JOIN machines m ON m.id = r.machine_id "
+            "WHERE r.module LIKE ? AND r.day >= ? "
+            "GROUP BY r.machine_id ORDER BY findings DESC",
+            (module.lower().replace("%", "") + "%", self._since_day(days)))
+
+    def module_findings(self, module: str, machine: Optional[str] = None,
+                        limit: int = 100) -> List[dict]:
+        """某模块的明细结果（最新在前），用于进一步排查单台机器"""
+        sql = ("SELECT m.name AS machine, f.ts, f.severity, f.title, f.detail "
+               "FROM findings f JOIN machines m ON m.id = f.machine_id WHERE f.module LIKE ?")
+        args: tuple = (module.replace("%", "") + "%",)
+        if machine:
+            sql += " AND m.name = ?"
+            args += (machine,)
+        return self._query(sql + " ORDER BY f.ts DESC LIMIT ?", args + (limit,))
+
+    def machines(self) -> List[dict]:
+        return self._query(
+            "SELECT m.name AS machine, COUNT(DISTINCT r.id) AS reports, MAX(r.created) AS last_report "
+            "FROM machines m LEFT JOIN reports r ON r.machine_id = m.id "
+            "GROUP BY m.id ORDER BY m.name")
+
+
+# ============================================================
+#                          命令行
+# ============================================================
+def _print_table(rows: List[dict]):
+    if not rows:
+        print("（无结果）")
+        return
+    cols = list(rows[0])
+    widths = [max(len(str(c)), *(len(str(r[c])) for r in rows)) for c in cols]
+    print("  ".join(str(c).ljust(w) for c, w in zip(cols, widths)))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(w) for c, w in zip(cols, widths)))
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m modules.fleet",
+                                     description="汇总多台电脑的诊断报告")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="导入报告文件或目录")
+    p.add_argument("db")
+    p.add_argument("paths", nargs="+")
+
+    for name, help_text in (("top-devices", "出错最多的设备"), ("top-events", "出现最多的 EventID")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("db")
+        p.add_argument("--days", type=float, default=7)
+        p.add_argument("--limit", type=int, default=20)
+        p.add_argument("--json", help="同时把结果写入 JSON 文件")
+
+    p = sub.add_parser("module", help="出现指定模块问题的机器（如 nvlddmkm）")
+    p.add_argument("db")
+    p.add_argument("name")
+    p.add_argument("--days", type=float)
+    p.add_argument("--machine", help="列出该机器上此模块的明细结果")
+    p.add_argument("--json")
+
+    p = sub.add_parser("machines", help="已导入的机器")
+    p.add_argument("db")
+    p.add_argument("--json")
+
+    args = parser.parse_args(argv)
+    with FleetStore(args.db) as store:
+        if args.command == "ingest":
+            print(store.ingest(args.paths, logger=print).describe())
+            return 0
+
+        start = time.perf_counter()
+        if args.command == "top-devices":
+            rows = store.top_devices(args.days, args.limit)
+        elif args.command == "top-events":
+            rows = store.top_events(args.days, args.limit)
+        elif args.command == "module" and args.machine:
+            rows = store.module_findings(args.name, args.machine)
+        elif args.command == "module":
+            rows = store.machines_with_module(args.name, args.days)
+        else:
+            rows = store.machines()
+        elapsed = time.perf_counter() - start
+
+    _print_table(rows)
+    print(f"\n查询耗时 {elapsed * 1000:.1f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"query": args.command, "rows": rows}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
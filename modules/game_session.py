@@ -0,0 +1,270 @@
+# modules/game_session.py
+"""
+游戏会话优化（基于 psutil）：
+- 按进程名或完整路径识别目标游戏
+- 提升游戏进程优先级，可选把游戏绑定到「最快」的核心
+- 把已知的后台进程（启动器、更新程序、覆盖层）降到较低优先级，并可挪到其余核心
+- 游戏退出或手动停止时，把所有改动恢复为原始值
+
+进程扫描采用增量方式：每次 tick 只取一次 PID 集合，
+与上次做差集，只对新出现的 PID 读取名称（需要时再读路径），
+不会每次遍历所有进程并获取完整属性。
+tick() 由 GUI 的 after 定时器驱动，运行在 Tk 线程中。
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+Logger = Callable[[str], None]
+
+# 常见启动器 / 更新程序 / 覆盖层（小写进程名）
+DEFAULT_BACKGROUND_NAMES = (
+    "steamwebhelper.exe",
+    "epicgameslauncher.exe",
+    "epicwebhelper.exe",
+    "wegame.exe",
+    "tgp_daemon.exe",
+    "eadesktop.exe",
+    "origin.exe",
+    "battle.net.exe",
+    "agent.exe",
+    "upc.exe",
+    "onedrive.exe",
+    "googleupdate.exe",
+    "microsoftedgeupdate.exe",
+    "nvcontainer.exe",
+    "discord.exe",
+)
+
+
+@dataclass
+class SessionConfig:
+    targets: List[str]                       # 进程名（cs2.exe）或完整路径
+    raise_priority: bool = True
+    pin_fast_cores: bool = False
+    fast_core_count: Optional[int] = None    # None：使用一半逻辑核心
+    demote_background: bool = True
+    background_names: Sequence[str] = DEFAULT_BACKGROUND_NAMES
+
+
+@dataclass
+class ProcessChange:
+    pid: int
+    name: str
+    create_time: float
+    role: str                                # "game" / "background"
+    orig_priority: Optional[int] = None
+    orig_affinity: Optional[List[int]] = None
+
+
+@dataclass
+class _Target:
+    text: str
+    by_path: bool = field(init=False)
+
+    def __post_init__(self):
+        self.text = os.path.normcase(self.text.strip())
+        self.by_path = os.sep in self.text or "/" in self.text
+
+
+def pick_fast_cores(psutil_mod, count: Optional[int] = None) -> List[int]:
+    """
+    选出「最快」的逻辑核心。
+    Windows 上 psutil 拿不到逐核最大频率时按以下规则近似：
+    - 开启超线程时，每个物理核心只取一个逻辑核心（相邻逻辑核心互为兄弟）
+    - 跳过 CPU 0，系统中断与 DPC 大多落在它上面
+    """
+    logical = psutil_mod.cpu_count(logical=True) or 1
+    physical = psutil_mod.cpu_count(logical=False) or logical
+
+    try:
+        freqs = psutil_mod.cpu_freq(percpu=True) or []
+    except Exception:
+        freqs = []
+    if len(freqs) == logical and len({f.max for f in freqs}) > 1:
+        order = sorted(range(logical), key=lambda i: -freqs[i].max)
+    else:
+        step = 2 if logical == physical * 2 else 1
+        order = [i for i in range(0, logical, step) if i != 0] or list(range(logical))
+
+    if count is None:
+        count = max(1, logical // 2)
+    return sorted(order[:max(1, min(count, len(order)))])
+
+
+def with_siblings(psutil_mod, cores: Sequence[int]) -> Set[int]:
+    """cores 加上它们的超线程兄弟（与 pick_fast_cores 相同的近似：相邻逻辑核心互为兄弟）"""
+    logical = psutil_mod.cpu_count(logical=True) or 1
+    physical = psutil_mod.cpu_count(logical=False) or logical
+    result = set(cores)
+    if logical == physical * 2:
+        result.update(c ^ 1 for c in cores)
+    return result
+
+
+class GameSessionOptimizer:
+    def __init__(self, config: SessionConfig, logger: Logger, psutil_mod=None):
+        if psutil_mod is None:
+            import psutil as psutil_mod
+        self.ps = psutil_mod
+        self.config = config
+        self.logger = logger
+
+        self._targets = [_Target(t) for t in config.targets if t.strip()]
+        self._background = {n.lower() for n in config.background_names}
+        self._known: Set[int] = set()
+        self._changes: Dict[int, ProcessChange] = {}
+        self._game_pids: Set[int] = set()
+
+        self.high = getattr(self.ps, "HIGH_PRIORITY_CLASS", -10)
+        self.below_normal = getattr(self.ps, "BELOW_NORMAL_PRIORITY_CLASS", 10)
+
+        all_cores = list(range(self.ps.cpu_count(logical=True) or 1))
+        self.fast_cores = pick_fast_cores(self.ps, config.fast_core_count)
+        # 后台进程不能落在快核心的超线程兄弟上，否则仍与游戏争抢同一个物理核心
+        busy = with_siblings(self.ps, self.fast_cores)
+        self.other_cores = [c for c in all_cores if c not in busy] or all_cores
+
+    @property
+    def game_running(self) -> bool:
+        return bool(self._game_pids)
+
+    # --------------------------
+    #  匹配
+    # --------------------------
+    def _is_target(self, proc, name: str) -> bool:
+        lname = os.path.normcase(name)
+        need_path = False
+        for t in self._targets:
+            if t.by_path:
+                need_path = True
+            elif lname == t.text:
+                return True
+        if not need_path:
+            return False
+        try:
+            exe = os.path.normcase(proc.exe())
+        except (self.ps.Error, OSError):
+            return False
+        return any(t.by_path and exe == t.text for t in self._targets)
+
+    # --------------------------
+    #  扫描
+    # --------------------------
+    def tick(self):
+        """增量扫描一次：处理新出现与已退出的进程"""
+        pids = set(self.ps.pids())
+        new = pids - self._known
+        gone = self._known - pids
+        self._known = pids
+
+        for pid in gone:
+            self._changes.pop(pid, None)
+            if pid in self._game_pids:
+                self._game_pids.discard(pid)
+                self.logger(f"游戏进程已退出（PID {pid}）。")
+                if not self._game_pids:
+                    self.revert_all()
+
+        for pid in new:
+            # 游戏启动时可能已经处理过本轮新出现的后台进程
+            if pid in self._changes:
+                continue
+            try:
+                proc = self.ps.Process(pid)
+                name = proc.name()
+            except (self.ps.Error, OSError):
+                continue
+            if self._is_target(proc, name):
+                self._on_game_started(proc, name)
+            elif self.config.demote_background and name.lower() in self._background:
+                # 后台进程只在游戏运行期间调整，启动前出现的等游戏启动后统一处理
+                if self.game_running:
+                    self._demote(proc, name)
+
+    def _on_game_started(self, proc, name: str):
+        first = not self._game_pids
+        self._game_pids.add(proc.pid)
+        self.logger(f"检测到游戏进程：{name}（PID {proc.pid}）")
+        self._apply(proc, name, "game",
+                    self.high if self.config.raise_priority else None,
+                    self.fast_cores if self.config.pin_fast_cores else None)
+        if first and self.config.demote_background:
+            for pid in self._known:
+                if pid in self._changes or pid in self._game_pids:
+                    continue
+                try:
+                    p = self.ps.Process(pid)
+                    pname = p.name()
+                except (self.ps.Error, OSError):
+                    continue
+                if pname.lower() in self._background:
+                    self._demote(p, pname)
+
+    def _demote(self, proc, name: str):
+        self._apply(proc, name, "background", self.below_normal,
+                    self.other_cores if self.config.pin_fast_cores else None)
+
+    # --------------------------
+    #  修改 / 恢复
+    # --------------------------
+    def _apply(self, proc, name: str, role: str, priority, affinity):
+        if proc.pid in self._changes:
+            # 已调整过：再次记录会把调整后的值当成「原始值」，恢复时就回不去了
+            return
+        try:
+            change = ProcessChange(pid=proc.pid, name=name, create_time=proc.create_time(),
+                                   role=role)
+        except (self.ps.Error, OSError):
+            return
+        try:
+            if priority is not None:
+                change.orig_priority = proc.nice()
+                proc.nice(priority)
+            if affinity is not None and hasattr(proc, "cpu_affinity"):
+                change.orig_affinity = proc.cpu_affinity()
+                proc.cpu_affinity(affinity)
+        except (self.ps.Error, OSError) as e:
+            self.logger(f"  调整 {name}（PID {proc.pid}）失败：{e}")
+            if change.orig_priority is not None or change.orig_affinity is not None:
+                self._changes[proc.pid] = change
+            return
+
+        self._changes[proc.pid] = change
+        parts = []
+        if priority is not None:
+            parts.append("提高优先级" if role == "game" else "降低优先级")
+        if affinity is not None:
+            parts.append(f"绑定核心 {','.join(map(str, affinity))}")
+        if parts:
+            self.logger(f"  {name}（PID {proc.pid}）：{'，'.join(parts)}")
+
+    def _revert(self, change: ProcessChange):
+        try:
+            proc = self.ps.Process(change.pid)
+            # PID 可能已被复用，创建时间不一致时不动它
+            if proc.create_time() != change.create_time:
+                return
+            if change.orig_priority is not None:
+                proc.nice(change.orig_priority)
+            if change.orig_affinity is not None:
+                proc.cpu_affinity(change.orig_affinity)
+            self.logger(f"  已恢复 {change.name}（PID {change.pid}）")
+        except (self.ps.NoSuchProcess, self.ps.ZombieProcess):
+            pass
+        except (self.ps.Error, OSError) as e:
+            self.logger(f"  恢复 {change.name}（PID {change.pid}）失败：{e}")
+
+    def revert_all(self):
+        if not self._changes:
+            return
+        self.logger("恢复游戏会话期间修改的进程优先级 / 核心绑定……")
+        for change in list(self._changes.values()):
+            self._revert(change)
+        self._changes.clear()
+
+    def stop(self):
+        self.revert_all()
+        self._game_pids.clear()
+        self._known.clear()
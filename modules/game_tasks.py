@@ -1,79 +1,68 @@
 # modules/game_tasks.py
-import subprocess
-import winreg
-from typing import Callable
+from typing import Callable, Optional
 import os
 
+from . import registry, steam_library
+from .cleaner import CleanStats, delete_tree, format_bytes
+from .command_exec import run_command
+from .probes import ProbeContext
+
 
 Logger = Callable[[str], None]
 
-
-def _run_simple_command(cmd: list, logger: Logger):
-    try:
-        logger(f"  执行命令：{' '.join(cmd)}")
-        subprocess.run(cmd, check=True)
-    except Exception as e:
-        logger(f"  命令执行失败：{e}")
-        raise
+HIGH_PERF_GUID = "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c"
+BALANCED_GUID = "381b4222-f694-41f0-9685-ff5bb260df2e"
+POWER_SAVER_GUID = "a1841308-3541-4fab-bc81-f71556f20b4a"
 
 
 # ------------------------
 # A. 禁用不必要的 UWP 后台
 # ------------------------
+UWP_BACKGROUND_PATHS = [
+    r"Software\Microsoft\Windows\CurrentVersion\BackgroundAccessApplications",
+    r"Software\Microsoft\Windows\CurrentVersion\Search",
+    r"Software\Microsoft\Windows\CurrentVersion\Search\BackgroundAccess",
+]
+
+GAMEBAR_PATH = r"Software\Microsoft\GameBar"
+GAMEMODE_VALUES = ["GameModeEnabled", "AutoGameModeEnabled"]
+
+
 def disable_uwp_background(logger: Logger):
     logger("  禁用 UWP 应用后台活动...")
 
-    paths = [
-        r"Software\Microsoft\Windows\CurrentVersion\BackgroundAccessApplications",
-        r"Software\Microsoft\Windows\CurrentVersion\Search",
-        r"Software\Microsoft\Windows\CurrentVersion\Search\BackgroundAccess",
-    ]
+    tx = registry.RegistryTransaction("disable_uwp_background")
+    for path in UWP_BACKGROUND_PATHS:
+        tx.set_value(registry.HKCU, path, "Disabled", 1)
 
     try:
-        for path in paths:
-            try:
-                key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, path, 0, winreg.KEY_ALL_ACCESS)
-                winreg.SetValueEx(key, "Disabled", 0, winreg.REG_DWORD, 1)
-                winreg.CloseKey(key)
-                logger(f"    已设置 Disabled=1: {path}")
-            except FileNotFoundError:
-                logger(f"    路径不存在（跳过）: {path}")
-
+        tx.commit(logger)
         logger("  UWP 后台已禁用（可逆操作）。")
-
     except Exception as e:
         logger(f"  禁用 UWP 后台失败：{e}")
 
 def enable_game_mode(logger: Logger):
     logger("  正在启用 GameMode...")
 
-    path = r"Software\Microsoft\GameBar"
-    try:
-        key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, path, 0, winreg.KEY_ALL_ACCESS)
-    except FileNotFoundError:
-        key = winreg.CreateKey(winreg.HKEY_CURRENT_USER, path)
-
-    winreg.SetValueEx(key, "GameModeEnabled", 0, winreg.REG_DWORD, 1)
-    winreg.SetValueEx(key, "AutoGameModeEnabled", 0, winreg.REG_DWORD, 1)
-    winreg.CloseKey(key)
+    tx = registry.RegistryTransaction("enable_game_mode")
+    for name in GAMEMODE_VALUES:
+        tx.set_value(registry.HKCU, GAMEBAR_PATH, name, 1, create_key=True)
+    tx.commit(logger)
 
     logger("  GameMode 已开启。")
 
 
-def clean_game_shader_cache(logger: Logger):
-    """
-    清理 Steam / WeGame Shader Cache
-    """
-    logger("  开始清理游戏 Shader / Cache 文件...")
+def restore_registry_changes(logger: Logger):
+    """回滚最近一次 UWP 后台 / GameMode 的注册表修改"""
+    registry.rollback_latest(logger)
 
-    local = os.getenv("LOCALAPPDATA")
-    prog86 = os.getenv("ProgramFiles(x86)")
 
-    targets = [
+def _game_cache_targets():
+    local = os.getenv("LOCALAPPDATA") or ""
+    return [
         # Steam
         os.path.join(local, "Steam", "htmlcache"),
         os.path.join(local, "Steam", "shadercache"),
-        os.path.join(prog86 or "", "Steam", "steamapps", "shadercache"),
 
         # WeGame
         os.path.join(local, "Tencent", "WeGameAppsCache"),
@@ -81,19 +70,61 @@ def clean_game_shader_cache(logger: Logger):
         os.path.join(local, "Tencent", "WeGame", "cache"),
     ]
 
-    import shutil
 
-    for path in targets:
+def clean_game_shader_cache(logger: Logger) -> CleanStats:
+    """
+    清理 Steam / WeGame Shader Cache
+    """
+    logger("  开始清理游戏 Shader / Cache 文件...")
+
+    stats = CleanStats()
+    for path in _game_cache_targets():
         if os.path.isdir(path):
-            try:
-                shutil.rmtree(path)
-                logger(f"    已删除：{path}")
-            except Exception as e:
-                logger(f"    删除失败：{path} | {e}")
+            before = stats.bytes_deleted
+            delete_tree(path, logger, stats)
+            logger(f"    已清理：{path}（{format_bytes(stats.bytes_deleted - before)}）")
         else:
             logger(f"    路径不存在（跳过）：{path}")
 
+    # Steam：所有库目录（含其它盘符）下的 steamapps/shadercache
+    clean_steam_shader_cache(logger, stats=stats)
+
     logger("  游戏 Cache 清理完成。")
+    return stats
+
+
+def clean_steam_shader_cache(logger: Logger, appids=None, steam_root=None,
+                             stats: Optional[CleanStats] = None) -> CleanStats:
+    """
+    按游戏清理 Steam 各库目录下的 steamapps/shadercache/<appid>。
+
+    appids 为空时清理所有已安装游戏，以及已卸载游戏遗留的缓存目录；
+    steam_root 为空时自动定位 Steam。
+    """
+    stats = stats if stats is not None else CleanStats()
+    # 删除时即可得到大小，不必先统计一遍
+    libraries = steam_library.discover_libraries(steam_root, with_sizes=False)
+    if not libraries:
+        logger("    未找到 Steam 安装目录（跳过）。")
+        return stats
+
+    logger(f"    发现 {len(libraries)} 个 Steam 库：")
+    for lib in libraries:
+        logger(f"      {lib.path}")
+
+    games = steam_library.iter_shader_caches(libraries, appids)
+    if not appids:
+        games += steam_library.orphan_shader_caches(libraries)
+    if not games:
+        logger("    未发现需要清理的 Steam Shader Cache。")
+        return stats
+
+    for game in games:
+        before = stats.bytes_deleted
+        delete_tree(game.shadercache_path, logger, stats)
+        logger(f"    已清理：{game.name}（{game.appid}，"
+               f"{format_bytes(stats.bytes_deleted - before)}）")
+    return stats
 
 def set_high_performance_plan(logger: Logger):
     """
@@ -106,11 +137,11 @@ def set_high_performance_plan(logger: Logger):
     - 需要管理员权限；
     - 若 OEM 修改或禁用了该方案，命令可能失败，会在日志中提示。
     """
-    high_perf_guid = "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c"
+    high_perf_guid = HIGH_PERF_GUID
     logger("  正在切换到高性能电源计划…")
 
     try:
-        _run_simple_command(
+        run_command(
             ["powercfg", "/setactive", high_perf_guid],
             logger
         )
@@ -129,11 +160,11 @@ def set_balanced_plan(logger: Logger):
     使用内置 GUID：
         381b4222-f694-41f0-9685-ff5bb260df2e  → Windows 默认平衡电源方案
     """
-    balanced_guid = "381b4222-f694-41f0-9685-ff5bb260df2e"
+    balanced_guid = BALANCED_GUID
     logger("  正在切换到平衡电源计划…")
 
     try:
-        _run_simple_command(
+        run_command(
             ["powercfg", "/setactive", balanced_guid],
             logger
         )
@@ -152,11 +183,11 @@ def set_power_saver_plan(logger: Logger):
     使用内置 GUID：
         a1841308-3541-4fab-bc81-f71556f20b4a  → Windows 节能模式
     """
-    saver_guid = "a1841308-3541-4fab-bc81-f71556f20b4a"
+    saver_guid = POWER_SAVER_GUID
     logger("  正在切换到节能电源计划（Power Saver）…")
 
     try:
-        _run_simple_command(
+        run_command(
             ["powercfg", "/setactive", saver_guid],
             logger
         )
@@ -167,3 +198,42 @@ def set_power_saver_plan(logger: Logger):
                "    - 当前系统策略不允许修改电源计划；\n"
                "    - 该电源方案被 OEM 禁用或移除；\n"
                "    - 未以管理员身份运行。")
+
+
+# ------------------------
+# 状态探测（已是目标状态时跳过任务）
+# ------------------------
+def probe_uwp_background(ctx: ProbeContext) -> bool:
+    for path in UWP_BACKGROUND_PATHS:
+        values = ctx.registry_values(registry.HKCU, path)
+        # 路径不存在时任务本身也会跳过
+        if values is not None and ctx.registry_value(registry.HKCU, path, "Disabled") != 1:
+            return False
+    return True
+
+
+def probe_game_mode(ctx: ProbeContext) -> bool:
+    return all(
+        ctx.registry_value(registry.HKCU, GAMEBAR_PATH, name) == 1
+        for name in GAMEMODE_VALUES
+    )
+
+
+def probe_game_shader_cache(ctx: ProbeContext) -> bool:
+    if not all(ctx.has_no_files(p) for p in _game_cache_targets()):
+        return False
+    return all(
+        ctx.has_no_files(lib.shadercache_root)
+        for lib in steam_library.discover_libraries(with_sizes=False)
+    )
+
+
+def _power_probe(guid: str):
+    def probe(ctx: ProbeContext) -> bool:
+        return ctx.active_power_scheme() == guid
+    return probe
+
+
+probe_high_performance_plan = _power_probe(HIGH_PERF_GUID)
+probe_balanced_plan = _power_probe(BALANCED_GUID)
+probe_power_saver_plan = _power_probe(POWER_SAVER_GUID)
@@ -0,0 +1,251 @@
+# modules/gpu_info.py
+"""
+GPU 信息读取（带缓存、后台执行）：
+- 后端按顺序尝试：nvidia-smi（经统一执行器，可超时结束）→ GPUtil（可选依赖）
+- 静态字段（名称、显存总量）在本次会话内只读取一次
+- 动态字段（温度、已用显存、负载）按 TTL 缓存，过期后在后台线程刷新
+- GUI 线程只调用 snapshot() / refresh()，永远不会等待 nvidia-smi
+
+测试时可向 GpuInfoProvider 传入自定义后端列表。
+"""
+
+import abc
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from .command_exec import run_command
+
+DEFAULT_TIMEOUT = 3.0
+DEFAULT_TTL = 5.0
+
+
+@dataclass
+class GpuReading:
+    name: str
+    memory_total_mb: float
+    memory_used_mb: Optional[float] = None
+    temperature: Optional[float] = None
+    load: Optional[float] = None          # 0 ~ 100
+
+
+class GpuBackend(abc.ABC):
+    """GPU 后端接口：query() 返回所有 GPU 的读数，失败时抛出异常"""
+
+    name = "base"
+
+    def available(self) -> bool:
+        return True
+
+    @abc.abstractmethod
+    def query(self, timeout: float) -> List[GpuReading]:
+        ...
+
+
+class NvidiaSmiBackend(GpuBackend):
+    name = "nvidia-smi"
+    FIELDS = "name,memory.total,memory.used,temperature.gpu,utilization.gpu"
+
+    def available(self) -> bool:
+        return shutil.which("nvidia-smi") is not None
+
+    @staticmethod
+    def _num(text: str) -> Optional[float]:
+        try:
+            return float(text)
+        except ValueError:
+            return None      # "[N/A]" / "[Not Supported]"
+
+    def query(self, timeout: float) -> List[GpuReading]:
+        out = run_command(
+            ["nvidia-smi", f"--query-gpu={self.FIELDS}", "--format=csv,noheader,nounits"],
+            timeout=timeout,
+        ).stdout
+        gpus = []
+        for line in out.splitlines():
+            parts = [p.strip() for p in line.split(",")]
+            if len(parts) < 5:
+                continue
+            gpus.append(GpuReading(
+                name=parts[0],
+                memory_total_mb=self._num(parts[1]) or 0.0,
+                memory_used_mb=self._num(parts[2]),
+                temperature=self._num(parts[3]),
+                load=self._num(parts[4]),
+            ))
+        return gpus
+
+
+class GPUtilBackend(GpuBackend):
+    name = "GPUtil"
+
+    def available(self) -> bool:
+        try:
+            import GPUtil  # noqa: F401
+            return True
+        except Exception:
+            return False
+
+    def query(self, timeout: float) -> List[GpuReading]:
+        import GPUtil
+        return [
+            GpuReading(
+                name=g.name,
+                memory_total_mb=g.memoryTotal,
+                memory_used_mb=g.memoryUsed,
+                temperature=g.temperature,
+                load=g.load * 100 if g.load is not None else None,
+            )
+            for g in GPUtil.getGPUs()
+        ]
+
+
+def default_backends() -> List[GpuBackend]:
+    return [NvidiaSmiBackend(), GPUtilBackend()]
+
+
+@dataclass
+class GpuSnapshot:
+    gpus: List[GpuReading]
+    status: str                 # "ok" / "pending" / "none" / "error"
+    message: str = ""
+    age: Optional[float] = None   # 动态字段距今秒数
+
+    def describe(self) -> List[str]:
+        if self.status == "pending" and not self.gpus:
+            return ["GPU：读取中……"]
+        if self.status == "none":
+            return [f"GPU：{self.message or '未检测到 GPU'}"]
+        if self.status == "error" and not self.gpus:
+            return [f"GPU 信息读取失败（{self.message}）"]
+        lines = []
+        for g in self.gpus:
+            lines.append(f"GPU：{g.name}")
+            if g.memory_used_mb is not None:
+                lines.append(f"显存占用：{g.memory_used_mb:.0f} MB / {g.memory_total_mb:.0f} MB")
+            else:
+                lines.append(f"显存总量：{g.memory_total_mb:.0f} MB")
+            if g.temperature is not None:
+                lines.append(f"GPU 温度：{g.temperature:.0f}°C")
+            if g.load is not None:
+                lines.append(f"GPU 负载：{g.load:.0f}%")
+        if self.status == "pending":
+            lines.append("（GPU 动态数据刷新中……）")
+        return lines
+
+
+class GpuInfoProvider:
+    def __init__(self, backends: Optional[Sequence[GpuBackend]] = None,
+                 timeout: float = DEFAULT_TIMEOUT, ttl: float = DEFAULT_TTL):
+        self.backends = list(backends) if backends is not None else default_backends()
+        self.timeout = timeout
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._backend: Optional[GpuBackend] = None     # 第一个成功的后端，之后固定使用
+        self._static: Optional[List[GpuReading]] = None
+        self._dynamic: List[GpuReading] = []
+        self._updated = 0.0
+        self._attempted: Optional[float] = None     # 上次发起刷新的时间，失败后同样按 TTL 退避
+        self._status = "pending"
+        self._message = ""
+
+    @property
+    def busy(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _stale(self) -> bool:
+        return self._attempted is None or time.monotonic() - self._attempted > self.ttl
+
+    def refresh(self, force: bool = False) -> bool:
+        """缓存过期时启动后台刷新；已在刷新中或无需刷新时直接返回。返回是否启动了刷新"""
+        with self._lock:
+            if self.busy or self._status == "none":
+                return False
+            if not force and not self._stale():
+                return False
+            self._attempted = time.monotonic()
+            self._thread = threading.Thread(target=self._worker, name="GpuInfoProvider",
+                                            daemon=True)
+            self._thread.start()
+            return True
+
+    def _candidates(self) -> List[GpuBackend]:
+        if self._backend is not None:
+            return [self._backend]
+        return [b for b in self.backends if b.available()]
+
+    def _worker(self):
+        errors = []
+        for backend in self._candidates():
+            # 每个后端在独立的子线程中执行，超时后放弃等待（GPUtil 无法被中断）
+            box: dict = {}
+
+            def call(b=backend):
+                try:
+                    box["result"] = b.query(self.timeout)
+                except Exception as e:
+                    box["error"] = e
+
+            t = threading.Thread(target=call, daemon=True)
+            t.start()
+            t.join(self.timeout)
+            if t.is_alive():
+                errors.append(f"{backend.name} 超时")
+                continue
+            if "error" in box:
+                errors.append(f"{backend.name}：{box['error']}")
+                continue
+            self._store(backend, box["result"])
+            return
+
+        with self._lock:
+            if self._static is None and not errors:
+                self._status, self._message = "none", "未检测到可用的 GPU 信息来源"
+            else:
+                self._status, self._message = "error", "；".join(errors)
+
+    def _store(self, backend: GpuBackend, gpus: List[GpuReading]):
+        with self._lock:
+            self._backend = backend
+            if not gpus:
+                self._static, self._dynamic = [], []
+                self._status, self._message = "none", "未检测到 GPU"
+                return
+            if self._static is None:
+                self._static = [GpuReading(g.name, g.memory_total_mb) for g in gpus]
+            self._dynamic = gpus
+            self._updated = time.monotonic()
+            self._status, self._message = "ok", ""
+
+    def snapshot(self) -> GpuSnapshot:
+        """立即返回当前缓存（不阻塞）；必要时顺带触发后台刷新"""
+        self.refresh()
+        with self._lock:
+            gpus = []
+            static = self._static or []
+            for i, s in enumerate(static):
+                d = self._dynamic[i] if i < len(self._dynamic) else None
+                gpus.append(GpuReading(
+                    name=s.name,
+                    memory_total_mb=s.memory_total_mb,
+                    memory_used_mb=d.memory_used_mb if d else None,
+                    temperature=d.temperature if d else None,
+                    load=d.load if d else None,
+                ))
+            status = "pending" if self.busy else self._status
+            age = time.monotonic() - self._updated if self._updated else None
+            return GpuSnapshot(gpus, status, self._message, age)
+
+
+_provider: Optional[GpuInfoProvider] = None
+
+
+def get_provider() -> GpuInfoProvider:
+    global _provider
+    if _provider is None:
+        _provider = GpuInfoProvider()
+    return _provider
@@ -0,0 +1,350 @@
+# modules/idle_maintenance.py
+"""
+空闲时自动维护：
+- 后台线程每隔几秒采样一次系统 CPU 占用与磁盘读写速率（psutil，扣除本工具自身的部分），
+  并增量检查游戏进程（只对新出现的 PID 读取进程名）
+- 机器持续空闲 idle_minutes 分钟、且没有游戏在运行时，按顺序执行选定的 LEVEL1 任务
+- 执行过程中负载升高或游戏启动，立即暂停：删除引擎停在当前文件（cleaner 暂停点），
+  重新空闲一段时间后从原位置继续
+- 本轮尚未完成的任务保存在数据目录，下次启动本工具时接着执行
+- 维护任务总是以限速、低优先级方式执行（io_throttle）
+- 每轮结束时批量重试被占用文件队列中到期的条目（retry_queue）
+
+只允许 LEVEL1 任务：无人值守时不执行会掉线、黑屏或重启的操作。
+"""
+
+import datetime
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .app_paths import data_dir
+from .cleaner import CleanStats, set_pause_hook
+from .io_throttle import ThrottleConfig, throttled
+from .reclaim import ReclaimReport
+from .retry_queue import queue_failures, retry_due
+from .task_runner import TaskDef, TaskLevel
+
+Logger = Callable[[str], None]
+
+CONFIG_FILE = "idle_maintenance.json"
+_save_lock = threading.Lock()           # GUI 线程与维护线程都会保存
+
+CHECK_INTERVAL = 5.0         # 等待空闲时的采样间隔（秒）
+RUNNING_INTERVAL = 2.0       # 执行任务期间的采样间隔，负载升高时尽快暂停
+RESUME_AFTER = 60.0          # 暂停后需要重新空闲多久才继续（秒）
+
+# 常见游戏进程（小写）；可在设置中追加
+DEFAULT_GAME_NAMES = (
+    "cs2.exe",
+    "valorant-win64-shipping.exe",
+    "leagueoflegends.exe",
+    "dota2.exe",
+    "r5apex.exe",
+    "fortniteclient-win64-shipping.exe",
+    "gta5.exe",
+    "overwatch.exe",
+    "pubg-win64-shipping.exe",
+    "yuanshen.exe",
+    "genshinimpact.exe",
+)
+
+
+# ============================================================
+#                           配置
+# ============================================================
+@dataclass
+class IdleConfig:
+    enabled: bool = False
+    task_keys: List[str] = field(default_factory=list)
+    idle_minutes: float = 10.0
+    cpu_percent: float = 15.0               # 系统 CPU 占用低于此值视为空闲
+    disk_mb_per_s: float = 5.0              # 磁盘读写低于此值视为空闲
+    games: List[str] = field(default_factory=lambda: list(DEFAULT_GAME_NAMES))
+    interval_hours: float = 24.0            # 两轮维护之间的最小间隔
+    # 运行状态
+    pending: List[str] = field(default_factory=list)     # 本轮尚未完成的任务
+    last_completed: Optional[str] = None
+
+    @classmethod
+    def load(cls) -> "IdleConfig":
+        path = os.path.join(data_dir(), CONFIG_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        known = cls.__dataclass_fields__
+        try:
+            return cls(**{k: v for k, v in raw.items() if k in known})
+        except TypeError:
+            return cls()
+
+    def save(self):
+        path = os.path.join(data_dir(), CONFIG_FILE)
+        tmp = path + ".tmp"
+        with _save_lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(asdict(self), f, ensure_ascii=False, indent=2)
+            os.replace(tmp, path)
+
+    def due(self, now: Optional[datetime.datetime] = None) -> bool:
+        if self.pending:
+            return True
+        if not self.last_completed:
+            return True
+        try:
+            last = datetime.datetime.fromisoformat(self.last_completed)
+        except ValueError:
+            return True
+        now = now or datetime.datetime.now()
+        return now - last >= datetime.timedelta(hours=self.interval_hours)
+
+
+# ============================================================
+#                        负载 / 游戏检测
+# ============================================================
+class LoadSampler:
+    """系统 CPU 占用与磁盘读写速率，扣除本进程自身的部分（维护任务本身的删除不算负载）"""
+
+    def __init__(self, psutil_mod):
+        self.ps = psutil_mod
+        self.me = psutil_mod.Process()
+        self.cpu_count = psutil_mod.cpu_count(logical=True) or 1
+        # cpu_percent(None) 的第一次调用只建立基线
+        psutil_mod.cpu_percent(None)
+        self.me.cpu_percent(None)
+        self._t = time.monotonic()
+        self._disk = self._disk_bytes()
+        self._own = self._own_bytes()
+
+    def _disk_bytes(self) -> int:
+        try:
+            io = self.ps.disk_io_counters()
+        except (RuntimeError, OSError):
+            io = None
+        return (io.read_bytes + io.write_bytes) if io else 0
+
+    def _own_bytes(self) -> int:
+        try:
+            io = self.me.io_counters()
+        except (AttributeError, self.ps.Error, OSError):
+            return 0
+        return io.read_bytes + io.write_bytes
+
+    def sample(self) -> Tuple[float, float]:
+        """返回 (CPU 占用 %，磁盘读写 MB/s)"""
+        now = time.monotonic()
+        dt = max(now - self._t, 1e-3)
+        disk, own = self._disk_bytes(), self._own_bytes()
+        disk_rate = max(0, (disk - self._disk) - (own - self._own)) / dt / (1024 * 1024)
+        self._t, self._disk, self._own = now, disk, own
+
+        cpu = self.ps.cpu_percent(None) - self.me.cpu_percent(None) / self.cpu_count
+        return max(0.0, cpu), disk_rate
+
+
+class GameWatcher:
+    """增量检查游戏进程：每次只对新出现的 PID 读取进程名"""
+
+    def __init__(self, psutil_mod, names):
+        self.ps = psutil_mod
+        self._known: Dict[int, str] = {}
+        self.set_names(names)
+
+    def set_names(self, names):
+        self.names = {n.strip().lower() for n in names if n.strip()}
+
+    def running_game(self) -> Optional[str]:
+        pids = set(self.ps.pids())
+        for pid in list(self._known):
+            if pid not in pids:
+                del self._known[pid]
+        for pid in pids - self._known.keys():
+            try:
+                self._known[pid] = self.ps.Process(pid).name().lower()
+            except (self.ps.Error, OSError):
+                self._known[pid] = ""
+        for name in self._known.values():
+            if name in self.names:
+                return name
+        return None
+
+
+# ============================================================
+#                          调度器
+# ============================================================
+class _Cancelled(Exception):
+    pass
+
+
+class IdleMaintenance:
+    def __init__(self, config: IdleConfig, tasks: Dict[str, TaskDef], logger: Logger,
+                 psutil_mod=None):
+        if psutil_mod is None:
+            import psutil as psutil_mod
+        self.ps = psutil_mod
+        self.config = config
+        self.tasks = tasks
+        self.logger = logger
+
+        self.status = "未启动"
+        self._stop = threading.Event()
+        self._gate = threading.Event()          # 置位：允许执行；清除：暂停
+        self._thread: Optional[threading.Thread] = None
+        self._worker: Optional[threading.Thread] = None
+        self._games: Optional[GameWatcher] = None
+
+    # --------------------------
+    #  生命周期
+    # --------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def busy(self) -> bool:
+        """正在执行（或暂停在）维护任务中"""
+        return self._worker is not None and self._worker.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="IdleMaintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._gate.set()
+        self.status = "未启动"
+
+    def reload_games(self):
+        """设置中修改游戏列表后调用"""
+        if self._games is not None:
+            self._games.set_names(self.config.games)
+
+    def eligible_keys(self, keys: List[str]) -> List[str]:
+        return [k for k in keys if k in self.tasks and self.tasks[k].level == TaskLevel.LEVEL1]
+
+    # --------------------------
+    #  监视循环
+    # --------------------------
+    def _run(self):
+        sampler = LoadSampler(self.ps)
+        games = self._games = GameWatcher(self.ps, self.config.games)
+        idle_since: Optional[float] = None
+        self.status = "等待空闲……"
+
+        while not self._stop.wait(RUNNING_INTERVAL if self.busy else CHECK_INTERVAL):
+            cpu, disk = sampler.sample()
+            game = games.running_game()
+            if game:
+                reason = f"游戏运行中（{game}）"
+            elif cpu > self.config.cpu_percent:
+                reason = f"CPU {cpu:.0f}%"
+            elif disk > self.config.disk_mb_per_s:
+                reason = f"磁盘 {disk:.1f} MB/s"
+            else:
+                reason = ""
+
+            now = time.monotonic()
+            if reason:
+                idle_since = None
+            elif idle_since is None:
+                idle_since = now
+            idle_for = now - idle_since if idle_since is not None else 0.0
+
+            if self.busy:
+                if reason and self._gate.is_set():
+                    self._gate.clear()
+                    self.status = f"已暂停：{reason}"
+                    self.logger(f"[空闲维护] 检测到{reason}，暂停维护。")
+                elif not reason and not self._gate.is_set() and idle_for >= RESUME_AFTER:
+                    self._gate.set()
+                    self.status = "正在执行维护任务……"
+                    self.logger("[空闲维护] 已重新空闲，从暂停处继续。")
+            elif not self.config.due():
+                self.status = f"本轮维护已完成（{self.config.last_completed}）"
+            elif idle_for >= self.config.idle_minutes * 60:
+                self._start_cycle()
+            else:
+                wait = self.config.idle_minutes * 60 - idle_for
+                self.status = (f"等待空闲：{reason}" if reason
+                               else f"已空闲，{wait / 60:.1f} 分钟后开始维护")
+
+    def _start_cycle(self):
+        cfg = self.config
+        cfg.pending = self.eligible_keys(cfg.pending) or self.eligible_keys(cfg.task_keys)
+        keys = list(cfg.pending)
+        if not keys:
+            self.status = "未选择维护任务"
+            return
+        self._gate.set()
+        self.status = "正在执行维护任务……"
+        self._worker = threading.Thread(target=self._run_tasks, args=(keys,),
+                                        name="IdleMaintenanceWorker", daemon=True)
+        self._worker.start()
+
+    # --------------------------
+    #  执行
+    # --------------------------
+    def _wait_gate(self):
+        # 暂停期间阻塞在这里；删除引擎的遍历状态保留在调用栈中
+        while not self._gate.wait(1.0):
+            pass
+        if self._stop.is_set():
+            raise _Cancelled()
+
+    def _run_tasks(self, keys: List[str]):
+        cfg = self.config
+        report = ReclaimReport()
+        self.logger(f"[空闲维护] 开始执行 {len(keys)} 个维护任务。")
+        set_pause_hook(self._wait_gate)
+        try:
+            # 后台维护总是限速并以低优先级执行
+            with throttled(ThrottleConfig()):
+                self._run_keys(keys, report)
+        except _Cancelled:
+            self.logger("[空闲维护] 已停止，未完成的任务将在下次空闲时继续。")
+            return
+        finally:
+            set_pause_hook(None)
+
+        report.log_summary(self.logger)
+        # 之前被占用的文件：只按记录的路径重试，不重新遍历目录
+        retry_due(self.logger)
+        cfg.pending = []
+        cfg.last_completed = datetime.datetime.now().isoformat(timespec="seconds")
+        self._save()
+        self.status = f"本轮维护已完成（{cfg.last_completed}）"
+        self.logger("[空闲维护] 本轮维护已完成。")
+
+    def _run_keys(self, keys: List[str], report: ReclaimReport):
+        cfg = self.config
+        for key in keys:
+            self._wait_gate()
+            task = self.tasks[key]
+            self.logger(f"→ 开始：{task.label}")
+            start = time.perf_counter()
+            try:
+                result = task.func()
+                if isinstance(result, CleanStats):
+                    report.add(task.label, result, time.perf_counter() - start)
+                    queue_failures(result, task.label, self.logger)
+                self.logger(f"√ 完成：{task.label}")
+            except _Cancelled:
+                raise
+            except Exception as e:
+                self.logger(f"× 失败：{task.label} | 错误：{e}")
+            cfg.pending = [k for k in cfg.pending if k != key]
+            self._save()
+
+    def _save(self):
+        try:
+            self.config.save()
+        except OSError as e:
+            self.logger(f"[空闲维护] 保存进度失败：{e}")
@@ -0,0 +1,196 @@
+# modules/io_throttle.py
+"""
+限速清理（避免清理时游戏读盘卡顿）：
+- 令牌桶：分别限制每秒删除的文件数与字节数，允许短暂突发
+- 降低优先级：Windows 上把执行清理的线程切换到后台模式
+  （THREAD_MODE_BACKGROUND_BEGIN，同时降低该线程的 CPU / I/O / 内存优先级，不影响其它线程）；
+  其它系统用 psutil 把进程 I/O 优先级设为 idle
+- 自适应退避：每隔一小段时间用 psutil 读取磁盘计数器，
+  平均请求延迟或平均队列长度超过阈值时把速率减半，恢复后逐步放开
+
+删除引擎（cleaner）在每个文件删除后调用 Throttle.consume()；
+未进入 throttled() 时不做任何限速，即「快速模式」。
+"""
+
+import contextlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+from .cleaner import set_throttle
+
+# SetThreadPriority 的后台模式
+_THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+_THREAD_MODE_BACKGROUND_END = 0x00020000
+
+
+@dataclass
+class ThrottleConfig:
+    ops_per_s: float = 300.0                 # 每秒最多删除的文件数
+    mb_per_s: float = 30.0                   # 每秒最多删除的数据量
+    burst_s: float = 0.5                     # 允许的突发量（相当于多少秒的配额）
+    latency_ms: float = 25.0                 # 磁盘平均请求延迟超过此值时退避
+    queue_length: float = 2.0                # 磁盘平均队列长度超过此值时退避
+    min_factor: float = 0.05                 # 退避时速率最低降到原来的比例
+    check_interval: float = 0.5              # 磁盘压力的检查间隔（秒）
+    low_priority: bool = True
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+
+    def take(self, amount: float) -> float:
+        """取出 amount 个令牌，返回需要等待的秒数（允许透支，由调用方睡眠补足）"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+        self.tokens -= amount
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class DiskPressure:
+    """
+    根据 psutil.disk_io_counters 的增量估算磁盘压力：
+    平均延迟 = Δ(读写耗时) / Δ(读写次数)；平均队列长度 ≈ Δ(读写耗时) / Δ(时间)（Little 定律）
+    统计的是所有磁盘的合计，不区分卷。
+    """
+
+    def __init__(self, psutil_mod=None):
+        if psutil_mod is None:
+            try:
+                import psutil as psutil_mod
+            except ImportError:
+                psutil_mod = None
+        self.ps = psutil_mod
+        self._prev = self._read()
+
+    def _read(self) -> Optional[Tuple[float, int, int]]:
+        if self.ps is None:
+            return None
+        try:
+            io = self.ps.disk_io_counters()
+        except (RuntimeError, OSError):
+            return None
+        if io is None or not hasattr(io, "read_time"):
+            return None
+        return time.monotonic(), io.read_count + io.write_count, io.read_time + io.write_time
+
+    def sample(self) -> Optional[Tuple[float, float]]:
+        """返回 (平均延迟 ms，平均队列长度)；无法读取计数器时返回 None"""
+        cur = self._read()
+        prev, self._prev = self._prev, cur
+        if cur is None or prev is None:
+            return None
+        dt = cur[0] - prev[0]
+        ops = cur[1] - prev[1]
+        busy_ms = cur[2] - prev[2]
+        if dt <= 0 or busy_ms < 0:
+            return None
+        latency = busy_ms / ops if ops > 0 else 0.0
+        return latency, busy_ms / 1000.0 / dt
+
+
+class Throttle:
+    def __init__(self, config: Optional[ThrottleConfig] = None,
+                 pressure: Optional[DiskPressure] = None):
+        self.config = config or ThrottleConfig()
+        cfg = self.config
+        self.ops = TokenBucket(cfg.ops_per_s, cfg.ops_per_s * cfg.burst_s)
+        bytes_rate = cfg.mb_per_s * 1024 * 1024
+        self.bytes = TokenBucket(bytes_rate, bytes_rate * cfg.burst_s)
+        self.pressure = pressure if pressure is not None else DiskPressure()
+        self.factor = 1.0
+        self.backoffs = 0
+        self.slept = 0.0
+        self._next_check = time.monotonic() + cfg.check_interval
+        self._lock = threading.Lock()
+
+    def _adapt(self):
+        cfg = self.config
+        sample = self.pressure.sample()
+        if sample is None:
+            return
+        latency, queue = sample
+        if latency > cfg.latency_ms or queue > cfg.queue_length:
+            self.factor = max(cfg.min_factor, self.factor * 0.5)
+            self.backoffs += 1
+        elif self.factor < 1.0:
+            self.factor = min(1.0, self.factor * 1.25)
+        self.ops.rate = cfg.ops_per_s * self.factor
+        self.bytes.rate = cfg.mb_per_s * 1024 * 1024 * self.factor
+
+    def consume(self, ops: int = 1, nbytes: int = 0):
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.config.check_interval
+                self._adapt()
+            wait = max(self.ops.take(ops), self.bytes.take(nbytes))
+        if wait > 0:
+            self.slept += wait
+            time.sleep(wait)
+
+    def describe(self) -> str:
+        text = f"限速等待 {self.slept:.1f}s"
+        if self.backoffs:
+            text += f"，磁盘繁忙退避 {self.backoffs} 次"
+        return text
+
+
+# ============================================================
+#                          优先级
+# ============================================================
+@contextlib.contextmanager
+def low_priority() -> Iterator[None]:
+    """在当前线程（Windows）/ 当前进程（其它系统）范围内降低 CPU 与 I/O 优先级"""
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        entered = bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(),
+                                                  _THREAD_MODE_BACKGROUND_BEGIN))
+        try:
+            yield
+        finally:
+            if entered:
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(),
+                                           _THREAD_MODE_BACKGROUND_END)
+        return
+
+    proc = original = None
+    try:
+        import psutil
+        proc = psutil.Process()
+        original = proc.ionice()
+        proc.ionice(psutil.IOPRIO_CLASS_IDLE)
+    except Exception:
+        # 没有 psutil、平台不支持 ionice 或无权限时照常执行
+        proc = None
+    try:
+        yield
+    finally:
+        if proc is not None:
+            try:
+                proc.ionice(original.ioclass, original.value)
+            except Exception:
+                pass
+
+
+@contextlib.contextmanager
+def throttled(config: Optional[ThrottleConfig] = None) -> Iterator[Throttle]:
+    """在当前线程中启用限速清理；退出时恢复快速模式与原优先级"""
+    throttle = Throttle(config)
+    set_throttle(throttle)
+    try:
+        if throttle.config.low_priority:
+            with low_priority():
+                yield throttle
+        else:
+            yield throttle
+    finally:
+        set_throttle(None)
@@ -0,0 +1,199 @@
+# modules/livekernel.py
+"""
+LiveKernelReports 转储文件解析：
+- 只读取文件开头固定大小的头部（4KB），不会把几百 MB 的内核转储读入内存
+- 支持 64 位内核转储（PAGEDU64）、32 位内核转储（PAGEDUMP）与 minidump（MDMP）
+- 解析出 BugCheck 代码、4 个参数与生成时间
+- 子目录名即触发转储的组件（WATCHDOG、USBHUB3、NDIS……），按组件 + BugCheck 分组计数
+
+synthetic_header() 可生成合成的头部数据，用于测试与基准。
+"""
+
+import datetime
+import os
+import struct
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+HEADER_READ = 4096
+
+# DUMP_HEADER64
+_OFF64_BUGCHECK = 0x38
+_OFF64_PARAMS = 0x40
+_OFF64_SYSTEM_TIME = 0xFA8
+
+# DUMP_HEADER32
+_OFF32_BUGCHECK = 0x28
+_OFF32_PARAMS = 0x2C
+_OFF32_SYSTEM_TIME = 0xFC0
+
+# MINIDUMP_HEADER
+_OFF_MDMP_TIMESTAMP = 0x14
+
+_FILETIME_EPOCH = datetime.datetime(1601, 1, 1)
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+BUGCHECK_NAMES = {
+    0x9F: "DRIVER_POWER_STATE_FAILURE",
+    0x117: "VIDEO_TDR_TIMEOUT_DETECTED",
+    0x124: "WHEA_UNCORRECTABLE_ERROR",
+    0x133: "DPC_WATCHDOG_VIOLATION",
+    0x141: "VIDEO_ENGINE_TIMEOUT_DETECTED",
+    0x144: "BUGCODE_USB3_DRIVER",
+    0x15E: "BUGCODE_NDIS_DRIVER_LIVE_DUMP",
+    0x161: "LIVE_SYSTEM_DUMP",
+    0x193: "VIDEO_DXGKRNL_LIVEDUMP",
+}
+
+# 组件目录 → 通俗说明
+COMPONENT_HINTS = {
+    "WATCHDOG": "显卡驱动无响应（TDR），常见于显卡驱动不稳定或超频",
+    "USBHUB3": "USB 3.x 集线器 / 控制器驱动异常，可能导致外设断连",
+    "USBXHCI": "USB 主控制器驱动异常",
+    "NDIS": "网卡驱动异常，可能导致断网或延迟飙升",
+    "PDCWATCHDOG": "电源管理（现代待机）超时",
+}
+
+
+@dataclass
+class DumpHeader:
+    path: str
+    component: Optional[str]
+    kind: str                                    # kernel64 / kernel32 / minidump / unknown
+    bugcheck: Optional[int] = None
+    params: Tuple[int, ...] = field(default_factory=tuple)
+    timestamp: Optional[datetime.datetime] = None
+    size: int = 0
+
+    @property
+    def bugcheck_name(self) -> str:
+        if self.bugcheck is None:
+            return "未知"
+        name = BUGCHECK_NAMES.get(self.bugcheck)
+        return f"{name} (0x{self.bugcheck:X})" if name else f"0x{self.bugcheck:X}"
+
+
+def _filetime(value: int) -> Optional[datetime.datetime]:
+    if value <= 0:
+        return None
+    try:
+        return _FILETIME_EPOCH + datetime.timedelta(microseconds=value // 10)
+    except OverflowError:
+        return None
+
+
+def parse_dump_header(data: bytes) -> Tuple[str, Optional[int], Tuple[int, ...],
+                                            Optional[datetime.datetime]]:
+    """解析头部字节，返回 (类型, BugCheck, 参数, 时间)；时间为 UTC"""
+    sig = data[:8]
+    if sig == b"PAGEDU64" and len(data) >= _OFF64_SYSTEM_TIME + 8:
+        code = struct.unpack_from("<I", data, _OFF64_BUGCHECK)[0]
+        params = struct.unpack_from("<4Q", data, _OFF64_PARAMS)
+        ts = _filetime(struct.unpack_from("<Q", data, _OFF64_SYSTEM_TIME)[0])
+        return "kernel64", code, params, ts
+    if sig == b"PAGEDUMP" and len(data) >= _OFF32_SYSTEM_TIME + 8:
+        code = struct.unpack_from("<I", data, _OFF32_BUGCHECK)[0]
+        params = struct.unpack_from("<4I", data, _OFF32_PARAMS)
+        ts = _filetime(struct.unpack_from("<Q", data, _OFF32_SYSTEM_TIME)[0])
+        return "kernel32", code, params, ts
+    if data[:4] == b"MDMP" and len(data) >= _OFF_MDMP_TIMESTAMP + 4:
+        stamp = struct.unpack_from("<I", data, _OFF_MDMP_TIMESTAMP)[0]
+        ts = _EPOCH + datetime.timedelta(seconds=stamp) if stamp else None
+        return "minidump", None, (), ts
+    return "unknown", None, (), None
+
+
+def _utc_to_local(ts: datetime.datetime) -> datetime.datetime:
+    return ts.replace(tzinfo=datetime.timezone.utc).astimezone().replace(tzinfo=None)
+
+
+def read_dump_header(path: str, component: Optional[str] = None) -> DumpHeader:
+    """读取单个转储的头部；DumpHeader.timestamp 为本地时间"""
+    with open(path, "rb") as f:
+        data = f.read(HEADER_READ)
+        st = os.fstat(f.fileno())
+    kind, code, params, ts = parse_dump_header(data)
+    ts = _utc_to_local(ts) if ts else datetime.datetime.fromtimestamp(st.st_mtime)
+    size = st.st_size
+    return DumpHeader(path=path, component=component, kind=kind, bugcheck=code,
+                      params=params, timestamp=ts, size=size)
+
+
+def scan_reports(root: str) -> List[DumpHeader]:
+    """遍历 LiveKernelReports，逐个读取 .dmp 头部；无法读取的文件跳过"""
+    dumps = []
+    root_norm = os.path.normcase(os.path.abspath(root))
+    for dirpath, _, files in os.walk(root):
+        rel = os.path.relpath(dirpath, root)
+        # 第一级子目录为组件名，根目录下的文件没有组件
+        component = None if os.path.normcase(os.path.abspath(dirpath)) == root_norm \
+            else rel.split(os.sep)[0]
+        for name in files:
+            if not name.lower().endswith(".dmp"):
+                continue
+            try:
+                dumps.append(read_dump_header(os.path.join(dirpath, name), component))
+            except OSError:
+                continue
+    return dumps
+
+
+@dataclass
+class DumpGroup:
+    component: Optional[str]
+    bugcheck: Optional[int]
+    dumps: List[DumpHeader]
+
+    @property
+    def count(self) -> int:
+        return len(self.dumps)
+
+    @property
+    def first(self) -> Optional[datetime.datetime]:
+        return min((d.timestamp for d in self.dumps if d.timestamp), default=None)
+
+    @property
+    def last(self) -> Optional[datetime.datetime]:
+        return max((d.timestamp for d in self.dumps if d.timestamp), default=None)
+
+    def per_day(self) -> Dict[datetime.date, int]:
+        counts = Counter(d.timestamp.date() for d in self.dumps if d.timestamp)
+        return dict(sorted(counts.items()))
+
+
+def group_dumps(dumps: List[DumpHeader]) -> List[DumpGroup]:
+    """按 (组件, BugCheck) 分组，最近发生的组排在前面"""
+    groups: Dict[Tuple[Optional[str], Optional[int]], List[DumpHeader]] = {}
+    for d in dumps:
+        groups.setdefault(((d.component or "").upper() or None, d.bugcheck), []).append(d)
+    result = [DumpGroup(comp, code, sorted(items, key=lambda d: d.timestamp or _FILETIME_EPOCH))
+              for (comp, code), items in groups.items()]
+    result.sort(key=lambda g: g.last or _FILETIME_EPOCH, reverse=True)
+    return result
+
+
+def synthetic_header(bugcheck: int, params=(0, 0, 0, 0),
+                     timestamp: Optional[datetime.datetime] = None, kind: str = "kernel64",
+                     size: int = 0x2000) -> bytes:
+    """生成合成的转储头部（测试 / 基准用），timestamp 为 UTC"""
+    buf = bytearray(size)
+    ft = 0
+    if timestamp is not None:
+        ft = (timestamp - _FILETIME_EPOCH) // datetime.timedelta(microseconds=1) * 10
+    if kind == "kernel64":
+        buf[:8] = b"PAGEDU64"
+        struct.pack_into("<I", buf, _OFF64_BUGCHECK, bugcheck)
+        struct.pack_into("<4Q", buf, _OFF64_PARAMS, *params)
+        struct.pack_into("<Q", buf, _OFF64_SYSTEM_TIME, ft)
+    elif kind == "kernel32":
+        buf[:8] = b"PAGEDUMP"
+        struct.pack_into("<I", buf, _OFF32_BUGCHECK, bugcheck)
+        struct.pack_into("<4I", buf, _OFF32_PARAMS, *params)
+        struct.pack_into("<Q", buf, _OFF32_SYSTEM_TIME, ft)
+    elif kind == "minidump":
+        buf[:4] = b"MDMP"
+        if timestamp is not None:
+            struct.pack_into("<I", buf, _OFF_MDMP_TIMESTAMP,
+                             int((timestamp - _EPOCH).total_seconds()))
+    return bytes(buf)
@@ -0,0 +1,55 @@
+# modules/logbuffer.py
+"""
+日志缓冲（与 Tk 无关，可在无界面环境下测试 / 跑基准）：
+- append() 只做时间戳格式化并放入待写列表，线程安全
+- drain() 一次取出所有待写行，LogPanel 合并成一次 Text.insert
+- 记录已写入的总行数，超过 max_lines 时给出需要从顶部删除的行数
+"""
+
+import datetime
+import threading
+from typing import List, Tuple
+
+DEFAULT_MAX_LINES = 5000
+
+
+class LogBuffer:
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES):
+        self.max_lines = max_lines
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._lines = 0          # 已写入界面的行数
+        self._last_sec = -1.0
+        self._last_ts = ""
+
+    def _timestamp(self) -> str:
+        # 同一秒内的多条日志复用已格式化的时间戳
+        now = datetime.datetime.now()
+        sec = now.replace(microsecond=0).timestamp()
+        if sec != self._last_sec:
+            self._last_sec = sec
+            self._last_ts = now.strftime("%H:%M:%S")
+        return self._last_ts
+
+    def append(self, msg: str):
+        with self._lock:
+            self._pending.append(f"[{self._timestamp()}] {msg}\n")
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def drain(self) -> Tuple[str, int]:
+        """
+        取出待写文本，返回 (文本, 需要从顶部删除的行数)。
+        消息本身可能含换行，这里按实际行数计数。
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return "", 0
+        text = "".join(pending)
+        self._lines += text.count("\n")
+        excess = max(0, self._lines - self.max_lines)
+        self._lines -= excess
+        return text, excess
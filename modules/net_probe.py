@@ -0,0 +1,290 @@
+# modules/net_probe.py
+"""
+网络延迟 / 抖动监控：
+- 对配置的游戏服务器端点并发做 TCP 建连计时或 UDP 回显计时
+- 每个端点的结果写入固定容量的环形缓冲区，滚动计算 p50 / p99 / 抖动 / 丢包
+- 后台线程运行独立的 asyncio 事件循环，GUI 线程只读取快照
+- measure() 做一次短时突发测量，供 TaskRunner 在每个网络任务前后对比
+
+端点列表可在数据目录的 net_endpoints.json 中配置：
+    [{"name": "Steam", "host": "store.steampowered.com", "port": 443, "proto": "tcp"}, ...]
+"""
+
+import asyncio
+import json
+import math
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+from .app_paths import data_dir
+from .command_exec import run_sync
+from .ringbuffer import RingBuffer
+
+Logger = Callable[[str], None]
+
+ENDPOINTS_FILE = "net_endpoints.json"
+
+
+@dataclass
+class Endpoint:
+    name: str
+    host: str
+    port: int
+    proto: str = "tcp"   # "tcp"：建连耗时；"udp"：回显往返耗时（需对端回显）
+
+
+DEFAULT_ENDPOINTS = [
+    Endpoint("Steam", "store.steampowered.com", 443),
+    Endpoint("腾讯", "www.qq.com", 443),
+    Endpoint("阿里 DNS", "223.5.5.5", 53),
+    Endpoint("Cloudflare", "1.1.1.1", 443),
+]
+
+
+def load_endpoints() -> List[Endpoint]:
+    path = os.path.join(data_dir(), ENDPOINTS_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [Endpoint(**e) for e in json.load(f)]
+    except (OSError, ValueError, TypeError):
+        return list(DEFAULT_ENDPOINTS)
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """最近秩法百分位数：第 ⌈pct/100 × n⌉ 小的值；空序列返回 None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(len(ordered), max(1, math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+@dataclass
+class LatencyStats:
+    name: str
+    sent: int
+    lost: int
+    p50: Optional[float]
+    p99: Optional[float]
+    jitter: Optional[float]
+
+    @property
+    def loss(self) -> float:
+        return self.lost / self.sent if self.sent else 0.0
+
+    def summary(self) -> str:
+        if self.p50 is None:
+            return f"无响应（丢包 {self.loss:.0%}）"
+        return (f"p50 {self.p50:.1f} ms，p99 {self.p99:.1f} ms，"
+                f"抖动 {self.jitter:.1f} ms，丢包 {self.loss:.0%}")
+
+    def describe(self) -> str:
+        return f"{self.name}：{self.summary()}"
+
+
+class EndpointSeries:
+    """
+    单个端点的滚动统计。
+    丢失的探测在 latency 中记为 NaN，保证窗口内成功与失败按时间对齐。
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.latency = RingBuffer(capacity)
+        self._lock = threading.Lock()
+
+    def add(self, ms: Optional[float]):
+        with self._lock:
+            self.latency.append(float("nan") if ms is None else ms)
+
+    def stats(self) -> LatencyStats:
+        with self._lock:
+            window = self.latency.values()
+        ok = [v for v in window if not math.isnan(v)]
+        # 抖动：相邻两次成功探测的平均绝对差（RFC 3550 思路）
+        jitter = (sum(abs(b - a) for a, b in zip(ok, ok[1:])) / (len(ok) - 1)
+                  if len(ok) > 1 else (0.0 if ok else None))
+        return LatencyStats(
+            name=self.name,
+            sent=len(window),
+            lost=len(window) - len(ok),
+            p50=percentile(ok, 50),
+            p99=percentile(ok, 99),
+            jitter=jitter,
+        )
+
+
+# ============================================================
+#                          探测
+# ============================================================
+async def tcp_connect_ms(host: str, port: int, timeout: float) -> Optional[float]:
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    ms = (time.perf_counter() - start) * 1000
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return ms
+
+
+class _EchoProtocol(asyncio.DatagramProtocol):
+    def __init__(self, payload: bytes, fut: asyncio.Future):
+        self.payload = payload
+        self.fut = fut
+
+    def datagram_received(self, data, addr):
+        if data == self.payload and not self.fut.done():
+            self.fut.set_result(time.perf_counter())
+
+    def error_received(self, exc):
+        if not self.fut.done():
+            self.fut.set_exception(exc)
+
+
+async def udp_echo_ms(host: str, port: int, timeout: float, seq: int = 0) -> Optional[float]:
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+    payload = struct.pack(">Id", seq, time.time())
+    try:
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _EchoProtocol(payload, fut), remote_addr=(host, port))
+    except OSError:
+        return None
+    try:
+        start = time.perf_counter()
+        transport.sendto(payload)
+        end = await asyncio.wait_for(fut, timeout)
+        return (end - start) * 1000
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        transport.close()
+
+
+async def _resolve(endpoints: Sequence[Endpoint]) -> List[str]:
+    """提前解析一次主机名，避免把 DNS 耗时算进延迟；结果与 endpoints 一一对应"""
+    loop = asyncio.get_running_loop()
+    resolved = []
+    for ep in endpoints:
+        try:
+            infos = await loop.getaddrinfo(ep.host, ep.port)
+            resolved.append(infos[0][4][0])
+        except OSError:
+            resolved.append(ep.host)
+    return resolved
+
+
+async def _probe_once(ep: Endpoint, addr: str, timeout: float, seq: int) -> Optional[float]:
+    if ep.proto == "udp":
+        return await udp_echo_ms(addr, ep.port, timeout, seq)
+    return await tcp_connect_ms(addr, ep.port, timeout)
+
+
+# ============================================================
+#                        监控器
+# ============================================================
+class LatencyMonitor:
+    """
+    端点按列表位置一一对应各自的统计序列（名称可能重复，不作为键）。
+    每次 start() 使用新的停止事件：stop() 后立即重新 start() 时，
+    旧线程仍会按自己的事件退出，不会出现两个线程同时写入。
+    """
+
+    def __init__(self, endpoints: Optional[List[Endpoint]] = None,
+                 interval: float = 1.0, window: int = 120, timeout: float = 1.0):
+        self.endpoints = endpoints if endpoints is not None else load_endpoints()
+        self.interval = interval
+        self.timeout = timeout
+        self.window = window
+        self.series = [EndpointSeries(ep.name, window) for ep in self.endpoints]
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._thread_main, args=(self._stop,),
+                                        name="LatencyMonitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """停止监控；timeout 不为 None 时最多等待这么久让线程退出"""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and timeout is not None:
+            thread.join(timeout)
+
+    def _thread_main(self, stop: threading.Event):
+        asyncio.run(self._loop(stop))
+
+    async def _loop(self, stop: threading.Event):
+        addrs = await _resolve(self.endpoints)
+        seq = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            results = await asyncio.gather(*(
+                _probe_once(ep, addr, self.timeout, seq)
+                for ep, addr in zip(self.endpoints, addrs)
+            ))
+            if stop.is_set():
+                break
+            for series, ms in zip(self.series, results):
+                series.add(ms)
+            seq += 1
+            delay = self.interval - (time.perf_counter() - start)
+            if delay > 0:
+                # 用 Event.wait 可以被 stop() 立即打断；放到线程池避免阻塞事件循环
+                await asyncio.get_running_loop().run_in_executor(None, stop.wait, delay)
+
+    def snapshot(self) -> List[LatencyStats]:
+        return [series.stats() for series in self.series]
+
+    def measure(self, rounds: int = 3) -> List[LatencyStats]:
+        """
+        同步突发测量（与滚动窗口互不影响），用于任务前后对比。
+        各端点并发，每轮之间间隔 100ms。
+        """
+        async def run():
+            addrs = await _resolve(self.endpoints)
+            series = [EndpointSeries(ep.name, rounds) for ep in self.endpoints]
+            for seq in range(rounds):
+                results = await asyncio.gather(*(
+                    _probe_once(ep, addr, self.timeout, seq)
+                    for ep, addr in zip(self.endpoints, addrs)
+                ))
+                for s, ms in zip(series, results):
+                    s.add(ms)
+                await asyncio.sleep(0.1)
+            return [s.stats() for s in series]
+
+        return run_sync(run)
+
+
+def _delta(before: Optional[float], after: Optional[float]) -> str:
+    if before is None or after is None:
+        return "-"
+    return f"{after - before:+.1f} ms"
+
+
+def log_comparison(before: List[LatencyStats], after: List[LatencyStats], logger: Logger):
+    logger("---------- 网络延迟前后对比 ----------")
+    for b, a in zip(before, after):
+        logger(f"  {a.name}：")
+        logger(f"    执行前  {b.summary()}")
+        logger(f"    执行后  {a.summary()}")
+        logger(f"    变化    p50 {_delta(b.p50, a.p50)}，抖动 {_delta(b.jitter, a.jitter)}，"
+               f"丢包 {a.loss - b.loss:+.0%}")
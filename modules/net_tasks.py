@@ -1,26 +1,36 @@
-import subprocess
-from typing import Callable
+# modules/net_tasks.py
+import asyncio
+import ipaddress
+import json
+import os
+import re
+import secrets
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .app_paths import data_dir
+from .command_exec import get_executor, run_command, run_sync
+from .net_probe import percentile
 
 Logger = Callable[[str], None]
 
 
-def _run_simple(cmd: list, logger: Logger):
-    try:
-        logger(f"  执行命令：{' '.join(cmd)}")
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
-        if e.returncode == 1:
-            logger("  命令返回 1：系统当前状态无需修复（非真正错误）")
-            return
-        logger(f"  命令执行错误码：{e.returncode}")
-        raise
+def _run_netsh(cmd: list, logger: Logger):
+    """netsh / ipconfig 返回 1 通常表示「当前状态无需修复」，不视为错误"""
+    result = run_command(cmd, logger, ok_codes=(0, 1))
+    if result.returncode == 1:
+        logger("  命令返回 1：系统当前状态无需修复（非真正错误）")
+    return result
 
 # --------------------------
 #  刷新 DNS 缓存
 # --------------------------
 def flush_dns(logger: Logger):
     logger("  刷新 DNS 缓存（ipconfig /flushdns）")
-    _run_simple(["ipconfig", "/flushdns"], logger)
+    _run_netsh(["ipconfig", "/flushdns"], logger)
 
 
 # --------------------------
@@ -28,7 +38,7 @@ def flush_dns(logger: Logger):
 # --------------------------
 def winsock_reset(logger: Logger):
     logger("  重置 Winsock（netsh winsock reset）")
-    _run_simple(["netsh", "winsock", "reset"], logger)
+    _run_netsh(["netsh", "winsock", "reset"], logger)
 
 
 # --------------------------
@@ -36,12 +46,433 @@ def winsock_reset(logger: Logger):
 # --------------------------
 def tcpip_reset(logger: Logger):
     logger("  轻量重置 TCP/IP（netsh int ip reset）")
-    _run_simple(["netsh", "int", "ip", "reset"], logger)
+    _run_netsh(["netsh", "int", "ip", "reset"], logger)
 
 
 # --------------------------
-#  设置 DNS
+#  设置 DNS（所有活动网卡）
 # --------------------------
-def set_dns(logger: Logger, ip: str):
-    logger(f"  设置 DNS：{ip}")
-    _run_simple(["netsh", "interface", "ip", "set", "dns", "name=Wi-Fi", f"static", ip], logger)
+@dataclass
+class DnsServers:
+    primary: str
+    secondary: str = ""
+    primary_v6: str = ""
+    secondary_v6: str = ""
+
+    def describe(self) -> str:
+        text = " / ".join(x for x in (self.primary, self.secondary) if x)
+        v6 = " / ".join(x for x in (self.primary_v6, self.secondary_v6) if x)
+        return f"{text}（IPv6：{v6}）" if v6 else text
+
+    def validate(self) -> "DnsServers":
+        """检查各地址的格式与协议族，返回规范化后的副本；不合法时抛出 ValueError"""
+        fields = {}
+        for name, version in (("primary", 4), ("secondary", 4),
+                              ("primary_v6", 6), ("secondary_v6", 6)):
+            text = getattr(self, name).strip()
+            if not text:
+                if name == "primary":
+                    raise ValueError("未填写主 DNS")
+                fields[name] = ""
+                continue
+            try:
+                ip = ipaddress.ip_address(text)
+            except ValueError:
+                raise ValueError(f"{text} 不是合法的 IP 地址") from None
+            if ip.version != version:
+                raise ValueError(f"{text} 不是 IPv{version} 地址")
+            fields[name] = str(ip)
+        return DnsServers(**fields)
+
+    def plan(self) -> Dict[int, List[str]]:
+        """协议族 → 按顺序设置的服务器；没有填写 IPv6 时不修改 IPv6"""
+        plan = {4: [x for x in (self.primary, self.secondary) if x]}
+        v6 = [x for x in (self.primary_v6, self.secondary_v6) if x]
+        if v6:
+            plan[6] = v6
+        return plan
+
+
+# 名称中包含这些关键字的网卡不修改（回环、虚拟机、隧道）
+VIRTUAL_ADAPTER_KEYWORDS = (
+    "loopback", "vethernet", "vmware", "virtualbox", "hyper-v",
+    "isatap", "teredo", "npcap", "tap-", "wsl",
+)
+
+DNS_BACKUP_FILE = "dns_backup.json"
+
+
+def list_active_adapters() -> List[str]:
+    """
+    通过 psutil 找出当前处于连接状态、且拥有可用 IPv4 地址的物理网卡。
+    （有线 / 无线 / 多网卡均可识别，不再写死 Wi-Fi）
+    """
+    import psutil
+
+    stats = psutil.net_if_stats()
+    addrs = psutil.net_if_addrs()
+    active = []
+    for name, st in stats.items():
+        if not st.isup:
+            continue
+        if any(k in name.lower() for k in VIRTUAL_ADAPTER_KEYWORDS):
+            continue
+        for a in addrs.get(name, []):
+            if a.family == socket.AF_INET and not a.address.startswith(("127.", "169.254.")):
+                active.append(name)
+                break
+    return active
+
+
+def _extract_ips(text: str, version: int) -> List[str]:
+    found = []
+    for token in re.split(r"[\s,]+", text):
+        try:
+            ip = ipaddress.ip_address(token.split("%")[0])
+        except ValueError:
+            continue
+        if ip.version == version and str(ip) not in found:
+            found.append(str(ip))
+    return found
+
+
+def _parse_dns_config(output: str, version: int) -> dict:
+    """解析 netsh show dnsservers 输出（中英文系统均适用：只依赖 DHCP 关键字和 IP 格式）"""
+    return {"dhcp": "DHCP" in output, "servers": _extract_ips(output, version)}
+
+
+def _netsh_family(version: int) -> str:
+    return "ipv4" if version == 4 else "ipv6"
+
+
+async def _read_adapter_dns(executor, adapter: str) -> dict:
+    config = {}
+    for version in (4, 6):
+        r = await executor.run_async(
+            ["netsh", "interface", _netsh_family(version), "show", "dnsservers", adapter],
+            check=False, timeout=15,
+        )
+        config[f"v{version}"] = _parse_dns_config(r.stdout, version)
+    return config
+
+
+def _dns_commands(adapter: str, version: int, servers: List[str], dhcp: bool = False) -> List[List[str]]:
+    family = _netsh_family(version)
+    if dhcp:
+        return [["netsh", "interface", family, "set", "dnsservers", adapter, "dhcp"]]
+    cmds = [["netsh", "interface", family, "set", "dnsservers", adapter,
+             "static", servers[0], "primary", "validate=no"]]
+    for index, ip in enumerate(servers[1:], start=2):
+        cmds.append(["netsh", "interface", family, "add", "dnsservers", adapter,
+                     ip, f"index={index}", "validate=no"])
+    return cmds
+
+
+async def _apply_adapter(executor, adapter: str, plan: Dict[int, dict], logger: Logger):
+    """同一网卡内按顺序执行（先 set 再 add），不同网卡之间并发"""
+    for version, cfg in plan.items():
+        for cmd in _dns_commands(adapter, version, cfg["servers"], cfg.get("dhcp", False)):
+            await executor.run_async(cmd, logger, ok_codes=(0, 1), timeout=30)
+
+
+def _load_dns_backup() -> dict:
+    path = os.path.join(data_dir(), DNS_BACKUP_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_dns_backup(backup: dict):
+    path = os.path.join(data_dir(), DNS_BACKUP_FILE)
+    if not backup:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(backup, f, ensure_ascii=False, indent=2)
+
+
+def set_dns(logger: Logger, servers):
+    """
+    把 DNS 应用到所有活动网卡：
+    1. 读取并备份各网卡被修改的协议族的当前 DNS（已有备份的保留最初的备份）
+    2. 所有网卡并发执行 netsh（IPv4 主/备，可选 IPv6）
+    3. 重新读取配置核对每个协议族的全部服务器，并直接向每个 DNS 发起一次测试解析
+    """
+    if isinstance(servers, str):
+        servers = DnsServers(primary=servers)
+    servers = servers.validate()
+    logger(f"  设置 DNS：{servers.describe()}")
+
+    adapters = list_active_adapters()
+    if not adapters:
+        logger("  未找到处于连接状态的网卡，跳过。")
+        return
+    logger(f"  活动网卡：{'，'.join(adapters)}")
+
+    targets = servers.plan()
+    plan: Dict[int, dict] = {version: {"servers": ips} for version, ips in targets.items()}
+
+    executor = get_executor()
+
+    async def run_all():
+        before = await asyncio.gather(*(_read_adapter_dns(executor, a) for a in adapters))
+        backup = _load_dns_backup()
+        for adapter, config in zip(adapters, before):
+            # 只备份本次修改的协议族，恢复时不会动用户没改过的那一族
+            saved = backup.setdefault(adapter, {})
+            for version in plan:
+                saved.setdefault(f"v{version}", config[f"v{version}"])
+        _save_dns_backup(backup)
+
+        results = await asyncio.gather(
+            *(_apply_adapter(executor, a, plan, logger) for a in adapters),
+            return_exceptions=True,
+        )
+        after = await asyncio.gather(*(_read_adapter_dns(executor, a) for a in adapters))
+        return results, after
+
+    results, after = run_sync(run_all)
+
+    # 核对：每个协议族读回的服务器必须与目标完全一致（顺序相同）
+    ok_count = 0
+    for adapter, res, config in zip(adapters, results, after):
+        if isinstance(res, Exception):
+            logger(f"  × {adapter}：设置失败（{res}）")
+            continue
+        mismatched = []
+        for version, expected in targets.items():
+            current = config[f"v{version}"]["servers"]
+            if current[:len(expected)] != expected:
+                mismatched.append(f"IPv{version} 为 {' / '.join(current) or '（空）'}")
+        if mismatched:
+            logger(f"  ? {adapter}：读取到的 DNS {'，'.join(mismatched)}，与目标不一致")
+        else:
+            ok_count += 1
+            current = [ip for version in targets for ip in config[f"v{version}"]["servers"]]
+            logger(f"  √ {adapter}：当前 DNS {' / '.join(current)}")
+
+    # 测试解析：直接向每个 DNS 查询一次（含备用与 IPv6）
+    tested = [ip for ips in targets.values() for ip in ips]
+    tests = benchmark_dns(tested, domains=DEFAULT_BENCH_DOMAINS[:1], timeout=3)
+    for test in sorted(tests, key=lambda r: tested.index(r.server)):
+        if test.samples:
+            logger(f"  测试解析成功：{test.server} 响应 {fmt_ms(test.p50)}")
+        else:
+            reason = test.error or "无响应"
+            logger(f"  测试解析失败：{test.server} {reason}，可执行「恢复原 DNS 设置」回退")
+
+    logger(f"  DNS 已应用到 {ok_count}/{len(adapters)} 个网卡（原设置已备份）。")
+
+
+def restore_dns(logger: Logger):
+    """按备份恢复各网卡原来的 DNS（DHCP 或静态地址），恢复后删除备份"""
+    backup = _load_dns_backup()
+    if not backup:
+        logger("  没有 DNS 备份，无需恢复。")
+        return
+
+    executor = get_executor()
+
+    def plan_of(config: dict) -> Dict[int, dict]:
+        # 备份中只有被修改过的协议族；其余保持现状
+        plan = {}
+        for version in (4, 6):
+            cfg = config.get(f"v{version}")
+            if cfg is None:
+                continue
+            if cfg.get("dhcp") or not cfg.get("servers"):
+                plan[version] = {"dhcp": True, "servers": []}
+            else:
+                plan[version] = {"servers": cfg["servers"]}
+        return plan
+
+    async def run_all():
+        return await asyncio.gather(
+            *(_apply_adapter(executor, a, plan_of(c), logger) for a, c in backup.items()),
+            return_exceptions=True,
+        )
+
+    results = run_sync(run_all)
+    remaining = {}
+    for (adapter, config), res in zip(backup.items(), results):
+        if isinstance(res, Exception):
+            logger(f"  × {adapter}：恢复失败（{res}），备份已保留")
+            remaining[adapter] = config
+        else:
+            logger(f"  √ {adapter}：已恢复原 DNS 设置")
+    _save_dns_backup(remaining)
+
+
+# ============================================================
+#                    DNS 服务器延迟测速
+# ============================================================
+DEFAULT_BENCH_DOMAINS = [
+    "www.baidu.com",
+    "www.qq.com",
+    "store.steampowered.com",
+    "www.bilibili.com",
+    "www.microsoft.com",
+]
+
+
+def build_dns_query(domain: str, qid: int, qtype: int = 1) -> bytes:
+    """构造一个标准递归查询报文（默认 A 记录）"""
+    header = struct.pack(">HHHHHH", qid, 0x0100, 1, 0, 0, 0)
+    qname = b"".join(
+        bytes([len(label)]) + label
+        for label in (p.encode("idna") for p in domain.strip(".").split("."))
+    ) + b"\x00"
+    return header + qname + struct.pack(">HH", qtype, 1)
+
+
+@dataclass
+class DnsBenchResult:
+    server: str
+    sent: int = 0
+    timeouts: int = 0
+    samples: List[float] = field(default_factory=list)     # 所有成功查询的耗时（ms）
+    cached: List[float] = field(default_factory=list)      # 重复查询（应命中服务器缓存）
+    uncached: List[float] = field(default_factory=list)    # 随机子域名（必然未命中缓存）
+    error: str = ""
+
+    @property
+    def p50(self) -> Optional[float]:
+        return percentile(self.samples, 50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return percentile(self.samples, 95)
+
+    @property
+    def cached_p50(self) -> Optional[float]:
+        return percentile(self.cached, 50)
+
+    @property
+    def uncached_p50(self) -> Optional[float]:
+        return percentile(self.uncached, 50)
+
+    @property
+    def loss(self) -> float:
+        return self.timeouts / self.sent if self.sent else 1.0
+
+    @property
+    def score(self) -> float:
+        """排序依据：中位延迟 + 丢包惩罚（每 1% 丢包折算 20ms）"""
+        if not self.samples:
+            return float("inf")
+        return (self.p50 or 0) + self.loss * 2000
+
+
+class _DnsClientProtocol(asyncio.DatagramProtocol):
+    """按报文 ID 把响应分发给等待中的 future"""
+
+    def __init__(self):
+        self.transport = None
+        self.waiters: Dict[int, asyncio.Future] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        qid, flags = struct.unpack(">HH", data[:4])
+        fut = self.waiters.pop(qid, None)
+        # QR 位为 1 才是响应；rcode（NXDOMAIN 等）不影响计时
+        if fut and not fut.done() and flags & 0x8000:
+            fut.set_result(time.perf_counter())
+
+    def error_received(self, exc):
+        for fut in self.waiters.values():
+            if not fut.done():
+                fut.set_exception(exc)
+        self.waiters.clear()
+
+
+async def _bench_server(server: str, domains: Sequence[str], rounds: int,
+                        timeout: float, port: int) -> DnsBenchResult:
+    result = DnsBenchResult(server=server)
+    loop = asyncio.get_running_loop()
+    try:
+        transport, proto = await loop.create_datagram_endpoint(
+            _DnsClientProtocol, remote_addr=(server, port))
+    except OSError as e:
+        result.error = str(e)
+        return result
+
+    async def query(domain: str) -> Optional[float]:
+        qid = secrets.randbelow(0x10000)
+        while qid in proto.waiters:
+            qid = secrets.randbelow(0x10000)
+        fut = loop.create_future()
+        proto.waiters[qid] = fut
+        result.sent += 1
+        start = time.perf_counter()
+        transport.sendto(build_dns_query(domain, qid))
+        try:
+            end = await asyncio.wait_for(fut, timeout)
+        except (asyncio.TimeoutError, OSError):
+            proto.waiters.pop(qid, None)
+            result.timeouts += 1
+            return None
+        ms = (end - start) * 1000
+        result.samples.append(ms)
+        return ms
+
+    try:
+        for _ in range(rounds):
+            for domain in domains:
+                # 随机子域名：服务器必须递归查询，反映未缓存时的延迟
+                ms = await query(f"{secrets.token_hex(4)}.{domain}")
+                if ms is not None:
+                    result.uncached.append(ms)
+                # 第一次查询预热缓存，第二次即为缓存命中延迟
+                await query(domain)
+                ms = await query(domain)
+                if ms is not None:
+                    result.cached.append(ms)
+    finally:
+        transport.close()
+    return result
+
+
+async def benchmark_dns_async(servers: Sequence[str],
+                              domains: Sequence[str] = DEFAULT_BENCH_DOMAINS,
+                              rounds: int = 1, timeout: float = 2.0,
+                              port: int = 53) -> List[DnsBenchResult]:
+    """所有候选服务器并发测速（同一服务器内的查询顺序执行，避免相互干扰）"""
+    results = await asyncio.gather(
+        *(_bench_server(s, domains, rounds, timeout, port) for s in servers)
+    )
+    return sorted(results, key=lambda r: r.score)
+
+
+def benchmark_dns(servers: Sequence[str], logger: Optional[Logger] = None,
+                  domains: Sequence[str] = DEFAULT_BENCH_DOMAINS, rounds: int = 1,
+                  timeout: float = 2.0, port: int = 53) -> List[DnsBenchResult]:
+    """
+    同步入口：返回按综合延迟排序的结果列表。
+    port 可改为本地测试用的 DNS 应答器端口（如 127.0.0.1:5353）。
+    """
+    if logger:
+        logger(f"  DNS 测速：{len(servers)} 个服务器 × {len(domains)} 个域名")
+    results = run_sync(lambda: benchmark_dns_async(servers, domains, rounds, timeout, port))
+    if logger:
+        for i, r in enumerate(results, 1):
+            logger(f"    {i}. {format_bench_row(r)}")
+    return results
+
+
+def fmt_ms(v: Optional[float]) -> str:
+    return "-" if v is None else f"{v:.0f} ms"
+
+
+def format_bench_row(r: DnsBenchResult) -> str:
+    if r.error:
+        return f"{r.server}：测速失败（{r.error}）"
+    return (f"{r.server}：中位 {fmt_ms(r.p50)}，P95 {fmt_ms(r.p95)}，"
+            f"缓存 {fmt_ms(r.cached_p50)}，未缓存 {fmt_ms(r.uncached_p50)}，"
+            f"超时 {r.timeouts}/{r.sent}")
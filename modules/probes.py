@@ -0,0 +1,104 @@
+# modules/probes.py
+"""
+任务状态探测：
+在真正执行任务前，用极低成本判断系统是否已处于目标状态。
+
+同一次执行中的所有探测共享一个 ProbeContext，结果会被缓存：
+- 所有电源计划任务共用一次 powercfg /getactivescheme
+- 同一个注册表键只读取一次（一次枚举拿到全部值）
+- 每个缓存目录只检查一次，找到第一个文件即返回（空的子目录不算）
+"""
+
+import os
+import re
+from typing import Callable, Dict, Optional, Tuple
+
+from . import registry
+from .command_exec import run_command
+
+# 返回 True 表示「已是目标状态，无需执行」
+ProbeFunc = Callable[["ProbeContext"], bool]
+
+_GUID_RE = re.compile(r"[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}")
+
+_MISSING = object()
+
+
+class ProbeContext:
+    def __init__(self, registry_backend: Optional[registry.RegistryBackend] = None):
+        self.registry_backend = registry_backend
+        self._power_scheme = _MISSING
+        self._reg_cache: Dict[Tuple[str, str], Optional[Dict[str, Tuple[object, int]]]] = {}
+        self._dir_cache: Dict[str, bool] = {}
+
+    # --------------------------
+    #  电源计划
+    # --------------------------
+    def active_power_scheme(self) -> Optional[str]:
+        """当前激活的电源计划 GUID（小写）；读取失败返回 None"""
+        if self._power_scheme is _MISSING:
+            self._power_scheme = None
+            try:
+                out = run_command(["powercfg", "/getactivescheme"], timeout=5).stdout
+                m = _GUID_RE.search(out)
+                if m:
+                    self._power_scheme = m.group(0).lower()
+            except Exception:
+                pass
+        return self._power_scheme
+
+    # --------------------------
+    #  注册表
+    # --------------------------
+    def registry_values(self, hive: str, path: str) -> Optional[Dict[str, Tuple[object, int]]]:
+        """键下所有值；键不存在或读取失败返回 None"""
+        k = (hive, path.lower())
+        if k not in self._reg_cache:
+            try:
+                backend = self.registry_backend or registry.get_backend()
+                self._reg_cache[k] = backend.read_values(hive, path)
+            except Exception:
+                self._reg_cache[k] = None
+        return self._reg_cache[k]
+
+    def registry_value(self, hive: str, path: str, name: str):
+        values = self.registry_values(hive, path)
+        if values is None or name not in values:
+            return None
+        return values[name][0]
+
+    # --------------------------
+    #  目录
+    # --------------------------
+    def has_no_files(self, path: str) -> bool:
+        """
+        目录不存在，或其中（含子目录）没有任何文件时返回 True。
+        只剩空子目录的缓存目录清理后也回收不了空间，视为已是目标状态。
+        """
+        if path not in self._dir_cache:
+            if not os.path.isdir(path):
+                # 不存在视为空，无权限等交给任务本身处理
+                self._dir_cache[path] = not os.path.exists(path)
+            else:
+                self._dir_cache[path] = not _contains_file(path)
+        return self._dir_cache[path]
+
+
+def _contains_file(path: str) -> bool:
+    """遇到第一个文件即返回；不进入符号链接目录，无法读取的子目录视为含有文件（交给任务处理）"""
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                    except OSError:
+                        pass
+                    return True
+        except OSError:
+            return True
+    return False
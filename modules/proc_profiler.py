@@ -0,0 +1,220 @@
+# modules/proc_profiler.py
+"""
+后台进程与启动项分析：
+- 在一个时间窗口内多次采样所有进程的 CPU 时间、工作集与 I/O 计数（psutil oneshot）
+- 以 (pid, 创建时间) 为键计算窗口内增量，排除 PID 复用造成的误差
+- 按 CPU / 内存 / 磁盘 I/O 分别列出占用最高的进程
+- 列出 Run 注册表键与启动文件夹中的开机启动项
+
+结果输出为 Finding 列表，与诊断报告使用同一套渲染。
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import registry
+from .cleaner import format_bytes
+from .findings import INFO, WARNING, Finding, note
+
+Logger = Callable[[str], None]
+
+PROCESS_SOURCE = "进程"
+STARTUP_SOURCE = "启动项"
+
+DEFAULT_WINDOW = 10.0
+DEFAULT_SAMPLES = 5
+DEFAULT_TOP = 8
+
+# 超过以下阈值的进程标记为警告
+CPU_WARN_PERCENT = 10.0          # 单核百分比
+IO_WARN_BYTES_PER_SEC = 5 * 1024 * 1024
+RSS_WARN_BYTES = 1024 * 1024 * 1024
+
+RUN_KEYS = [
+    (registry.HKCU, r"Software\Microsoft\Windows\CurrentVersion\Run"),
+    (registry.HKCU, r"Software\Microsoft\Windows\CurrentVersion\RunOnce"),
+    (registry.HKLM, r"Software\Microsoft\Windows\CurrentVersion\Run"),
+    (registry.HKLM, r"Software\Microsoft\Windows\CurrentVersion\RunOnce"),
+    (registry.HKLM, r"Software\WOW6432Node\Microsoft\Windows\CurrentVersion\Run"),
+]
+
+
+def startup_folders() -> List[str]:
+    folders = []
+    appdata = os.environ.get("APPDATA")
+    if appdata:
+        folders.append(os.path.join(appdata, r"Microsoft\Windows\Start Menu\Programs\Startup"))
+    programdata = os.environ.get("PROGRAMDATA", r"C:\ProgramData")
+    folders.append(os.path.join(programdata, r"Microsoft\Windows\Start Menu\Programs\StartUp"))
+    return folders
+
+
+# ============================================================
+#                          进程采样
+# ============================================================
+# (pid, create_time) → (name, cpu 秒, rss, io 读写字节合计)
+Sample = Dict[Tuple[int, float], Tuple[str, float, int, int]]
+
+
+def sample_processes(ps) -> Sample:
+    result: Sample = {}
+    for proc in ps.process_iter():
+        try:
+            with proc.oneshot():
+                ct = proc.create_time()
+                name = proc.name()
+                cpu = proc.cpu_times()
+                rss = proc.memory_info().rss
+                try:
+                    io = proc.io_counters()
+                    io_bytes = io.read_bytes + io.write_bytes
+                except (ps.AccessDenied, AttributeError):
+                    io_bytes = 0
+        except (ps.NoSuchProcess, ps.AccessDenied, ps.ZombieProcess, OSError):
+            continue
+        result[(proc.pid, ct)] = (name, cpu.user + cpu.system, rss, io_bytes)
+    return result
+
+
+@dataclass
+class ProcessUsage:
+    pid: int
+    name: str
+    cpu_percent: float       # 窗口内平均，单核百分比
+    rss_peak: int
+    io_rate: float           # 字节/秒
+
+    def describe(self) -> str:
+        return (f"{self.name}（PID {self.pid}）：CPU {self.cpu_percent:.1f}%，"
+                f"内存 {format_bytes(self.rss_peak)}，磁盘 I/O {format_bytes(int(self.io_rate))}/s")
+
+
+def profile_processes(window: float = DEFAULT_WINDOW, samples: int = DEFAULT_SAMPLES,
+                      psutil_mod=None, sleep: Callable[[float], None] = time.sleep
+                      ) -> Tuple[List[ProcessUsage], float]:
+    """
+    在 window 秒内采样 samples 次（至少两次），返回每个进程的窗口统计与实际窗口长度。
+    只在窗口开始和结束都存在的进程才计算 CPU / I/O 增量。
+    """
+    if psutil_mod is None:
+        import psutil as psutil_mod
+    ps = psutil_mod
+    samples = max(2, samples)
+
+    first = sample_processes(ps)
+    t0 = time.perf_counter()
+    peak: Dict[Tuple[int, float], int] = {k: v[2] for k, v in first.items()}
+    last = first
+    for _ in range(samples - 1):
+        sleep(window / (samples - 1))
+        last = sample_processes(ps)
+        for k, v in last.items():
+            if v[2] > peak.get(k, 0):
+                peak[k] = v[2]
+    elapsed = max(time.perf_counter() - t0, 1e-6)
+
+    usage = []
+    for key, (name, cpu1, _, io1) in last.items():
+        start = first.get(key)
+        if start is None:
+            continue
+        _, cpu0, _, io0 = start
+        usage.append(ProcessUsage(
+            pid=key[0],
+            name=name,
+            cpu_percent=max(cpu1 - cpu0, 0.0) / elapsed * 100,
+            rss_peak=peak.get(key, 0),
+            io_rate=max(io1 - io0, 0) / elapsed,
+        ))
+    return usage, elapsed
+
+
+def _top(usage: List[ProcessUsage], key, n: int) -> List[ProcessUsage]:
+    # System Idle Process 的 CPU 时间是空闲时间，不参与排名
+    ranked = sorted((u for u in usage if u.pid != 0), key=key, reverse=True)
+    return ranked[:n]
+
+
+def process_findings(usage: List[ProcessUsage], elapsed: float,
+                     top: int = DEFAULT_TOP) -> List[Finding]:
+    findings = [note(PROCESS_SOURCE, f"采样窗口：{elapsed:.1f} 秒，共 {len(usage)} 个进程")]
+    rankings = [
+        ("CPU", lambda u: u.cpu_percent, lambda u: u.cpu_percent >= CPU_WARN_PERCENT),
+        ("内存", lambda u: u.rss_peak, lambda u: u.rss_peak >= RSS_WARN_BYTES),
+        ("磁盘 I/O", lambda u: u.io_rate, lambda u: u.io_rate >= IO_WARN_BYTES_PER_SEC),
+    ]
+    for label, key, is_heavy in rankings:
+        for rank, u in enumerate(_top(usage, key, top), 1):
+            if not key(u):
+                break
+            findings.append(Finding(
+                source=PROCESS_SOURCE,
+                severity=WARNING if is_heavy(u) else INFO,
+                title=f"{label} 第 {rank}：{u.describe()}",
+                module=u.name,
+                extra={"ranking": label, "pid": u.pid},
+            ))
+    return findings
+
+
+# ============================================================
+#                           启动项
+# ============================================================
+def startup_findings(backend: Optional[registry.RegistryBackend] = None) -> List[Finding]:
+    if backend is None:
+        try:
+            backend = registry.get_backend()
+        except ImportError:
+            backend = None          # 非 Windows（没有 winreg）：只检查启动文件夹
+    findings: List[Finding] = []
+
+    for hive, path in (RUN_KEYS if backend is not None else ()):
+        try:
+            values = backend.read_values(hive, path)
+        except OSError:
+            continue
+        for name, (command, _) in sorted(values.items()):
+            if not name:
+                continue
+            findings.append(Finding(
+                source=STARTUP_SOURCE,
+                severity=INFO,
+                title=f"{name}（{hive}\\{path.rsplit(chr(92), 1)[-1]}）",
+                detail=str(command),
+                module=name,
+            ))
+
+    for folder in startup_folders():
+        try:
+            with os.scandir(folder) as it:
+                entries = [e for e in it if e.is_file() and e.name.lower() != "desktop.ini"]
+        except OSError:
+            continue
+        for e in sorted(entries, key=lambda e: e.name.lower()):
+            findings.append(Finding(
+                source=STARTUP_SOURCE,
+                severity=INFO,
+                title=f"{e.name}（启动文件夹）",
+                detail=e.path,
+                module=e.name,
+            ))
+
+    if not findings:
+        return [note(STARTUP_SOURCE, "未找到开机启动项")]
+    return findings
+
+
+def run_profile(logger: Logger, window: float = DEFAULT_WINDOW,
+                samples: int = DEFAULT_SAMPLES) -> List[tuple]:
+    """完整分析，返回 render_text 可用的分节结果"""
+    logger(f"正在采样后台进程（{window:g} 秒）……")
+    usage, elapsed = profile_processes(window, samples)
+    logger("正在读取开机启动项……")
+    sections = [
+        ("【资源占用最高的进程】", process_findings(usage, elapsed)),
+        ("【开机启动项】", startup_findings()),
+    ]
+    logger("进程与启动项分析完成。")
+    return sections
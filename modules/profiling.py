@@ -0,0 +1,133 @@
+# modules/profiling.py
+"""
+可选的性能分析模式：
+- 设置环境变量 GAMERTOOL_PROFILE=1，或在「工具与设置」页按 Ctrl+Alt+P 打开隐藏开关
+- 开启后，被包装的调用（单个任务、完整诊断）在 cProfile 下运行，
+  同时在前后各取一次 tracemalloc 快照
+- 每次调用在数据目录 diagnostics\\ 下生成：
+    <时间>_<名称>.prof   —— 可用 snakeviz / python -m pstats 打开
+    <时间>_<名称>.txt    —— 耗时最多的函数与新增内存最多的代码行
+
+关闭时 call() / profiled 只多一次布尔判断，不启动任何分析器。
+"""
+
+import cProfile
+import datetime
+import functools
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+from .app_paths import data_dir
+
+Logger = Callable[[str], None]
+
+ENV_VAR = "GAMERTOOL_PROFILE"
+OUTPUT_DIR = "diagnostics"
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+_enabled = os.environ.get(ENV_VAR, "").strip().lower() not in ("", "0", "false", "no")
+# cProfile 同一时间只能有一个分析器在运行，嵌套调用时直接执行
+_active = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool):
+    global _enabled
+    _enabled = enabled
+
+
+def output_dir() -> str:
+    return data_dir(OUTPUT_DIR)
+
+
+def _safe_name(label: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", label).strip("_") or "run"
+
+
+def _write_summary(path: str, label: str, seconds: float, profiler: cProfile.Profile,
+                   before: Optional[tracemalloc.Snapshot], after: Optional[tracemalloc.Snapshot]):
+    buf = io.StringIO()
+    buf.write(f"{label}\n耗时：{seconds:.3f}s\n\n")
+
+    stats = pstats.Stats(profiler, stream=buf)
+    stats.strip_dirs()
+    buf.write(f"==== 累计耗时最多的 {TOP_FUNCTIONS} 个函数（cumulative） ====\n")
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    buf.write(f"\n==== 自身耗时最多的 {TOP_FUNCTIONS} 个函数（tottime） ====\n")
+    stats.sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+
+    if before is not None and after is not None:
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+        buf.write(f"\n==== 新增内存最多的 {TOP_ALLOCATIONS} 处代码 ====\n")
+        for stat in diff[:TOP_ALLOCATIONS]:
+            buf.write(f"{stat}\n")
+        current, peak = tracemalloc.get_traced_memory()
+        buf.write(f"\n当前跟踪内存：{current / 1024:.1f} KB，峰值：{peak / 1024:.1f} KB\n")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(buf.getvalue())
+
+
+def _profile_call(label: str, func: Callable, args, kwargs, logger: Optional[Logger]):
+    if not _active.acquire(blocking=False):
+        return func(*args, **kwargs)
+    try:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        base = os.path.join(output_dir(), f"{stamp}_{_safe_name(label)}")
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(10)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            after = tracemalloc.take_snapshot()
+            try:
+                profiler.dump_stats(base + ".prof")
+                _write_summary(base + ".txt", label, seconds, profiler, before, after)
+                if logger:
+                    logger(f"  性能分析结果：{base}.prof / .txt")
+            except OSError as e:
+                if logger:
+                    logger(f"  写入性能分析结果失败：{e}")
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+    finally:
+        _active.release()
+
+
+def call(label: str, func: Callable, *args, logger: Optional[Logger] = None, **kwargs):
+    """分析模式开启时在 cProfile + tracemalloc 下执行 func，否则直接调用"""
+    if not _enabled:
+        return func(*args, **kwargs)
+    return _profile_call(label, func, args, kwargs, logger)
+
+
+def profiled(label: str):
+    """装饰器版本的 call()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            return _profile_call(label, func, args, kwargs, None)
+        return wrapper
+    return decorator
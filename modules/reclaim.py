@@ -0,0 +1,78 @@
+# modules/reclaim.py
+"""
+磁盘空间回收报告：
+- 每个清理任务结束后，对其触及的卷再做一次 shutil.disk_usage 快照
+- 与删除引擎记录的「删除前剩余空间」对比，得到实际回收量
+- 按任务、按卷汇总，供 TaskRunner 在执行结束时输出
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+from .cleaner import CleanStats, free_space, format_bytes
+
+Logger = Callable[[str], None]
+
+
+@dataclass
+class VolumeDelta:
+    volume: str
+    free_before: int
+    free_after: int
+
+    @property
+    def reclaimed(self) -> int:
+        return self.free_after - self.free_before
+
+
+@dataclass
+class TaskReclaim:
+    label: str
+    stats: CleanStats
+    volumes: List[VolumeDelta] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+class ReclaimReport:
+    """收集一次 run_selected_tasks 中所有清理任务的回收结果"""
+
+    def __init__(self):
+        self.tasks: List[TaskReclaim] = []
+
+    def add(self, label: str, stats: CleanStats, seconds: float = 0.0) -> TaskReclaim:
+        entry = TaskReclaim(label=label, stats=stats, seconds=seconds)
+        for vol, before in stats.free_before.items():
+            after = free_space(vol)
+            if after is not None:
+                entry.volumes.append(VolumeDelta(vol, before, after))
+        self.tasks.append(entry)
+        return entry
+
+    def per_volume(self) -> Dict[str, int]:
+        """卷 → 所有任务在该卷上回收的空间之和"""
+        result: Dict[str, int] = {}
+        for t in self.tasks:
+            for v in t.volumes:
+                result[v.volume] = result.get(v.volume, 0) + v.reclaimed
+        return result
+
+    def log_summary(self, logger: Logger):
+        if not self.tasks:
+            return
+
+        logger("---------- 磁盘空间回收统计 ----------")
+        for t in self.tasks:
+            s = t.stats
+            line = (f"  {t.label}：删除 {s.files_deleted} 个文件，"
+                    f"{format_bytes(s.bytes_deleted)}，耗时 {t.seconds:.1f}s")
+            if s.failed:
+                line += f"；{s.failed} 个失败（{format_bytes(s.failed_bytes)}）"
+            logger(line)
+            for v in t.volumes:
+                logger(f"    {v.volume} 剩余空间 {format_bytes(v.free_before)} → "
+                       f"{format_bytes(v.free_after)}（{format_bytes(v.reclaimed)}）")
+
+        total_deleted = sum(t.stats.bytes_deleted for t in self.tasks)
+        logger(f"  合计删除：{format_bytes(total_deleted)}")
+        for vol, reclaimed in self.per_volume().items():
+            logger(f"  卷 {vol} 实际回收：{format_bytes(reclaimed)}")
@@ -0,0 +1,402 @@
+# modules/registry.py
+"""
+注册表事务层：
+- 先读取当前值，值已相同的写入直接跳过
+- 同一个键的所有写入共用一个句柄，一次性完成
+- 写入前保存快照（JSON），可随时回滚
+- 后端可替换：Windows 上使用 winreg，测试时使用内存实现
+"""
+
+import abc
+import datetime
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .app_paths import data_dir
+
+Logger = Callable[[str], None]
+
+# 与 winreg 中的常量取值一致，避免非 Windows 平台导入 winreg
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+HKCU = "HKCU"
+HKLM = "HKLM"
+
+
+# ============================================================
+#                          后端
+# ============================================================
+class RegistryBackend(abc.ABC):
+    """注册表访问接口。open_key 在键不存在时抛出 FileNotFoundError。"""
+
+    @abc.abstractmethod
+    def open_key(self, hive: str, path: str, write: bool = False):
+        ...
+
+    @abc.abstractmethod
+    def create_key(self, hive: str, path: str):
+        ...
+
+    @abc.abstractmethod
+    def delete_key(self, hive: str, path: str):
+        ...
+
+    @abc.abstractmethod
+    def query_value(self, handle, name: str) -> Tuple[object, int]:
+        """返回 (值, 类型)；值不存在时抛出 FileNotFoundError"""
+
+    @abc.abstractmethod
+    def read_values(self, hive: str, path: str) -> Dict[str, Tuple[object, int]]:
+        """一次性读取键下所有值；键不存在时抛出 FileNotFoundError"""
+
+    @abc.abstractmethod
+    def set_value(self, handle, name: str, value_type: int, value):
+        ...
+
+    @abc.abstractmethod
+    def delete_value(self, handle, name: str):
+        ...
+
+    def close(self, handle):
+        pass
+
+
+class WinregBackend(RegistryBackend):
+    def __init__(self):
+        import winreg
+        self._w = winreg
+        self._hives = {
+            HKCU: winreg.HKEY_CURRENT_USER,
+            HKLM: winreg.HKEY_LOCAL_MACHINE,
+        }
+
+    def open_key(self, hive, path, write=False):
+        access = self._w.KEY_QUERY_VALUE
+        if write:
+            access |= self._w.KEY_SET_VALUE
+        return self._w.OpenKey(self._hives[hive], path, 0, access)
+
+    def create_key(self, hive, path):
+        return self._w.CreateKeyEx(
+            self._hives[hive], path, 0,
+            self._w.KEY_QUERY_VALUE | self._w.KEY_SET_VALUE,
+        )
+
+    def delete_key(self, hive, path):
+        self._w.DeleteKey(self._hives[hive], path)
+
+    def query_value(self, handle, name):
+        return self._w.QueryValueEx(handle, name)
+
+    def read_values(self, hive, path):
+        handle = self._w.OpenKey(self._hives[hive], path, 0, self._w.KEY_QUERY_VALUE)
+        values = {}
+        try:
+            i = 0
+            while True:
+                try:
+                    name, value, value_type = self._w.EnumValue(handle, i)
+                except OSError:
+                    break
+                values[name] = (value, value_type)
+                i += 1
+        finally:
+            self._w.CloseKey(handle)
+        return values
+
+    def set_value(self, handle, name, value_type, value):
+        self._w.SetValueEx(handle, name, 0, value_type, value)
+
+    def delete_value(self, handle, name):
+        self._w.DeleteValue(handle, name)
+
+    def close(self, handle):
+        self._w.CloseKey(handle)
+
+
+class MemoryRegistryBackend(RegistryBackend):
+    """内存中的注册表，用于在非 Windows 平台测试事务逻辑"""
+
+    def __init__(self, initial: Optional[Dict[Tuple[str, str], Dict[str, Tuple[object, int]]]] = None):
+        # (hive, 小写路径) → {值名: (值, 类型)}
+        self.keys: Dict[Tuple[str, str], Dict[str, Tuple[object, int]]] = {}
+        for (hive, path), values in (initial or {}).items():
+            self.keys[(hive, path.lower())] = dict(values)
+        self.writes = 0  # 实际写入次数，便于断言跳过逻辑
+
+    def open_key(self, hive, path, write=False):
+        k = (hive, path.lower())
+        if k not in self.keys:
+            raise FileNotFoundError(path)
+        return k
+
+    def create_key(self, hive, path):
+        k = (hive, path.lower())
+        self.keys.setdefault(k, {})
+        return k
+
+    def delete_key(self, hive, path):
+        self.keys.pop((hive, path.lower()), None)
+
+    def query_value(self, handle, name):
+        try:
+            return self.keys[handle][name]
+        except KeyError:
+            raise FileNotFoundError(name)
+
+    def read_values(self, hive, path):
+        return dict(self.keys[self.open_key(hive, path)])
+
+    def set_value(self, handle, name, value_type, value):
+        self.keys[handle][name] = (value, value_type)
+        self.writes += 1
+
+    def delete_value(self, handle, name):
+        self.keys[handle].pop(name, None)
+
+
+_default_backend: Optional[RegistryBackend] = None
+
+
+def get_backend() -> RegistryBackend:
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = WinregBackend()
+    return _default_backend
+
+
+def set_backend(backend: Optional[RegistryBackend]):
+    """替换默认后端（测试时传入 MemoryRegistryBackend，传 None 恢复 winreg）"""
+    global _default_backend
+    _default_backend = backend
+
+
+# ============================================================
+#                          快照
+# ============================================================
+@dataclass
+class SnapshotEntry:
+    hive: str
+    path: str
+    name: str
+    existed: bool               # 修改前该值是否存在
+    old_value: object = None
+    old_type: int = 0
+    key_created: bool = False   # 该键是否由本次事务创建
+
+
+@dataclass
+class RegistrySnapshot:
+    label: str
+    timestamp: str
+    entries: List[SnapshotEntry] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        for e in d["entries"]:
+            if isinstance(e["old_value"], bytes):
+                e["old_value"] = {"hex": e["old_value"].hex()}
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RegistrySnapshot":
+        entries = []
+        for e in d.get("entries", []):
+            if isinstance(e.get("old_value"), dict) and "hex" in e["old_value"]:
+                e["old_value"] = bytes.fromhex(e["old_value"]["hex"])
+            entries.append(SnapshotEntry(**e))
+        return cls(label=d.get("label", ""), timestamp=d.get("timestamp", ""), entries=entries)
+
+
+def _snapshot_dir() -> str:
+    return data_dir("registry_snapshots")
+
+
+def save_snapshot(snapshot: RegistrySnapshot) -> str:
+    fname = f"{snapshot.timestamp.replace('-', '').replace('.', '_')}_{snapshot.label}.json"
+    path = os.path.join(_snapshot_dir(), fname)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot.to_dict(), f, ensure_ascii=False, indent=2)
+    return path
+
+
+def latest_snapshot_path() -> Optional[str]:
+    d = _snapshot_dir()
+    files = sorted(f for f in os.listdir(d) if f.endswith(".json"))
+    return os.path.join(d, files[-1]) if files else None
+
+
+def load_snapshot(path: str) -> RegistrySnapshot:
+    with open(path, "r", encoding="utf-8") as f:
+        return RegistrySnapshot.from_dict(json.load(f))
+
+
+# ============================================================
+#                          事务
+# ============================================================
+@dataclass
+class RegistryChange:
+    hive: str
+    path: str
+    name: str
+    value: object
+    value_type: int = REG_DWORD
+    create_key: bool = False    # 键不存在时是否创建（否则跳过）
+
+
+def _same(current: Optional[Tuple[object, int]], change: RegistryChange) -> bool:
+    """当前值（read_values 的一项，不存在时为 None）是否已与目标一致"""
+    if current is None:
+        return False
+    value, value_type = current
+    if isinstance(value, (list, tuple)) and isinstance(change.value, (list, tuple)):
+        value, target = list(value), list(change.value)      # REG_MULTI_SZ
+    else:
+        target = change.value
+    return value_type == change.value_type and value == target
+
+
+class RegistryTransaction:
+    """
+    用法：
+        tx = RegistryTransaction("enable_game_mode")
+        tx.set_value(HKCU, r"Software\\Microsoft\\GameBar", "GameModeEnabled", 1, create_key=True)
+        snapshot = tx.commit(logger)
+    """
+
+    def __init__(self, label: str, backend: Optional[RegistryBackend] = None):
+        self.label = label
+        self.backend = backend
+        self.changes: List[RegistryChange] = []
+
+    def set_value(self, hive: str, path: str, name: str, value,
+                  value_type: int = REG_DWORD, create_key: bool = False):
+        self.changes.append(RegistryChange(hive, path, name, value, value_type, create_key))
+
+    def _grouped(self) -> Dict[Tuple[str, str], List[RegistryChange]]:
+        groups: Dict[Tuple[str, str], List[RegistryChange]] = {}
+        for c in self.changes:
+            groups.setdefault((c.hive, c.path), []).append(c)
+        return groups
+
+    def commit(self, logger: Logger, persist: bool = True) -> RegistrySnapshot:
+        """
+        应用所有修改并返回快照（仅包含真正发生变化的值）。
+        任意一步写入失败时，先回滚已写入的部分再抛出异常。
+        """
+        backend = self.backend or get_backend()
+        snapshot = RegistrySnapshot(
+            label=self.label,
+            timestamp=datetime.datetime.now().strftime("%Y-%m-%dT%H-%M-%S.%f"),
+        )
+        skipped = 0
+
+        try:
+            for (hive, path), changes in self._grouped().items():
+                # 先只读地读取整个键：值都已相同时不以写权限打开，HKLM 下也无需管理员权限
+                try:
+                    current = backend.read_values(hive, path)
+                except FileNotFoundError:
+                    current = None
+                pending = []
+                for c in changes:
+                    if current is not None and _same(current.get(c.name), c):
+                        skipped += 1
+                        logger(f"    已是 {c.name}={c.value}（跳过）: {path}")
+                    else:
+                        pending.append(c)
+                if not pending:
+                    continue
+
+                created = False
+                try:
+                    handle = backend.open_key(hive, path, write=True)
+                except FileNotFoundError:
+                    if not any(c.create_key for c in pending):
+                        logger(f"    路径不存在（跳过）: {path}")
+                        continue
+                    handle = backend.create_key(hive, path)
+                    created = True
+
+                try:
+                    for c in pending:
+                        try:
+                            old_value, old_type = backend.query_value(handle, c.name)
+                            existed = True
+                        except FileNotFoundError:
+                            old_value, old_type, existed = None, 0, False
+
+                        # 先记快照再写入，写入失败时也能回滚
+                        snapshot.entries.append(SnapshotEntry(
+                            hive, path, c.name, existed, old_value, old_type, created,
+                        ))
+                        backend.set_value(handle, c.name, c.value_type, c.value)
+                        logger(f"    已设置 {c.name}={c.value}: {path}")
+                finally:
+                    backend.close(handle)
+        except Exception:
+            if snapshot.entries:
+                logger("    写入失败，正在回滚本次已修改的值…")
+                rollback(snapshot, logger, backend)
+            raise
+
+        if snapshot.entries and persist:
+            save_snapshot(snapshot)
+        if skipped and not snapshot.entries:
+            logger("    所有值均已是目标状态，无需写入。")
+        return snapshot
+
+
+def rollback(snapshot: RegistrySnapshot, logger: Logger,
+             backend: Optional[RegistryBackend] = None):
+    """按快照逆序恢复：恢复旧值 / 删除新增的值 / 删除新建的键"""
+    backend = backend or get_backend()
+    created_keys = []
+
+    for e in reversed(snapshot.entries):
+        try:
+            handle = backend.open_key(e.hive, e.path, write=True)
+        except FileNotFoundError:
+            logger(f"    回滚跳过（键已不存在）: {e.path}")
+            continue
+        try:
+            if e.existed:
+                backend.set_value(handle, e.name, e.old_type, e.old_value)
+                logger(f"    已恢复 {e.name}={e.old_value}: {e.path}")
+            else:
+                backend.delete_value(handle, e.name)
+                logger(f"    已删除新增值 {e.name}: {e.path}")
+        except OSError as ex:
+            logger(f"    回滚 {e.name} 失败：{ex}")
+        finally:
+            backend.close(handle)
+
+        if e.key_created and (e.hive, e.path) not in created_keys:
+            created_keys.append((e.hive, e.path))
+
+    for hive, path in created_keys:
+        try:
+            backend.delete_key(hive, path)
+            logger(f"    已删除新建的键: {path}")
+        except OSError:
+            pass
+
+
+def rollback_latest(logger: Logger, backend: Optional[RegistryBackend] = None) -> bool:
+    """回滚最近一次保存的快照，成功后删除该快照文件"""
+    path = latest_snapshot_path()
+    if not path:
+        logger("  没有可回滚的注册表快照。")
+        return False
+    snapshot = load_snapshot(path)
+    logger(f"  回滚注册表快照：{snapshot.label}（{snapshot.timestamp}）")
+    rollback(snapshot, logger, backend)
+    os.remove(path)
+    return True
@@ -0,0 +1,343 @@
+# modules/retry_queue.py
+"""
+被占用文件的重试队列：
+- 清理任务删除失败的文件（CleanStats.failed_paths / failed_sizes）加入持久化队列，
+  保存在数据目录 retry\\queue.json
+- 重试时只按队列中记录的路径逐个删除，不再重新遍历目录；
+  入队时记下文件大小与修改时间，重试前二者有变化说明已是另一个文件（被重新创建或写入），
+  直接移出队列而不删除；删除成功后清掉清理任务本应移除、因该文件而留下的空目录
+- 指数退避：第 n 次失败后等待 BASE_DELAY × 2^(n-1)（上限 MAX_DELAY）再试；
+  启动本工具时、空闲维护结束时各批量重试一次到期的条目
+- 可选「重启后删除」：MoveFileExW(MOVEFILE_DELAY_UNTIL_REBOOT)，需要管理员权限；
+  重启后文件已不存在，下次重试时从队列中移除
+- stuck_bytes()：仍被占用而无法回收的空间
+"""
+
+import datetime
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .app_paths import data_dir
+from .cleaner import CleanStats, format_bytes
+
+Logger = Callable[[str], None]
+
+RETRY_DIR = "retry"
+QUEUE_FILE = "queue.json"
+
+BASE_DELAY = 10 * 60             # 第一次重试前等待 10 分钟
+MAX_DELAY = 24 * 3600
+MAX_ATTEMPTS = 8                 # 超过后不再自动重试，只能手动重试或重启后删除
+MAX_ENTRIES = 20000
+MAX_LOGGED = 5
+
+_MOVEFILE_DELAY_UNTIL_REBOOT = 0x4
+
+
+@dataclass
+class RetryEntry:
+    path: str
+    size: int
+    source: str = ""                          # 来自哪个清理任务
+    attempts: int = 1
+    next_try: float = 0.0                     # time.time()
+    first_failed: str = ""
+    on_reboot: bool = False                   # 已登记重启后删除
+    mtime: float = 0.0                        # 入队时的修改时间；0 为旧版队列（只比较大小）
+    prune_to: str = ""                        # 删除成功后向上移除空目录，直到此目录（不含）
+
+    def backoff(self, now: float):
+        self.attempts += 1
+        self.next_try = now + min(MAX_DELAY, BASE_DELAY * 2 ** (self.attempts - 1))
+
+    @property
+    def exhausted(self) -> bool:
+        return self.attempts > MAX_ATTEMPTS
+
+
+@dataclass
+class RetryResult:
+    deleted: int = 0
+    deleted_bytes: int = 0
+    gone: int = 0                             # 已不存在（被其它程序删除或重启后删除）
+    changed: int = 0                          # 大小或修改时间已变化，移出队列而不删除
+    locked: List[RetryEntry] = field(default_factory=list)
+
+    def describe(self) -> str:
+        text = f"重试删除成功 {self.deleted} 个（{format_bytes(self.deleted_bytes)}）"
+        if self.gone:
+            text += f"，{self.gone} 个已不存在"
+        if self.changed:
+            text += f"，{self.changed} 个已被重新写入（不再删除）"
+        if self.locked:
+            text += (f"，{len(self.locked)} 个仍被占用"
+                     f"（{format_bytes(sum(e.size for e in self.locked))}）")
+        return text
+
+
+class RetryQueue:
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self._entries: Optional[Dict[str, RetryEntry]] = None
+
+    # --------------------------
+    #  持久化
+    # --------------------------
+    def _path(self) -> str:
+        if self.directory is None:
+            return os.path.join(data_dir(RETRY_DIR), QUEUE_FILE)
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, QUEUE_FILE)
+
+    def _load(self) -> Dict[str, RetryEntry]:
+        if self._entries is None:
+            entries = {}
+            try:
+                with open(self._path(), "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+            except (OSError, ValueError):
+                raw = []
+            for item in raw if isinstance(raw, list) else []:
+                try:
+                    e = RetryEntry(**item)
+                except TypeError:
+                    continue
+                entries[os.path.normcase(e.path)] = e
+            self._entries = entries
+        return self._entries
+
+    def _save(self):
+        path = self._path()
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump([asdict(e) for e in self._entries.values()], f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    # --------------------------
+    #  入队
+    # --------------------------
+    def add_failures(self, stats: CleanStats, source: str = "") -> int:
+        """把一次清理中删除失败的文件加入队列，返回新加入的条数"""
+        if not stats.failed_paths:
+            return 0
+        now = time.time()
+        stamp = datetime.datetime.now().isoformat(timespec="seconds")
+        added = 0
+        with self.lock:
+            entries = self._load()
+            for path, size in zip(stats.failed_paths, stats.failed_sizes):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue                  # 已不存在或无法访问，无需重试
+                key = os.path.normcase(path)
+                entry = entries.get(key)
+                if entry is None:
+                    if len(entries) >= MAX_ENTRIES:
+                        break
+                    entries[key] = RetryEntry(path, st.st_size, source,
+                                              next_try=now + BASE_DELAY, first_failed=stamp,
+                                              mtime=st.st_mtime,
+                                              prune_to=_prune_root(path, stats.prune_roots))
+                    added += 1
+                else:
+                    # 清理任务再次遇到同一文件：本身就是一次失败的重试
+                    entry.size, entry.mtime = st.st_size, st.st_mtime
+                    entry.backoff(now)
+            self._save()
+        return added
+
+    # --------------------------
+    #  查询
+    # --------------------------
+    def entries(self) -> List[RetryEntry]:
+        with self.lock:
+            return list(self._load().values())
+
+    def stuck_bytes(self) -> int:
+        return sum(e.size for e in self.entries())
+
+    def __len__(self) -> int:
+        return len(self.entries())
+
+    # --------------------------
+    #  重试
+    # --------------------------
+    def retry(self, force: bool = False, now: Optional[float] = None) -> RetryResult:
+        """
+        按记录的路径重试删除。force=False 时只处理已到期且未超过最大次数的条目。
+        """
+        now = time.time() if now is None else now
+        result = RetryResult()
+        with self.lock:
+            entries = self._load()
+            for key, e in list(entries.items()):
+                if not force and (e.next_try > now or e.exhausted):
+                    continue
+                try:
+                    st = os.stat(e.path)
+                except FileNotFoundError:
+                    del entries[key]
+                    result.gone += 1
+                    continue
+                except OSError:
+                    st = None
+                if st is not None and (st.st_size != e.size
+                                       or (e.mtime and st.st_mtime != e.mtime)):
+                    # 同名的新文件（程序重新创建或仍在写入），不是当初要清理的那个
+                    del entries[key]
+                    result.changed += 1
+                    continue
+                try:
+                    os.unlink(e.path)
+                except FileNotFoundError:
+                    del entries[key]
+                    result.gone += 1
+                    continue
+                except OSError:
+                    e.backoff(now)
+                    result.locked.append(e)
+                    continue
+                del entries[key]
+                result.deleted += 1
+                result.deleted_bytes += e.size
+                if e.prune_to:
+                    _remove_empty_parents(e.path, e.prune_to)
+            self._save()
+        return result
+
+    def schedule_on_reboot(self) -> int:
+        """为队列中的所有文件登记重启后删除（仅 Windows，需要管理员权限），返回成功条数"""
+        if os.name != "nt":
+            return 0
+        import ctypes
+        move = ctypes.windll.kernel32.MoveFileExW
+        done = 0
+        with self.lock:
+            entries = self._load()
+            for e in entries.values():
+                if e.on_reboot:
+                    done += 1
+                    continue
+                if move(e.path, None, _MOVEFILE_DELAY_UNTIL_REBOOT):
+                    e.on_reboot = True
+                    done += 1
+            self._save()
+        return done
+
+    def report(self) -> str:
+        items = sorted(self.entries(), key=lambda e: e.size, reverse=True)
+        if not items:
+            return "重试队列为空：没有因被占用而无法删除的文件。"
+        lines = [f"共 {len(items)} 个文件因被占用无法删除，"
+                 f"占用空间 {format_bytes(sum(e.size for e in items))}。", ""]
+        by_source: Dict[str, int] = {}
+        for e in items:
+            by_source[e.source or "其它"] = by_source.get(e.source or "其它", 0) + e.size
+        lines.append("按清理任务：")
+        for source, size in sorted(by_source.items(), key=lambda kv: kv[1], reverse=True):
+            lines.append(f"  {format_bytes(size):>10}  {source}")
+        lines.append("")
+        lines.append("最大的文件：")
+        for e in items[:20]:
+            flags = []
+            if e.on_reboot:
+                flags.append("重启后删除")
+            elif e.exhausted:
+                flags.append("已停止自动重试")
+            else:
+                flags.append(f"已失败 {e.attempts} 次，下次重试 "
+                             f"{datetime.datetime.fromtimestamp(e.next_try):%m-%d %H:%M}")
+            lines.append(f"  {format_bytes(e.size):>10}  {e.path}（{'，'.join(flags)}）")
+        return "\n".join(lines)
+
+
+def _prune_root(path: str, roots: List[str]) -> str:
+    """path 所属的最深的清理根目录；不在任何根目录下时返回空串"""
+    best = ""
+    for root in roots:
+        if _is_under(path, root) and len(root) > len(best):
+            best = root
+    return best
+
+
+def _is_under(path: str, root: str) -> bool:
+    try:
+        rel = os.path.relpath(os.path.normcase(path), os.path.normcase(root))
+    except ValueError:                        # 不同盘符
+        return False
+    return rel != os.curdir and rel != os.pardir and not rel.startswith(os.pardir + os.sep)
+
+
+def _remove_empty_parents(path: str, stop: str):
+    """从 path 的父目录开始向上移除空目录，不包括 stop 本身；遇到非空目录即停止"""
+    d = os.path.dirname(path)
+    while _is_under(d, stop):
+        try:
+            os.rmdir(d)
+        except OSError:
+            return
+        d = os.path.dirname(d)
+
+
+def queue_failures(stats: CleanStats, source: str, logger: Logger):
+    """清理任务结束后调用：把删除失败的文件加入重试队列"""
+    if not stats.failed_paths:
+        return
+    try:
+        added = get_queue().add_failures(stats, source)
+    except OSError as e:
+        logger(f"  保存重试队列失败：{e}")
+        return
+    if added:
+        logger(f"  {added} 个被占用的文件已加入重试队列，"
+               "下次启动或空闲维护时会自动重试。")
+
+
+def retry_due(logger: Logger, force: bool = False) -> Optional[RetryResult]:
+    """批量重试到期的条目；队列为空或没有任何变化时不输出日志"""
+    queue = get_queue()
+    try:
+        if not len(queue):
+            return None
+        result = queue.retry(force=force)
+    except OSError as e:
+        logger(f"[重试队列] 读写失败：{e}")
+        return None
+    if result.deleted or result.gone or result.changed or result.locked:
+        log_result(result, logger)
+    return result
+
+
+def log_stuck(logger: Logger):
+    """输出重试队列中仍被占用、暂时无法回收的空间"""
+    try:
+        entries = get_queue().entries()
+    except OSError:
+        return
+    if entries:
+        logger(f"  重试队列中还有 {len(entries)} 个被占用的文件，"
+               f"共 {format_bytes(sum(e.size for e in entries))} 暂时无法回收。")
+
+
+def log_result(result: RetryResult, logger: Logger):
+    logger(f"[重试队列] {result.describe()}")
+    for e in result.locked[:MAX_LOGGED]:
+        logger(f"    {e.path}")
+    if len(result.locked) > MAX_LOGGED:
+        logger(f"    ……其余 {len(result.locked) - MAX_LOGGED} 个略")
+
+
+_queue: Optional[RetryQueue] = None
+
+
+def get_queue() -> RetryQueue:
+    global _queue
+    if _queue is None:
+        _queue = RetryQueue()
+    return _queue
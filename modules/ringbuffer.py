@@ -0,0 +1,43 @@
+# modules/ringbuffer.py
+"""
+预分配的定长环形缓冲区（array('d') 实现），供延迟监控与系统监控共用。
+写满后覆盖最旧的数据，写入不产生任何新对象。
+"""
+
+import array
+from typing import List
+
+
+class RingBuffer:
+    """预分配的定长 double 缓冲区，写满后覆盖最旧的数据"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = array.array("d", [0.0]) * capacity
+        self._pos = 0
+        self._count = 0
+
+    def append(self, value: float):
+        self._data[self._pos] = value
+        self._pos = (self._pos + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def last(self) -> float:
+        """最新写入的值；缓冲区为空时返回 0.0"""
+        if not self._count:
+            return 0.0
+        return self._data[(self._pos - 1) % self.capacity]
+
+    def values(self) -> List[float]:
+        """按时间顺序（旧 → 新）返回当前数据"""
+        if self._count < self.capacity:
+            return self._data[:self._count].tolist()
+        return (self._data[self._pos:] + self._data[:self._pos]).tolist()
+
+    def clear(self):
+        self._pos = 0
+        self._count = 0
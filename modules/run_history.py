@@ -0,0 +1,260 @@
+# modules/run_history.py
+"""
+诊断运行历史：
+- 每次完整诊断的结果（按段的 Finding 列表）保存到数据目录 history\\ 下
+- 内容寻址去重：每条 Finding 序列化后按 SHA-256 存成一个 gzip 压缩的 blob，
+  多次运行中相同的事件文本只存一份；每次运行只保存一份 lzma 压缩的清单（各段的 blob 哈希）
+- 对比两次运行：按 Finding.fingerprint 归并，只列出新增、已消失、有变化（次数 / 严重程度）的问题
+
+目录结构：
+    history\\blobs\\ab\\abcdef….gz
+    history\\runs\\20240501-210312-123456.json.xz
+"""
+
+import datetime
+import gzip
+import hashlib
+import json
+import lzma
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .app_paths import data_dir
+from .findings import NEW_MARK, NOTE, SEVERITY_LABELS, SEVERITY_ORDER, Finding, render_finding
+
+HISTORY_DIR = "history"
+MAX_RUNS = 50
+
+# 派生结果（时间线）由其他段计算而来，不参与对比
+EXCLUDED_SOURCES = {"timeline"}
+
+
+def _history_dir(*parts: str) -> str:
+    return data_dir(HISTORY_DIR, *parts)
+
+
+# ============================================================
+#                        blob 存储
+# ============================================================
+def _canonical(f: Finding) -> bytes:
+    d = f.to_dict()
+    d["extra"] = {k: v for k, v in d["extra"].items() if k != NEW_MARK}
+    return json.dumps(d, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(_history_dir("blobs", digest[:2]), digest[2:] + ".gz")
+
+
+def _put_blob(data: bytes) -> Tuple[str, bool]:
+    """写入 blob，返回 (哈希, 是否为新写入)"""
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest)
+    if os.path.exists(path):
+        return digest, False
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        # mtime=0 使相同内容的压缩结果一致
+        f.write(gzip.compress(data, mtime=0))
+    os.replace(tmp, path)
+    return digest, True
+
+
+def _get_blob(digest: str) -> bytes:
+    with open(_blob_path(digest), "rb") as f:
+        return gzip.decompress(f.read())
+
+
+# ============================================================
+#                        保存 / 读取
+# ============================================================
+@dataclass
+class RunInfo:
+    run_id: str
+    findings: int
+    new_blobs: int
+    path: str
+
+    def describe(self) -> str:
+        return (f"已保存诊断记录 {self.run_id}：{self.findings} 条结果，"
+                f"新写入 {self.new_blobs} 条，其余与历史记录共用")
+
+
+def save_run(sections: List[tuple], label: str = "hid_usb") -> RunInfo:
+    run_id = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    manifest = {"run_id": run_id, "label": label, "sections": []}
+    total = new = 0
+    for header, findings in sections:
+        digests = []
+        for f in findings:
+            digest, created = _put_blob(_canonical(f))
+            digests.append(digest)
+            total += 1
+            new += created
+        manifest["sections"].append([header, digests])
+
+    path = os.path.join(_history_dir("runs"), f"{run_id}.json.xz")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(lzma.compress(json.dumps(manifest, ensure_ascii=False).encode("utf-8")))
+    os.replace(tmp, path)
+    prune()
+    return RunInfo(run_id, total, new, path)
+
+
+def list_runs() -> List[str]:
+    """按时间从旧到新"""
+    d = _history_dir("runs")
+    return sorted(name[:-len(".json.xz")] for name in os.listdir(d) if name.endswith(".json.xz"))
+
+
+def _load_manifest(run_id: str) -> dict:
+    with open(os.path.join(_history_dir("runs"), f"{run_id}.json.xz"), "rb") as f:
+        return json.loads(lzma.decompress(f.read()).decode("utf-8"))
+
+
+def load_run(run_id: str) -> List[tuple]:
+    """读取一次运行，返回与 collect_findings 相同结构的 [(标题, [Finding, ...]), ...]"""
+    sections = []
+    for header, digests in _load_manifest(run_id)["sections"]:
+        findings = []
+        for digest in digests:
+            try:
+                findings.append(Finding.from_dict(json.loads(_get_blob(digest).decode("utf-8"))))
+            except (OSError, ValueError, TypeError):
+                continue
+        sections.append((header, findings))
+    return sections
+
+
+def prune(keep: int = MAX_RUNS):
+    """只保留最近 keep 次运行，并删除不再被任何运行引用的 blob"""
+    runs = list_runs()
+    if len(runs) <= keep:
+        return
+    runs_dir = _history_dir("runs")
+    for run_id in runs[:-keep]:
+        try:
+            os.remove(os.path.join(runs_dir, f"{run_id}.json.xz"))
+        except OSError:
+            pass
+
+    referenced = set()
+    for run_id in runs[-keep:]:
+        try:
+            for _, digests in _load_manifest(run_id)["sections"]:
+                referenced.update(digests)
+        except (OSError, ValueError, lzma.LZMAError):
+            # 清单损坏时不删除任何 blob，以免误删
+            return
+    blobs_dir = _history_dir("blobs")
+    for sub in os.listdir(blobs_dir):
+        sub_dir = os.path.join(blobs_dir, sub)
+        if not os.path.isdir(sub_dir):
+            continue
+        for name in os.listdir(sub_dir):
+            if name.endswith(".gz") and sub + name[:-3] not in referenced:
+                try:
+                    os.remove(os.path.join(sub_dir, name))
+                except OSError:
+                    pass
+
+
+# ============================================================
+#                           对比
+# ============================================================
+@dataclass
+class _Summary:
+    """同一指纹的所有 Finding 的汇总"""
+    latest: Finding
+    count: int = 0
+    severity: str = NOTE
+
+    @property
+    def occurrences(self) -> int:
+        # 已经自带计数的结果（如 LiveKernel 分组）以其计数为准
+        n = self.latest.extra.get("count")
+        return n if isinstance(n, int) else self.count
+
+
+def _summarize(sections: List[tuple]) -> Dict[str, _Summary]:
+    result: Dict[str, _Summary] = {}
+    for _, findings in sections:
+        for f in findings:
+            if f.severity == NOTE or f.source in EXCLUDED_SOURCES:
+                continue
+            s = result.get(f.fingerprint)
+            if s is None:
+                s = result[f.fingerprint] = _Summary(f, severity=f.severity)
+            elif (f.timestamp or datetime.datetime.min) >= (s.latest.timestamp or datetime.datetime.min):
+                s.latest = f
+            s.count += 1
+            if SEVERITY_ORDER.get(f.severity, 9) < SEVERITY_ORDER.get(s.severity, 9):
+                s.severity = f.severity
+    return result
+
+
+@dataclass
+class RunDiff:
+    new: List[Finding] = field(default_factory=list)
+    resolved: List[Finding] = field(default_factory=list)
+    changed: List[Tuple[Finding, str]] = field(default_factory=list)   # (新结果, 变化说明)
+    unchanged: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return not (self.new or self.resolved or self.changed)
+
+
+def compare_runs(old: List[tuple], new: List[tuple]) -> RunDiff:
+    before, after = _summarize(old), _summarize(new)
+    diff = RunDiff()
+    for fp, s in after.items():
+        prev = before.get(fp)
+        if prev is None:
+            diff.new.append(s.latest)
+            continue
+        changes = []
+        if prev.severity != s.severity:
+            changes.append(f"严重程度 {SEVERITY_LABELS.get(prev.severity, prev.severity)} → "
+                           f"{SEVERITY_LABELS.get(s.severity, s.severity)}")
+        if prev.occurrences != s.occurrences:
+            changes.append(f"次数 {prev.occurrences} → {s.occurrences}")
+        if changes:
+            diff.changed.append((s.latest, "，".join(changes)))
+        else:
+            diff.unchanged += 1
+    diff.resolved = [s.latest for fp, s in before.items() if fp not in after]
+    return diff
+
+
+def render_diff(diff: RunDiff, old_id: str, new_id: str) -> str:
+    lines = [f"对比：{old_id}（旧） → {new_id}（新）",
+             f"新增 {len(diff.new)}，已消失 {len(diff.resolved)}，有变化 {len(diff.changed)}，"
+             f"未变化 {diff.unchanged}", ""]
+    if diff.empty:
+        lines.append("两次诊断结果一致，没有新增或消失的问题。")
+        return "\n".join(lines)
+    if diff.new:
+        lines.append("【新增的问题】")
+        lines += [render_finding(f) for f in diff.new]
+        lines.append("")
+    if diff.resolved:
+        lines.append("【已消失的问题】（上次存在、本次未再出现）")
+        lines += [render_finding(f) for f in diff.resolved]
+        lines.append("")
+    if diff.changed:
+        lines.append("【有变化的问题】")
+        for f, what in diff.changed:
+            lines.append(render_finding(f))
+            lines.append(f"    变化：{what}")
+    return "\n".join(lines)
+
+
+def compare_latest() -> Optional[str]:
+    """对比最近两次运行；记录不足两次时返回 None"""
+    runs = list_runs()
+    if len(runs) < 2:
+        return None
+    return render_diff(compare_runs(load_run(runs[-2]), load_run(runs[-1])), runs[-2], runs[-1])
@@ -0,0 +1,304 @@
+# modules/steam_library.py
+"""
+Steam 库目录发现模块：
+- 解析 libraryfolders.vdf，枚举所有 Steam 库（可能分布在多个盘符）
+- 解析 appmanifest_*.acf，获取已安装游戏的名称与安装目录
+- 定位每个游戏的 steamapps/shadercache/<appid> 目录并统计大小
+- 找出 shadercache 下已没有对应 appmanifest 的目录（游戏已卸载）
+
+库与游戏列表按 libraryfolders.vdf 的 mtime 缓存，VDF 未变化时不会重复解析；
+shadercache 大小随时会变化，不缓存，需要时（with_sizes=True）每次重新统计。
+不依赖 Windows API，可在 Linux 上对模拟的 Steam 目录结构运行。
+"""
+
+import os
+import re
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+
+# ============================================================
+#                    VDF / ACF 文本解析
+# ============================================================
+# 带引号的字符串（支持 \" \\ 转义）、花括号、// 注释、无引号的裸 token
+_VDF_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])|//[^\n]*|([^\s{}"]+)')
+_VDF_ESCAPE = re.compile(r"\\(.)")
+_ESCAPE_MAP = {"n": "\n", "t": "\t", "\\": "\\", '"': '"'}
+
+
+def _unescape(s: str) -> str:
+    if "\\" not in s:
+        return s
+    return _VDF_ESCAPE.sub(lambda m: _ESCAPE_MAP.get(m.group(1), m.group(1)), s)
+
+
+def parse_vdf(text: str) -> Dict[str, object]:
+    """
+    解析 Valve KeyValues 文本（.vdf / .acf），返回嵌套 dict。
+    键统一转为小写，方便 "Path" / "path" 等写法混用的文件。
+    """
+    root: Dict[str, object] = {}
+    stack: List[Dict[str, object]] = [root]
+    pending_key: Optional[str] = None
+
+    for m in _VDF_TOKEN.finditer(text):
+        quoted, brace, bare = m.groups()
+        if brace == "{":
+            child: Dict[str, object] = {}
+            if pending_key is not None:
+                stack[-1][pending_key] = child
+                pending_key = None
+            stack.append(child)
+        elif brace == "}":
+            if len(stack) > 1:
+                stack.pop()
+            pending_key = None
+        elif quoted is not None or bare is not None:
+            token = _unescape(quoted) if quoted is not None else bare
+            if pending_key is None:
+                pending_key = token.lower()
+            else:
+                stack[-1][pending_key] = token
+                pending_key = None
+        # 注释：直接跳过
+
+    return root
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+# ============================================================
+#                          数据结构
+# ============================================================
+@dataclass
+class SteamGame:
+    appid: str
+    name: str
+    install_dir: str            # steamapps/common/<installdir> 完整路径
+    shadercache_path: str       # steamapps/shadercache/<appid> 完整路径
+    shadercache_bytes: int = 0  # 目录不存在时为 0
+
+
+@dataclass
+class SteamLibrary:
+    path: str
+    games: List[SteamGame] = field(default_factory=list)
+
+    @property
+    def shadercache_root(self) -> str:
+        return os.path.join(self.path, "steamapps", "shadercache")
+
+    def copy(self) -> "SteamLibrary":
+        return SteamLibrary(self.path, [replace(g) for g in self.games])
+
+
+# 缓存：libraryfolders.vdf 路径 → (mtime_ns, 解析结果)；不含大小。
+# 对外只返回副本，统计大小、排序都不会改动缓存中的对象
+_LIBRARY_CACHE: Dict[str, Tuple[int, List[SteamLibrary]]] = {}
+
+
+# ============================================================
+#                       Steam 根目录定位
+# ============================================================
+def _registry_steam_path() -> Optional[str]:
+    try:
+        import winreg
+    except ImportError:
+        return None
+    try:
+        key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam")
+        try:
+            value, _ = winreg.QueryValueEx(key, "SteamPath")
+        finally:
+            winreg.CloseKey(key)
+        return os.path.normpath(value)
+    except OSError:
+        return None
+
+
+def find_steam_roots() -> List[str]:
+    """返回可能的 Steam 安装根目录（去重，仅保留存在的目录）"""
+    candidates = [_registry_steam_path()]
+    for env in ("ProgramFiles(x86)", "ProgramFiles"):
+        base = os.getenv(env)
+        if base:
+            candidates.append(os.path.join(base, "Steam"))
+
+    roots: List[str] = []
+    seen = set()
+    for c in candidates:
+        if not c or not os.path.isdir(c):
+            continue
+        norm = os.path.normcase(os.path.abspath(c))
+        if norm not in seen:
+            seen.add(norm)
+            roots.append(c)
+    return roots
+
+
+# ============================================================
+#                       目录大小统计
+# ============================================================
+def dir_size(path: str) -> int:
+    """基于 os.scandir 的递归大小统计（不跟随符号链接，忽略无权限项）"""
+    total = 0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return total
+
+
+# ============================================================
+#                    libraryfolders / appmanifest
+# ============================================================
+def _library_paths(steam_root: str, vdf: Dict[str, object]) -> List[str]:
+    paths = [steam_root]
+    folders = vdf.get("libraryfolders") or {}
+    if not isinstance(folders, dict):
+        return paths
+
+    for key, value in folders.items():
+        if not key.isdigit():
+            continue
+        # 新格式："1" { "path" "D:\\SteamLibrary" ... }；旧格式："1" "D:\\SteamLibrary"
+        if isinstance(value, dict):
+            p = value.get("path")
+        else:
+            p = value
+        if isinstance(p, str) and p:
+            paths.append(p)
+
+    result: List[str] = []
+    seen = set()
+    for p in paths:
+        norm = os.path.normcase(os.path.normpath(p))
+        if norm not in seen:
+            seen.add(norm)
+            result.append(os.path.normpath(p))
+    return result
+
+
+def _scan_library(lib_path: str) -> SteamLibrary:
+    lib = SteamLibrary(path=lib_path)
+    steamapps = os.path.join(lib_path, "steamapps")
+    try:
+        entries = list(os.scandir(steamapps))
+    except OSError:
+        return lib
+
+    for entry in entries:
+        name = entry.name
+        if not (name.startswith("appmanifest_") and name.endswith(".acf")):
+            continue
+        try:
+            state = parse_vdf(_read_text(entry.path)).get("appstate", {})
+        except OSError:
+            continue
+        if not isinstance(state, dict):
+            continue
+
+        appid = str(state.get("appid") or name[len("appmanifest_"):-len(".acf")])
+        cache_path = os.path.join(steamapps, "shadercache", appid)
+        lib.games.append(SteamGame(
+            appid=appid,
+            name=str(state.get("name") or appid),
+            install_dir=os.path.join(steamapps, "common", str(state.get("installdir", ""))),
+            shadercache_path=cache_path,
+        ))
+    return lib
+
+
+def _measure(libraries: List[SteamLibrary]):
+    for lib in libraries:
+        for g in lib.games:
+            g.shadercache_bytes = (dir_size(g.shadercache_path)
+                                   if os.path.isdir(g.shadercache_path) else 0)
+        lib.games.sort(key=lambda g: g.shadercache_bytes, reverse=True)
+
+
+def discover_libraries(steam_root: Optional[str] = None, refresh: bool = False,
+                       with_sizes: bool = True) -> List[SteamLibrary]:
+    """
+    枚举所有 Steam 库及其中已安装游戏的 shadercache 目录。
+
+    steam_root 为空时自动定位（注册表 / ProgramFiles）；
+    库与游戏列表按 libraryfolders.vdf 的 mtime 缓存，refresh=True 时强制重新解析。
+    with_sizes=True 时重新统计每个 shadercache 的大小（不缓存），并按大小排序；
+    只需要路径时（清理、状态探测）传 False，避免遍历所有缓存目录。
+    """
+    roots = [steam_root] if steam_root else find_steam_roots()
+    libraries: List[SteamLibrary] = []
+
+    for root in roots:
+        vdf_path = os.path.join(root, "steamapps", "libraryfolders.vdf")
+        try:
+            mtime = os.stat(vdf_path).st_mtime_ns
+        except OSError:
+            mtime = -1
+
+        cached = _LIBRARY_CACHE.get(vdf_path)
+        if cached and cached[0] == mtime and not refresh:
+            libraries.extend(lib.copy() for lib in cached[1])
+            continue
+
+        try:
+            vdf = parse_vdf(_read_text(vdf_path)) if mtime >= 0 else {}
+        except OSError:
+            vdf = {}
+
+        found = [_scan_library(p) for p in _library_paths(root, vdf)]
+        _LIBRARY_CACHE[vdf_path] = (mtime, found)
+        libraries.extend(lib.copy() for lib in found)
+
+    if with_sizes:
+        _measure(libraries)
+    return libraries
+
+
+def invalidate_cache():
+    """丢弃缓存的库与游戏列表，下次查询重新解析"""
+    _LIBRARY_CACHE.clear()
+
+
+def iter_shader_caches(libraries: List[SteamLibrary], appids=None) -> List[SteamGame]:
+    """返回存在 shadercache 目录的游戏；appids 不为空时只保留指定游戏"""
+    wanted = {str(a) for a in appids} if appids else None
+    return [
+        g for lib in libraries for g in lib.games
+        if os.path.isdir(g.shadercache_path) and (wanted is None or g.appid in wanted)
+    ]
+
+
+def orphan_shader_caches(libraries: List[SteamLibrary]) -> List[SteamGame]:
+    """shadercache 下没有对应 appmanifest 的目录（游戏已卸载，缓存不会再被使用）"""
+    orphans: List[SteamGame] = []
+    for lib in libraries:
+        known = {g.appid for g in lib.games}
+        try:
+            entries = list(os.scandir(lib.shadercache_root))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if not entry.is_dir(follow_symlinks=False) or entry.name in known:
+                    continue
+            except OSError:
+                continue
+            orphans.append(SteamGame(appid=entry.name, name="已卸载的游戏",
+                                     install_dir="", shadercache_path=entry.path))
+    return orphans
@@ -0,0 +1,134 @@
+# modules/sys_monitor.py
+"""
+实时系统监控采样器：
+- 后台线程按固定间隔采样 CPU（每核）、内存、磁盘 I/O 与网络速率
+- 每个指标写入预分配的 RingBuffer，采样过程不分配新的缓冲区
+- seq 在每次采样后递增，GUI 只在 seq 变化时重绘
+- 记录采样线程自身消耗的 CPU 时间，用于确认开销（目标 < 1% 单核）
+
+不调用 GPUtil / nvidia-smi，GPU 信息由单独的模块提供。
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .ringbuffer import RingBuffer
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_HISTORY = 120   # 每个指标保留的采样点数
+
+
+class SystemSampler:
+    def __init__(self, interval: float = DEFAULT_INTERVAL, history: int = DEFAULT_HISTORY):
+        import psutil
+        self._psutil = psutil
+
+        self.interval = interval
+        self.history = history
+        self.cpu_count = psutil.cpu_count(logical=True) or 1
+
+        self.cpu_total = RingBuffer(history)
+        self.cpu_cores: List[RingBuffer] = [RingBuffer(history) for _ in range(self.cpu_count)]
+        self.memory = RingBuffer(history)
+        self.disk_read = RingBuffer(history)    # 字节/秒
+        self.disk_write = RingBuffer(history)
+        self.net_sent = RingBuffer(history)
+        self.net_recv = RingBuffer(history)
+
+        self.seq = 0
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._cpu_seconds = 0.0     # 采样线程累计 CPU 时间
+        self._wall_seconds = 0.0
+
+    # --------------------------
+    #  生命周期
+    # --------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="SystemSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def set_interval(self, interval: float):
+        self.interval = max(0.2, interval)
+
+    # --------------------------
+    #  采样
+    # --------------------------
+    def _run(self):
+        ps = self._psutil
+        # 第一次调用只建立基线（cpu_percent 的 interval=None 语义）
+        ps.cpu_percent(percpu=True)
+        disk_prev = self._disk_bytes()
+        net_prev = self._net_bytes()
+        t_prev = time.perf_counter()
+        start_wall = t_prev
+        start_cpu = time.thread_time()
+
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            dt = max(now - t_prev, 1e-6)
+            t_prev = now
+
+            per_core = ps.cpu_percent(percpu=True)
+            mem = ps.virtual_memory().percent
+            disk_now = self._disk_bytes()
+            net_now = self._net_bytes()
+
+            with self.lock:
+                for buf, value in zip(self.cpu_cores, per_core):
+                    buf.append(value)
+                self.cpu_total.append(sum(per_core) / max(len(per_core), 1))
+                self.memory.append(mem)
+                self.disk_read.append(max(disk_now[0] - disk_prev[0], 0) / dt)
+                self.disk_write.append(max(disk_now[1] - disk_prev[1], 0) / dt)
+                self.net_sent.append(max(net_now[0] - net_prev[0], 0) / dt)
+                self.net_recv.append(max(net_now[1] - net_prev[1], 0) / dt)
+                self.seq += 1
+
+            disk_prev, net_prev = disk_now, net_now
+            self._cpu_seconds = time.thread_time() - start_cpu
+            self._wall_seconds = time.perf_counter() - start_wall
+
+    def _disk_bytes(self) -> tuple:
+        c = self._psutil.disk_io_counters()
+        return (c.read_bytes, c.write_bytes) if c else (0, 0)
+
+    def _net_bytes(self) -> tuple:
+        c = self._psutil.net_io_counters()
+        return (c.bytes_sent, c.bytes_recv) if c else (0, 0)
+
+    # --------------------------
+    #  读取
+    # --------------------------
+    def overhead_percent(self) -> float:
+        """采样线程占用单个 CPU 核心的百分比"""
+        if self._wall_seconds <= 0:
+            return 0.0
+        return self._cpu_seconds / self._wall_seconds * 100
+
+    def series(self) -> Dict[str, RingBuffer]:
+        """名称 → 缓冲区（读取时请持有 self.lock）"""
+        result = {
+            "CPU": self.cpu_total,
+            "内存": self.memory,
+            "磁盘读": self.disk_read,
+            "磁盘写": self.disk_write,
+            "上传": self.net_sent,
+            "下载": self.net_recv,
+        }
+        for i, buf in enumerate(self.cpu_cores):
+            result[f"核心 {i}"] = buf
+        return result
@@ -1,122 +1,93 @@
 import os
-import shutil
-import subprocess
 from typing import Callable
 
+from .cleaner import CleanStats, delete_path_contents, delete_tree
+from .command_exec import spawn_detached
+from .probes import ProbeContext
+
 Logger = Callable[[str], None]
 
+PREFETCH_PATH = r"C:\Windows\Prefetch"
+NV_CACHE_PATH = r"C:\ProgramData\NVIDIA Corporation\NV_Cache"
+WU_DOWNLOAD_PATH = r"C:\Windows\SoftwareDistribution\Download"
 
-# --------------------------
-#  通用命令执行
-# --------------------------
-def _run_simple_command(cmd: list, logger: Logger):
-    try:
-        logger(f"  执行命令：{' '.join(cmd)}")
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
-        logger(f"  命令执行错误码：{e.returncode}")
-        raise
-    except Exception as e:
-        logger(f"  命令执行失败：{e}")
-        raise
+
+def _dx_shader_cache_path() -> str:
+    local = os.getenv("LOCALAPPDATA")
+    return os.path.join(local, "D3DSCache") if local else ""
+
+
+def _recent_path() -> str:
+    user = os.getenv("USERPROFILE")
+    return os.path.join(user, r"AppData\Roaming\Microsoft\Windows\Recent") if user else ""
 
 
 # --------------------------
 #  TEMP 清理
 # --------------------------
-def clean_temp(logger: Logger):
+def clean_temp(logger: Logger) -> CleanStats:
     temp = os.getenv("TEMP")
     if not temp:
         logger("  未找到 TEMP 目录。")
-        return
+        return CleanStats()
     logger(f"  清理临时文件夹：{temp}")
-    for root, _, files in os.walk(temp):
-        for f in files:
-            fp = os.path.join(root, f)
-            try:
-                os.remove(fp)
-            except Exception:
-                pass
+    return delete_path_contents(temp, logger)
 
 
 # --------------------------
 #  Prefetch 清理
 # --------------------------
-def clean_prefetch(logger: Logger):
-    path = r"C:\Windows\Prefetch"
+def clean_prefetch(logger: Logger) -> CleanStats:
+    path = PREFETCH_PATH
     logger(f"  清理 Prefetch：{path}")
-    if os.path.isdir(path):
-        for f in os.listdir(path):
-            fp = os.path.join(path, f)
-            try:
-                os.remove(fp)
-            except Exception:
-                pass
-    else:
+    if not os.path.isdir(path):
         logger("  Prefetch 不存在。")
+        return CleanStats()
+    return delete_path_contents(path, logger, recursive=False)
 
 
 # --------------------------
 #  DX Shader Cache
 # --------------------------
-def clean_dx_shader_cache(logger: Logger):
-    local = os.getenv("LOCALAPPDATA")
-    if not local:
+def clean_dx_shader_cache(logger: Logger) -> CleanStats:
+    path = _dx_shader_cache_path()
+    if not path:
         logger("  未找到 LOCALAPPDATA。")
-        return
-    path = os.path.join(local, "D3DSCache")
+        return CleanStats()
     logger(f"  清理 DX Shader Cache：{path}")
-    try:
-        shutil.rmtree(path)
-    except Exception:
-        pass
+    return delete_tree(path, logger)
 
 
 # --------------------------
 #  NVIDIA Shader Cache
 # --------------------------
-def clean_nvidia_shader_cache(logger: Logger):
-    path = r"C:\ProgramData\NVIDIA Corporation\NV_Cache"
+def clean_nvidia_shader_cache(logger: Logger) -> CleanStats:
+    path = NV_CACHE_PATH
     logger(f"  清理 NVIDIA Shader Cache：{path}")
-    try:
-        shutil.rmtree(path)
-    except Exception:
-        pass
+    return delete_tree(path, logger)
 
 
 # --------------------------
 #  Windows 更新缓存
 # --------------------------
-def clean_windows_update_cache(logger: Logger):
-    path = r"C:\Windows\SoftwareDistribution\Download"
+def clean_windows_update_cache(logger: Logger) -> CleanStats:
+    path = WU_DOWNLOAD_PATH
     logger(f"  清理 Windows 更新缓存：{path}")
-    if os.path.isdir(path):
-        for root, _, files in os.walk(path):
-            for f in files:
-                fp = os.path.join(root, f)
-                try:
-                    os.remove(fp)
-                except Exception:
-                    pass
-    else:
+    if not os.path.isdir(path):
         logger("  缓存目录不存在。")
+        return CleanStats()
+    return delete_path_contents(path, logger)
 
 
 # --------------------------
 #  Recent 清理
 # --------------------------
-def clean_recent(logger: Logger):
-    user = os.getenv("USERPROFILE")
-    if not user:
-        return
-    path = os.path.join(user, r"AppData\Roaming\Microsoft\Windows\Recent")
+def clean_recent(logger: Logger) -> CleanStats:
+    path = _recent_path()
+    if not path:
+        return CleanStats()
     logger(f"  清理 Recent：{path}")
-    if os.path.isdir(path):
-        for f in os.listdir(path):
-            try:
-                os.remove(os.path.join(path, f))
-            except Exception:
-                pass
+    return delete_path_contents(path, logger, recursive=False)
 
 
 # --------------------------
@@ -125,10 +96,7 @@ def clean_recent(logger: Logger):
 def refresh_gpu_idle_tasks(logger: Logger):
     logger("  刷新 GPU IdleTasks（ProcessIdleTasks）")
     try:
-        subprocess.Popen(
-            ["rundll32.exe", "advapi32.dll,ProcessIdleTasks"],
-            creationflags=subprocess.DETACHED_PROCESS
-        )
+        spawn_detached(["rundll32.exe", "advapi32.dll,ProcessIdleTasks"], logger)
         logger("  GPU IdleTasks 已在后台执行（GUI 不会被影响）。")
     except Exception:
         logger("  GPU IdleTasks 执行异常（已忽略）。")
@@ -141,10 +109,34 @@ def refresh_gpu_idle_tasks(logger: Logger):
 def refresh_dwm(logger: Logger):
     logger("警告：刷新 DWM 可能导致短暂黑屏。")
     try:
-        subprocess.Popen(
-            ["taskkill", "/IM", "dwm.exe", "/F"],
-            creationflags=subprocess.DETACHED_PROCESS
-        )
+        spawn_detached(["taskkill", "/IM", "dwm.exe", "/F"], logger)
         logger("  DWM 刷新任务在后台执行。")
     except Exception as e:
         logger(f"  刷新 DWM 失败：{e}")
+
+
+# --------------------------
+#  状态探测：目录为空即无需清理
+# --------------------------
+def probe_clean_temp(ctx: ProbeContext) -> bool:
+    return ctx.has_no_files(os.getenv("TEMP") or "")
+
+
+def probe_clean_prefetch(ctx: ProbeContext) -> bool:
+    return ctx.has_no_files(PREFETCH_PATH)
+
+
+def probe_clean_dx_shader_cache(ctx: ProbeContext) -> bool:
+    return ctx.has_no_files(_dx_shader_cache_path())
+
+
+def probe_clean_nvidia_shader_cache(ctx: ProbeContext) -> bool:
+    return ctx.has_no_files(NV_CACHE_PATH)
+
+
+def probe_clean_windows_update_cache(ctx: ProbeContext) -> bool:
+    return ctx.has_no_files(WU_DOWNLOAD_PATH)
+
+
+def probe_clean_recent(ctx: ProbeContext) -> bool:
+    return ctx.has_no_files(_recent_path())
@@ -1,9 +1,20 @@
 # modules/task_runner.py
 import enum
+import queue
+import threading
+import time
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from tkinter import messagebox
 
+from . import profiling
+from .cleaner import CleanStats
+from .io_throttle import ThrottleConfig, throttled
+from .net_probe import LatencyMonitor, log_comparison
+from .probes import ProbeContext, ProbeFunc
+from .reclaim import ReclaimReport
+from .retry_queue import log_stuck, queue_failures
+
 
 class TaskLevel(enum.Enum):
     LEVEL1 = 1  # 安全任务
@@ -12,7 +23,8 @@ class TaskLevel(enum.Enum):
 
 
 # 执行函数不带参数，内部自己调用 logger
-TaskFunc = Callable[[], None]
+# 清理类任务返回 CleanStats，用于汇总磁盘空间回收情况
+TaskFunc = Callable[[], Any]
 
 
 @dataclass
@@ -24,20 +36,39 @@ class TaskDef:
     description: str = ""    # 详细描述（可选）
     warn: str = ""           # 特殊警告（可选，用于 UI 或日志）
     is_dns_task: bool = False  # 是否是 DNS 相关任务（用于额外提示）
+    is_network_task: bool = False  # 是否是网络任务（执行前后对比延迟）
+    probe: Optional[ProbeFunc] = None  # 状态探测（可选），返回 True 表示无需执行
+    undoes: Tuple[str, ...] = ()       # 本任务会撤销哪些任务的修改（如回滚注册表快照）
 
 
 class TaskRunner:
     """
     负责：
     - 收集用户勾选的任务
+    - 探测系统状态，跳过已处于目标状态的任务
     - 按 L1 -> L2 -> L3 顺序执行
     - 弹提示确认框
     - 记录日志
+
+    状态探测与任务本身都在后台线程执行，只有确认弹窗在 Tk 线程中：
+    探测要读注册表、执行 powercfg、遍历目录；限速模式会降低执行线程的优先级
+    并在删除之间睡眠，都不能放在 GUI 线程里。日志经线程安全的 LogPanel 交回 Tk 线程。
     """
 
-    def __init__(self, logger: Callable[[str], None], tk_root):
+    def __init__(self, logger: Callable[[str], None], tk_root,
+                 latency_monitor: Optional[LatencyMonitor] = None):
         self.logger = logger
         self.root = tk_root
+        self.latency_monitor = latency_monitor
+        self._reclaim = ReclaimReport()
+        # 非 None 时清理任务以限速 + 低优先级方式执行（游戏运行中）；None 为快速模式
+        self.throttle: Optional[ThrottleConfig] = None
+        self._worker: Optional[threading.Thread] = None
+        self._probing = False
+
+    @property
+    def busy(self) -> bool:
+        return self._probing or (self._worker is not None and self._worker.is_alive())
 
     def run_selected_tasks(
         self,
@@ -51,6 +82,45 @@ class TaskRunner:
         if not selected:
             messagebox.showinfo("提示", "你还没有勾选任何任务。", parent=self.root)
             return
+        if self.busy:
+            messagebox.showinfo("提示", "上一批任务仍在执行，请等待其结束。", parent=self.root)
+            return
+
+        # 状态探测：在确认弹窗之前、在后台线程中完成，结果经队列交回 Tk 线程
+        self._probing = True
+        q: "queue.Queue" = queue.Queue()
+
+        def probe():
+            noop: List[TaskDef] = []
+            try:
+                noop = self._probe_tasks(selected)
+            finally:
+                q.put(noop)
+
+        threading.Thread(target=probe, name="TaskProbe", daemon=True).start()
+        self._poll_probe(q, selected)
+
+    def _poll_probe(self, q: "queue.Queue", selected: List[TaskDef]):
+        try:
+            noop = q.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self._poll_probe, q, selected)
+            return
+        self._probing = False
+
+        # 已是目标状态的任务不再执行
+        if noop:
+            for t in noop:
+                self.logger(f"○ 跳过：{t.label}（已是目标状态，无需执行）")
+            noop_keys = {t.key for t in noop}
+            selected = [t for t in selected if t.key not in noop_keys]
+            if not selected:
+                self.logger("所有勾选任务均已是目标状态，本次无需执行。")
+                return
+
+        # 撤销类任务与它撤销的任务同时勾选时先执行撤销，否则会把本次刚写入的修改立即撤销
+        keys = {t.key for t in selected}
+        selected.sort(key=lambda t: not keys.intersection(t.undoes))
 
         # 分类
         l1 = [t for t in selected if t.level == TaskLevel.LEVEL1]
@@ -85,27 +155,85 @@ class TaskRunner:
                 self.logger("用户取消：含 LEVEL3 任务的执行。")
                 return
 
-        # 真正开始执行
+        self._worker = threading.Thread(target=self._execute, args=(l1, l2, l3, self.throttle),
+                                        name="TaskRunner", daemon=True)
+        self._worker.start()
+
+    def _execute(self, l1: List[TaskDef], l2: List[TaskDef], l3: List[TaskDef],
+                 throttle: Optional[ThrottleConfig]):
+        """后台线程：按顺序执行已确认的任务"""
+        self._reclaim = ReclaimReport()
         self.logger("========== 开始执行勾选任务 ==========")
-        self._run_task_group("LEVEL1 安全任务", l1)
-        self._run_task_group("LEVEL2 谨慎任务", l2)
-        self._run_task_group("LEVEL3 重启任务", l3)
+        self._run_task_group("LEVEL1 安全任务", l1, throttle)
+        self._run_task_group("LEVEL2 谨慎任务", l2, throttle)
+        # 重启任务之前输出统计，否则重启后就看不到了
+        self._reclaim.log_summary(self.logger)
+        if self._reclaim.tasks:
+            log_stuck(self.logger)
+        self._run_task_group("LEVEL3 重启任务", l3, throttle)
         self.logger("========== 所有任务执行结束（如包含重启任务则系统会重启） ==========")
 
-    def _run_task_group(self, title: str, tasks: List[TaskDef]):
+    def _probe_tasks(self, tasks: List[TaskDef]) -> List[TaskDef]:
+        """
+        一次性探测所有带 probe 的任务，共享同一个 ProbeContext：
+        电源计划只查询一次、同一注册表键只读一次、每个目录只 scandir 一次。
+        同批有撤销类任务时，被它撤销的任务不探测：现在的状态在撤销之后就不成立了。
+        """
+        ctx = ProbeContext()
+        undone = {key for t in tasks for key in t.undoes}
+        noop = []
+        for t in tasks:
+            if t.probe is None or t.key in undone:
+                continue
+            try:
+                if t.probe(ctx):
+                    noop.append(t)
+            except Exception as e:
+                # 探测失败时照常执行任务
+                self.logger(f"  探测 {t.label} 状态失败（照常执行）：{e}")
+        return noop
+
+    def _run_task_group(self, title: str, tasks: List[TaskDef],
+                        throttle: Optional[ThrottleConfig] = None):
         if not tasks:
             return
         self.logger(f"[{title}] 共 {len(tasks)} 个任务。")
         for t in tasks:
-            self._run_single_task(t)
+            self._run_single_task(t, throttle)
+
+    def _measure_latency(self, when: str):
+        self.logger(f"  测量{when}的网络延迟……")
+        try:
+            return self.latency_monitor.measure()
+        except Exception as e:
+            self.logger(f"  测量网络延迟失败：{e}")
+            return None
 
-    def _run_single_task(self, task: TaskDef):
+    def _run_single_task(self, task: TaskDef, throttle_cfg: Optional[ThrottleConfig] = None):
         self.logger(f"→ 开始：{task.label}")
         if task.warn:
             self.logger(f"  注意：{task.warn}")
+        # 网络任务：紧贴任务前后各做一次短时延迟测量，变化只归因于这一个任务
+        latency_before = None
+        if task.is_network_task and task.level != TaskLevel.LEVEL3 and self.latency_monitor:
+            latency_before = self._measure_latency("执行前")
         try:
-            task.func()
+            start = time.perf_counter()
+            if throttle_cfg is None:
+                result = profiling.call(f"task_{task.key}", task.func, logger=self.logger)
+            else:
+                with throttled(throttle_cfg) as throttle:
+                    result = profiling.call(f"task_{task.key}", task.func, logger=self.logger)
+                if throttle.slept:
+                    self.logger(f"  {throttle.describe()}")
+            if isinstance(result, CleanStats):
+                self._reclaim.add(task.label, result, time.perf_counter() - start)
+                queue_failures(result, task.label, self.logger)
             self.logger(f"√ 完成：{task.label}")
         except Exception as e:
             self.logger(f"× 失败：{task.label} | 错误：{e}")
+        if latency_before is not None:
+            latency_after = self._measure_latency("执行后")
+            if latency_after is not None:
+                log_comparison(latency_before, latency_after, self.logger)
 
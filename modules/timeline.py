@@ -0,0 +1,178 @@
+# modules/timeline.py
+"""
+跨来源事件时间线：
+- 各扫描器的结果先各自按时间排序，再用 heapq.merge 做 k 路归并，
+  逐条产出而不把合并结果整体放进内存（n 条事件、k 个来源：O(n log k)）
+- 滑动窗口聚类：同一设备（VID/PID）相邻事件间隔不超过 window 的归为一个「事件簇」；
+  没有设备信息的事件（WER 崩溃、LiveKernel 转储等）作为同时段相关事件附加到活跃的簇上
+- 突发检测：同一设备在 burst_window 内出现 burst_count 次以上（如 5 分钟内反复断开 20 次）
+
+簇只保留少量样本事件与计数，长时间的大量事件也不会占用过多内存。
+"""
+
+import datetime
+import heapq
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .findings import ERROR, NOTE, WARNING, Finding
+
+TIMELINE_SOURCE = "timeline"
+
+DEFAULT_WINDOW = datetime.timedelta(minutes=2)
+DEFAULT_BURST_WINDOW = datetime.timedelta(minutes=5)
+DEFAULT_BURST_COUNT = 20
+
+MAX_SAMPLES = 8          # 每个簇保留的样本事件数
+MAX_RELATED = 5          # 每个簇保留的同时段无设备事件数
+
+
+def merge_streams(streams: Iterable[Iterable[Finding]]) -> Iterator[Finding]:
+    """k 路归并多个已按时间升序排列的事件流；没有时间的事件不参与"""
+    timed = ((f for f in s if f.timestamp is not None) for s in streams)
+    return heapq.merge(*timed, key=lambda f: f.timestamp)
+
+
+@dataclass
+class Incident:
+    key: Optional[str]                            # 设备 VID_xxxx&PID_xxxx；None 表示无设备的事件组
+    start: datetime.datetime
+    end: datetime.datetime
+    count: int = 0
+    sources: Dict[str, int] = field(default_factory=dict)
+    samples: List[Finding] = field(default_factory=list)
+    related: List[Finding] = field(default_factory=list)
+    related_count: int = 0
+    burst_peak: int = 0                           # burst_window 内的最大事件数
+    _recent: Deque[datetime.datetime] = field(default_factory=deque, repr=False)
+    _tail: Deque[Finding] = field(default_factory=lambda: deque(maxlen=MAX_RELATED), repr=False)
+
+    def add(self, f: Finding, burst_window: datetime.timedelta):
+        self.end = f.timestamp
+        self.count += 1
+        self.sources[f.source] = self.sources.get(f.source, 0) + 1
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(f)
+        self._tail.append(f)
+        recent = self._recent
+        recent.append(f.timestamp)
+        while recent[0] < f.timestamp - burst_window:
+            recent.popleft()
+        self.burst_peak = max(self.burst_peak, len(recent))
+
+    def relate(self, f: Finding):
+        self.related_count += 1
+        if len(self.related) < MAX_RELATED:
+            self.related.append(f)
+
+    def is_burst(self, burst_count: int) -> bool:
+        return self.burst_peak >= burst_count
+
+    @property
+    def cross_source(self) -> bool:
+        return len(self.sources) > 1 or bool(self.related_count)
+
+
+def cluster_incidents(events: Iterable[Finding],
+                      window: datetime.timedelta = DEFAULT_WINDOW,
+                      burst_window: datetime.timedelta = DEFAULT_BURST_WINDOW
+                      ) -> Iterator[Incident]:
+    """
+    events 必须按时间升序（merge_streams 的输出）。
+    一个簇在 window 内没有新事件后即结束并产出；活跃簇按最后更新时间排列，
+    过期检查只看队首，整体为线性时间。
+    """
+    active: "OrderedDict[Optional[str], Incident]" = OrderedDict()
+
+    for f in events:
+        ts = f.timestamp
+        while active:
+            key, inc = next(iter(active.items()))
+            if ts - inc.end <= window:
+                break
+            del active[key]
+            yield inc
+
+        key = f.device
+        inc = active.get(key)
+        if inc is None:
+            inc = Incident(key=key, start=ts, end=ts)
+            active[key] = inc
+            loose = active.get(None)
+            if key is not None and loose is not None:
+                # 设备簇开始前不久的无设备事件同样视为相关
+                for other in loose._tail:
+                    if ts - other.timestamp <= window:
+                        inc.relate(other)
+        else:
+            active.move_to_end(key)
+        inc.add(f, burst_window)
+
+        if key is None:
+            # 没有设备信息的事件：作为同时段的相关事件附加到活跃的设备簇
+            for other_key, other in active.items():
+                if other_key is not None:
+                    other.relate(f)
+
+    yield from active.values()
+
+
+def _describe(f: Finding) -> str:
+    title = f.title.splitlines()[0] if f.title else ""
+    return f"{f.timestamp:%H:%M:%S}  [{f.source}] {title[:120]}"
+
+
+def incident_finding(inc: Incident, burst_count: int = DEFAULT_BURST_COUNT,
+                     burst_window: datetime.timedelta = DEFAULT_BURST_WINDOW) -> Finding:
+    sources = "、".join(f"{s}×{n}" for s, n in inc.sources.items())
+    span = f"{inc.start:%Y-%m-%d %H:%M:%S}"
+    if inc.end != inc.start:
+        span += f" ~ {inc.end:%H:%M:%S}"
+    who = f"设备 {inc.key}" if inc.key else "多个来源"
+    detail = [f"时间：{span}", f"来源：{sources}"]
+    if inc.is_burst(burst_count):
+        detail.append(f"⚠ 突发：{burst_window.total_seconds() / 60:g} 分钟内最多出现 "
+                      f"{inc.burst_peak} 次（设备反复断开 / 重连或驱动反复失败）")
+    detail += [_describe(f) for f in inc.samples]
+    if inc.count > len(inc.samples):
+        detail.append(f"……另有 {inc.count - len(inc.samples)} 条")
+    if inc.related:
+        detail.append("同时段的其他事件：")
+        detail += ["  " + _describe(f) for f in inc.related]
+        if inc.related_count > len(inc.related):
+            detail.append(f"  ……另有 {inc.related_count - len(inc.related)} 条")
+    vid, pid = (inc.key[4:8], inc.key[-4:]) if inc.key else (None, None)
+    return Finding(
+        source=TIMELINE_SOURCE,
+        severity=ERROR if inc.is_burst(burst_count) else WARNING,
+        title=f"{who}：{inc.count} 个事件" + ("（突发）" if inc.is_burst(burst_count) else ""),
+        detail="\n".join(detail),
+        timestamp=inc.start,
+        vid=vid,
+        pid=pid,
+        extra={"count": inc.count, "burst_peak": inc.burst_peak},
+    )
+
+
+def build_timeline(sections: List[Tuple[str, List[Finding]]],
+                   window: datetime.timedelta = DEFAULT_WINDOW,
+                   burst_window: datetime.timedelta = DEFAULT_BURST_WINDOW,
+                   burst_count: int = DEFAULT_BURST_COUNT) -> List[Finding]:
+    """
+    把 collect_findings 的各段结果合并成时间线，只输出值得关注的簇：
+    跨来源关联的、同一设备多次出现的、或发生突发的。
+    """
+    streams = [
+        sorted((f for f in findings if f.severity != NOTE and f.timestamp is not None),
+               key=lambda f: f.timestamp)
+        for _, findings in sections
+    ]
+    result = []
+    for inc in cluster_incidents(merge_streams(streams), window, burst_window):
+        if inc.cross_source or inc.is_burst(burst_count) or (inc.key and inc.count > 1):
+            result.append(incident_finding(inc, burst_count, burst_window))
+    if not result:
+        return [Finding(TIMELINE_SOURCE, NOTE, "未发现跨来源关联或突发的事件。")]
+    result.sort(key=lambda f: f.timestamp, reverse=True)
+    return result
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """数据目录（历史记录、注册表快照、重试队列……）指向临时目录"""
+    path = tmp_path / "data"
+    monkeypatch.setenv("GAMERTOOL_DATA_DIR", str(path))
+    return path
@@ -0,0 +1,207 @@
+"""
+测试用的最小 .evtx 生成器：每个块内第一条记录携带一个 BinXML 模板定义，
+其余记录只引用模板并给出替换值；文件头与块头按真实格式计算 CRC32。
+"""
+
+import datetime
+import random
+import struct
+import zlib
+
+CHUNK_SIZE = 65536
+EPOCH = datetime.datetime(1601, 1, 1)
+
+
+def filetime(ts: datetime.datetime) -> int:
+    return (ts - EPOCH) // datetime.timedelta(microseconds=1) * 10
+
+
+def utf16(s: str) -> bytes:
+    return s.encode("utf-16-le")
+
+
+class _Chunk:
+    def __init__(self):
+        self.buf = bytearray(CHUNK_SIZE)
+        self.pos = 512
+        self.names = {}                 # 名称 → 块内偏移（同名只内联一次）
+        self.template_off = None
+        self.records = []               # (块内偏移, record_id)
+
+
+class _Frag:
+    """在已知的块内绝对偏移处构造 BinXML"""
+
+    def __init__(self, chunk: _Chunk, start: int):
+        self.chunk = chunk
+        self.start = start
+        self.b = bytearray()
+
+    def here(self) -> int:
+        return self.start + len(self.b)
+
+    def name_ref(self, name: str):
+        off = self.chunk.names.get(name)
+        if off is None:
+            off = self.here() + 4
+            self.b += struct.pack("<I", off)
+            self.chunk.names[name] = off
+            self.b += struct.pack("<IHH", 0, 0, len(name)) + utf16(name) + b"\0\0"
+        else:
+            self.b += struct.pack("<I", off)
+
+    def value(self, text: str):
+        self.b += bytes([0x05, 0x01]) + struct.pack("<H", len(text)) + utf16(text)
+
+    def subst(self, idx: int, vtype: int, optional: bool = False):
+        self.b += bytes([0x0E if optional else 0x0D]) + struct.pack("<HB", idx, vtype)
+
+    def element(self, name, attrs=(), children=None):
+        self.b += bytes([0x41 if attrs else 0x01]) + struct.pack("<HI", 0xFFFF, 0)
+        self.name_ref(name)
+        if attrs:
+            self.b += struct.pack("<I", 0)
+        for i, (attr, value) in enumerate(attrs):
+            self.b += bytes([0x46 if i < len(attrs) - 1 else 0x06])
+            self.name_ref(attr)
+            value(self)
+        if children is None:
+            self.b += b"\x03"
+        else:
+            self.b += b"\x02"
+            children(self)
+            self.b += b"\x04"
+
+
+def _build_template(f: _Frag):
+    f.b += b"\x0f\x01\x01\x00"
+
+    def system(f):
+        f.element("Provider", [("Name", lambda f: f.subst(0, 0x01))])
+        f.element("EventID", [("Qualifiers", lambda f: f.subst(9, 0x06, True))],
+                  lambda f: f.subst(1, 0x06))
+        f.element("Level", children=lambda f: f.subst(2, 0x04))
+        f.element("TimeCreated", [("SystemTime", lambda f: f.subst(3, 0x11))])
+        f.element("EventRecordID", children=lambda f: f.subst(4, 0x0A))
+        f.element("Channel", children=lambda f: f.subst(5, 0x01))
+        f.element("Computer", children=lambda f: f.subst(6, 0x01))
+        f.element("Security", [("UserID", lambda f: f.subst(10, 0x13, True))])
+
+    def event_data(f):
+        f.element("Data", [("Name", lambda f: f.value("param1"))], lambda f: f.subst(7, 0x01))
+        f.element("Data", [("Name", lambda f: f.value("param2"))],
+                  lambda f: f.subst(8, 0x14, True))
+        f.element("Data", [("Name", lambda f: f.value("Guid"))],
+                  lambda f: f.subst(11, 0x0F, True))
+
+    def event(f):
+        f.element("System", children=system)
+        f.element("EventData", children=event_data)
+
+    f.element("Event", [("xmlns", lambda f: f.value(
+        "http://schemas.microsoft.com/win/2004/08/events/event"))], event)
+    f.b += b"\x00"
+
+
+SID = bytes([1, 5]) + (5).to_bytes(6, "big") + struct.pack("<5I", 21, 1, 2, 3, 1001)
+
+
+def _values(rec: dict):
+    return [
+        (0x01, utf16(rec["provider"])),
+        (0x06, struct.pack("<H", rec["event_id"])),
+        (0x04, struct.pack("<B", rec["level"])),
+        (0x11, struct.pack("<Q", filetime(rec["time"]))),
+        (0x0A, struct.pack("<Q", rec["record_id"])),
+        (0x01, utf16("System")),
+        (0x01, utf16("DESKTOP-TEST")),
+        (0x01, utf16(rec["param1"])),
+        (0x14, struct.pack("<I", rec["param2"])) if rec["param2"] is not None else (0x00, b""),
+        (0x00, b""),
+        (0x13, SID) if rec["record_id"] % 2 else (0x00, b""),
+        (0x0F, bytes(range(16))),
+    ]
+
+
+def _write_record(chunk: _Chunk, rec: dict) -> bool:
+    start = chunk.pos
+    f = _Frag(chunk, start + 24)
+    f.b += b"\x0f\x01\x01\x00"
+    if chunk.template_off is None:
+        tdef = f.here() + 10
+        f.b += bytes([0x0C, 0x01]) + struct.pack("<II", 0x1234, tdef)
+        size_at = len(f.b) + 20
+        f.b += struct.pack("<I", 0) + bytes(range(16)) + struct.pack("<I", 0)
+        body = len(f.b)
+        _build_template(f)
+        struct.pack_into("<I", f.b, size_at, len(f.b) - body)
+        chunk.template_off = tdef
+    else:
+        f.b += bytes([0x0C, 0x01]) + struct.pack("<II", 0x1234, chunk.template_off)
+    values = _values(rec)
+    f.b += struct.pack("<I", len(values))
+    for vtype, v in values:
+        f.b += struct.pack("<HBB", len(v), vtype, 0)
+    for _, v in values:
+        f.b += v
+    size = 24 + len(f.b) + 4
+    if start + size > CHUNK_SIZE:
+        return False
+    header = b"**\0\0" + struct.pack("<IQQ", size, rec["record_id"], filetime(rec["time"]))
+    chunk.buf[start:start + size] = header + bytes(f.b) + struct.pack("<I", size)
+    chunk.pos += size
+    chunk.records.append((start, rec["record_id"]))
+    return True
+
+
+def _finish_chunk(chunk: _Chunk) -> bytes:
+    b = chunk.buf
+    b[:8] = b"ElfChnk\0"
+    first, last = chunk.records[0][1], chunk.records[-1][1]
+    struct.pack_into("<QQQQ", b, 8, first, last, first, last)
+    struct.pack_into("<III", b, 40, 128, chunk.records[-1][0], chunk.pos)
+    struct.pack_into("<I", b, 52, zlib.crc32(b[512:chunk.pos]))
+    struct.pack_into("<I", b, 124, zlib.crc32(b[128:512], zlib.crc32(b[:120])))
+    return bytes(b)
+
+
+def make_evtx(path, records) -> int:
+    """写出 .evtx 文件，返回块数"""
+    chunks = []
+    cur = _Chunk()
+    for rec in records:
+        if not _write_record(cur, rec):
+            chunks.append(_finish_chunk(cur))
+            cur = _Chunk()
+            assert _write_record(cur, rec)
+    if cur.records:
+        chunks.append(_finish_chunk(cur))
+    h = bytearray(4096)
+    h[:8] = b"ElfFile\0"
+    struct.pack_into("<QQQ", h, 8, 0, len(chunks) - 1, records[-1]["record_id"] + 1)
+    struct.pack_into("<IHHHH", h, 32, 128, 1, 3, 4096, len(chunks))
+    struct.pack_into("<I", h, 124, zlib.crc32(h[:120]))
+    with open(path, "wb") as f:
+        f.write(h)
+        for c in chunks:
+            f.write(c)
+    return len(chunks)
+
+
+PROVIDERS = ["Service Control Manager", "Microsoft-Windows-Kernel-PnP", "disk",
+             "Microsoft-Windows-DriverFrameworks-UserMode"]
+
+
+def gen_records(n: int, seed: int = 1):
+    rnd = random.Random(seed)
+    base = datetime.datetime(2024, 5, 1)
+    return [
+        dict(record_id=i + 1,
+             time=base + datetime.timedelta(seconds=37 * i, microseconds=rnd.randrange(10 ** 6)),
+             provider=rnd.choice(PROVIDERS),
+             event_id=rnd.choice([7000, 7034, 51, 2100, 10110, 1, 6005]),
+             level=rnd.choice([2, 3, 4]),
+             param1=f'svc<{i}>&"x"',
+             param2=rnd.choice([None, rnd.randrange(2 ** 32)]))
+        for i in range(n)
+    ]
@@ -0,0 +1,132 @@
+"""
+测试用的 psutil 替身：只实现本工具用到的那部分接口。
+进程表、CPU 占用与磁盘计数器都由测试直接修改。
+"""
+
+from collections import namedtuple
+
+NORMAL_PRIORITY_CLASS = 32
+HIGH_PRIORITY_CLASS = 128
+BELOW_NORMAL_PRIORITY_CLASS = 16384
+
+SELF_PID = 1
+
+_DiskIO = namedtuple("sdiskio", "read_bytes write_bytes read_count write_count read_time write_time")
+_ProcIO = namedtuple("pio", "read_bytes write_bytes")
+
+
+class Error(Exception):
+    pass
+
+
+class NoSuchProcess(Error):
+    pass
+
+
+class ZombieProcess(NoSuchProcess):
+    pass
+
+
+class AccessDenied(Error):
+    pass
+
+
+class _ProcState:
+    def __init__(self, pid, name, exe, create_time, affinity):
+        self.pid = pid
+        self.name = name
+        self.exe = exe
+        self.create_time = create_time
+        self.nice = NORMAL_PRIORITY_CLASS
+        self.affinity = list(affinity)
+        self.cpu = 0.0
+        self.io = 0
+
+
+class FakePsutil:
+    Error = Error
+    NoSuchProcess = NoSuchProcess
+    ZombieProcess = ZombieProcess
+    AccessDenied = AccessDenied
+    NORMAL_PRIORITY_CLASS = NORMAL_PRIORITY_CLASS
+    HIGH_PRIORITY_CLASS = HIGH_PRIORITY_CLASS
+    BELOW_NORMAL_PRIORITY_CLASS = BELOW_NORMAL_PRIORITY_CLASS
+
+    def __init__(self, logical: int = 4, physical: int = 4):
+        self.logical = logical
+        self.physical = physical
+        self.procs = {}
+        self.cpu = 0.0                       # 系统 CPU 占用 %
+        self.disk_bytes = 0                  # 系统磁盘读写累计字节
+        self._clock = 1000.0
+        self.add(SELF_PID, "gamertool.exe")
+
+    # ---- 测试用 ----
+    def add(self, pid: int, name: str, exe: str = ""):
+        self._clock += 1
+        self.procs[pid] = _ProcState(pid, name, exe or rf"C:\Apps\{name}", self._clock,
+                                     range(self.logical))
+        return self.procs[pid]
+
+    def remove(self, pid: int):
+        self.procs.pop(pid, None)
+
+    # ---- psutil 接口 ----
+    def pids(self):
+        return list(self.procs)
+
+    def Process(self, pid: int = SELF_PID):
+        if pid not in self.procs:
+            raise NoSuchProcess(pid)
+        return _Process(self, pid)
+
+    def cpu_count(self, logical: bool = True):
+        return self.logical if logical else self.physical
+
+    def cpu_freq(self, percpu: bool = False):
+        return []
+
+    def cpu_percent(self, interval=None):
+        return self.cpu
+
+    def disk_io_counters(self):
+        return _DiskIO(self.disk_bytes, 0, 0, 0, 0, 0)
+
+
+class _Process:
+    def __init__(self, ps: FakePsutil, pid: int):
+        self._ps = ps
+        self.pid = pid
+
+    def _state(self) -> _ProcState:
+        try:
+            return self._ps.procs[self.pid]
+        except KeyError:
+            raise NoSuchProcess(self.pid) from None
+
+    def name(self):
+        return self._state().name
+
+    def exe(self):
+        return self._state().exe
+
+    def create_time(self):
+        return self._state().create_time
+
+    def nice(self, value=None):
+        state = self._state()
+        if value is None:
+            return state.nice
+        state.nice = value
+
+    def cpu_affinity(self, cpus=None):
+        state = self._state()
+        if cpus is None:
+            return list(state.affinity)
+        state.affinity = list(cpus)
+
+    def cpu_percent(self, interval=None):
+        return self._state().cpu
+
+    def io_counters(self):
+        return _ProcIO(self._state().io, 0)
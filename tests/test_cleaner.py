@@ -0,0 +1,29 @@
+from modules import cleaner
+from modules.cleaner import CleanStats
+
+
+def test_failed_paths_capped_but_counted(monkeypatch):
+    monkeypatch.setattr(cleaner, "MAX_FAILED_PATHS", 3)
+    stats = CleanStats()
+    for i in range(5):
+        cleaner._fail(stats, f"/locked/{i}", 10)
+    assert (stats.failed, stats.failed_bytes) == (5, 50)
+    assert stats.failed_paths == ["/locked/0", "/locked/1", "/locked/2"]
+    assert stats.failed_sizes == [10, 10, 10]
+
+    other = CleanStats()
+    cleaner._fail(other, "/locked/x", 7)
+    stats.merge(other)
+    assert (stats.failed, stats.failed_bytes) == (6, 57)
+    assert len(stats.failed_paths) == len(stats.failed_sizes) == 3
+
+
+def test_merge_fills_up_to_cap(monkeypatch):
+    monkeypatch.setattr(cleaner, "MAX_FAILED_PATHS", 3)
+    stats, other = CleanStats(), CleanStats()
+    cleaner._fail(stats, "/a", 1)
+    for p in ("/b", "/c", "/d"):
+        cleaner._fail(other, p, 1)
+    stats.merge(other)
+    assert stats.failed_paths == ["/a", "/b", "/c"]
+    assert stats.failed == 4
@@ -0,0 +1,117 @@
+import asyncio
+import subprocess
+
+import pytest
+
+from modules.command_exec import CommandExecutor, FakeRunner
+
+
+def make_executor(responses=None, **kwargs):
+    runner = FakeRunner(responses)
+    return CommandExecutor(spawn=runner, **kwargs), runner
+
+
+def test_output_streamed_and_returned():
+    executor, runner = make_executor({("ipconfig",): (0, b"line1\r\nline2\n", b"warn\n")},
+                                     encoding="utf-8")
+    logs = []
+    result = executor.run(["ipconfig", "/flushdns"], logs.append)
+    assert result.ok and result.stdout == "line1\r\nline2\n" and result.stderr == "warn\n"
+    assert logs == ["  执行命令：ipconfig /flushdns", "    line1", "    line2",
+                    "    [stderr] warn"]
+    assert runner.calls == [["ipconfig", "/flushdns"]]
+
+
+def test_oem_code_page_decoding():
+    # 多字节字符恰好跨越 4096 字节的读取边界
+    text = "a" * 4095 + "已成功刷新 DNS 解析缓存。\r\n"
+    executor, _ = make_executor({("ipconfig",): (0, text.encode("cp936"), b"")},
+                                encoding="cp936")
+    logs = []
+    result = executor.run(["ipconfig"], logs.append, echo=False)
+    assert result.stdout == text
+    assert logs == ["    " + text.rstrip()]
+
+
+def test_nonzero_exit_codes():
+    executor, _ = make_executor({("netsh",): (1, b"", b"")}, encoding="utf-8")
+    with pytest.raises(subprocess.CalledProcessError) as info:
+        executor.run(["netsh", "winsock", "reset"])
+    assert info.value.returncode == 1
+    assert executor.run(["netsh"], ok_codes=(0, 1)).returncode == 1
+    assert executor.run(["netsh"], check=False).returncode == 1
+
+
+def test_timeout_kills_process():
+    executor, _ = make_executor({("slow",): (0, b"late\n", b"", 5.0)}, encoding="utf-8")
+    with pytest.raises(subprocess.TimeoutExpired):
+        executor.run(["slow"], timeout=0.05)
+
+    procs = []
+
+    async def spawn(cmd):
+        proc = await FakeRunner({("slow",): (0, b"", b"", 5.0)})(cmd)
+        procs.append(proc)
+        return proc
+
+    result = CommandExecutor(spawn=spawn).run(["slow"], timeout=0.05, check=False)
+    assert result.timed_out and result.returncode is None and not result.ok
+    assert procs[0].killed
+
+
+def test_spawn_error_and_run_many():
+    executor, _ = make_executor({("missing",): FileNotFoundError("missing"),
+                                 ("bad",): (2, b"", b"")}, encoding="utf-8")
+    ok, missing, bad = executor.run_many([["ok"], ["missing"], ["bad"]])
+    assert ok.ok
+    assert isinstance(missing, FileNotFoundError)
+    assert isinstance(bad, subprocess.CalledProcessError)
+
+
+def _tracking(runner):
+    """记录同时在运行的命令数的最大值"""
+    state = {"active": 0, "peak": 0}
+
+    async def spawn(cmd):
+        proc = await runner(cmd)
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        wait = proc.wait
+
+        async def tracked_wait():
+            try:
+                return await wait()
+            finally:
+                state["active"] -= 1
+        proc.wait = tracked_wait
+        return proc
+    return spawn, state
+
+
+def test_concurrency_limits():
+    spawn, state = _tracking(FakeRunner(default=(0, b"", b"", 0.02)))
+    shared = CommandExecutor(spawn=spawn, max_concurrency=2)
+    shared.run_many([["cmd", str(i)] for i in range(6)])
+    assert state["peak"] == 2
+
+    # 独立的并发上限：一批命令可以同时开始，且不占用共享执行器的信号量
+    state["peak"] = 0
+    batch = shared.with_concurrency(6)
+    assert batch.spawn is shared.spawn and batch.max_concurrency == 6
+    batch.run_many([["cmd", str(i)] for i in range(6)])
+    assert state["peak"] == 6
+    assert shared.with_concurrency(0).max_concurrency == 1
+
+
+def test_sync_entry_inside_running_loop():
+    executor, _ = make_executor({("echo",): (0, b"hi\n", b"")}, encoding="utf-8")
+
+    async def caller():
+        # 事件循环中调用同步入口：在独立线程的新循环中执行，而不是报 RuntimeError
+        result = executor.run(["echo"])
+        direct = await executor.run_async(["echo"])
+        return result, direct
+
+    result, direct = asyncio.run(caller())
+    assert result.stdout == direct.stdout == "hi\n"
+    assert CommandExecutor._run_sync(lambda: asyncio.sleep(0, "done")) == "done"
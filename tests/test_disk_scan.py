@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from modules.disk_scan import NO_EXT, ROOT_FILES, DiskScanner, normalize_roots
+
+
+def write(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    write(root / "a.txt", 100)
+    write(root / "big" / "x.bin", 5000)
+    write(root / "big" / "sub" / "y.bin", 3000)
+    write(root / "big" / "sub" / "README", 10)
+    write(root / "small" / "s.txt", 50)
+    return root
+
+
+def scan(roots, **kwargs):
+    scanner = DiskScanner([str(r) for r in roots], **kwargs)
+    scanner.start()
+    scanner.join(10)
+    snap = scanner.snapshot()
+    assert not snap.running and not snap.error
+    return snap
+
+
+def test_recursive_totals(tree):
+    snap = scan([tree], workers=3)
+    assert (snap.files, snap.bytes, snap.dirs_scanned, snap.errors) == (5, 8160, 4, 0)
+    assert snap.top_dirs == [(8010, str(tree / "big")), (3010, str(tree / "big" / "sub")),
+                             (50, str(tree / "small"))]
+    assert dict(snap.by_group) == {str(tree / "big"): 8010, str(tree / "small"): 50,
+                                   os.path.join(str(tree), ROOT_FILES): 100}
+    assert dict(snap.by_ext) == {".bin": 8000, ".txt": 150, NO_EXT: 10}
+
+
+def test_top_k_limit(tree):
+    snap = scan([tree], top_k=2, workers=1)
+    assert snap.top_files == [(5000, str(tree / "big" / "x.bin")),
+                              (3000, str(tree / "big" / "sub" / "y.bin"))]
+    assert snap.top_dirs == [(8010, str(tree / "big")), (3010, str(tree / "big" / "sub"))]
+    assert snap.bytes == 8160                            # 汇总不受 top_k 影响
+
+
+def test_normalize_roots_overlap(tree):
+    root, big = str(tree), str(tree / "big")
+    bigger = str(tree.parent / "rootx")
+    assert normalize_roots([big, root + os.sep, os.path.join(big, "sub"), root, bigger]) == [root, bigger]
+    assert normalize_roots([os.path.join(root, "big", "..", "small")]) == [str(tree / "small")]
+
+    snap = scan([big, tree, tree / "big" / "sub"])
+    assert (snap.files, snap.bytes) == (5, 8160)         # 重叠的扫描根不重复计数
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="平台不支持符号链接")
+def test_symlinked_dirs_not_followed(tree, tmp_path):
+    outside = tmp_path / "outside"
+    write(outside / "huge.bin", 100000)
+    try:
+        os.symlink(outside, tree / "link", target_is_directory=True)
+        os.symlink(tree / "big", tree / "small" / "loop", target_is_directory=True)
+        os.symlink(tree / "big" / "x.bin", tree / "small" / "x-link.bin")
+    except (OSError, NotImplementedError):
+        pytest.skip("无权限创建符号链接")
+    snap = scan([tree])
+    assert (snap.files, snap.bytes, snap.dirs_scanned) == (5, 8160, 4)
+    assert all("huge" not in path for _, path in snap.top_files)
@@ -0,0 +1,116 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from modules import net_tasks
+from modules.net_probe import percentile
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(10, 0, -1)]          # 未排序
+    assert percentile(values, 50) == 5.0
+    assert percentile(values, 90) == 9.0
+    assert percentile(values, 95) == 10.0
+    assert percentile(list(range(1, 101)), 99) == 99
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) is None
+
+
+class _Responder:
+    """本地 UDP DNS 应答器：把查询原样回送并置 QR 位；drop_every=n 时每 n 个查询丢弃一个"""
+
+    def __init__(self, drop_every: int = 0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self.drop_every = drop_every
+        self.received = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self.sock.recvfrom(512)
+            except socket.timeout:
+                continue
+            self.received += 1
+            if self.drop_every and self.received % self.drop_every == 0:
+                continue
+            self.sock.sendto(data[:2] + b"\x81\x80" + data[4:], addr)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.sock.close()
+
+
+@pytest.fixture
+def responder():
+    servers = []
+
+    def make(**kwargs):
+        r = _Responder(**kwargs)
+        servers.append(r)
+        return r
+
+    yield make
+    for r in servers:
+        r.close()
+
+
+def test_build_dns_query():
+    q = net_tasks.build_dns_query("www.qq.com", 0x1234)
+    assert q[:2] == b"\x12\x34"
+    assert b"\x03www\x02qq\x03com\x00" in q
+
+
+def test_benchmark_local_responder(responder):
+    r = responder()
+    domains = ["a.example", "b.example"]
+    [result] = net_tasks.benchmark_dns(["127.0.0.1"], domains=domains, timeout=1.0, port=r.port)
+
+    # 每个域名：随机子域名 1 次 + 预热 1 次 + 缓存命中 1 次
+    assert result.sent == 6 and r.received == 6
+    assert result.timeouts == 0 and result.loss == 0.0
+    assert len(result.samples) == 6
+    assert len(result.uncached) == 2 and len(result.cached) == 2
+    assert result.p50 == percentile(result.samples, 50)
+    assert result.p95 == max(result.samples)
+
+
+def test_benchmark_counts_timeouts(responder):
+    r = responder(drop_every=3)
+    [result] = net_tasks.benchmark_dns(["127.0.0.1"], domains=["a.example", "b.example"],
+                                       timeout=0.2, port=r.port)
+    assert result.sent == 6
+    assert result.timeouts == 2
+    assert len(result.samples) == 4
+    # 每个域名的第三次（缓存命中）查询被丢弃
+    assert result.cached == []
+    assert result.score == pytest.approx(result.p50 + result.loss * 2000)
+
+
+def test_benchmark_silent_server(responder):
+    r = responder(drop_every=1)
+    [result] = net_tasks.benchmark_dns(["127.0.0.1"], domains=["a.example"],
+                                       timeout=0.2, port=r.port)
+    assert result.sent == result.timeouts == 3
+    assert result.loss == 1.0
+    assert result.p50 is None and result.score == float("inf")
+    assert "超时 3/3" in net_tasks.format_bench_row(result)
+
+
+def test_benchmark_inside_running_loop(responder):
+    r = responder()
+
+    async def caller():
+        return net_tasks.benchmark_dns(["127.0.0.1"], domains=["a.example"], timeout=1.0,
+                                       port=r.port)
+
+    [result] = asyncio.run(caller())
+    assert result.sent == 3 and result.timeouts == 0
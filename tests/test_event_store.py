@@ -0,0 +1,163 @@
+import datetime
+import json
+
+import pytest
+
+from modules import command_exec
+from modules.command_exec import CommandExecutor, FakeRunner
+from modules.diagnostics_core import ChannelSpec, scan_event_logs
+from modules.event_store import BOOKMARKS_FILE, CHANNEL, FINDINGS_FILE, RECORD_ID, EventStore
+from modules.findings import NEW_MARK, WARNING, Finding
+
+T = datetime.datetime(2024, 5, 1, 10, 0, 0)
+
+
+def event(rid, minutes=None):
+    return Finding("System.evtx", WARNING, f"EventID 7000 #{rid}",
+                   timestamp=T + datetime.timedelta(minutes=rid if minutes is None else minutes),
+                   event_id=7000, extra={RECORD_ID: rid})
+
+
+def rids(findings):
+    return [f.extra[RECORD_ID] for f in findings]
+
+
+def test_merge_advances_bookmark_and_dedups(tmp_path):
+    store = EventStore(str(tmp_path))
+    assert store.bookmark("System") == 0
+
+    new = store.merge("System", [event(3), event(1), event(2)])
+    assert sorted(rids(new)) == [1, 2, 3] and all(f.extra[NEW_MARK] for f in new)
+    assert store.bookmark("System") == 3
+
+    # 重复查询到的旧记录、书签之前的记录、没有记录号的结果都被忽略
+    again = store.merge("System", [event(3), event(2), event(4), event(4),
+                                   Finding("System.evtx", WARNING, "无记录号")])
+    assert rids(again) == [4]
+    assert store.bookmark("System") == 4
+    assert rids(store.recent("System")) == [4, 3, 2, 1]
+    assert [bool(f.extra.get(NEW_MARK)) for f in store.recent("System")] == [True, False, False, False]
+
+    # 其它通道互不影响
+    assert rids(store.merge("Application", [event(2)])) == [2]
+    assert store.bookmark("System") == 4 and store.bookmark("Application") == 2
+
+
+def test_max_entries_drops_oldest(tmp_path):
+    store = EventStore(str(tmp_path), max_entries=5)
+    store.merge("System", [event(i) for i in range(1, 5)])
+    store.merge("Application", [event(10, minutes=-10), event(11, minutes=100)])
+    store.merge("System", [event(5), event(6)])
+    kept = {(f.extra[CHANNEL], f.extra[RECORD_ID]) for f in store.recent("System") + store.recent("Application")}
+    assert kept == {("System", 3), ("System", 4), ("System", 5), ("System", 6), ("Application", 11)}
+    assert store.bookmark("System") == 6                  # 裁剪不影响书签
+
+
+def test_save_and_reload(tmp_path):
+    store = EventStore(str(tmp_path))
+    store.merge("System", [event(7), event(8)])
+    store.set_oldest("System", 2)
+    store.save()
+
+    saved = json.loads((tmp_path / BOOKMARKS_FILE).read_text(encoding="utf-8"))
+    assert saved == {"System": {"record": 8, "oldest": 2}}
+    items = json.loads((tmp_path / FINDINGS_FILE).read_text(encoding="utf-8"))
+    assert all(NEW_MARK not in item["extra"] for item in items)   # 「新」标记不落盘
+
+    reloaded = EventStore(str(tmp_path))
+    assert (reloaded.bookmark("System"), reloaded.oldest("System")) == (8, 2)
+    assert rids(reloaded.recent("System")) == [8, 7]
+    assert reloaded.recent("System")[0].timestamp == T + datetime.timedelta(minutes=8)
+
+
+def test_legacy_bookmarks_upgraded(tmp_path):
+    (tmp_path / BOOKMARKS_FILE).write_text(json.dumps({"System": 120, "Bad": "x"}), encoding="utf-8")
+    store = EventStore(str(tmp_path))
+    assert (store.bookmark("System"), store.oldest("System")) == (120, 0)
+    assert store.bookmark("Bad") == 0
+    store.set_oldest("System", 40)
+    store.save()
+    saved = json.loads((tmp_path / BOOKMARKS_FILE).read_text(encoding="utf-8"))
+    assert saved == {"System": {"record": 120, "oldest": 40}}
+
+
+def test_reset_bookmark_drops_channel(tmp_path):
+    store = EventStore(str(tmp_path))
+    store.merge("System", [event(50)])
+    store.merge("Application", [event(60)])
+    store.set_oldest("System", 10)
+    store.reset_bookmark("System")
+    assert (store.bookmark("System"), store.oldest("System")) == (0, 0)
+    assert store.recent("System") == [] and rids(store.recent("Application")) == [60]
+    assert rids(store.merge("System", [event(1)])) == [1]     # 记录号从头开始也能重新入库
+
+
+# ============================================================
+#                 日志被清空（记录号回退）的检测
+# ============================================================
+def _xml(*record_ids):
+    return "".join(
+        "<Event xmlns='http://schemas.microsoft.com/win/2004/08/events/event'><System>"
+        "<Provider Name='Service Control Manager'/><EventID>7000</EventID><Level>2</Level>"
+        f"<TimeCreated SystemTime='2024-05-01T02:0{i}:00.0000000Z'/>"
+        f"<EventRecordID>{i}</EventRecordID></System></Event>"
+        for i in record_ids).encode()
+
+
+def _gli(oldest, count):
+    return f"oldestRecordNumber: {oldest}\nnumberOfLogRecords: {count}\n".encode()
+
+
+@pytest.fixture
+def run_scan(tmp_path):
+    def run(gli, query):
+        runner = FakeRunner({("wevtutil", "gli", "System"): (0, gli, b""),
+                             ("wevtutil", "qe", "System"): (0, query, b"")})
+        command_exec.set_executor(CommandExecutor(spawn=runner, encoding="utf-8"))
+        store = EventStore(str(tmp_path))
+        result = scan_event_logs(store, [ChannelSpec("System")])
+        text = "\n".join(f.title for f in result)
+        queries = [c[3] for c in runner.calls if c[1] == "qe"]
+        return store, text, queries
+
+    yield run
+    command_exec.set_executor(None)
+
+
+def test_cleared_log_resets_bookmark(run_scan, tmp_path):
+    old = EventStore(str(tmp_path))
+    old.merge("System", [event(500)])
+    old.set_oldest("System", 1)
+    old.save()
+
+    # 清空后只有 3 条记录：最新记录号小于书签
+    store, text, queries = run_scan(_gli(1, 3), _xml(1, 2, 3))
+    assert queries == ["/q:*[System[EventRecordID>500]]", "/q:*"]   # 丢弃书签后重新查询
+    assert "日志已被清空，书签已重置" in text
+    assert store.bookmark("System") == 3 and store.oldest("System") == 1
+    assert rids(store.recent("System")) == [3, 2, 1]
+
+
+def test_cleared_log_detected_by_oldest_record(run_scan, tmp_path):
+    # 清空后新记录号已超过旧书签：靠最旧记录号回退识别
+    old = EventStore(str(tmp_path))
+    old.merge("System", [event(5)])
+    old.set_oldest("System", 4)
+    old.save()
+
+    store, text, queries = run_scan(_gli(1, 8), _xml(6, 7, 8))
+    assert "日志已被清空，书签已重置" in text and len(queries) == 2
+    assert store.oldest("System") == 1
+
+
+def test_wrapped_log_is_not_cleared(run_scan, tmp_path):
+    old = EventStore(str(tmp_path))
+    old.merge("System", [event(5)])
+    old.set_oldest("System", 1)
+    old.save()
+
+    store, text, queries = run_scan(_gli(8, 3), _xml(8, 9))
+    assert queries == ["/q:*[System[EventRecordID>5]]"]
+    assert "日志已被清空" not in text
+    assert "书签之后有 2 条记录在读取前已被循环覆盖" in text
+    assert store.bookmark("System") == 9 and store.oldest("System") == 8
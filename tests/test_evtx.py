@@ -0,0 +1,93 @@
+import datetime
+
+import pytest
+
+from evtx_writer import gen_records, make_evtx
+from modules import evtx
+
+
+@pytest.fixture
+def small_evtx(tmp_path):
+    records = gen_records(600)
+    path = tmp_path / "System.evtx"
+    chunks = make_evtx(str(path), records)
+    return path, records, chunks
+
+
+def _corrupt(path, offset):
+    data = bytearray(path.read_bytes())
+    data[offset] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+
+def test_file_header(small_evtx):
+    path, records, chunks = small_evtx
+    header = evtx.parse_file_header(path.read_bytes()[:evtx.FILE_HEADER_SIZE])
+    assert header.checksum_ok and not header.dirty
+    assert (header.major_version, header.minor_version) == (3, 1)
+    assert header.chunk_count == chunks > 1
+    assert header.next_record_id == len(records) + 1
+
+    _corrupt(path, 16)
+    assert not evtx.parse_file_header(path.read_bytes()[:128]).checksum_ok
+    with pytest.raises(evtx.EvtxError):
+        evtx.parse_file_header(b"NotEvtx\0" + bytes(200))
+
+
+def test_chunk_crc(small_evtx):
+    path, _, _ = small_evtx
+    first = evtx.FILE_HEADER_SIZE
+    second = first + evtx.CHUNK_SIZE
+    header = evtx.parse_chunk_header(path.read_bytes()[first:second])
+    assert header.header_ok and header.data_ok and header.first_record_id == 1
+
+    _corrupt(path, second + 130)                              # 第二个块的块头
+    _corrupt(path, first + evtx.CHUNK_HEADER_SIZE + 40)       # 第一个块的记录数据
+    data = path.read_bytes()
+    assert not evtx.parse_chunk_header(data[first:second]).data_ok
+    assert not evtx.parse_chunk_header(data[second:second + evtx.CHUNK_SIZE]).header_ok
+    assert evtx.read_evtx(str(path), workers=1).bad_chunks == [0, 1]
+    # 未使用的预分配块
+    assert evtx.parse_chunk_header(bytes(evtx.CHUNK_SIZE)) is None
+
+
+def test_record_decode(small_evtx):
+    path, records, chunks = small_evtx
+    scan = evtx.read_evtx(str(path), render_xml=True, workers=1)
+    assert (scan.chunks, scan.records_total, scan.bad_records) == (chunks, len(records), 0)
+    assert [r.record_id for r in scan.records] == [r["record_id"] for r in records]
+
+    rec, src = scan.records[0], records[0]
+    assert (rec.event_id, rec.provider, rec.level) == (src["event_id"], src["provider"],
+                                                       src["level"])
+    assert rec.channel == "System" and rec.computer == "DESKTOP-TEST"
+    assert rec.time_created == rec.written == src["time"]
+    assert rec.data["param1"] == 'svc<0>&"x"'
+    assert rec.data["Guid"] == "{03020100-0504-0706-0809-0A0B0C0D0E0F}"
+    assert "<Data Name=\"param1\">svc&lt;0&gt;&amp;\"x\"</Data>" in rec.xml
+    assert 'UserID="S-1-5-21-1-2-3-1001"' in rec.xml
+
+
+def test_filters(small_evtx):
+    path, records, _ = small_evtx
+    since = records[300]["time"]
+    flt = evtx.EventFilter.build(event_ids=[7000, 7034], providers=["DISK", "Service Control Manager"],
+                                 since=since)
+    scan = evtx.read_evtx(str(path), flt, workers=1)
+    expected = [r["record_id"] for r in records
+                if r["event_id"] in (7000, 7034)
+                and r["provider"] in ("disk", "Service Control Manager")
+                and r["time"] >= since]
+    assert expected and [r.record_id for r in scan.records] == expected
+    assert all(r.xml == "" for r in scan.records)
+
+
+def test_process_pool_matches_inline(tmp_path):
+    records = gen_records(2500, seed=7)
+    path = str(tmp_path / "big.evtx")
+    assert make_evtx(path, records) >= evtx.MIN_CHUNKS_FOR_POOL
+    flt = evtx.EventFilter.build(since=datetime.datetime(2024, 5, 1, 3))
+    inline = evtx.read_evtx(path, flt, render_xml=True, workers=1)
+    pooled = evtx.read_evtx(path, flt, render_xml=True, workers=2)
+    assert pooled.records == inline.records
+    assert pooled.records_total == len(records)
@@ -0,0 +1,74 @@
+from fake_psutil import BELOW_NORMAL_PRIORITY_CLASS, HIGH_PRIORITY_CLASS, NORMAL_PRIORITY_CLASS, \
+    FakePsutil
+from modules.game_session import GameSessionOptimizer, SessionConfig, pick_fast_cores
+
+
+def make_session(ps, **kwargs):
+    config = SessionConfig(targets=["cs2.exe"], pin_fast_cores=True, fast_core_count=2,
+                           **kwargs)
+    return GameSessionOptimizer(config, lambda msg: None, ps)
+
+
+def test_start_demote_exit_revert():
+    ps = FakePsutil(logical=4, physical=4)
+    discord = ps.add(100, "Discord.exe")
+    other = ps.add(101, "notepad.exe")
+    game = ps.add(200, "cs2.exe")
+    later = ps.add(300, "steamwebhelper.exe")     # 排在游戏之后，首次 tick 时仍是新 PID
+    session = make_session(ps)
+    assert session.fast_cores == [1, 2] and session.other_cores == [0, 3]
+
+    session.tick()
+    assert session.game_running
+    assert (game.nice, game.affinity) == (HIGH_PRIORITY_CLASS, [1, 2])
+    for proc in (discord, later):
+        assert (proc.nice, proc.affinity) == (BELOW_NORMAL_PRIORITY_CLASS, [0, 3])
+    assert (other.nice, other.affinity) == (NORMAL_PRIORITY_CLASS, [0, 1, 2, 3])
+
+    # 游戏运行期间新启动的后台进程
+    late = ps.add(400, "onedrive.exe")
+    session.tick()
+    assert late.nice == BELOW_NORMAL_PRIORITY_CLASS
+
+    ps.remove(200)
+    session.tick()
+    assert not session.game_running
+    for proc in (discord, later, late):
+        assert (proc.nice, proc.affinity) == (NORMAL_PRIORITY_CLASS, [0, 1, 2, 3])
+
+
+def test_background_before_game_waits():
+    ps = FakePsutil()
+    discord = ps.add(100, "discord.exe")
+    session = make_session(ps)
+    session.tick()
+    assert discord.nice == NORMAL_PRIORITY_CLASS
+
+    game = ps.add(200, "cs2.exe")
+    session.tick()
+    assert discord.nice == BELOW_NORMAL_PRIORITY_CLASS
+
+    session.stop()
+    assert discord.nice == game.nice == NORMAL_PRIORITY_CLASS
+
+
+def test_reused_pid_not_reverted():
+    ps = FakePsutil()
+    ps.add(200, "cs2.exe")
+    ps.add(100, "discord.exe")
+    session = make_session(ps)
+    session.tick()
+
+    # 同一 PID 被另一个进程复用：创建时间不同，恢复时不动它
+    ps.remove(100)
+    reused = ps.add(100, "discord.exe")
+    reused.nice = BELOW_NORMAL_PRIORITY_CLASS
+    session.stop()
+    assert reused.nice == BELOW_NORMAL_PRIORITY_CLASS
+
+
+def test_siblings_excluded_from_other_cores():
+    ps = FakePsutil(logical=8, physical=4)
+    assert pick_fast_cores(ps, 2) == [2, 4]
+    session = make_session(ps)
+    assert session.other_cores == [0, 1, 6, 7]
@@ -0,0 +1,108 @@
+import types
+
+import pytest
+
+from modules import gpu_info
+from modules.gpu_info import GpuBackend, GpuInfoProvider, GpuReading
+
+
+class Failing(GpuBackend):
+    name = "failing"
+
+    def __init__(self):
+        self.calls = 0
+
+    def query(self, timeout):
+        self.calls += 1
+        raise OSError("nvidia-smi 不存在")
+
+
+class Unavailable(Failing):
+    name = "unavailable"
+
+    def available(self):
+        return False
+
+
+class StandIn(GpuBackend):
+    name = "stand-in"
+
+    def __init__(self):
+        self.calls = 0
+
+    def query(self, timeout):
+        self.calls += 1
+        return [GpuReading(f"Fake GPU {self.calls}", 8192, 1000.0 * self.calls, 50 + self.calls,
+                           10.0)]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(gpu_info, "time", types.SimpleNamespace(monotonic=c))
+    return c
+
+
+def _refresh(provider, **kwargs):
+    started = provider.refresh(**kwargs)
+    if started:
+        provider._thread.join(5)
+    return started
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        GpuBackend()
+
+
+def test_falls_back_and_caches_within_ttl(clock):
+    failing, unavailable, stand_in = Failing(), Unavailable(), StandIn()
+    provider = GpuInfoProvider([unavailable, failing, stand_in], timeout=1.0, ttl=5.0)
+
+    assert _refresh(provider)
+    snap = provider.snapshot()
+    assert snap.status == "ok"
+    assert (failing.calls, unavailable.calls, stand_in.calls) == (1, 0, 1)
+    assert snap.gpus[0].name == "Fake GPU 1" and snap.gpus[0].memory_used_mb == 1000.0
+
+    # TTL 之内不再查询
+    clock.now += 4.0
+    assert not _refresh(provider)
+    assert provider.snapshot().status == "ok" and stand_in.calls == 1
+
+    # 过期后只使用已成功的后端；名称等静态字段保留第一次读取的值
+    clock.now += 2.0
+    assert _refresh(provider)
+    gpu = provider.snapshot().gpus[0]
+    assert (failing.calls, stand_in.calls) == (1, 2)
+    assert gpu.name == "Fake GPU 1" and gpu.memory_used_mb == 2000.0 and gpu.temperature == 52
+
+
+def test_all_backends_fail(clock):
+    failing = Failing()
+    provider = GpuInfoProvider([failing], timeout=1.0, ttl=5.0)
+    assert _refresh(provider)
+    snap = provider.snapshot()
+    assert snap.status == "error" and "nvidia-smi 不存在" in snap.message
+    assert snap.describe() == [f"GPU 信息读取失败（{snap.message}）"]
+
+    # 失败后同样按 TTL 退避
+    assert not _refresh(provider)
+    clock.now += 6.0
+    assert _refresh(provider) and failing.calls == 2
+
+
+def test_no_backend_available(clock):
+    provider = GpuInfoProvider([Unavailable()], ttl=5.0)
+    assert _refresh(provider)
+    assert provider.snapshot().status == "none"
+    clock.now += 60
+    assert not _refresh(provider, force=True)
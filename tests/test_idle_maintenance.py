@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from fake_psutil import FakePsutil
+from modules import idle_maintenance
+from modules.cleaner import pause_point
+from modules.idle_maintenance import IdleConfig, IdleMaintenance, LoadSampler
+from modules.task_runner import TaskDef, TaskLevel
+
+
+@pytest.fixture(autouse=True)
+def fast_timing(monkeypatch):
+    monkeypatch.setattr(idle_maintenance, "CHECK_INTERVAL", 0.01)
+    monkeypatch.setattr(idle_maintenance, "RUNNING_INTERVAL", 0.01)
+    monkeypatch.setattr(idle_maintenance, "RESUME_AFTER", 0.15)
+
+
+def wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.005)
+
+
+def task(key, func, level=TaskLevel.LEVEL1):
+    return TaskDef(key=key, label=key, level=level, func=func)
+
+
+def make(tasks, ps, **config):
+    config.setdefault("idle_minutes", 0.2 / 60)          # 0.2 秒
+    cfg = IdleConfig(enabled=True, task_keys=[t.key for t in tasks], **config)
+    logs = []
+    im = IdleMaintenance(cfg, {t.key: t for t in tasks}, logs.append, psutil_mod=ps)
+    return im, cfg, logs
+
+
+def test_load_sampler_excludes_own_usage():
+    ps = FakePsutil(logical=4)
+    sampler = LoadSampler(ps)
+    ps.cpu = 30.0
+    ps.procs[1].cpu = 40.0                                # 本进程 40%（单核口径）→ 系统 10%
+    ps.disk_bytes += 20 * 1024 * 1024
+    ps.procs[1].io += 20 * 1024 * 1024                    # 磁盘读写全是本进程的
+    cpu, disk = sampler.sample()
+    assert cpu == pytest.approx(20.0) and disk == 0.0
+
+
+def test_starts_only_after_idle_minutes():
+    ps = FakePsutil()
+    ps.cpu = 90.0
+    ran = []
+    im, cfg, logs = make([task("a", lambda: ran.append("a")),
+                          task("reboot", lambda: ran.append("reboot"), TaskLevel.LEVEL2)], ps)
+    im.start()
+    try:
+        wait_for(lambda: im.status.startswith("等待空闲：CPU"))
+        time.sleep(0.3)                                   # 一直繁忙：不开始
+        assert ran == []
+
+        ps.cpu = 0.0
+        start = time.monotonic()
+        wait_for(lambda: cfg.last_completed is not None and not im.busy)
+        assert time.monotonic() - start >= 0.2
+        assert ran == ["a"]                               # 无人值守时不执行 LEVEL2
+        assert IdleConfig.load().last_completed == cfg.last_completed
+        assert not cfg.due()
+    finally:
+        im.stop()
+
+
+def test_pauses_when_game_starts_and_resumes():
+    ps = FakePsutil()
+    started = threading.Event()
+    progress = []
+
+    def work():
+        started.set()
+        for i in range(40):
+            pause_point()
+            progress.append(i)
+            time.sleep(0.01)
+
+    im, cfg, logs = make([task("clean", work)], ps)
+    im.start()
+    try:
+        assert started.wait(5)
+        ps.add(500, "cs2.exe")
+        wait_for(lambda: im.status.startswith("已暂停"))
+        assert "游戏运行中（cs2.exe）" in im.status
+        paused_at = len(progress)
+        time.sleep(0.2)
+        assert len(progress) <= paused_at + 1               # 停在暂停点上
+        assert im.busy
+
+        ps.remove(500)
+        wait_for(lambda: cfg.last_completed is not None and not im.busy)
+        assert progress == list(range(40))                  # 从暂停处继续，没有重来
+        assert any("暂停维护" in line for line in logs)
+        assert any("从暂停处继续" in line for line in logs)
+    finally:
+        im.stop()
+
+
+def test_pending_survives_restart():
+    ps = FakePsutil()
+    ran = []
+    in_second = threading.Event()
+
+    def second():
+        ran.append("b")
+        in_second.set()
+        while True:
+            pause_point()
+            time.sleep(0.01)
+
+    tasks = [task("a", lambda: ran.append("a")), task("b", second), task("c", lambda: ran.append("c"))]
+    im, cfg, _ = make(tasks, ps)
+    im.start()
+    assert in_second.wait(5)
+    im.stop()
+    wait_for(lambda: not im.busy)
+
+    saved = IdleConfig.load()
+    assert saved.pending == ["b", "c"] and saved.last_completed is None
+
+    # 重新启动：只执行上次未完成的任务
+    ran.clear()
+    tasks[1] = task("b", lambda: ran.append("b"))
+    im2 = IdleMaintenance(saved, {t.key: t for t in tasks}, lambda msg: None, psutil_mod=ps)
+    im2.start()
+    try:
+        wait_for(lambda: saved.last_completed is not None and not im2.busy)
+        assert ran == ["b", "c"]
+        assert IdleConfig.load().pending == []
+    finally:
+        im2.stop()
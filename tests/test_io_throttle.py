@@ -0,0 +1,102 @@
+import types
+from collections import namedtuple
+
+import pytest
+
+from modules import io_throttle
+from modules.io_throttle import DiskPressure, Throttle, ThrottleConfig, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(io_throttle, "time", types.SimpleNamespace(monotonic=c.monotonic, sleep=c.sleep))
+    return c
+
+
+class StubPressure:
+    """依次返回预设的 (延迟 ms, 队列长度)"""
+
+    def __init__(self, samples):
+        self.samples = list(samples)
+
+    def sample(self):
+        return self.samples.pop(0)
+
+
+def test_token_bucket_burst_then_wait(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    assert [bucket.take(1) for _ in range(5)] == [0.0] * 5       # 满桶突发
+    assert bucket.take(1) == pytest.approx(0.1)                   # 透支 1 个令牌
+    assert bucket.take(2) == pytest.approx(0.3)                   # 累计透支 3 个
+    clock.now += 0.3
+    assert bucket.take(0) == pytest.approx(0.0)
+    clock.now += 10                                               # 长时间空闲也不超过容量
+    bucket.take(0)
+    assert bucket.tokens == 5
+
+
+def test_token_bucket_min_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=0.1)
+    assert bucket.capacity == 1.0
+    assert bucket.take(1) == 0.0
+    assert bucket.take(1) == pytest.approx(0.5)
+
+
+def test_adapt_backs_off_and_recovers(clock):
+    cfg = ThrottleConfig(ops_per_s=100, mb_per_s=10, latency_ms=25, queue_length=2, min_factor=0.2)
+    busy, idle = (50.0, 0.5), (5.0, 0.5)
+    throttle = Throttle(cfg, pressure=StubPressure([busy, (5.0, 4.0), busy, busy] + [idle] * 8 + [None]))
+
+    factors = []
+    for _ in range(13):
+        throttle._adapt()
+        factors.append(throttle.factor)
+    # 延迟或队列超限减半，最低 min_factor；恢复时每次 ×1.25，最高 1.0；无样本时保持不变
+    assert factors[:4] == pytest.approx([0.5, 0.25, 0.2, 0.2])
+    assert factors[4:12] == pytest.approx([0.25, 0.3125, 0.390625, 0.48828125,
+                                           0.6103515625, 0.762939453125, 0.95367431640625, 1.0])
+    assert factors[12] == 1.0
+    assert throttle.backoffs == 4
+    assert throttle.ops.rate == 100
+    assert throttle.bytes.rate == 10 * 1024 * 1024
+
+
+def test_consume_sleeps_at_reduced_rate(clock):
+    cfg = ThrottleConfig(ops_per_s=10, mb_per_s=1000, burst_s=0.1, check_interval=0.5)
+    throttle = Throttle(cfg, pressure=StubPressure([(100.0, 0.0)]))
+    throttle.consume()                                            # 用掉唯一的令牌
+    assert clock.sleeps == []
+
+    clock.now += 0.5                                              # 到检查点：退避到 5 ops/s
+    throttle.consume()
+    throttle.consume()
+    assert throttle.factor == 0.5 and throttle.ops.rate == 5
+    assert clock.sleeps == pytest.approx([0.2])
+    assert throttle.slept == pytest.approx(0.2)
+    assert throttle.describe() == "限速等待 0.2s，磁盘繁忙退避 1 次"
+
+
+def test_disk_pressure_from_counters(clock):
+    io = namedtuple("sdiskio", "read_count write_count read_time write_time")
+    counters = [io(100, 0, 1000, 0), io(140, 10, 2500, 500)]
+    ps = types.SimpleNamespace(disk_io_counters=lambda: counters.pop(0))
+    pressure = DiskPressure(ps)
+    clock.now += 0.5
+    latency, queue = pressure.sample()
+    assert latency == pytest.approx(2000 / 50)
+    assert queue == pytest.approx(2.0 / 0.5)
+    assert DiskPressure(types.SimpleNamespace(disk_io_counters=lambda: None)).sample() is None
@@ -0,0 +1,68 @@
+import datetime
+import os
+import struct
+
+from modules import livekernel
+from modules.livekernel import synthetic_header
+
+WHEN = datetime.datetime(2024, 5, 1, 12, 30, 15)
+
+
+def test_kernel64_header():
+    data = synthetic_header(0x141, (0xFFFF8001, 2, 3, 0xFFFFFFFFFFFFFFFF), WHEN)
+    kind, code, params, ts = livekernel.parse_dump_header(data)
+    assert (kind, code, ts) == ("kernel64", 0x141, WHEN)
+    assert params == (0xFFFF8001, 2, 3, 0xFFFFFFFFFFFFFFFF)
+    # 按文档中的 DUMP_HEADER64 偏移直接核对
+    assert struct.unpack_from("<I", data, 0x38)[0] == 0x141
+    assert struct.unpack_from("<Q", data, 0x40)[0] == 0xFFFF8001
+
+
+def test_kernel32_and_minidump_headers():
+    kind, code, params, ts = livekernel.parse_dump_header(
+        synthetic_header(0x117, (1, 2, 3, 4), WHEN, kind="kernel32"))
+    assert (kind, code, params, ts) == ("kernel32", 0x117, (1, 2, 3, 4), WHEN)
+
+    kind, code, params, ts = livekernel.parse_dump_header(
+        synthetic_header(0, timestamp=WHEN, kind="minidump"))
+    assert (kind, code, params, ts) == ("minidump", None, (), WHEN)
+
+
+def test_unknown_and_truncated():
+    assert livekernel.parse_dump_header(b"garbage" * 10)[0] == "unknown"
+    # 签名正确但头部不完整（SystemTime 之前就截断了）
+    assert livekernel.parse_dump_header(synthetic_header(0x141)[:0x100])[0] == "unknown"
+    # 没有时间时返回 None
+    assert livekernel.parse_dump_header(synthetic_header(0x141))[3] is None
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_scan_and_group_by_component(tmp_path):
+    day1 = datetime.datetime(2024, 5, 1, 8)
+    day2 = datetime.datetime(2024, 5, 2, 8)
+    _write(tmp_path / "WATCHDOG" / "a.dmp", synthetic_header(0x141, timestamp=day1))
+    _write(tmp_path / "WATCHDOG" / "b.dmp", synthetic_header(0x141, timestamp=day2))
+    _write(tmp_path / "watchdog" / "sub" / "c.dmp", synthetic_header(0x141, timestamp=day2))
+    _write(tmp_path / "USBHUB3" / "d.dmp", synthetic_header(0x144, timestamp=day1))
+    _write(tmp_path / "root.dmp", synthetic_header(0x161, timestamp=day1, kind="kernel32"))
+    _write(tmp_path / "NDIS" / "notes.txt", b"not a dump")
+
+    dumps = livekernel.scan_reports(str(tmp_path))
+    by_name = {os.path.basename(d.path): d for d in dumps}
+    assert sorted(by_name) == ["a.dmp", "b.dmp", "c.dmp", "d.dmp", "root.dmp"]
+    assert by_name["c.dmp"].component == "watchdog"           # 第一级子目录即组件
+    assert by_name["root.dmp"].component is None
+    assert by_name["d.dmp"].bugcheck_name == "BUGCODE_USB3_DRIVER (0x144)"
+    assert by_name["a.dmp"].timestamp == livekernel._utc_to_local(day1)
+
+    groups = livekernel.group_dumps(dumps)
+    keys = [(g.component, g.bugcheck, g.count) for g in groups]
+    assert keys[0] == ("WATCHDOG", 0x141, 3)                 # 组件名不区分大小写，最近的在前
+    assert sorted(keys[1:], key=str) == [("USBHUB3", 0x144, 1), (None, 0x161, 1)]
+    watchdog = groups[0]
+    assert list(watchdog.per_day().values()) == [1, 2]
+    assert watchdog.last == livekernel._utc_to_local(day2)
@@ -0,0 +1,103 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from modules.net_probe import Endpoint, EndpointSeries, LatencyMonitor, LatencyStats, \
+    log_comparison
+
+
+def test_series_stats():
+    series = EndpointSeries("x", capacity=4)
+    for ms in (99.0, 10.0, None, 20.0, 15.0):          # 第一个值被挤出窗口
+        series.add(ms)
+    stats = series.stats()
+    assert (stats.sent, stats.lost, stats.loss) == (4, 1, 0.25)
+    assert (stats.p50, stats.p99) == (15.0, 20.0)
+    assert stats.jitter == pytest.approx((10 + 5) / 2)  # 相邻成功探测的平均绝对差
+
+    empty = EndpointSeries("y", 4)
+    empty.add(None)
+    stats = empty.stats()
+    assert stats.p50 is None and stats.jitter is None and stats.loss == 1.0
+    assert "无响应" in stats.describe()
+
+
+def test_log_comparison():
+    before = [LatencyStats("Steam", 3, 0, 20.0, 30.0, 2.0)]
+    after = [LatencyStats("Steam", 3, 1, 15.5, 18.0, 1.0)]
+    logs = []
+    log_comparison(before, after, logs.append)
+    assert logs[-1] == "    变化    p50 -4.5 ms，抖动 -1.0 ms，丢包 +33%"
+    assert any("执行后  p50 15.5 ms" in line for line in logs)
+
+
+@pytest.fixture
+def servers():
+    """本地 TCP 监听端口、UDP 回显端口，以及一个已关闭的 TCP 端口"""
+    tcp = socket.socket()
+    tcp.bind(("127.0.0.1", 0))
+    tcp.listen(16)
+    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp.bind(("127.0.0.1", 0))
+    udp.settimeout(0.1)
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+
+    stop = threading.Event()
+
+    def echo():
+        while not stop.is_set():
+            try:
+                data, addr = udp.recvfrom(512)
+            except socket.timeout:
+                continue
+            udp.sendto(data, addr)
+
+    thread = threading.Thread(target=echo, daemon=True)
+    thread.start()
+    yield [
+        Endpoint("tcp", "127.0.0.1", tcp.getsockname()[1]),
+        Endpoint("udp", "127.0.0.1", udp.getsockname()[1], proto="udp"),
+        Endpoint("closed", "127.0.0.1", closed_port),
+        Endpoint("tcp", "127.0.0.1", tcp.getsockname()[1]),   # 重名端点各自统计
+    ]
+    stop.set()
+    thread.join()
+    tcp.close()
+    udp.close()
+
+
+def _check(stats):
+    assert [s.name for s in stats] == ["tcp", "udp", "closed", "tcp"]
+    for s in (stats[0], stats[1], stats[3]):
+        assert (s.sent, s.lost) == (3, 0) and s.p50 is not None and s.jitter is not None
+    assert stats[2].loss == 1.0 and stats[2].p50 is None
+
+
+def test_measure_local_endpoints(servers):
+    _check(LatencyMonitor(servers, timeout=0.5).measure(rounds=3))
+
+
+def test_measure_inside_running_loop(servers):
+    monitor = LatencyMonitor(servers, timeout=0.5)
+
+    async def caller():
+        return monitor.measure(rounds=3)
+
+    _check(asyncio.run(caller()))
+
+
+def test_monitor_start_stop(servers):
+    monitor = LatencyMonitor(servers[:2], interval=0.02, window=10, timeout=0.5)
+    monitor.start()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and min(s.sent for s in monitor.snapshot()) < 3:
+        time.sleep(0.02)
+    monitor.stop(timeout=2)
+    assert not monitor.running
+    assert all(s.sent >= 3 and s.lost == 0 for s in monitor.snapshot())
@@ -0,0 +1,117 @@
+import queue
+
+import pytest
+
+from modules import registry
+from modules.registry import HKCU, HKLM, REG_DWORD, REG_MULTI_SZ, REG_SZ, MemoryRegistryBackend
+from modules.task_runner import TaskDef, TaskLevel, TaskRunner
+
+GAMEBAR = r"Software\Microsoft\GameBar"
+
+
+class WriteTracking(MemoryRegistryBackend):
+    """记录以写权限打开的键，用于断言值已相同时不申请写权限"""
+
+    def __init__(self, initial=None):
+        super().__init__(initial)
+        self.opened_for_write = []
+
+    def open_key(self, hive, path, write=False):
+        handle = super().open_key(hive, path, write)
+        if write:
+            self.opened_for_write.append(path)
+        return handle
+
+
+class FailingBackend(MemoryRegistryBackend):
+    def set_value(self, handle, name, value_type, value):
+        if name == "Broken":
+            raise OSError("拒绝访问")
+        super().set_value(handle, name, value_type, value)
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        registry.RegistryBackend()
+
+
+def test_matching_values_skip_write_access():
+    backend = WriteTracking({
+        (HKLM, GAMEBAR): {"AutoGameModeEnabled": (1, REG_DWORD),
+                          "Paths": (["a", "b"], REG_MULTI_SZ)},
+    })
+    tx = registry.RegistryTransaction("t", backend)
+    tx.set_value(HKLM, GAMEBAR, "AutoGameModeEnabled", 1)
+    tx.set_value(HKLM, GAMEBAR, "Paths", ("a", "b"), REG_MULTI_SZ)
+    snapshot = tx.commit(lambda msg: None)
+
+    assert snapshot.entries == []
+    assert backend.writes == 0
+    assert backend.opened_for_write == []
+
+
+def test_commit_writes_only_changed_values_and_rolls_back(data_dir):
+    backend = MemoryRegistryBackend({
+        (HKCU, GAMEBAR): {"AllowAutoGameMode": (1, REG_DWORD),
+                          "AutoGameModeEnabled": (0, REG_DWORD),
+                          "Label": ("1", REG_SZ)},
+    })
+    tx = registry.RegistryTransaction("enable_game_mode", backend)
+    for name in ("AllowAutoGameMode", "AutoGameModeEnabled", "Label"):
+        tx.set_value(HKCU, GAMEBAR, name, 1)               # Label 类型不同，需要写入
+    tx.set_value(HKCU, r"Software\New", "X", 5, create_key=True)
+    tx.set_value(HKCU, r"Software\Missing", "Y", 5)          # 不创建键：跳过
+    snapshot = tx.commit(lambda msg: None)
+
+    assert [e.name for e in snapshot.entries] == ["AutoGameModeEnabled", "Label", "X"]
+    assert backend.writes == 3
+    assert (HKCU, r"software\missing") not in backend.keys
+    assert registry.latest_snapshot_path() is not None
+
+    assert registry.rollback_latest(lambda msg: None, backend)
+    values = backend.keys[(HKCU, GAMEBAR.lower())]
+    assert values["AutoGameModeEnabled"] == (0, REG_DWORD)
+    assert values["Label"] == ("1", REG_SZ)
+    assert (HKCU, r"software\new") not in backend.keys
+    assert registry.latest_snapshot_path() is None
+
+
+def test_failed_write_rolls_back():
+    backend = FailingBackend({(HKCU, GAMEBAR): {"A": (0, REG_DWORD)}})
+    tx = registry.RegistryTransaction("t", backend)
+    tx.set_value(HKCU, GAMEBAR, "A", 1)
+    tx.set_value(HKCU, GAMEBAR, "Broken", 1)
+    with pytest.raises(OSError):
+        tx.commit(lambda msg: None)
+    assert backend.keys[(HKCU, GAMEBAR.lower())] == {"A": (0, REG_DWORD)}
+
+
+class _Root:
+    def after(self, ms, func, *args):
+        raise AssertionError("探测结果已在队列中，不应再轮询")
+
+
+def test_undo_task_runs_before_tasks_it_undoes():
+    order = []
+
+    def task(key, **kwargs):
+        return TaskDef(key=key, label=key, level=TaskLevel.LEVEL1,
+                       func=lambda: order.append(key), **kwargs)
+
+    probed = []
+    selected = [
+        task("enable_gamemode", probe=lambda ctx: probed.append("enable_gamemode") or True),
+        task("flush"),
+        task("restore_registry", undoes=("enable_gamemode",)),
+    ]
+    runner = TaskRunner(lambda msg: None, _Root())
+
+    # 同批有撤销任务时不探测被撤销的任务（撤销之后它就不再是「已是目标状态」）
+    assert runner._probe_tasks(selected) == []
+    assert probed == []
+
+    q = queue.Queue()
+    q.put([])
+    runner._poll_probe(q, selected)
+    runner._worker.join(5)
+    assert order == ["restore_registry", "enable_gamemode", "flush"]
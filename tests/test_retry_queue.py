@@ -0,0 +1,90 @@
+import json
+import os
+
+from modules.cleaner import CleanStats
+from modules import retry_queue
+from modules.retry_queue import RetryQueue
+
+
+def _write(path, data=b"x" * 100):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _failures(paths, prune_roots=()):
+    stats = CleanStats(prune_roots=list(prune_roots))
+    for p in paths:
+        stats.failed_paths.append(p)
+        stats.failed_sizes.append(os.path.getsize(p))
+    return stats
+
+
+def test_retry_deletes_and_prunes_empty_dirs(tmp_path):
+    root = tmp_path / "cache"
+    locked = str(root / "a" / "b" / "locked.bin")
+    _write(locked)
+    _write(str(root / "keep" / "other.bin"))
+
+    q = RetryQueue(str(tmp_path / "retry"))
+    assert q.add_failures(_failures([locked], [str(root)]), "测试") == 1
+    result = q.retry(force=True)
+
+    assert (result.deleted, result.deleted_bytes, result.changed) == (1, 100, 0)
+    assert not os.path.exists(root / "a")          # 留下的空目录一并移除
+    assert os.path.isdir(root)                     # 边界目录本身保留
+    assert len(q) == 0
+
+
+def test_retry_skips_rewritten_file(tmp_path):
+    path = str(tmp_path / "log" / "app.log")
+    _write(path)
+    q = RetryQueue(str(tmp_path / "retry"))
+    q.add_failures(_failures([path]))
+
+    _write(path, b"y" * 250)                       # 程序重新创建了同名文件
+    result = q.retry(force=True)
+    assert (result.deleted, result.changed) == (0, 1)
+    assert os.path.exists(path)
+    assert len(q) == 0
+
+
+def test_retry_detects_mtime_change(tmp_path):
+    path = str(tmp_path / "same_size.bin")
+    _write(path)
+    q = RetryQueue(str(tmp_path / "retry"))
+    q.add_failures(_failures([path]))
+
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 60))
+    assert q.retry(force=True).changed == 1
+    assert os.path.exists(path)
+
+
+def test_legacy_queue_without_mtime(tmp_path):
+    path = str(tmp_path / "old.bin")
+    _write(path)
+    retry_dir = tmp_path / "retry"
+    retry_dir.mkdir()
+    (retry_dir / "queue.json").write_text(json.dumps([{"path": path, "size": 100}]))
+
+    q = RetryQueue(str(retry_dir))
+    [entry] = q.entries()
+    assert entry.mtime == 0.0 and entry.prune_to == ""
+    assert q.retry(force=True).deleted == 1
+    assert not os.path.exists(path)
+    assert os.path.isdir(tmp_path)
+
+
+def test_retry_due_logs_changed_only(tmp_path, monkeypatch):
+    path = str(tmp_path / "log" / "app.log")
+    _write(path)
+    q = RetryQueue(str(tmp_path / "retry"))
+    q.add_failures(_failures([path]))
+    _write(path, b"y" * 250)
+    monkeypatch.setattr(retry_queue, "_queue", q)
+
+    logs = []
+    result = retry_queue.retry_due(logs.append, force=True)
+    assert (result.deleted, result.gone, result.changed, result.locked) == (0, 0, 1, [])
+    assert logs == ["[重试队列] 重试删除成功 0 个（0 B），1 个已被重新写入（不再删除）"]
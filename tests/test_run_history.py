@@ -0,0 +1,71 @@
+import datetime
+
+from modules import run_history
+from modules.findings import ERROR, INFO, NOTE, WARNING, Finding
+
+
+def _setupapi(line, ts):
+    return Finding("setupapi", ERROR, line, timestamp=ts, vid="046D", pid="C52B")
+
+
+def _event(event_id, message, ts, record_id):
+    return Finding("System.evtx", WARNING, f"EventID {event_id}（Service Control Manager）",
+                   detail=message, timestamp=ts, event_id=event_id,
+                   module="Service Control Manager", extra={"record_id": record_id})
+
+
+T1 = datetime.datetime(2026, 10, 1, 9, 0, 0)
+T2 = datetime.datetime(2026, 10, 2, 21, 30, 15)
+
+
+def test_fingerprint_ignores_timestamps():
+    a = _setupapi("!!!  dvi: Device not started: USB\\VID_046D&PID_C52B\\6&1A2B3C&0&2 09:00:01.123", T1)
+    b = _setupapi("!!!  dvi: Device not started: USB\\VID_046D&PID_C52B\\7&9F8E7D&0&1 21:30:15.456", T2)
+    assert a.fingerprint == b.fingerprint
+
+
+def test_fingerprint_uses_message_template():
+    a = _event(7000, "The Foo service failed to start: error 1053.", T1, 100)
+    b = _event(7000, "The Foo service failed to start: error 1058.", T2, 250)
+    c = _event(7000, "The Bar service failed to start: error 1053.", T1, 101)
+    assert a.fingerprint == b.fingerprint
+    assert a.fingerprint != c.fingerprint
+
+
+def test_compare_saved_runs():
+    first = [
+        ("【setupapi】", [
+            _setupapi("!!!  dvi: Device not started 09:00:01.123", T1),
+            Finding("setupapi", NOTE, "状态说明"),
+        ]),
+        ("【事件日志】", [
+            _event(7000, "The Foo service failed to start.", T1, 100),
+            _event(7000, "The Bar service failed to start.", T1, 101),
+        ]),
+    ]
+    second = [
+        ("【setupapi】", [
+            _setupapi("!!!  dvi: Device not started 21:30:15.456", T2),
+        ]),
+        ("【事件日志】", [
+            _event(7000, "The Foo service failed to start.", T1, 100),
+            _event(7000, "The Foo service failed to start.", T2, 180),
+            Finding("System.evtx", INFO, "EventID 10110（DriverFrameworks-UserMode）",
+                    detail="A problem has occurred with driver WUDFRd", timestamp=T2,
+                    event_id=10110, module="DriverFrameworks-UserMode"),
+        ]),
+    ]
+    run_history.save_run(first)
+    run_history.save_run(second)
+    runs = run_history.list_runs()
+    assert len(runs) == 2
+
+    diff = run_history.compare_runs(run_history.load_run(runs[0]), run_history.load_run(runs[1]))
+    assert [f.event_id for f in diff.new] == [10110]
+    assert [f.detail for f in diff.resolved] == ["The Bar service failed to start."]
+    assert [(f.detail, what) for f, what in diff.changed] == [
+        ("The Foo service failed to start.", "次数 1 → 2")]
+    assert diff.unchanged == 1                      # setupapi 行只是时间戳不同
+
+    text = run_history.compare_latest()
+    assert "新增 1，已消失 1，有变化 1，未变化 1" in text
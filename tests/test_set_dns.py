@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+from modules import command_exec, net_tasks
+from modules.command_exec import CommandExecutor, FakeProcess
+
+
+class FakeNetsh:
+    """按 netsh set / add dnsservers 修改状态，show dnsservers 返回当前配置"""
+
+    def __init__(self):
+        self.config = {"ipv4": ["DHCP"], "ipv6": ["DHCP"]}
+        self.calls = []
+
+    async def __call__(self, cmd):
+        self.calls.append(list(cmd))
+        family, action = cmd[2], cmd[3]
+        if action == "show":
+            return FakeProcess(0, " ".join(self.config[family]).encode())
+        if action == "set":
+            self.config[family] = ["DHCP"] if cmd[6] == "dhcp" else ["Static", cmd[7]]
+        elif action == "add":
+            self.config[family].append(cmd[6])
+        return FakeProcess(0)
+
+
+@pytest.fixture
+def netsh(monkeypatch):
+    fake = FakeNetsh()
+    command_exec.set_executor(CommandExecutor(spawn=fake, encoding="utf-8"))
+    monkeypatch.setattr(net_tasks, "list_active_adapters", lambda: ["Ethernet"])
+    monkeypatch.setattr(net_tasks, "benchmark_dns", lambda servers, **kwargs:
+                        [net_tasks.DnsBenchResult(server=s, samples=[5.0]) for s in servers])
+    yield fake
+    command_exec.set_executor(None)
+
+
+def test_set_and_restore_only_changed_family(netsh, data_dir):
+    logs = []
+    net_tasks.set_dns(logs.append, net_tasks.DnsServers("223.5.5.5", "223.6.6.6"))
+    assert netsh.config["ipv4"] == ["Static", "223.5.5.5", "223.6.6.6"]
+    assert any("√ Ethernet" in line for line in logs)
+
+    backup = json.loads((data_dir / net_tasks.DNS_BACKUP_FILE).read_text(encoding="utf-8"))
+    assert list(backup["Ethernet"]) == ["v4"]          # IPv6 没有改动，不备份
+
+    netsh.calls.clear()
+    net_tasks.restore_dns(logs.append)
+    assert netsh.config["ipv4"] == ["DHCP"]
+    assert all(call[2] == "ipv4" for call in netsh.calls)
+    assert not (data_dir / net_tasks.DNS_BACKUP_FILE).exists()
+
+
+def test_set_dns_inside_running_loop(netsh):
+    async def caller():
+        net_tasks.set_dns(lambda msg: None, net_tasks.DnsServers("1.1.1.1"))
+        net_tasks.restore_dns(lambda msg: None)
+
+    asyncio.run(caller())
+    assert netsh.config["ipv4"] == ["DHCP"]
+
+
+def test_invalid_address_rejected(netsh):
+    with pytest.raises(ValueError):
+        net_tasks.set_dns(lambda msg: None, net_tasks.DnsServers("1.1.1.300"))
+    with pytest.raises(ValueError):
+        net_tasks.DnsServers("1.1.1.1", primary_v6="8.8.8.8").validate()
+    assert netsh.calls == []
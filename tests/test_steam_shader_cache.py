@@ -0,0 +1,110 @@
+import os
+
+from modules import steam_library
+from modules.game_tasks import clean_steam_shader_cache
+
+
+def _write(path, data=b""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _manifest(steamapps, appid, name):
+    text = f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n\t"name"\t\t"{name}"\n' \
+           f'\t"installdir"\t\t"{name}"\n}}\n'
+    _write(os.path.join(steamapps, f"appmanifest_{appid}.acf"), text.encode())
+
+
+def _cache(steamapps, appid, size):
+    _write(os.path.join(steamapps, "shadercache", str(appid), "fozpipelinesv6", "a.foz"),
+           b"x" * size)
+
+
+def make_steam(tmp_path):
+    """Steam 根目录 + 另一个库；根库装 730、570，第二个库装 1091500，另有一个已卸载游戏的缓存"""
+    root = tmp_path / "Steam"
+    other = tmp_path / "SteamLibrary"
+    root_apps = str(root / "steamapps")
+    other_apps = str(other / "steamapps")
+    vdf = ('"libraryfolders"\n{\n'
+           f'\t"0"\n\t{{\n\t\t"path"\t\t"{str(root)}"\n\t}}\n'
+           f'\t"1"\n\t{{\n\t\t"path"\t\t"{str(other)}"\n\t}}\n'
+           '}\n').replace("\\", "\\\\")
+    _write(os.path.join(root_apps, "libraryfolders.vdf"), vdf.encode())
+    _manifest(root_apps, 730, "Counter-Strike 2")
+    _manifest(root_apps, 570, "dota 2 beta")
+    _manifest(other_apps, 1091500, "Cyberpunk 2077")
+    _cache(root_apps, 730, 3000)
+    _cache(root_apps, 570, 2000)
+    _cache(other_apps, 1091500, 5000)
+    _cache(root_apps, 440, 1000)          # 已卸载：没有 appmanifest_440.acf
+    steam_library.invalidate_cache()
+    return str(root), root_apps, other_apps
+
+
+def test_discover_libraries(tmp_path):
+    root, _, other_apps = make_steam(tmp_path)
+    libs = steam_library.discover_libraries(root)
+    assert [os.path.basename(lib.path) for lib in libs] == ["Steam", "SteamLibrary"]
+    assert [(g.appid, g.shadercache_bytes) for g in libs[0].games] == [("730", 3000), ("570", 2000)]
+    assert libs[1].games[0].name == "Cyberpunk 2077"
+
+    orphans = steam_library.orphan_shader_caches(libs)
+    assert [g.appid for g in orphans] == ["440"]
+
+
+def test_sizes_not_cached(tmp_path):
+    root, root_apps, _ = make_steam(tmp_path)
+    assert steam_library.discover_libraries(root)[0].games[0].shadercache_bytes == 3000
+    # VDF 未变化，但缓存目录在增长
+    _write(os.path.join(root_apps, "shadercache", "730", "more.bin"), b"y" * 4000)
+    assert steam_library.discover_libraries(root)[0].games[0].shadercache_bytes == 7000
+
+    no_sizes = steam_library.discover_libraries(root, with_sizes=False)
+    assert len(no_sizes[0].games) == 2
+
+
+def test_clean_selected_games(tmp_path):
+    root, root_apps, other_apps = make_steam(tmp_path)
+    stats = clean_steam_shader_cache(lambda msg: None, appids=[730, "1091500"], steam_root=root)
+
+    assert stats.bytes_deleted == 8000
+    assert not os.path.exists(os.path.join(root_apps, "shadercache", "730"))
+    assert not os.path.exists(os.path.join(other_apps, "shadercache", "1091500"))
+    # 未选择的游戏与已卸载游戏的缓存都保留
+    assert os.path.isdir(os.path.join(root_apps, "shadercache", "570"))
+    assert os.path.isdir(os.path.join(root_apps, "shadercache", "440"))
+
+
+def test_clean_all_includes_orphans(tmp_path):
+    root, root_apps, other_apps = make_steam(tmp_path)
+    logs = []
+    stats = clean_steam_shader_cache(logs.append, steam_root=root)
+
+    assert stats.bytes_deleted == 11000
+    assert os.listdir(os.path.join(root_apps, "shadercache")) == []
+    assert os.listdir(os.path.join(other_apps, "shadercache")) == []
+    assert any("已卸载的游戏" in line for line in logs)
+
+
+def test_missing_steam(tmp_path):
+    steam_library.invalidate_cache()
+    logs = []
+    stats = clean_steam_shader_cache(logs.append, steam_root=str(tmp_path / "nowhere"))
+    assert stats.bytes_deleted == 0
+
+
+def test_measuring_leaves_cache_untouched(tmp_path):
+    root, root_apps, _ = make_steam(tmp_path)
+    # 按 appmanifest 顺序缓存的游戏列表，大小均为 0
+    cached = [(g.appid, g.shadercache_bytes)
+              for g in steam_library.discover_libraries(root, with_sizes=False)[0].games]
+
+    measured = steam_library.discover_libraries(root)
+    assert measured[0].games[0].shadercache_bytes == 3000
+    measured[0].games.clear()                                # 调用方随意修改返回值
+
+    again = steam_library.discover_libraries(root, with_sizes=False)[0].games
+    assert [(g.appid, g.shadercache_bytes) for g in again] == cached
+    assert all(size == 0 for _, size in cached)
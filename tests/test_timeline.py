@@ -0,0 +1,77 @@
+import datetime
+
+from modules.findings import ERROR, NOTE, WARNING, Finding
+from modules.timeline import (MAX_SAMPLES, TIMELINE_SOURCE, build_timeline, cluster_incidents,
+                              merge_streams)
+
+T = datetime.datetime(2024, 5, 1, 10, 0, 0)
+
+
+def at(seconds, source="setupapi", device=("046D", "C077"), title="设备断开"):
+    vid, pid = device if device else (None, None)
+    return Finding(source, WARNING, title, timestamp=T + datetime.timedelta(seconds=seconds),
+                   vid=vid, pid=pid)
+
+
+def test_merge_streams_orders_lazily():
+    a = [at(0), at(40), at(80)]
+    b = [at(10, "System.evtx"), Finding("System.evtx", WARNING, "无时间"), at(50, "System.evtx")]
+    c = iter([at(5, "WER", None), at(90, "WER", None)])      # 迭代器也可以
+    merged = merge_streams([a, b, c])
+    assert not isinstance(merged, list)
+    assert [(f.timestamp - T).seconds for f in merged] == [0, 5, 10, 40, 50, 80, 90]
+
+
+def test_cluster_by_device_window():
+    usb = [at(0), at(60), at(150), at(900)]
+    evtx = [at(30, "System.evtx")]
+    wer = [at(90, "WER", None, "应用崩溃")]
+    incidents = list(cluster_incidents(merge_streams([usb, evtx, wer])))
+
+    loose, first, second = incidents
+    assert loose.key is None and loose.count == 1
+    assert first.key == "VID_046D&PID_C077"
+    assert (first.count, first.start, first.end) == (4, T, T + datetime.timedelta(seconds=150))
+    assert first.sources == {"setupapi": 3, "System.evtx": 1}
+    assert [f.source for f in first.related] == ["WER"]          # 无设备事件附加到活跃簇
+    assert second.count == 1 and second.start == T + datetime.timedelta(seconds=900)
+
+
+def test_loose_event_before_device_is_related():
+    events = [at(-60, "LiveKernel", None, "WATCHDOG"), at(0, device=("1532", "0084"))]
+    loose, dev = cluster_incidents(merge_streams([events]))
+    assert dev.related_count == 1 and dev.related[0].source == "LiveKernel"
+    assert dev.cross_source
+
+
+def test_burst_detection():
+    burst = [at(10 * i, device=("1532", "0084")) for i in range(25)]          # 4 分钟内 25 次
+    steady = [at(30 * i, "System.evtx", ("28DE", "1142")) for i in range(40)]  # 20 分钟内每 30 秒一次
+    incidents = {inc.key: inc for inc in cluster_incidents(merge_streams([burst, steady]))}
+
+    hot = incidents["VID_1532&PID_0084"]
+    cold = incidents["VID_28DE&PID_1142"]
+    assert hot.burst_peak == 25 and hot.is_burst(20)
+    assert cold.count == 40 and cold.burst_peak == 11 and not cold.is_burst(20)
+    assert cold.is_burst(11)
+    assert len(cold.samples) == MAX_SAMPLES
+
+
+def test_build_timeline_keeps_interesting_incidents():
+    sections = [
+        ("setupapi", [at(0), at(60), at(900, device=("AAAA", "BBBB")),
+                      Finding("setupapi", NOTE, "扫描完成", timestamp=T)]),
+        ("System.evtx", [at(30, "System.evtx")]),
+        ("WER", [at(3000, "WER", None)]),
+        ("USB", [at(5000 + 10 * i, "USB", ("1532", "0084")) for i in range(20)]),
+    ]
+    result = build_timeline(sections)
+    assert [f.source for f in result] == [TIMELINE_SOURCE] * 2
+    burst, cross = result                                         # 新 → 旧
+    assert burst.severity == ERROR and burst.title.endswith("（突发）")
+    assert (burst.vid, burst.pid, burst.extra["count"]) == ("1532", "0084", 20)
+    assert cross.severity == WARNING and cross.title == "设备 VID_046D&PID_C077：3 个事件"
+    assert "来源：setupapi×2、System.evtx×1" in cross.detail
+
+    only_singles = build_timeline([("setupapi", [at(0)]), ("WER", [at(10000, "WER", None)])])
+    assert [f.severity for f in only_singles] == [NOTE]
@@ -0,0 +1,174 @@
+# ui/diskscanpanel.py
+import os
+import tkinter as tk
+from tkinter import ttk, filedialog
+from typing import List, Optional, Tuple
+
+from modules.cleaner import format_bytes
+from modules.disk_scan import DiskScanner, default_roots
+
+
+class _SizeTable(ttk.Frame):
+    """两列表格（大小 / 名称），行数固定，刷新时只改写发生变化的行"""
+
+    def __init__(self, parent, heading: str):
+        super().__init__(parent)
+        self.tree = ttk.Treeview(self, columns=("size", "name"), show="headings", height=16)
+        self.tree.heading("size", text="大小")
+        self.tree.heading("name", text=heading)
+        self.tree.column("size", width=100, anchor="e", stretch=False)
+        self.tree.column("name", width=560, anchor="w")
+        scrollbar = ttk.Scrollbar(self, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self._rows: List[Tuple[str, str]] = []
+
+    def update_rows(self, rows: List[Tuple[str, str]]):
+        items = self.tree.get_children()
+        for i, row in enumerate(rows):
+            if i < len(items):
+                if i < len(self._rows) and self._rows[i] == row:
+                    continue
+                self.tree.item(items[i], values=row)
+            else:
+                self.tree.insert("", "end", values=row)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+        self._rows = list(rows)
+
+    def selected_name(self) -> Optional[str]:
+        sel = self.tree.selection()
+        return self.tree.item(sel[0], "values")[1] if sel else None
+
+
+class DiskScanWindow(tk.Toplevel):
+    """
+    磁盘空间分析窗口。
+    扫描在 DiskScanner 的后台线程中进行，GUI 定时检查 seq，
+    有新结果时刷新进度与四个列表（扫描过程中即可看到部分结果）。关闭窗口即停止扫描。
+    """
+
+    POLL_MS = 300
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("磁盘空间分析")
+        self.geometry("760x520")
+
+        self.scanner: Optional[DiskScanner] = None
+        self._last_seq = -1
+        self._job = None
+
+        frm = ttk.Frame(self, padding=8)
+        frm.pack(fill="both", expand=True)
+
+        bar = ttk.Frame(frm)
+        bar.pack(fill="x", pady=(0, 6))
+        ttk.Label(bar, text="扫描位置：").pack(side="left")
+        self.var_root = tk.StringVar(value=";".join(default_roots()))
+        ttk.Entry(bar, textvariable=self.var_root, width=50).pack(side="left", padx=(0, 4))
+        ttk.Button(bar, text="浏览…", command=self._browse).pack(side="left")
+        self.btn_scan = ttk.Button(bar, text="开始扫描", command=self._toggle)
+        self.btn_scan.pack(side="right")
+
+        self.var_status = tk.StringVar(value="可输入多个位置，以分号分隔。")
+        ttk.Label(frm, textvariable=self.var_status, foreground="#555555")\
+            .pack(anchor="w", pady=(0, 6))
+
+        book = ttk.Notebook(frm)
+        book.pack(fill="both", expand=True)
+        self.tbl_files = _SizeTable(book, "文件")
+        self.tbl_dirs = _SizeTable(book, "目录")
+        self.tbl_ext = _SizeTable(book, "扩展名")
+        self.tbl_group = _SizeTable(book, "一级文件夹")
+        book.add(self.tbl_files, text="最大的文件")
+        book.add(self.tbl_dirs, text="最大的目录")
+        book.add(self.tbl_ext, text="按扩展名")
+        book.add(self.tbl_group, text="按文件夹")
+
+        self.tbl_files.tree.bind("<Double-1>", lambda e: self._reveal(self.tbl_files))
+        self.tbl_dirs.tree.bind("<Double-1>", lambda e: self._reveal(self.tbl_dirs))
+        self.tbl_group.tree.bind("<Double-1>", lambda e: self._reveal(self.tbl_group))
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    # --------------------------
+    #  操作
+    # --------------------------
+    def _browse(self):
+        path = filedialog.askdirectory(parent=self, title="选择要扫描的文件夹")
+        if path:
+            self.var_root.set(os.path.normpath(path))
+
+    def _toggle(self):
+        if self.scanner is not None and self.scanner.running:
+            self.scanner.stop()
+            self.var_status.set("正在停止……")
+            return
+        roots = [r.strip() for r in self.var_root.get().split(";") if r.strip()]
+        missing = [r for r in roots if not os.path.isdir(r)]
+        if not roots or missing:
+            self.var_status.set(f"位置不存在：{'；'.join(missing) or '（空）'}")
+            return
+        self.scanner = DiskScanner(roots)
+        self._last_seq = -1
+        self.scanner.start()
+        self.btn_scan.config(text="停止扫描")
+        self._poll()
+
+    def _reveal(self, table: _SizeTable):
+        """双击：在资源管理器中定位"""
+        name = table.selected_name()
+        if not name or not os.path.exists(name) or os.name != "nt":
+            return
+        from modules.command_exec import spawn_detached
+        if os.path.isdir(name):
+            spawn_detached(["explorer", name])
+        else:
+            spawn_detached(["explorer", f"/select,{name}"])
+
+    # --------------------------
+    #  刷新
+    # --------------------------
+    def _poll(self):
+        if not self.winfo_exists() or self.scanner is None:
+            return
+        scanner = self.scanner
+        if scanner.seq != self._last_seq:
+            self._last_seq = scanner.seq
+            self._render()
+        if scanner.running:
+            self._job = self.after(self.POLL_MS, self._poll)
+        else:
+            self._job = None
+            self._render()
+            self.btn_scan.config(text="开始扫描")
+
+    def _render(self):
+        snap = self.scanner.snapshot()
+        if snap.running:
+            state = "正在扫描"
+        elif snap.error:
+            state = f"扫描出错（{snap.error}），以下为部分结果"
+        else:
+            state = "已停止" if snap.stopped else "扫描完成"
+        status = (f"{state}：{snap.dirs_scanned} 个目录、{snap.files} 个文件，"
+                  f"共 {format_bytes(snap.bytes)}，{snap.seconds:.1f}s")
+        if snap.errors:
+            status += f"（{snap.errors} 个目录无法访问）"
+        if snap.running and snap.current:
+            status += f"\n{snap.current}"
+        self.var_status.set(status)
+        self.tbl_files.update_rows([(format_bytes(s), p) for s, p in snap.top_files])
+        self.tbl_dirs.update_rows([(format_bytes(s), p) for s, p in snap.top_dirs])
+        self.tbl_ext.update_rows([(format_bytes(s), e) for e, s in snap.by_ext])
+        self.tbl_group.update_rows([(format_bytes(s), g) for g, s in snap.by_group])
+
+    def _on_close(self):
+        if self.scanner is not None:
+            self.scanner.stop()
+        if self._job:
+            self.after_cancel(self._job)
+            self._job = None
+        self.destroy()
@@ -1,16 +1,21 @@
 # ui/dnspopup.py
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Callable
 
+from modules import net_tasks
+
 
 class DNSConfigPopup(tk.Toplevel):
     """
     DNS 配置窗口。
-    通过回调把选中的 DNS IP 返回给主界面。
+    通过回调把选中的 DnsServers（主/备 DNS，可选 IPv6）返回给主界面。
+    「测速」在后台线程对所有候选 DNS 并发查询，结果按延迟排名显示。
     """
 
-    def __init__(self, parent, on_dns_selected: Callable[[str], None]):
+    def __init__(self, parent, on_dns_selected: Callable[[net_tasks.DnsServers], None]):
         super().__init__(parent)
         self.title("配置 DNS")
         self.resizable(False, False)
@@ -18,6 +23,8 @@ class DNSConfigPopup(tk.Toplevel):
 
         self.var_choice = tk.StringVar(value="ali")
         self.var_custom = tk.StringVar(value="")
+        self.var_custom_secondary = tk.StringVar(value="")
+        self.var_ipv6 = tk.BooleanVar(value=True)
 
         frm = ttk.Frame(self, padding=10)
         frm.pack(fill="both", expand=True)
@@ -25,16 +32,20 @@ class DNSConfigPopup(tk.Toplevel):
         ttk.Label(frm, text="选择一个 DNS 提供商：").pack(anchor="w", pady=(0, 5))
 
         choices = [
-            ("阿里 223.5.5.5", "223.5.5.5"),
-            ("DNSPod 119.29.29.29", "119.29.29.29"),
-            ("Google 8.8.8.8", "8.8.8.8"),
+            ("阿里 223.5.5.5", net_tasks.DnsServers(
+                "223.5.5.5", "223.6.6.6", "2400:3200::1", "2400:3200:baba::1")),
+            ("DNSPod 119.29.29.29", net_tasks.DnsServers(
+                "119.29.29.29", "182.254.116.116", "2402:4e00::")),
+            ("Google 8.8.8.8", net_tasks.DnsServers(
+                "8.8.8.8", "8.8.4.4", "2001:4860:4860::8888", "2001:4860:4860::8844")),
         ]
 
+        # 主 DNS IP → 预设
         self.dns_map = {}
 
-        for text, ip in choices:
-            val = ip
-            self.dns_map[val] = text
+        for text, servers in choices:
+            val = servers.primary
+            self.dns_map[val] = servers
             ttk.Radiobutton(
                 frm,
                 text=text,
@@ -49,8 +60,35 @@ class DNSConfigPopup(tk.Toplevel):
             value="custom"
         ).pack(anchor="w", pady=(5, 0))
 
-        entry = ttk.Entry(frm, textvariable=self.var_custom, width=20)
-        entry.pack(anchor="w", pady=(0, 10))
+        custom = ttk.Frame(frm)
+        custom.pack(anchor="w", pady=(0, 5))
+        ttk.Label(custom, text="主：").pack(side="left")
+        ttk.Entry(custom, textvariable=self.var_custom, width=16).pack(side="left")
+        ttk.Label(custom, text="  备（可选）：").pack(side="left")
+        ttk.Entry(custom, textvariable=self.var_custom_secondary, width=16).pack(side="left")
+
+        ttk.Checkbutton(
+            frm, text="同时设置 IPv6 DNS（仅预设提供商）", variable=self.var_ipv6
+        ).pack(anchor="w", pady=(0, 10))
+
+        # 测速结果表
+        bench = ttk.Frame(frm)
+        bench.pack(fill="x", pady=(0, 5))
+        self.btn_bench = ttk.Button(bench, text="测速", command=self._start_benchmark)
+        self.btn_bench.pack(side="left")
+        self.var_bench_status = tk.StringVar(value="点击测速，比较各 DNS 在当前网络下的延迟")
+        ttk.Label(bench, textvariable=self.var_bench_status).pack(side="left", padx=8)
+
+        columns = ("rank", "server", "p50", "p95", "cached", "uncached", "timeouts")
+        headings = ("排名", "DNS", "中位延迟", "P95", "缓存命中", "未缓存", "超时")
+        self.tree = ttk.Treeview(frm, columns=columns, show="headings", height=5)
+        for col, text in zip(columns, headings):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=110 if col == "server" else 70, anchor="center")
+        self.tree.pack(fill="x", pady=(0, 10))
+        self.tree.bind("<<TreeviewSelect>>", self._on_bench_row_selected)
+
+        self._bench_queue: "queue.Queue" = queue.Queue()
 
         btns = ttk.Frame(frm)
         btns.pack(anchor="e", pady=(5, 0))
@@ -62,6 +100,67 @@ class DNSConfigPopup(tk.Toplevel):
         self.grab_set()
         self.focus_set()
 
+    # ------------------------------------------------------------
+    #                       DNS 测速
+    # ------------------------------------------------------------
+    def _candidates(self):
+        servers = list(self.dns_map.keys())
+        custom = self.var_custom.get().strip()
+        if custom and custom not in servers:
+            servers.append(custom)
+        return servers
+
+    def _start_benchmark(self):
+        servers = self._candidates()
+        self.btn_bench.config(state="disabled")
+        self.var_bench_status.set("测速中……")
+        self.tree.delete(*self.tree.get_children())
+
+        def worker():
+            try:
+                self._bench_queue.put(net_tasks.benchmark_dns(servers))
+            except Exception as e:
+                self._bench_queue.put(e)
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.after(100, self._poll_benchmark)
+
+    def _poll_benchmark(self):
+        if not self.winfo_exists():
+            return
+        try:
+            results = self._bench_queue.get_nowait()
+        except queue.Empty:
+            self.after(100, self._poll_benchmark)
+            return
+
+        self.btn_bench.config(state="normal")
+        if isinstance(results, Exception):
+            self.var_bench_status.set(f"测速失败：{results}")
+            return
+
+        fmt = net_tasks.fmt_ms
+        for i, r in enumerate(results, 1):
+            self.tree.insert("", "end", iid=r.server, values=(
+                i, r.server, fmt(r.p50), fmt(r.p95),
+                fmt(r.cached_p50), fmt(r.uncached_p50), f"{r.timeouts}/{r.sent}",
+            ))
+        if results and results[0].samples:
+            self.var_bench_status.set(f"最快：{results[0].server}（点击表格行即可选中）")
+        else:
+            self.var_bench_status.set("所有 DNS 均无响应，请检查网络连接")
+
+    def _on_bench_row_selected(self, _event):
+        sel = self.tree.selection()
+        if not sel:
+            return
+        ip = sel[0]
+        if ip in self.dns_map:
+            self.var_choice.set(ip)
+        else:
+            self.var_choice.set("custom")
+            self.var_custom.set(ip)
+
     def _on_ok(self):
         choice = self.var_choice.get()
         if choice == "custom":
@@ -69,8 +168,18 @@ class DNSConfigPopup(tk.Toplevel):
             if not ip:
                 messagebox.showerror("错误", "请输入自定义 DNS IP。", parent=self)
                 return
+            servers = net_tasks.DnsServers(ip, self.var_custom_secondary.get().strip())
         else:
-            ip = choice
-
-        self.on_dns_selected(ip)
+            preset = self.dns_map[choice]
+            servers = net_tasks.DnsServers(preset.primary, preset.secondary)
+            if self.var_ipv6.get():
+                servers.primary_v6 = preset.primary_v6
+                servers.secondary_v6 = preset.secondary_v6
+        try:
+            servers = servers.validate()
+        except ValueError as e:
+            messagebox.showerror("错误", f"DNS 地址无效：{e}", parent=self)
+            return
+
+        self.on_dns_selected(servers)
         self.destroy()
@@ -1,7 +1,9 @@
 # ui/logpanel.py
+import threading
 import tkinter as tk
 from tkinter import ttk
-import datetime
+
+from modules.logbuffer import LogBuffer
 
 
 class LogPanel(ttk.Frame):
@@ -10,8 +12,12 @@ class LogPanel(ttk.Frame):
     - 不可编辑
     - 自动追加日志
     - 自动滚动到底部
+    - 同一轮事件循环内的多条日志合并为一次插入，超过上限时删除最旧的行
+    - 可在后台线程中调用 log()：只写入线程安全的 LogBuffer，由 Tk 线程定时取出
     """
 
+    POLL_MS = 200
+
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
 
@@ -30,10 +36,33 @@ class LogPanel(ttk.Frame):
         self.text.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
+        self.buffer = LogBuffer()
+        self._flush_scheduled = False
+        self._tk_thread = threading.current_thread()
+        self.after(self.POLL_MS, self._poll)
+
     def log(self, msg: str):
-        ts = datetime.datetime.now().strftime("%H:%M:%S")
-        line = f"[{ts}] {msg}\n"
+        self.buffer.append(msg)
+        # Tk 不是线程安全的：后台线程只写缓冲，留给 _poll 处理
+        if threading.current_thread() is not self._tk_thread:
+            return
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.after_idle(self.flush)
+
+    def _poll(self):
+        if self.buffer.has_pending and not self._flush_scheduled:
+            self.flush()
+        self.after(self.POLL_MS, self._poll)
+
+    def flush(self):
+        self._flush_scheduled = False
+        text, excess = self.buffer.drain()
+        if not text:
+            return
         self.text.configure(state="normal")
-        self.text.insert("end", line)
+        self.text.insert("end", text)
+        if excess:
+            self.text.delete("1.0", f"{excess + 1}.0")
         self.text.see("end")
         self.text.configure(state="disabled")
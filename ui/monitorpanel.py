@@ -0,0 +1,162 @@
+# ui/monitorpanel.py
+import tkinter as tk
+from tkinter import ttk
+from typing import List, Optional
+
+from modules.ringbuffer import RingBuffer
+from modules.sys_monitor import SystemSampler
+from modules.cleaner import format_bytes
+
+
+class Sparkline:
+    """
+    Canvas 上的一条迷你折线。
+    图元只在创建时生成一次，之后通过 coords / itemconfig 原地更新，
+    Tk 只重绘发生变化的区域，不会清空整个画布。
+    """
+
+    def __init__(self, canvas: tk.Canvas, x: int, y: int, width: int, height: int,
+                 title: str, fixed_max: Optional[float] = None, rate: bool = False,
+                 color: str = "#2a7ae2"):
+        self.canvas = canvas
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+        self.fixed_max = fixed_max
+        self.rate = rate
+        self._text = ""
+
+        canvas.create_rectangle(x, y, x + width, y + height, outline="#cccccc")
+        canvas.create_text(x + 4, y + 2, anchor="nw", text=title, fill="#555555",
+                           font=("Microsoft YaHei", 8))
+        self.value_item = canvas.create_text(x + width - 4, y + 2, anchor="ne", text="",
+                                             font=("Microsoft YaHei", 8))
+        # 折线至少需要两个点，先放一条贴底的占位线
+        base = y + height - 1
+        self.line_item = canvas.create_line(x, base, x + 1, base, fill=color, width=1)
+
+    def _format(self, value: float) -> str:
+        if self.rate:
+            return f"{format_bytes(int(value))}/s"
+        return f"{value:.0f}%"
+
+    def update(self, buf: RingBuffer):
+        values = buf.values()
+        if len(values) < 2:
+            return
+        top = self.fixed_max or max(max(values), 1.0)
+        step = self.width / (buf.capacity - 1)
+        # 数据右对齐：最新的点在最右侧
+        x0 = self.x + self.width - step * (len(values) - 1)
+        bottom = self.y + self.height - 1
+        scale = (self.height - 14) / top
+        coords: List[float] = []
+        for i, v in enumerate(values):
+            coords.append(x0 + i * step)
+            coords.append(bottom - min(v, top) * scale)
+        self.canvas.coords(self.line_item, *coords)
+
+        text = self._format(values[-1])
+        if text != self._text:
+            self._text = text
+            self.canvas.itemconfig(self.value_item, text=text)
+
+
+class MonitorWindow(tk.Toplevel):
+    """
+    实时系统监控窗口。
+    采样在 SystemSampler 的后台线程中完成，GUI 定时检查 seq，
+    只有产生新样本时才更新折线。关闭窗口即停止采样。
+    """
+
+    CHART_W = 260
+    CHART_H = 60
+    CORE_W = 126
+    CORE_H = 40
+    PAD = 6
+
+    def __init__(self, parent, interval: float = 1.0):
+        super().__init__(parent)
+        self.title("实时系统监控")
+        self.resizable(False, False)
+
+        self.sampler = SystemSampler(interval=interval)
+        self._last_seq = -1
+        self._job = None
+
+        frm = ttk.Frame(self, padding=8)
+        frm.pack(fill="both", expand=True)
+
+        # 采样间隔
+        bar = ttk.Frame(frm)
+        bar.pack(fill="x", pady=(0, 6))
+        ttk.Label(bar, text="采样间隔（秒）：").pack(side="left")
+        self.var_interval = tk.StringVar(value=f"{interval:g}")
+        spin = ttk.Spinbox(bar, from_=0.5, to=10, increment=0.5, width=5,
+                           textvariable=self.var_interval, command=self._apply_interval)
+        spin.pack(side="left")
+        spin.bind("<Return>", lambda e: self._apply_interval())
+        self.var_overhead = tk.StringVar(value="")
+        ttk.Label(bar, textvariable=self.var_overhead, foreground="#777777")\
+            .pack(side="right")
+
+        # 画布：上方 3×2 主指标，下方每核 CPU
+        pad, cw, ch = self.PAD, self.CHART_W, self.CHART_H
+        cores = self.sampler.cpu_count
+        core_cols = 4
+        core_rows = (cores + core_cols - 1) // core_cols
+        width = pad + 2 * (cw + pad)
+        height = pad + 3 * (ch + pad) + core_rows * (self.CORE_H + pad)
+        self.canvas = tk.Canvas(frm, width=width, height=height, background="white",
+                                highlightthickness=0)
+        self.canvas.pack()
+
+        s = self.sampler
+        layout = [
+            ("CPU 总占用", s.cpu_total, 100, False, "#2a7ae2"),
+            ("内存占用", s.memory, 100, False, "#8e44ad"),
+            ("磁盘读取", s.disk_read, None, True, "#27ae60"),
+            ("磁盘写入", s.disk_write, None, True, "#c0392b"),
+            ("网络下载", s.net_recv, None, True, "#16a085"),
+            ("网络上传", s.net_sent, None, True, "#d35400"),
+        ]
+        self.charts = []
+        for i, (title, buf, top, rate, color) in enumerate(layout):
+            x = pad + (i % 2) * (cw + pad)
+            y = pad + (i // 2) * (ch + pad)
+            self.charts.append((Sparkline(self.canvas, x, y, cw, ch, title, top, rate, color), buf))
+
+        core_top = pad + 3 * (ch + pad)
+        for i, buf in enumerate(s.cpu_cores):
+            x = pad + (i % core_cols) * (self.CORE_W + pad)
+            y = core_top + (i // core_cols) * (self.CORE_H + pad)
+            self.charts.append(
+                (Sparkline(self.canvas, x, y, self.CORE_W, self.CORE_H, f"核心 {i}", 100), buf))
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.sampler.start()
+        self._poll()
+
+    def _apply_interval(self):
+        try:
+            self.sampler.set_interval(float(self.var_interval.get()))
+        except ValueError:
+            self.var_interval.set(f"{self.sampler.interval:g}")
+
+    def _poll(self):
+        if not self.winfo_exists():
+            return
+        if self.sampler.seq != self._last_seq:
+            with self.sampler.lock:
+                self._last_seq = self.sampler.seq
+                for chart, buf in self.charts:
+                    chart.update(buf)
+            self.var_overhead.set(f"采样开销：{self.sampler.overhead_percent():.2f}% 单核")
+        # 轮询频率与采样间隔解耦，但不会比采样更快地重绘
+        self._job = self.after(250, self._poll)
+
+    def _on_close(self):
+        self.sampler.stop()
+        if self._job:
+            self.after_cancel(self._job)
+            self._job = None
+        self.destroy()